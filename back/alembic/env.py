@@ -15,11 +15,12 @@ from app.data.models.EffectsTable import EffectsTable
 from app.data.models.MetaDataTable import MetaDataTable
 from app.data.models.UserTable import UserTable
 from app.data.models.StatsMappingTable import StatsMappingTable
-from app.data.models.OrderTable import OrderTable
+from app.data.models.OrderTable import OrderTable, ProfilePurchaseSummaryTable
 from app.data.models.CartTable import CartTable
 from app.data.models.DeliveryDatesTable import DeliveryDatesTable
 from app.data.models.LocationTable import LocationTable
-from app.data.models.ReviewTable import ReviewTable
+from app.data.models.ReviewTable import ReviewTable, ReviewSummaryTable
+from app.data.models.SchedulerTable import SchedulerJobRunTable, SchedulerLeaderTable
 
 from app.envVariables import DATABASE_ALEMBIC_URL
 
@@ -51,6 +52,15 @@ config.set_main_option("sqlalchemy.url", DATABASE_ALEMBIC_URL)
 target_metadata = base.metadata
 # target_metadata = mymodel.Base.metadata
 
+# Database objects managed only by migrations (Postgres specific), autogenerate
+# must not try to drop them because they are not in the models
+MIGRATION_ONLY_OBJECTS = {("column", "search_vector"), ("index", "ix_item_table_search_vector")}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return (type_, name) not in MIGRATION_ONLY_OBJECTS
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -74,6 +84,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -83,7 +94,11 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
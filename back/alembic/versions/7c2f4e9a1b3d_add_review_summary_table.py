@@ -0,0 +1,74 @@
+"""Add review summary table
+
+Revision ID: 7c2f4e9a1b3d
+Revises: d300b6436d69
+Create Date: 2026-10-19 13:20:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "7c2f4e9a1b3d"
+down_revision: Union[str, None] = "d300b6436d69"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "review_summary_table",
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("review_count", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Integer(), nullable=False),
+        sa.Column("rating_1", sa.Integer(), nullable=False),
+        sa.Column("rating_2", sa.Integer(), nullable=False),
+        sa.Column("rating_3", sa.Integer(), nullable=False),
+        sa.Column("rating_4", sa.Integer(), nullable=False),
+        sa.Column("rating_5", sa.Integer(), nullable=False),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(
+            ["item_id"],
+            ["item_table.id"],
+        ),
+        sa.PrimaryKeyConstraint("item_id"),
+    )
+    op.create_index(
+        op.f("ix_review_table_item_id"), "review_table", ["item_id"], unique=False
+    )
+
+    # Backfill from the reviews that already exist
+    op.execute(
+        """
+        INSERT INTO review_summary_table (
+            item_id, review_count, rating_sum,
+            rating_1, rating_2, rating_3, rating_4, rating_5, updated_at
+        )
+        SELECT
+            item_id,
+            COUNT(*),
+            SUM(rating),
+            SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating = 3 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating = 4 THEN 1 ELSE 0 END),
+            SUM(CASE WHEN rating = 5 THEN 1 ELSE 0 END),
+            MAX(updated_at)
+        FROM review_table
+        GROUP BY item_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_review_table_item_id"), table_name="review_table")
+    op.drop_table("review_summary_table")
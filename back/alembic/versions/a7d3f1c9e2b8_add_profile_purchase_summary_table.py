@@ -0,0 +1,65 @@
+"""Add profile purchase summary table
+
+Revision ID: a7d3f1c9e2b8
+Revises: e5a9c3f7d214
+Create Date: 2026-10-19 16:05:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a7d3f1c9e2b8"
+down_revision: Union[str, None] = "e5a9c3f7d214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "profile_purchase_summary_table",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("item_id", sa.Integer(), nullable=False),
+        sa.Column("times_ordered", sa.Integer(), nullable=False),
+        sa.Column("total_spend", sa.Integer(), nullable=False),
+        sa.Column("last_order_date", sa.Date(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["item_id"],
+            ["item_table.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["user_table.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id", "item_id"),
+    )
+
+    # Backfill from the order history, orders only keep their total so the spend
+    # per item uses the current base cost
+    op.execute(
+        """
+        INSERT INTO profile_purchase_summary_table (
+            user_id, item_id, times_ordered, total_spend, last_order_date
+        )
+        SELECT
+            order_table.user_id,
+            order_item_association.item_id,
+            SUM(order_item_association.quantity),
+            SUM(order_item_association.quantity * gold_table.base_cost),
+            MAX(order_table.order_date)
+        FROM order_table
+        JOIN order_item_association
+            ON order_item_association.order_id = order_table.id
+        JOIN item_table ON item_table.id = order_item_association.item_id
+        JOIN gold_table ON gold_table.id = item_table.gold_id
+        GROUP BY order_table.user_id, order_item_association.item_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("profile_purchase_summary_table")
@@ -0,0 +1,44 @@
+"""Add review pagination indexes
+
+Revision ID: b4e81d2c6f05
+Revises: 7c2f4e9a1b3d
+Create Date: 2026-10-19 13:45:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b4e81d2c6f05"
+down_revision: Union[str, None] = "7c2f4e9a1b3d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The composite index also serves the lookups by item_id alone
+    op.drop_index(op.f("ix_review_table_item_id"), table_name="review_table")
+    op.create_index(
+        "ix_review_table_item_created",
+        "review_table",
+        ["item_id", "created_at", "id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_comment_table_review_created",
+        "comment_table",
+        ["review_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_comment_table_review_created", table_name="comment_table")
+    op.drop_index("ix_review_table_item_created", table_name="review_table")
+    op.create_index(
+        op.f("ix_review_table_item_id"), "review_table", ["item_id"], unique=False
+    )
@@ -0,0 +1,61 @@
+"""Add scheduler job run and leader tables
+
+Revision ID: c41f8e6b2d95
+Revises: a7d3f1c9e2b8
+Create Date: 2026-10-19 17:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "c41f8e6b2d95"
+down_revision: Union[str, None] = "a7d3f1c9e2b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "scheduler_job_run_table",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("job_name", sa.String(length=100), nullable=False),
+        sa.Column("node_id", sa.String(length=200), nullable=False),
+        sa.Column("status", sa.String(length=20), nullable=False),
+        sa.Column(
+            "started_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("duration_seconds", sa.Float(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scheduler_job_run_job_started",
+        "scheduler_job_run_table",
+        ["job_name", "started_at"],
+        unique=False,
+    )
+    op.create_table(
+        "scheduler_leader_table",
+        sa.Column("lock_name", sa.String(length=100), nullable=False),
+        sa.Column("node_id", sa.String(length=200), nullable=False),
+        sa.Column("acquired_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("lock_name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("scheduler_leader_table")
+    op.drop_index(
+        "ix_scheduler_job_run_job_started", table_name="scheduler_job_run_table"
+    )
+    op.drop_table("scheduler_job_run_table")
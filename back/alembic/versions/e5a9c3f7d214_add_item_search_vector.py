@@ -0,0 +1,46 @@
+"""Add item search vector
+
+Revision ID: e5a9c3f7d214
+Revises: b4e81d2c6f05
+Create Date: 2026-10-19 14:10:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a9c3f7d214"
+down_revision: Union[str, None] = "b4e81d2c6f05"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Generated column so it never gets out of sync with the item rows,
+    # weights: name A, plaintext B, description C
+    op.execute(
+        """
+        ALTER TABLE item_table ADD COLUMN search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(name, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(plain_text, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(description, '')), 'C')
+        ) STORED
+        """
+    )
+    op.create_index(
+        "ix_item_table_search_vector",
+        "item_table",
+        ["search_vector"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_item_table_search_vector", table_name="item_table")
+    op.drop_column("item_table", "search_vector")
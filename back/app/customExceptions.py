@@ -131,6 +131,18 @@ class InvalidUserReview(ReviewProcessorException):
     pass
 
 
+class InvalidCursorException(ReviewProcessorException):
+    pass
+
+
+class InvalidReviewBatchException(ReviewProcessorException):
+    pass
+
+
+class InvalidItemFieldsException(Exception):
+    pass
+
+
 class DataGeneratorException(Exception):
     pass
 
@@ -159,6 +171,26 @@ class CommentGenerationError(DataGeneratorException):
     pass
 
 
+class BulkDataGenerationError(DataGeneratorException):
+    pass
+
+
 class SystemInitializationError(Exception):
     """Raised when system initialization fails"""
     pass
+
+
+class DiagnosticsException(Exception):
+    pass
+
+
+class ProfilerAlreadyRunningException(DiagnosticsException):
+    pass
+
+
+class NoProfileException(DiagnosticsException):
+    pass
+
+
+class NoMemoryBaselineException(DiagnosticsException):
+    pass
@@ -0,0 +1,580 @@
+import argparse
+import asyncio
+import bisect
+import itertools
+import random
+import time
+from datetime import date, datetime, time as dayTime, timedelta, timezone
+from typing import Dict, List, Sequence, Tuple
+from pydantic import BaseModel, Field, model_validator
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from app.auth.functions import hashPassword
+from app.customExceptions import BulkDataGenerationError
+from app.data.models.CartTable import CartTable
+from app.data.models.GoldTable import GoldTable
+from app.data.models.ItemTable import ItemTable
+from app.data.models.LocationTable import LocationTable
+from app.data.models.OrderTable import OrderItemAssociation, OrderTable
+from app.data.models.ReviewTable import CommentTable, ReviewTable
+from app.data.models.UserTable import UserTable
+from app.data.queries.orderQueries import rebuildPurchaseSummaries
+from app.data.queries.reviewQueries import rebuildReviewSummary
+from app.schemas.Order import CartStatus, OrderStatus
+
+# Seeded generator of production looking datasets for load tests. Rows are built
+# in memory per chunk of users and written with COPY on Postgres (multi-row
+# INSERT on other databases), ids are assigned here so there is no round trip
+# per row. Usage:
+#   python -m app.data.BulkDataGenerator --users 200000 --seed 7
+
+DEFAULT_LOCATIONS: List[str] = ["Mexico", "Korea", "Japan", "China", "USA"]
+COMMENTS: List[str] = [
+    "Great product, would buy again!",
+    "Not as expected, but still good",
+    "Perfect for my needs",
+    "Could be better",
+    "Excellent quality",
+    "Fast delivery",
+    "Good value for money",
+    "Not worth the price",
+    "Exactly what I needed",
+    "Better than expected",
+    "Amazing!",
+    "Disappointed with the purchase",
+    "Highly recommend",
+    "Would not recommend",
+]
+EMAIL_DOMAIN: str = "@loadtest.example"
+# The generated emails are prefix + user id + EMAIL_DOMAIN
+MAX_EMAIL_LENGTH: int = UserTable.__table__.c.email.type.length
+
+
+def userIdDigitsBudget(userNamePrefix: str) -> int:
+    """Digits of user id that still fit in the email column after the prefix."""
+    return MAX_EMAIL_LENGTH - len(EMAIL_DOMAIN) - len(userNamePrefix)
+
+
+ID_TABLES: List[Table] = [
+    UserTable.__table__,
+    OrderTable.__table__,
+    CartTable.__table__,
+    ReviewTable.__table__,
+    CommentTable.__table__,
+]
+
+
+class BulkDataConfig(BaseModel):
+    users: int = Field(default=10000, ge=1)
+    meanOrdersPerUser: float = Field(default=4.0, gt=0)
+    # Pareto shape of the orders per user, the lower the heavier the power users
+    orderCountAlpha: float = Field(default=1.6, gt=1)
+    maxOrdersPerUser: int = Field(default=500, ge=1)
+    meanItemsPerOrder: float = Field(default=2.5, ge=1)
+    maxItemsPerOrder: int = Field(default=8, ge=1)
+    # Zipf exponent of the item popularity, 0 is uniform
+    zipfExponent: float = Field(default=1.1, ge=0)
+    cartProbability: float = Field(default=0.3, ge=0, le=1)
+    maxCartItems: int = Field(default=5, ge=1)
+    reviewProbability: float = Field(default=0.35, ge=0, le=1)
+    commentProbability: float = Field(default=0.4, ge=0, le=1)
+    cancelProbability: float = Field(default=0.05, ge=0, le=1)
+    historyDays: int = Field(default=730, ge=1)
+    userChunkSize: int = Field(default=2000, ge=1)
+    batchSize: int = Field(default=5000, ge=1)
+    seed: int = 42
+    userNamePrefix: str = "load_user_"
+    password: str = "LoadTest123!"
+
+    @model_validator(mode="after")
+    def checkEmailLength(self) -> "BulkDataConfig":
+        # Ids start after the existing users, prepare() checks the real last id
+        if len(str(self.users)) > userIdDigitsBudget(self.userNamePrefix):
+            raise ValueError(
+                f"userNamePrefix is too long, the emails of {self.users} users "
+                f"would not fit in {MAX_EMAIL_LENGTH} characters"
+            )
+        return self
+
+
+class ZipfSampler:
+    """
+    Draws items with probability proportional to 1 / rank^exponent, the rank of
+    each item is a seeded shuffle so the popular items change with the seed.
+    """
+
+    def __init__(self, values: Sequence[int], exponent: float, rng: random.Random):
+        self.rng = rng
+        self.values: List[int] = list(values)
+        rng.shuffle(self.values)
+        weights = [1.0 / (rank**exponent) for rank in range(1, len(self.values) + 1)]
+        self.cumulativeWeights: List[float] = list(itertools.accumulate(weights))
+        self.totalWeight: float = self.cumulativeWeights[-1]
+
+    def sample(self) -> int:
+        position: int = bisect.bisect_left(
+            self.cumulativeWeights, self.rng.random() * self.totalWeight
+        )
+        return self.values[min(position, len(self.values) - 1)]
+
+    def sampleDistinct(self, count: int) -> List[int]:
+        count = min(count, len(self.values))
+        picked: Dict[int, None] = {}
+        while len(picked) < count:
+            picked[self.sample()] = None
+        return list(picked)
+
+
+def powerUserOrderCount(
+    rng: random.Random, mean: float, alpha: float, maxOrders: int
+) -> int:
+    """
+    Orders of one user from a Pareto tail, most users buy a couple of times and a
+    few buy hundreds. (paretovariate - 1) has mean 1 / (alpha - 1), scaled to mean.
+    """
+    count: int = round((rng.paretovariate(alpha) - 1) * mean * (alpha - 1))
+    return min(count, maxOrders)
+
+
+def itemsInOrder(rng: random.Random, mean: float, maxItems: int) -> int:
+    """Geometric number of distinct items in an order, at least one."""
+    if mean <= 1:
+        return 1
+    stopProbability: float = 1 / mean
+    count: int = 1
+    while count < maxItems and rng.random() > stopProbability:
+        count += 1
+    return count
+
+
+class BulkWriter:
+    """
+    Writes rows as tuples in the order of the given columns, with COPY when the
+    connection is Postgres and multi-row INSERT statements otherwise.
+    """
+
+    def __init__(self, connection: AsyncConnection, batchSize: int):
+        self.connection = connection
+        self.batchSize = batchSize
+        self.usesCopy: bool = connection.dialect.name == "postgresql"
+
+    async def write(
+        self, table: Table, columns: Sequence[str], rows: List[Tuple]
+    ) -> None:
+        if not rows:
+            return
+        if self.usesCopy:
+            rawConnection = await self.connection.get_raw_connection()
+            await rawConnection.driver_connection.copy_records_to_table(
+                table.name, records=rows, columns=list(columns)
+            )
+            return
+        statement = insert(table)
+        for start in range(0, len(rows), self.batchSize):
+            batch = rows[start : start + self.batchSize]
+            await self.connection.execute(
+                statement, [dict(zip(columns, row)) for row in batch]
+            )
+
+
+class RowBuffer:
+    def __init__(self) -> None:
+        self.users: List[Tuple] = []
+        self.orders: List[Tuple] = []
+        self.orderItems: List[Tuple] = []
+        self.carts: List[Tuple] = []
+        self.reviews: List[Tuple] = []
+        self.comments: List[Tuple] = []
+
+
+class BulkDataGenerator:
+    USER_COLUMNS: Tuple[str, ...] = (
+        "id",
+        "userName",
+        "password",
+        "created",
+        "last_singn",
+        "gold_spend",
+        "current_gold",
+        "email",
+        "birthdate",
+        "location_id",
+    )
+    ORDER_COLUMNS: Tuple[str, ...] = (
+        "id",
+        "user_id",
+        "total",
+        "order_date",
+        "delivery_date",
+        "status",
+        "location_id",
+        "reviewed",
+    )
+    ORDER_ITEM_COLUMNS: Tuple[str, ...] = ("order_id", "item_id", "quantity")
+    CART_COLUMNS: Tuple[str, ...] = ("id", "status", "item_id", "user_id")
+    REVIEW_COLUMNS: Tuple[str, ...] = (
+        "id",
+        "order_id",
+        "item_id",
+        "rating",
+        "created_at",
+        "updated_at",
+    )
+    COMMENT_COLUMNS: Tuple[str, ...] = (
+        "id",
+        "review_id",
+        "user_id",
+        "content",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(self, engine: AsyncEngine, config: BulkDataConfig):
+        self.engine = engine
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.today: date = date.today()
+        self.itemCosts: Dict[int, int] = {}
+        self.itemQuality: Dict[int, float] = {}
+        self.itemSampler: ZipfSampler | None = None
+        self.locationIds: List[int] = []
+        self.nextIds: Dict[str, int] = {}
+        self.hashedPassword: str = ""
+        self.counts: Dict[str, int] = {
+            "users": 0,
+            "orders": 0,
+            "order_items": 0,
+            "carts": 0,
+            "reviews": 0,
+            "comments": 0,
+        }
+
+    async def prepare(self) -> None:
+        async with self.engine.begin() as connection:
+            result = await connection.execute(
+                select(ItemTable.id, GoldTable.base_cost)
+                .join(GoldTable, GoldTable.id == ItemTable.gold_id)
+                .order_by(ItemTable.id)
+            )
+            self.itemCosts = {itemId: baseCost for itemId, baseCost in result.all()}
+            if not self.itemCosts:
+                raise BulkDataGenerationError(
+                    "The item table is empty, start the backend once to load items"
+                )
+            self.locationIds = list(
+                (
+                    await connection.execute(
+                        select(LocationTable.id).order_by(LocationTable.id)
+                    )
+                ).scalars()
+            )
+            if not self.locationIds:
+                await connection.execute(
+                    insert(LocationTable),
+                    [{"country_name": name} for name in DEFAULT_LOCATIONS],
+                )
+                self.locationIds = list(
+                    (
+                        await connection.execute(
+                            select(LocationTable.id).order_by(LocationTable.id)
+                        )
+                    ).scalars()
+                )
+            for table in ID_TABLES:
+                maxId = await connection.scalar(select(func.max(table.c.id)))
+                self.nextIds[table.name] = (maxId or 0) + 1
+            lastUserId: int = (
+                self.nextIds[UserTable.__tablename__] + self.config.users - 1
+            )
+            if len(str(lastUserId)) > userIdDigitsBudget(self.config.userNamePrefix):
+                raise BulkDataGenerationError(
+                    f"The email of user {lastUserId} would not fit in "
+                    f"{MAX_EMAIL_LENGTH} characters, use a shorter prefix"
+                )
+        self.itemSampler = ZipfSampler(
+            list(self.itemCosts), self.config.zipfExponent, self.rng
+        )
+        self.itemQuality = {
+            itemId: self.rng.uniform(2.8, 4.7) for itemId in sorted(self.itemCosts)
+        }
+        # bcrypt is slow on purpose, every generated user shares the same hash
+        self.hashedPassword = hashPassword(self.config.password)
+
+    def nextId(self, tableName: str) -> int:
+        value: int = self.nextIds[tableName]
+        self.nextIds[tableName] = value + 1
+        return value
+
+    def randomDate(self, start: date, end: date) -> date:
+        days: int = max((end - start).days, 0)
+        return start + timedelta(days=self.rng.randint(0, days))
+
+    def randomMoment(self, day: date) -> datetime:
+        seconds: int = self.rng.randint(0, 86399)
+        return datetime.combine(day, dayTime(), tzinfo=timezone.utc) + timedelta(
+            seconds=seconds
+        )
+
+    def rating(self, itemId: int) -> int:
+        return max(1, min(5, round(self.rng.gauss(self.itemQuality[itemId], 1.0))))
+
+    def orderStatus(self, deliveryDate: date) -> OrderStatus:
+        if self.rng.random() < self.config.cancelProbability:
+            return OrderStatus.CANCELED
+        if deliveryDate < self.today:
+            return OrderStatus.DELIVERED
+        return self.rng.choice([OrderStatus.PENDING, OrderStatus.SHIPPED])
+
+    def buildOrder(
+        self, buffer: RowBuffer, userId: int, locationId: int, orderDate: date
+    ) -> int:
+        config = self.config
+        orderId: int = self.nextId(OrderTable.__tablename__)
+        itemIds: List[int] = self.itemSampler.sampleDistinct(
+            itemsInOrder(self.rng, config.meanItemsPerOrder, config.maxItemsPerOrder)
+        )
+        total: int = 0
+        for itemId in itemIds:
+            quantity: int = self.rng.choices((1, 2, 3), weights=(80, 15, 5))[0]
+            total += quantity * self.itemCosts[itemId]
+            buffer.orderItems.append((orderId, itemId, quantity))
+        deliveryDate: date = orderDate + timedelta(days=self.rng.randint(2, 10))
+        status: OrderStatus = self.orderStatus(deliveryDate)
+        reviewed: bool = (
+            status == OrderStatus.DELIVERED
+            and self.rng.random() < config.reviewProbability
+        )
+        if reviewed:
+            for itemId in itemIds:
+                reviewId: int = self.nextId(ReviewTable.__tablename__)
+                reviewedAt: datetime = self.randomMoment(
+                    self.randomDate(deliveryDate, self.today)
+                )
+                buffer.reviews.append(
+                    (
+                        reviewId,
+                        orderId,
+                        itemId,
+                        self.rating(itemId),
+                        reviewedAt,
+                        reviewedAt,
+                    )
+                )
+                if self.rng.random() < config.commentProbability:
+                    buffer.comments.append(
+                        (
+                            self.nextId(CommentTable.__tablename__),
+                            reviewId,
+                            userId,
+                            self.rng.choice(COMMENTS),
+                            reviewedAt,
+                            reviewedAt,
+                        )
+                    )
+        buffer.orders.append(
+            (
+                orderId,
+                userId,
+                total,
+                orderDate,
+                deliveryDate,
+                status.value,
+                locationId,
+                reviewed,
+            )
+        )
+        return 0 if status == OrderStatus.CANCELED else total
+
+    def buildUser(self, buffer: RowBuffer) -> None:
+        config = self.config
+        userId: int = self.nextId(UserTable.__tablename__)
+        userName: str = f"{config.userNamePrefix}{userId}"
+        locationId: int = self.rng.choice(self.locationIds)
+        created: date = self.today - timedelta(
+            days=self.rng.randint(0, config.historyDays)
+        )
+        orderCount: int = powerUserOrderCount(
+            self.rng,
+            config.meanOrdersPerUser,
+            config.orderCountAlpha,
+            config.maxOrdersPerUser,
+        )
+        orderDates: List[date] = sorted(
+            self.randomDate(created, self.today) for _ in range(orderCount)
+        )
+        goldSpend: int = sum(
+            self.buildOrder(buffer, userId, locationId, orderDate)
+            for orderDate in orderDates
+        )
+        if self.rng.random() < config.cartProbability:
+            cartItems: int = self.rng.randint(1, config.maxCartItems)
+            for itemId in self.itemSampler.sampleDistinct(cartItems):
+                buffer.carts.append(
+                    (
+                        self.nextId(CartTable.__tablename__),
+                        CartStatus.ADDED.value,
+                        itemId,
+                        userId,
+                    )
+                )
+        lastSignIn: date = self.randomDate(
+            orderDates[-1] if orderDates else created, self.today
+        )
+        buffer.users.append(
+            (
+                userId,
+                userName,
+                self.hashedPassword,
+                created,
+                lastSignIn,
+                goldSpend,
+                self.rng.randint(0, 50000),
+                f"{userName}{EMAIL_DOMAIN}",
+                date(
+                    self.rng.randint(1960, 2008),
+                    self.rng.randint(1, 12),
+                    self.rng.randint(1, 28),
+                ),
+                locationId,
+            )
+        )
+
+    async def writeBuffer(self, buffer: RowBuffer) -> None:
+        async with self.engine.begin() as connection:
+            writer = BulkWriter(connection, self.config.batchSize)
+            await writer.write(UserTable.__table__, self.USER_COLUMNS, buffer.users)
+            await writer.write(OrderTable.__table__, self.ORDER_COLUMNS, buffer.orders)
+            await writer.write(
+                OrderItemAssociation, self.ORDER_ITEM_COLUMNS, buffer.orderItems
+            )
+            await writer.write(CartTable.__table__, self.CART_COLUMNS, buffer.carts)
+            await writer.write(
+                ReviewTable.__table__, self.REVIEW_COLUMNS, buffer.reviews
+            )
+            await writer.write(
+                CommentTable.__table__, self.COMMENT_COLUMNS, buffer.comments
+            )
+        self.counts["users"] += len(buffer.users)
+        self.counts["orders"] += len(buffer.orders)
+        self.counts["order_items"] += len(buffer.orderItems)
+        self.counts["carts"] += len(buffer.carts)
+        self.counts["reviews"] += len(buffer.reviews)
+        self.counts["comments"] += len(buffer.comments)
+
+    async def finish(self) -> None:
+        """
+        Move the id sequences past the ids assigned here and rebuild the summary
+        tables that the request path keeps up to date.
+        """
+        async with self.engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                for table in ID_TABLES:
+                    await connection.execute(
+                        text(
+                            f"SELECT setval(pg_get_serial_sequence('{table.name}', "
+                            f"'id'), (SELECT max(id) FROM {table.name}))"
+                        )
+                    )
+        sessionMaker = async_sessionmaker(self.engine, class_=AsyncSession)
+        async with sessionMaker() as session:
+            await rebuildPurchaseSummaries(session)
+            for itemId in self.itemCosts:
+                await rebuildReviewSummary(session, itemId)
+            await session.commit()
+
+    async def run(self) -> Dict[str, int]:
+        await self.prepare()
+        remaining: int = self.config.users
+        while remaining > 0:
+            buffer = RowBuffer()
+            for _ in range(min(remaining, self.config.userChunkSize)):
+                self.buildUser(buffer)
+            await self.writeBuffer(buffer)
+            remaining -= len(buffer.users)
+        await self.finish()
+        return dict(self.counts)
+
+
+def parseArguments(arguments: Sequence[str] | None = None) -> argparse.Namespace:
+    from app.envVariables import DATABASE_URL
+
+    defaults = BulkDataConfig()
+    parser = argparse.ArgumentParser(
+        description="Generate a seeded synthetic dataset for load testing"
+    )
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--mean-orders", type=float, default=defaults.meanOrdersPerUser
+    )
+    parser.add_argument(
+        "--order-alpha", type=float, default=defaults.orderCountAlpha
+    )
+    parser.add_argument("--max-orders", type=int, default=defaults.maxOrdersPerUser)
+    parser.add_argument(
+        "--mean-items", type=float, default=defaults.meanItemsPerOrder
+    )
+    parser.add_argument("--zipf", type=float, default=defaults.zipfExponent)
+    parser.add_argument(
+        "--review-probability", type=float, default=defaults.reviewProbability
+    )
+    parser.add_argument(
+        "--cart-probability", type=float, default=defaults.cartProbability
+    )
+    parser.add_argument("--history-days", type=int, default=defaults.historyDays)
+    parser.add_argument("--chunk-size", type=int, default=defaults.userChunkSize)
+    parser.add_argument("--batch-size", type=int, default=defaults.batchSize)
+    parser.add_argument("--prefix", default=defaults.userNamePrefix)
+    parser.add_argument("--password", default=defaults.password)
+    return parser.parse_args(arguments)
+
+
+def configFromArguments(arguments: argparse.Namespace) -> BulkDataConfig:
+    return BulkDataConfig(
+        users=arguments.users,
+        seed=arguments.seed,
+        meanOrdersPerUser=arguments.mean_orders,
+        orderCountAlpha=arguments.order_alpha,
+        maxOrdersPerUser=arguments.max_orders,
+        meanItemsPerOrder=arguments.mean_items,
+        zipfExponent=arguments.zipf,
+        reviewProbability=arguments.review_probability,
+        cartProbability=arguments.cart_probability,
+        historyDays=arguments.history_days,
+        userChunkSize=arguments.chunk_size,
+        batchSize=arguments.batch_size,
+        userNamePrefix=arguments.prefix,
+        password=arguments.password,
+    )
+
+
+async def generate(databaseUrl: str, config: BulkDataConfig) -> Dict[str, int]:
+    engine = create_async_engine(databaseUrl)
+    try:
+        return await BulkDataGenerator(engine, config).run()
+    finally:
+        await engine.dispose()
+
+
+def main(arguments: Sequence[str] | None = None) -> None:
+    parsed = parseArguments(arguments)
+    start: float = time.perf_counter()
+    counts: Dict[str, int] = asyncio.run(
+        generate(parsed.database_url, configFromArguments(parsed))
+    )
+    elapsed: float = time.perf_counter() - start
+    totalRows: int = sum(counts.values())
+    for name, count in counts.items():
+        print(f"{name}: {count}")
+    print(f"{totalRows} rows in {elapsed:.1f}s ({totalRows / elapsed:.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
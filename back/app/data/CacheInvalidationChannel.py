@@ -0,0 +1,140 @@
+import asyncio
+from typing import Any, Callable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
+    AsyncEngine,
+    AsyncSession,
+    create_async_engine,
+)
+from sqlalchemy.pool import NullPool
+from app.logger import logger
+
+RECONNECT_DELAY_SECONDS: float = 5.0
+
+
+class CacheInvalidationChannel:
+    """
+    Tells every worker which cache keys changed using Postgres LISTEN/NOTIFY, so
+    there is no broker to run. notify() is sent inside the caller transaction and
+    Postgres only delivers it on commit, a rolled back change invalidates nothing.
+
+    With other databases (sqlite in tests and local runs) there is a single worker
+    and notify() only runs the local handlers.
+
+    The listener uses its own connection outside the pool, a pooled session would
+    keep the LISTEN after going back to the pool. Notifications sent while it is
+    disconnected are lost, so every (re)connect clears the subscribed caches.
+    """
+
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self.handlers: List[Callable[[str], None]] = []
+        self.clearHandlers: List[Callable[[], None]] = []
+        self.connection: Optional[AsyncConnection] = None
+        self.driverConnection: Any = None
+        self.listenTask: Optional[asyncio.Task] = None
+        self.stopping: bool = False
+
+    def subscribe(
+        self,
+        handler: Callable[[str], None],
+        clear: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """handler drops one key, clear drops everything after a reconnect."""
+        self.handlers.append(handler)
+        if clear is not None:
+            self.clearHandlers.append(clear)
+
+    def dispatch(self, key: str) -> None:
+        for handler in self.handlers:
+            try:
+                handler(key)
+            except Exception as e:
+                logger.error(f"Cache invalidation handler failed for {key}: {e}")
+
+    def clearAll(self) -> None:
+        for clear in self.clearHandlers:
+            try:
+                clear()
+            except Exception as e:
+                logger.error(f"Cache clear on {self.channel} failed: {e}")
+
+    async def notify(self, dbSession: AsyncSession, key: str) -> None:
+        """Queue the invalidation of key in the current transaction of dbSession."""
+        if dbSession.bind.dialect.name == "postgresql":
+            await dbSession.execute(
+                text("SELECT pg_notify(:channel, :key)"),
+                {"channel": self.channel, "key": key},
+            )
+
+    def onNotification(self, connection: Any, pid: int, channel: str, payload: str) -> None:
+        self.dispatch(payload)
+
+    async def listen(self, asyncEngine: AsyncEngine) -> None:
+        listenEngine: AsyncEngine = create_async_engine(
+            asyncEngine.url, poolclass=NullPool
+        )
+        try:
+            while not self.stopping:
+                try:
+                    self.connection = await listenEngine.connect()
+                    rawConnection = await self.connection.get_raw_connection()
+                    # asyncpg connection under the sqlalchemy adapter
+                    self.driverConnection = rawConnection.driver_connection
+                    await self.driverConnection.add_listener(
+                        self.channel, self.onNotification
+                    )
+                    # Anything sent while disconnected was missed
+                    self.clearAll()
+                    logger.info(f"Listening to cache invalidations on {self.channel}")
+                    while not self.driverConnection.is_closed() and not self.stopping:
+                        await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.warning(
+                        f"Cache invalidation listener on {self.channel} failed: {e}"
+                    )
+                finally:
+                    await self.closeConnection()
+                if not self.stopping:
+                    await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+        finally:
+            await listenEngine.dispose()
+
+    async def closeConnection(self) -> None:
+        if self.connection is None:
+            return
+        try:
+            if self.driverConnection is not None:
+                await self.driverConnection.remove_listener(
+                    self.channel, self.onNotification
+                )
+        except Exception:
+            pass
+        try:
+            await self.connection.invalidate()
+            await self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+        self.driverConnection = None
+
+    def start(self, asyncEngine: AsyncEngine) -> None:
+        if asyncEngine.dialect.name != "postgresql" or self.listenTask is not None:
+            return
+        self.stopping = False
+        self.listenTask = asyncio.create_task(self.listen(asyncEngine))
+
+    async def stop(self) -> None:
+        self.stopping = True
+        if self.listenTask is None:
+            return
+        self.listenTask.cancel()
+        try:
+            await self.listenTask
+        except asyncio.CancelledError:
+            pass
+        self.listenTask = None
+        await self.closeConnection()
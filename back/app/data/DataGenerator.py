@@ -12,6 +12,7 @@ from app.data.mappers import mapOrderToOrderTable
 from app.data.models.OrderTable import OrderItemAssociation, OrderTable
 from app.data.queries.authQueries import insertUser, checkUserExistInDB
 from app.data.queries.locationQueries import createLocation
+from app.data.queries.orderQueries import rebuildPurchaseSummaries
 from app.data.queries.reviewQueries import addReview, addComment
 from app.schemas.Order import Order, OrderStatus
 from app.schemas.AuthSchemas import UserInDB
@@ -156,6 +157,8 @@ class DataGenerator:
                     }
                     ins = insert(OrderItemAssociation).values(**record)
                     await self.dbSession.execute(ins)
+            # Fake orders skip OrderProcessor, fill the profile summaries in one go
+            await rebuildPurchaseSummaries(self.dbSession)
         except SQLAlchemyError as e:
             raise OrderItemAssociationError(
                 f"Failed to generate order-item associations: {str(e)}"
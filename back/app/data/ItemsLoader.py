@@ -40,7 +40,12 @@ from app.data.queries.itemQueries import (
 from app.schemas.Item import Effects, Gold, Item, Stat
 from app.logger import logger
 from app.logger import logMethod
+from app.metrics import itemsLoaderPhaseSeconds
 from app.items.defaultItems import DEFAULT_ITEMS
+from app.items.ItemCatalog import itemCatalog
+
+# Methods called once per item/stat/tag during a refresh only log a sample of the calls
+PER_ITEM_LOG_SAMPLE_RATE: float = 0.01
 
 
 # TODO: remove commits just one needed
@@ -161,6 +166,7 @@ class ItemsLoader:
             await insertVersion(self.dbSession, lastVersion)
         elif currentVersion != lastVersion:
             await self.updateDbVersion(lastVersion)
+        itemCatalog.invalidate()
 
     @logMethod
     async def updateItemsStepsJob(self) -> None:
@@ -178,24 +184,30 @@ class ItemsLoader:
             ItemsLoaderError: If any error occurs during the update process.
         """
         self.itemsUrl = self.makeItemsUlr(self.version)
-        itemsJson: dict | list = await self.getJson(self.itemsUrl)
+        with itemsLoaderPhaseSeconds.time(phase="fetch"):
+            itemsJson: dict | list = await self.getJson(self.itemsUrl)
         if not itemsJson:
             raise ItemsLoaderError("Items Json is empty!")
-        itemsList: List[Item] = await self.parseItemsJsonIntoItemList(itemsJson)
+        with itemsLoaderPhaseSeconds.time(phase="parse"):
+            itemsList: List[Item] = await self.parseItemsJsonIntoItemList(itemsJson)
         if not itemsList:
             raise ItemsLoaderError("Items Json is empty!")
         # Here again linter gives an error but the pidantic default constructor is an empty container
         # not none, I think this will be fine
-        uniqueTags: Set[str] = set(tag for item in itemsList for tag in item.tags)
-        await self.updateTagsInDataBase(uniqueTags)
-        uniqueStats: Set[Stat] = self.getUniqueStats(itemsList)
-        await self.updateStatsInDataBase(uniqueStats)
-        # TODO: we dont like nested loops in python ):
-        uniqueEffects: Set[str] = set(
-            effect for item in itemsList for effect in item.effect.root
-        )
-        await self.updateEffectsInDataBase(uniqueEffects)
-        await self.updateItemsInDataBase(itemsList)
+        with itemsLoaderPhaseSeconds.time(phase="tags"):
+            uniqueTags: Set[str] = set(tag for item in itemsList for tag in item.tags)
+            await self.updateTagsInDataBase(uniqueTags)
+        with itemsLoaderPhaseSeconds.time(phase="stats"):
+            uniqueStats: Set[Stat] = self.getUniqueStats(itemsList)
+            await self.updateStatsInDataBase(uniqueStats)
+        with itemsLoaderPhaseSeconds.time(phase="effects"):
+            # TODO: we dont like nested loops in python ):
+            uniqueEffects: Set[str] = set(
+                effect for item in itemsList for effect in item.effect.root
+            )
+            await self.updateEffectsInDataBase(uniqueEffects)
+        with itemsLoaderPhaseSeconds.time(phase="items"):
+            await self.updateItemsInDataBase(itemsList)
 
     @logMethod
     def getUniqueStats(self, items: List[Item]) -> Set[Stat]:
@@ -281,7 +293,7 @@ class ItemsLoader:
             mapping[row.original_name] = row.mapped_name
         return mapping
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def parseDataNodeIntoItem(
         self, itemId: int, itemData, itemNames: Set[str], statMapping: Dict[str, str]
     ) -> Item | None:
@@ -333,7 +345,7 @@ class ItemsLoader:
             )
             return None
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     def parseStatsNodeIntoStats(
         self, statsNode: Dict[str, int | float], statMappingDict: Dict[str, str]
     ) -> Set[Stat]:
@@ -357,7 +369,7 @@ class ItemsLoader:
             stats.add(stat)
         return stats
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     def buildImageUrl(self, imageName: str) -> str:
         """
         Build the image url given the version and image name
@@ -390,7 +402,7 @@ class ItemsLoader:
             await self.dbSession.rollback()
             raise UpdateTagsError() from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     def addTagInDataBaseIfNew(self, tag: str, existingTagNames: Set[str]) -> bool:
         ##TODO: CAN THIS BE ASYNC AND THE LOOP STILL RUN?
         """
@@ -461,7 +473,7 @@ class ItemsLoader:
             await self.dbSession.rollback()
             raise UpdateEffectsError() from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     def addEffectInDataBaseIfNew(
         self, effect: str, existingEffectNames: Set[str]
     ) -> bool:
@@ -480,7 +492,7 @@ class ItemsLoader:
         except Exception as e:
             raise UpdateEffectsError() from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     def addStatInDataBaseIfNew(self, stat: Stat, existingstatNames: Set[str]) -> bool:
         ##TODO: CAN THIS BE ASYNC AND THE LOOP STILL RUN?
         """
@@ -517,7 +529,7 @@ class ItemsLoader:
             await self.dbSession.rollback()
             raise UpdateItemsError() from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def insertOrUpdateItemTable(
         self, item: Item, existingItem: ItemTable | None
     ) -> None:
@@ -557,7 +569,7 @@ class ItemsLoader:
         except Exception as e:
             raise UpdateItemsError() from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def addItemStatsRelations(self, itemId: int, stats: Set[Stat]) -> None:
         """
         This function inserts the relations given the itemId and stats
@@ -581,7 +593,7 @@ class ItemsLoader:
                         "Could not insert a relation item-stat"
                     ) from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def addItemEffectsRelations(self, itemId: int, effects: Effects) -> None:
         """
         This function inserts the relations given the itemId and effects.
@@ -607,7 +619,7 @@ class ItemsLoader:
                         "Could not insert a relation item-effect"
                     ) from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def addItemTagsRelations(self, itemId: int, tags: Set[str]) -> None:
         """
         This function inserts the relations given the itemId and tags
@@ -624,7 +636,7 @@ class ItemsLoader:
             except Exception as e:
                 raise UpdateItemsError("Could not insert a relation item-tag") from e
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def deleteItemTagsExistingRelations(self, itemId) -> None:
         """
         This function deletes the many to many relation of an item with
@@ -639,7 +651,7 @@ class ItemsLoader:
         except Exception as e:
             raise UpdateItemsError("Error while deleting tags associations for item")
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def deleteItemStatsExistingRelations(self, itemId) -> None:
         """
         This function deletes the many to many relation of an item with
@@ -654,7 +666,7 @@ class ItemsLoader:
         except Exception as e:
             raise UpdateItemsError("Error while deleting stats associations for item")
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def deleteItemEffectsExistingRelations(self, itemId) -> None:
         """
         This function deletes the many-to-many relation of an item with
@@ -669,7 +681,7 @@ class ItemsLoader:
         except Exception as e:
             raise UpdateItemsError("Error while deleting effects associations for item")
 
-    @logMethod
+    @logMethod(sampleRate=PER_ITEM_LOG_SAMPLE_RATE)
     async def insertOrUpdateGoldTable(
         self, createNewGoldTable: bool, gold: Gold, itemId: int | None = None
     ) -> int:
@@ -0,0 +1,53 @@
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+Value = TypeVar("Value")
+
+
+class LRUTTLCache(Generic[Value]):
+    """
+    Bounded in-process cache, entries expire ttlSeconds after being set and the
+    least recently used one is evicted when maxSize is reached. It is only touched
+    from the event loop so it has no lock.
+    """
+
+    def __init__(
+        self,
+        maxSize: int,
+        ttlSeconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.maxSize = maxSize
+        self.ttlSeconds = ttlSeconds
+        self.clock = clock
+        # key -> (expires at, value), ordered from least to most recently used
+        self.entries: OrderedDict[Hashable, Tuple[float, Value]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Value]:
+        entry: Tuple[float, Value] | None = self.entries.get(key)
+        if entry is None:
+            return None
+        expiresAt, value = entry
+        if expiresAt <= self.clock():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value: Value) -> None:
+        if self.maxSize <= 0:
+            return
+        self.entries[key] = (self.clock() + self.ttlSeconds, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxSize:
+            self.entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        self.entries.pop(key, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+    def __len__(self) -> int:
+        return len(self.entries)
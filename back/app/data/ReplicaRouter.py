@@ -0,0 +1,97 @@
+import asyncio
+import time
+from typing import Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from app.logger import logger
+from app.metrics import dbReadSessionsTotal, dbReplicaLagSeconds
+
+# Lag is 0 when the replica replayed everything it received, otherwise the age of the
+# last replayed transaction. Without the first check an idle primary would look like lag.
+POSTGRES_LAG_QUERY = text(
+    """
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+    """
+)
+
+
+class ReplicaRouter:
+    """
+    Decides where the read-only sessions go. Reads use the replica while its
+    lag is under maxLagSeconds, otherwise (or when the replica is down, or there
+    is no replica configured) they fall back to the primary.
+
+    The lag is measured at most once per checkInterval seconds, the result is shared
+    by all the requests in between.
+    """
+
+    def __init__(
+        self,
+        primarySessionMaker: async_sessionmaker[AsyncSession],
+        replicaEngine: Optional[AsyncEngine] = None,
+        replicaSessionMaker: Optional[async_sessionmaker[AsyncSession]] = None,
+        maxLagSeconds: float = 5.0,
+        checkInterval: float = 10.0,
+    ):
+        self.primarySessionMaker = primarySessionMaker
+        self.replicaEngine = replicaEngine
+        self.replicaSessionMaker = replicaSessionMaker
+        self.maxLagSeconds = maxLagSeconds
+        self.checkInterval = checkInterval
+        self.replicaHealthy: bool = False
+        self.lastLag: Optional[float] = None
+        self.lastCheck: float = float("-inf")
+        self.checkLock: Optional[asyncio.Lock] = None
+
+    @property
+    def hasReplica(self) -> bool:
+        return self.replicaEngine is not None and self.replicaSessionMaker is not None
+
+    async def measureLag(self) -> float:
+        """
+        Replication lag in seconds, only Postgres exposes it, other databases
+        (sqlite files in local setups) are considered up to date.
+        """
+        async with self.replicaEngine.connect() as conn:
+            if self.replicaEngine.dialect.name != "postgresql":
+                await conn.execute(text("SELECT 1"))
+                return 0.0
+            result = await conn.execute(POSTGRES_LAG_QUERY)
+            return float(result.scalar() or 0.0)
+
+    async def refreshReplicaHealth(self) -> None:
+        try:
+            self.lastLag = await self.measureLag()
+            dbReplicaLagSeconds.set(self.lastLag)
+            healthy: bool = self.lastLag <= self.maxLagSeconds
+            if not healthy:
+                logger.warning(
+                    f"Replica lag {self.lastLag:.2f}s over {self.maxLagSeconds}s, reading from primary"
+                )
+        except Exception as e:
+            logger.warning(f"Replica lag check failed, reading from primary: {str(e)}")
+            healthy = False
+        self.replicaHealthy = healthy
+        self.lastCheck = time.monotonic()
+
+    async def shouldUseReplica(self) -> bool:
+        if not self.hasReplica:
+            return False
+        if time.monotonic() - self.lastCheck >= self.checkInterval:
+            if self.checkLock is None:
+                self.checkLock = asyncio.Lock()
+            async with self.checkLock:
+                # Another request could have refreshed it while this one waited
+                if time.monotonic() - self.lastCheck >= self.checkInterval:
+                    await self.refreshReplicaHealth()
+        return self.replicaHealthy
+
+    async def getReadSessionMaker(self) -> async_sessionmaker[AsyncSession]:
+        if await self.shouldUseReplica():
+            dbReadSessionsTotal.inc(target="replica")
+            return self.replicaSessionMaker
+        dbReadSessionsTotal.inc(target="primary")
+        return self.primarySessionMaker
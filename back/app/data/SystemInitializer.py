@@ -3,7 +3,7 @@ from typing import List
 from app.data.ItemsLoader import ItemsLoader
 from app.data.DataGenerator import DataGenerator
 from app.delivery.DeliveryDateAssigner import DeliveryDateAssigner
-from app.data.utils import getAllItemTableRowsAnMapToItems
+from app.data.utils import getItemsByIdsInBatch
 from app.customExceptions import SystemInitializationError
 from app.logger import logMethod, logger
 from app.schemas.Item import Item
@@ -60,7 +60,7 @@ class SystemInitializer:
         """Load items from database"""
         try:
             logger.info("Loading items from database...")
-            self.items = await getAllItemTableRowsAnMapToItems(self.db)
+            self.items = await getItemsByIdsInBatch(self.db)
             if not self.items:
                 logger.error("No items found in database")
                 raise SystemInitializationError("No items found in database")
@@ -147,8 +147,9 @@ class SystemInitializer:
         try:
             # Check if system was already initialized
             if await self.checkInitializationStatus():
-                logger.info("System was previously initialized, loading existing data...")
-                await self.loadItems()
+                # The items are only needed to generate data, the item catalog is
+                # already warmed by the startup
+                logger.info("System was previously initialized")
                 self._initialized = True
                 return
 
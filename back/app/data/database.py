@@ -1,21 +1,146 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+import threading
+import time
+from typing import Any, AsyncGenerator, Dict
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import declarative_base
-from app.envVariables import DATABASE_URL
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from app.envVariables import (
+    DATABASE_REPLICA_URL,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_STATEMENT_CACHE_SIZE,
+    REPLICA_LAG_CHECK_INTERVAL,
+    REPLICA_MAX_LAG_SECONDS,
+)
+from app.data.queryInstrumentation import instrumentEngine
+from app.data.ReplicaRouter import ReplicaRouter
+from app.metrics import dbPoolCheckoutWaitSeconds, dbPoolConnections, registry
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Default async pool that records how long each checkout waited for a connection
+    and how many checkouts are waiting right now.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.waiting: int = 0
+        self.waitingLock = threading.Lock()
+
+    def _do_get(self):
+        start: float = time.perf_counter()
+        with self.waitingLock:
+            self.waiting += 1
+        try:
+            return super()._do_get()
+        finally:
+            with self.waitingLock:
+                self.waiting -= 1
+            dbPoolCheckoutWaitSeconds.observe(time.perf_counter() - start)
+
+
+def getEngineOptions(databaseUrl: str) -> Dict[str, Any]:
+    """
+    Keyword arguments for create_async_engine. The pool settings only apply to
+    server databases, sqlite (tests) keeps the SQLAlchemy defaults.
+    Docs: https://docs.sqlalchemy.org/en/20/core/pooling.html#setting-pool-recycle
+    """
+    if databaseUrl.startswith("sqlite"):
+        return {"echo": False}
+    options: Dict[str, Any] = {
+        "echo": False,
+        "poolclass": TimedAsyncAdaptedQueuePool,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        # Azure closes idle connections, recycle them before that happens
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if databaseUrl.startswith("postgresql+asyncpg"):
+        # Prepared statements cache per connection, handled by the sqlalchemy asyncpg adapter
+        options["connect_args"] = {
+            "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE
+        }
+    return options
+
+
+def makeEngine(databaseUrl: str = DATABASE_URL) -> AsyncEngine:
+    newEngine: AsyncEngine = create_async_engine(
+        databaseUrl, **getEngineOptions(databaseUrl)
+    )
+    instrumentEngine(newEngine.sync_engine)
+    return newEngine
+
+
+def getPoolStatus(asyncEngine: AsyncEngine) -> Dict[str, int]:
+    """
+    Snapshot of the connection pool, used by the health check and the metrics.
+    """
+    pool = asyncEngine.sync_engine.pool
+    if not isinstance(pool, AsyncAdaptedQueuePool):
+        return {}
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "waiting": getattr(pool, "waiting", 0),
+    }
 
 
 # Modules are singletons, first import will create this object and the subsequent imports
 # will use the same instance
 # Docs: https://docs.sqlalchemy.org/en/20/tutorial/engine.html#tutorial-engine
-engine = create_async_engine(DATABASE_URL, echo=False)
+engine = makeEngine()
 # All tables have to be an instance of this to be managed together
 base = declarative_base()
 AsyncSessionLocal = async_sessionmaker(engine, autoflush=False)
 
+# Optional read replica, without DATABASE_REPLICA_URL every read goes to the primary
+replicaEngine = makeEngine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
+ReplicaSessionLocal = (
+    async_sessionmaker(replicaEngine, autoflush=False) if replicaEngine else None
+)
+replicaRouter = ReplicaRouter(
+    AsyncSessionLocal,
+    replicaEngine,
+    ReplicaSessionLocal,
+    maxLagSeconds=REPLICA_MAX_LAG_SECONDS,
+    checkInterval=REPLICA_LAG_CHECK_INTERVAL,
+)
+
+
+def collectPoolStatus() -> None:
+    for state, value in getPoolStatus(engine).items():
+        dbPoolConnections.set(value, state=state)
+
+
+registry.addCollector(collectPoolStatus)
+
 
 # https://fastapi.tiangolo.com/tutorial/dependencies/dependencies-with-yield/#dependencies-with-yield-and-httpexception
 # With yield can execute cleanup
+# Read-write session, always bound to the primary
 async def getDbSession() -> AsyncGenerator[AsyncSession, None]:
     # Change from asyncSession to asyncSessionLocal to bind it to the engine
     async with AsyncSessionLocal() as session:
         yield session
+
+
+# Read-only routes depend on this one instead of getDbSession, never write with it:
+# the session can be bound to a replica
+async def getReadDbSession() -> AsyncGenerator[AsyncSession, None]:
+    sessionMaker = await replicaRouter.getReadSessionMaker()
+    async with sessionMaker() as session:
+        yield session
@@ -4,12 +4,12 @@ from app.data.models.UserTable import UserTable
 from app.data.models.ItemTable import ItemTable
 from app.data.models.GoldTable import GoldTable
 from app.data.models.LocationTable import LocationTable
-from app.data.models.ReviewTable import ReviewTable, CommentTable
+from app.data.models.ReviewTable import ReviewTable, CommentTable, ReviewSummaryTable
 from app.schemas.AuthSchemas import UserInDB
 from app.schemas.Item import Effects, Gold, Item, Stat
 from app.schemas.Order import CartItem, Order
 from app.schemas.Location import Location
-from app.schemas.Review import Review, Comment
+from app.schemas.Review import Review, Comment, ReviewSummary
 from app.data.models.CartTable import CartTable
 
 
@@ -141,6 +141,26 @@ def mapReviewTableToReview(reviewTable: ReviewTable) -> Review:
     return review
 
 
+def mapReviewSummaryTableToReviewSummary(
+    summaryTable: ReviewSummaryTable,
+) -> ReviewSummary:
+    count: int = summaryTable.review_count
+    summary = ReviewSummary(
+        itemId=summaryTable.item_id,
+        count=count,
+        averageRating=round(summaryTable.rating_sum / count, 2) if count else None,
+        ratingCounts=[
+            summaryTable.rating_1,
+            summaryTable.rating_2,
+            summaryTable.rating_3,
+            summaryTable.rating_4,
+            summaryTable.rating_5,
+        ],
+        updatedAt=summaryTable.updated_at,
+    )
+    return summary
+
+
 def mapCommentTableToComment(commentTable: CommentTable) -> Comment:
     comment = Comment(
         id=commentTable.id,
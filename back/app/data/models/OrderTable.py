@@ -30,3 +30,23 @@ class OrderTable(base):
         "ItemTable",
         secondary=OrderItemAssociation,
     )
+
+
+class ProfilePurchaseSummaryTable(base):
+    """
+    What each user bought per item, updated in the same transaction as the order so
+    the profile page reads it by primary key instead of aggregating the whole order
+    history on every request.
+    """
+
+    __tablename__ = "profile_purchase_summary_table"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user_table.id"), primary_key=True, nullable=False
+    )
+    item_id: Mapped[int] = mapped_column(
+        ForeignKey("item_table.id"), primary_key=True, nullable=False
+    )
+    times_ordered: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    total_spend: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_order_date: Mapped[Date] = mapped_column(Date, nullable=False)
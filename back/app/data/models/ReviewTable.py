@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, Integer, Text, DateTime, func, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, Integer, Text, DateTime, func, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.data.database import base
 
@@ -22,6 +22,8 @@ class ReviewTable(base):
 
     __table_args__ = (
         UniqueConstraint("order_id", "item_id", name="uix_review_order_item"),
+        # Keyset pagination of the item reviews, newest first
+        Index("ix_review_table_item_created", "item_id", "created_at", "id"),
     )
 
     comments: Mapped[list["CommentTable"]] = relationship(
@@ -51,3 +53,33 @@ class CommentTable(base):
     review: Mapped["ReviewTable"] = relationship(
         "ReviewTable", back_populates="comments"
     )
+
+    __table_args__ = (
+        Index("ix_comment_table_review_created", "review_id", "created_at", "id"),
+    )
+
+
+class ReviewSummaryTable(base):
+    """
+    Rating aggregates per item, updated in the same transaction as the reviews
+    so the item grid does not have to read every review to show a rating.
+    """
+
+    __tablename__ = "review_summary_table"
+
+    item_id: Mapped[int] = mapped_column(
+        ForeignKey("item_table.id"), primary_key=True, nullable=False
+    )
+    review_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_sum: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_1: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_2: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_3: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_4: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    rating_5: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    updated_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -0,0 +1,39 @@
+from sqlalchemy import DateTime, Float, Index, String, Text, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.data.database import base
+
+
+class SchedulerJobRunTable(base):
+    """One row per run of a scheduled job, written by the scheduler leader."""
+
+    __tablename__ = "scheduler_job_run_table"
+
+    id: Mapped[int] = mapped_column(primary_key=True, nullable=False)
+    job_name: Mapped[str] = mapped_column(String(100), nullable=False)
+    node_id: Mapped[str] = mapped_column(String(200), nullable=False)
+    status: Mapped[str] = mapped_column(String(20), nullable=False)
+    started_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    finished_at: Mapped[DateTime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    duration_seconds: Mapped[float | None] = mapped_column(Float, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    __table_args__ = (
+        Index("ix_scheduler_job_run_job_started", "job_name", "started_at"),
+    )
+
+
+class SchedulerLeaderTable(base):
+    """Who holds the scheduler lock and when it last proved it was alive."""
+
+    __tablename__ = "scheduler_leader_table"
+
+    lock_name: Mapped[str] = mapped_column(String(100), primary_key=True, nullable=False)
+    node_id: Mapped[str] = mapped_column(String(200), nullable=False)
+    acquired_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=False)
+    heartbeat_at: Mapped[DateTime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
@@ -0,0 +1,25 @@
+import base64
+from datetime import datetime
+from typing import Tuple
+from app.customExceptions import InvalidCursorException
+
+# Keyset pagination: the cursor is the (created_at, id) of the last row returned,
+# the next page starts right after it. Unlike OFFSET, the database work does not
+# grow with the page number and rows inserted meanwhile do not shift the pages.
+# The cursor is opaque for the clients, they just send back what they received.
+
+CURSOR_SEPARATOR: str = "|"
+
+
+def encodeCursor(createdAt: datetime, rowId: int) -> str:
+    raw: str = f"{createdAt.isoformat()}{CURSOR_SEPARATOR}{rowId}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decodeCursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw: str = base64.urlsafe_b64decode(cursor.encode()).decode()
+        createdAt, rowId = raw.rsplit(CURSOR_SEPARATOR, 1)
+        return datetime.fromisoformat(createdAt), int(rowId)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorException("Invalid pagination cursor") from e
@@ -67,3 +67,13 @@ async def getUserIdWithUserName(
     )
     userId = result.scalars().first()
     return userId
+
+
+async def getUserNameWithUserId(asyncSession: AsyncSession, userId: int) -> str | None:
+    """
+    Get the userName with the user id.
+    """
+    result = await asyncSession.execute(
+        select(UserTable.userName).where(UserTable.id == userId)
+    )
+    return result.scalars().first()
@@ -1,5 +1,5 @@
-from typing import Dict, List, Sequence, Set, Tuple
-from sqlalchemy import Row, distinct, insert, update
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import Row, distinct, func, insert, literal_column, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from app.data.models.MetaDataTable import MetaDataTable
@@ -17,6 +17,24 @@ from app.schemas.Item import Stat
 
 # TODO: CHECK QUERYS THAT CAN BE SIMPLIFY with a join
 
+SOME_ITEMS_LIMIT: int = 300
+
+# Item schema field -> column, used to select only the fields a client asked for
+ITEM_FIELD_COLUMNS = {
+    "id": ItemTable.id,
+    "name": ItemTable.name,
+    "plaintext": ItemTable.plain_text,
+    "description": ItemTable.description,
+    "image": ItemTable.image,
+    "imageUrl": ItemTable.imageUrl,
+}
+GOLD_FIELD_COLUMNS = {
+    "base": GoldTable.base_cost,
+    "purchasable": GoldTable.purchaseable,
+    "total": GoldTable.total,
+    "sell": GoldTable.sell,
+}
+
 
 async def getAllTagsTable(asyncSession: AsyncSession) -> List[TagsTable]:
     """Fetch all tags from the TagsTable."""
@@ -231,12 +249,42 @@ async def getSomeItems(asyncSession: AsyncSession) -> List[ItemTable]:
         select(ItemTable)
         .join(GoldTable, GoldTable.id == ItemTable.gold_id)
         .where((GoldTable.purchaseable) & (GoldTable.base_cost > 0))
-        .limit(300)
+        .limit(SOME_ITEMS_LIMIT)
     )
     items: List[ItemTable] = [item for item in result.scalars().all()]
     return items
 
 
+async def getItemFieldRows(
+    asyncSession: AsyncSession,
+    itemFields: Sequence[str],
+    withGold: bool = False,
+    someItems: bool = False,
+) -> List[Dict[str, Any]]:
+    """
+    Fetch only the given ItemTable columns (keyed by Item field name, id is always
+    selected) and the gold columns as "gold_<field>" when withGold. someItems applies
+    the same filter and limit as getSomeItems.
+    """
+    columns = [ITEM_FIELD_COLUMNS["id"].label("id")]
+    columns += [
+        ITEM_FIELD_COLUMNS[field].label(field) for field in itemFields if field != "id"
+    ]
+    if withGold:
+        columns += [
+            column.label(f"gold_{field}") for field, column in GOLD_FIELD_COLUMNS.items()
+        ]
+    query = select(*columns)
+    if withGold or someItems:
+        query = query.join(GoldTable, GoldTable.id == ItemTable.gold_id)
+    if someItems:
+        query = query.where(
+            (GoldTable.purchaseable) & (GoldTable.base_cost > 0)
+        ).limit(SOME_ITEMS_LIMIT)
+    result = await asyncSession.execute(query)
+    return [dict(row) for row in result.mappings().all()]
+
+
 async def getStatIdWithStatName(
     asyncSession: AsyncSession, statName: str
 ) -> int | None:
@@ -397,3 +445,145 @@ async def getAllItemIds(asyncSession: AsyncSession) -> Sequence[int]:
 #         .values(imageHDPath = path)
 #     )
 #     await asyncSession.commit()
+
+
+# Batched versions of the per item queries above: each one reads the relation for
+# many items (all of them when itemIds is None) in a single statement.
+
+
+async def getItemsWithGoldByIds(
+    asyncSession: AsyncSession, itemIds: Optional[Sequence[int]] = None
+) -> List[Tuple[ItemTable, GoldTable]]:
+    """Fetch items joined with their gold row."""
+    query = select(ItemTable, GoldTable).join(
+        GoldTable, GoldTable.id == ItemTable.gold_id
+    )
+    if itemIds is not None:
+        query = query.where(ItemTable.id.in_(itemIds))
+    result = await asyncSession.execute(query)
+    return [(itemTable, goldTable) for itemTable, goldTable in result.all()]
+
+
+async def getTagNamesByItemIds(
+    asyncSession: AsyncSession, itemIds: Optional[Sequence[int]] = None
+) -> Dict[int, Set[str]]:
+    """Return the tag names of each item."""
+    query = select(ItemTagsAssociation.c.item_id, TagsTable.name).join(
+        TagsTable, TagsTable.id == ItemTagsAssociation.c.tags_id
+    )
+    if itemIds is not None:
+        query = query.where(ItemTagsAssociation.c.item_id.in_(itemIds))
+    result = await asyncSession.execute(query)
+    tagsByItem: Dict[int, Set[str]] = {}
+    for itemId, tagName in result.all():
+        tagsByItem.setdefault(itemId, set()).add(tagName)
+    return tagsByItem
+
+
+async def getStatsByItemIds(
+    asyncSession: AsyncSession, itemIds: Optional[Sequence[int]] = None
+) -> Dict[int, Set[Stat]]:
+    """Return the stats of each item."""
+    query = select(
+        ItemStatAssociation.c.item_id,
+        StatsTable.name,
+        StatsTable.kind,
+        ItemStatAssociation.c.value,
+    ).join(StatsTable, StatsTable.id == ItemStatAssociation.c.stat_id)
+    if itemIds is not None:
+        query = query.where(ItemStatAssociation.c.item_id.in_(itemIds))
+    result = await asyncSession.execute(query)
+    statsByItem: Dict[int, Set[Stat]] = {}
+    for itemId, name, kind, value in result.all():
+        statsByItem.setdefault(itemId, set()).add(
+            Stat(name=name, kind=kind, value=value)
+        )
+    return statsByItem
+
+
+async def getEffectsByItemIds(
+    asyncSession: AsyncSession, itemIds: Optional[Sequence[int]] = None
+) -> Dict[int, Dict[str, int | float]]:
+    """Return the effect name/value pairs of each item."""
+    query = select(
+        ItemEffectAssociation.c.item_id, EffectsTable.name, ItemEffectAssociation.c.value
+    ).join(EffectsTable, EffectsTable.id == ItemEffectAssociation.c.effect_id)
+    if itemIds is not None:
+        query = query.where(ItemEffectAssociation.c.item_id.in_(itemIds))
+    result = await asyncSession.execute(query)
+    effectsByItem: Dict[int, Dict[str, int | float]] = {}
+    for itemId, name, value in result.all():
+        effectsByItem.setdefault(itemId, {})[name] = value
+    return effectsByItem
+
+
+async def getItemCatalogSignature(asyncSession: AsyncSession) -> Tuple[int, int, int]:
+    """
+    Number of items, highest item id and total length of the names, together with
+    the version they tell when the catalog changed without loading it.
+    """
+    result = await asyncSession.execute(
+        select(
+            func.count(ItemTable.id),
+            func.coalesce(func.max(ItemTable.id), 0),
+            func.coalesce(func.sum(func.length(ItemTable.name)), 0),
+        )
+    )
+    count, maxId, namesLength = result.one()
+    return count, maxId, namesLength
+
+
+# Generated tsvector column created by migration, it is not in the ItemTable model
+# because sqlite (tests) can not create it
+ITEM_SEARCH_VECTOR = literal_column("item_table.search_vector")
+SEARCH_CONFIG: str = "english"
+
+
+async def searchItemIdsFullText(
+    asyncSession: AsyncSession,
+    tsQuery: Optional[str],
+    tags: Sequence[str] = (),
+    stats: Sequence[str] = (),
+    effects: Sequence[str] = (),
+    limit: int = 20,
+    offset: int = 0,
+) -> List[int]:
+    """
+    Postgres only. Ids of the items matching the tsquery and having every facet,
+    ranked with ts_rank_cd over the weighted search_vector (GIN indexed).
+    """
+    query = select(ItemTable.id)
+    for tag in tags:
+        query = query.where(
+            ItemTable.id.in_(
+                select(ItemTagsAssociation.c.item_id)
+                .join(TagsTable, TagsTable.id == ItemTagsAssociation.c.tags_id)
+                .where(TagsTable.name == tag)
+            )
+        )
+    for stat in stats:
+        query = query.where(
+            ItemTable.id.in_(
+                select(ItemStatAssociation.c.item_id)
+                .join(StatsTable, StatsTable.id == ItemStatAssociation.c.stat_id)
+                .where(StatsTable.name == stat)
+            )
+        )
+    for effect in effects:
+        query = query.where(
+            ItemTable.id.in_(
+                select(ItemEffectAssociation.c.item_id)
+                .join(EffectsTable, EffectsTable.id == ItemEffectAssociation.c.effect_id)
+                .where(EffectsTable.name == effect)
+            )
+        )
+    if tsQuery:
+        tsQueryExpression = func.to_tsquery(SEARCH_CONFIG, tsQuery)
+        query = query.where(ITEM_SEARCH_VECTOR.op("@@")(tsQueryExpression)).order_by(
+            func.ts_rank_cd(ITEM_SEARCH_VECTOR, tsQueryExpression).desc(),
+            ItemTable.name,
+        )
+    else:
+        query = query.order_by(ItemTable.name)
+    result = await asyncSession.execute(query.limit(limit).offset(offset))
+    return list(result.scalars().all())
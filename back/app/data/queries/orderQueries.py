@@ -1,12 +1,17 @@
-from typing import List, Optional, Tuple
-from sqlalchemy import func, select, and_, update
+from typing import List, Optional, Sequence, Tuple
+from sqlalchemy import delete, func, insert, select, and_, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 
 from app.data.models.UserTable import UserTable
 from app.data.models.GoldTable import GoldTable
 from app.data.models.ItemTable import ItemTable
-from app.data.models.OrderTable import OrderItemAssociation, OrderTable
+from app.data.models.OrderTable import (
+    OrderItemAssociation,
+    OrderTable,
+    ProfilePurchaseSummaryTable,
+)
 from app.schemas.Order import Order, OrderSummary
 from app.schemas.Order import OrderStatus
 
@@ -105,7 +110,7 @@ async def getUniqueItemNamesQuantityAndBasePriceByUserName(
         .join(OrderTable, OrderTable.user_id == UserTable.id)
         .join(OrderItemAssociation, OrderTable.id == OrderItemAssociation.c.order_id)
         .join(ItemTable, OrderItemAssociation.c.item_id == ItemTable.id)
-        .join(GoldTable, GoldTable.id == ItemTable.id)
+        .join(GoldTable, GoldTable.id == ItemTable.gold_id)
         .where(UserTable.userName == userName)
         .group_by(ItemTable.name, GoldTable.base_cost)
         .order_by(ItemTable.name)
@@ -132,6 +137,115 @@ async def getUniqueItemNamesQuantityAndBasePriceByUserName(
     return finalList
 
 
+async def addOrderToPurchaseSummary(
+    asyncSession: AsyncSession,
+    user_id: int,
+    order_date: date,
+    items: Sequence[Tuple[int, int, int]],
+) -> None:
+    """
+    Add the (item_id, quantity, total) of a new order to the user purchase summary,
+    one upsert for all the items. Postgres and sqlite share the ON CONFLICT syntax.
+    """
+    if not items:
+        return
+    dialectName: str = asyncSession.bind.dialect.name
+    dialectInsert = postgresql.insert if dialectName == "postgresql" else sqlite.insert
+    # Two argument max() is sqlite scalar max, postgres calls it greatest()
+    latestOf = func.greatest if dialectName == "postgresql" else func.max
+    statement = dialectInsert(ProfilePurchaseSummaryTable).values(
+        [
+            {
+                "user_id": user_id,
+                "item_id": item_id,
+                "times_ordered": quantity,
+                "total_spend": total,
+                "last_order_date": order_date,
+            }
+            for item_id, quantity, total in items
+        ]
+    )
+    summary = ProfilePurchaseSummaryTable.__table__.c
+    await asyncSession.execute(
+        statement.on_conflict_do_update(
+            index_elements=[summary.user_id, summary.item_id],
+            set_={
+                "times_ordered": summary.times_ordered + statement.excluded.times_ordered,
+                "total_spend": summary.total_spend + statement.excluded.total_spend,
+                "last_order_date": latestOf(
+                    summary.last_order_date, statement.excluded.last_order_date
+                ),
+            },
+        )
+    )
+
+
+async def rebuildPurchaseSummaries(asyncSession: AsyncSession) -> None:
+    """
+    Recompute every purchase summary from the orders, for data inserted without
+    going through OrderProcessor. The spend of old orders is estimated with the
+    current base cost since orders only store their total.
+    """
+    await asyncSession.execute(delete(ProfilePurchaseSummaryTable))
+    await asyncSession.execute(
+        insert(ProfilePurchaseSummaryTable).from_select(
+            [
+                "user_id",
+                "item_id",
+                "times_ordered",
+                "total_spend",
+                "last_order_date",
+            ],
+            select(
+                OrderTable.user_id,
+                OrderItemAssociation.c.item_id,
+                func.sum(OrderItemAssociation.c.quantity),
+                func.sum(OrderItemAssociation.c.quantity * GoldTable.base_cost),
+                func.max(OrderTable.order_date),
+            )
+            .join(OrderItemAssociation, OrderTable.id == OrderItemAssociation.c.order_id)
+            .join(ItemTable, OrderItemAssociation.c.item_id == ItemTable.id)
+            .join(GoldTable, GoldTable.id == ItemTable.gold_id)
+            .group_by(OrderTable.user_id, OrderItemAssociation.c.item_id),
+        )
+    )
+
+
+async def getPurchaseSummaryByUserName(
+    asyncSession: AsyncSession, userName: str
+) -> List[OrderSummary]:
+    """Read the purchase summary of the user, one indexed lookup whatever the history length."""
+    result = await asyncSession.execute(
+        select(
+            ItemTable.name,
+            GoldTable.base_cost,
+            ProfilePurchaseSummaryTable.times_ordered,
+            ProfilePurchaseSummaryTable.total_spend,
+            ProfilePurchaseSummaryTable.last_order_date,
+        )
+        .select_from(UserTable)
+        .join(
+            ProfilePurchaseSummaryTable,
+            ProfilePurchaseSummaryTable.user_id == UserTable.id,
+        )
+        .join(ItemTable, ItemTable.id == ProfilePurchaseSummaryTable.item_id)
+        .join(GoldTable, GoldTable.id == ItemTable.gold_id)
+        .where(UserTable.userName == userName)
+        .order_by(ItemTable.name)
+    )
+    return [
+        OrderSummary(
+            itemName=name,
+            basePrice=baseCost,
+            timesOrdered=timesOrdered,
+            totalSpend=totalSpend,
+            orderDates=[],
+            lastOrderDate=lastOrderDate,
+        )
+        for name, baseCost, timesOrdered, totalSpend, lastOrderDate in result.all()
+    ]
+
+
 async def getOrdersWithStatusAndDeliveryDate(
     asyncSession: AsyncSession, delivery_date: date, status: OrderStatus
 ) -> List[OrderTable]:
@@ -1,8 +1,15 @@
-from typing import Optional, List
-from sqlalchemy import select
+from datetime import datetime
+from typing import Dict, Iterable, Optional, List, Tuple
+from sqlalchemy import and_, case, delete, func, insert, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
-from app.data.models.ReviewTable import ReviewTable, CommentTable
+from sqlalchemy.orm import aliased, noload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from app.data.models.ReviewTable import (
+    ReviewTable,
+    CommentTable,
+    ReviewSummaryTable,
+)
 from app.data.models.OrderTable import OrderTable
 
 
@@ -23,6 +30,41 @@ async def addReview(
     return review.id
 
 
+async def addReviews(
+    asyncSession: AsyncSession,
+    order_id: int,
+    ratings_by_item: Dict[int, int],
+) -> Dict[int, int]:
+    """
+    Create the reviews of many items of an order with one multi-row insert.
+    Returns the new review id of each item id.
+    """
+    result = await asyncSession.execute(
+        insert(ReviewTable).returning(ReviewTable.id, ReviewTable.item_id),
+        [
+            {"order_id": order_id, "item_id": item_id, "rating": rating}
+            for item_id, rating in ratings_by_item.items()
+        ],
+    )
+    return {item_id: review_id for review_id, item_id in result.all()}
+
+
+async def addComments(
+    asyncSession: AsyncSession,
+    comments: List[Tuple[int, int, str]],
+) -> None:
+    """Create many comments, given as (review_id, user_id, content), with one insert."""
+    if not comments:
+        return
+    await asyncSession.execute(
+        insert(CommentTable),
+        [
+            {"review_id": review_id, "user_id": user_id, "content": content}
+            for review_id, user_id, content in comments
+        ],
+    )
+
+
 async def updateReview(
     asyncSession: AsyncSession,
     review_id: int,
@@ -156,3 +198,228 @@ async def getCommentsByUserId(
         select(CommentTable).where(CommentTable.user_id == user_id)
     )
     return list(result.scalars().all())
+
+
+def ratingColumnName(rating: int) -> str:
+    return f"rating_{rating}"
+
+
+async def applyRatingToReviewSummary(
+    asyncSession: AsyncSession,
+    item_id: int,
+    added_rating: int,
+    removed_rating: Optional[int] = None,
+) -> bool:
+    """
+    Add a rating to the item summary, or move one from removed_rating to added_rating
+    when a review changes. Returns False if the item has no summary row yet.
+    """
+    summary = ReviewSummaryTable.__table__.c
+    values = {
+        ratingColumnName(added_rating): summary[ratingColumnName(added_rating)] + 1,
+        "rating_sum": summary.rating_sum + added_rating,
+    }
+    if removed_rating is None:
+        values["review_count"] = summary.review_count + 1
+    else:
+        values["rating_sum"] = summary.rating_sum + added_rating - removed_rating
+        values[ratingColumnName(removed_rating)] = (
+            summary[ratingColumnName(removed_rating)] - 1
+        )
+    result = await asyncSession.execute(
+        update(ReviewSummaryTable)
+        .where(ReviewSummaryTable.item_id == item_id)
+        .values(values)
+    )
+    return result.rowcount > 0
+
+
+def dialectInsertOf(asyncSession: AsyncSession):
+    """Postgres and sqlite share the ON CONFLICT syntax, not the insert construct."""
+    if asyncSession.bind.dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
+
+
+async def ensureReviewSummaries(
+    asyncSession: AsyncSession, item_ids: Iterable[int]
+) -> None:
+    """
+    Create the missing summary rows with zero counts, call before
+    applyRatingToReviewSummary. Concurrent first reviews of an item both end up
+    incrementing the same row: ON CONFLICT DO NOTHING waits for the other insert
+    and the increments apply on top of each other. Items reviewed before the
+    summaries existed were backfilled by the migration that added the table.
+    """
+    rows: List[Dict[str, int]] = [
+        {
+            "item_id": item_id,
+            "review_count": 0,
+            "rating_sum": 0,
+            **{ratingColumnName(rating): 0 for rating in range(1, 6)},
+        }
+        for item_id in sorted(set(item_ids))
+    ]
+    if not rows:
+        return
+    # Sorted ids, two batches lock their rows in the same order
+    statement = dialectInsertOf(asyncSession)(ReviewSummaryTable).values(rows)
+    await asyncSession.execute(
+        statement.on_conflict_do_nothing(index_elements=[ReviewSummaryTable.item_id])
+    )
+
+
+async def rebuildReviewSummary(asyncSession: AsyncSession, item_id: int) -> None:
+    """
+    Recompute the item summary from the review table, flushed changes included.
+    Offline and backfill use only: the counts come from the snapshot of this
+    transaction, a concurrent review of the item would be overwritten. The
+    request paths use ensureReviewSummaries and applyRatingToReviewSummary.
+    """
+    result = await asyncSession.execute(
+        select(
+            func.count(ReviewTable.id),
+            func.coalesce(func.sum(ReviewTable.rating), 0),
+            *[
+                func.coalesce(
+                    func.sum(case((ReviewTable.rating == rating, 1), else_=0)), 0
+                )
+                for rating in range(1, 6)
+            ],
+        ).where(ReviewTable.item_id == item_id)
+    )
+    reviewCount, ratingSum, *ratingCounts = result.one()
+    if reviewCount == 0:
+        await asyncSession.execute(
+            delete(ReviewSummaryTable).where(ReviewSummaryTable.item_id == item_id)
+        )
+        return
+    values: Dict[str, int] = {
+        "review_count": reviewCount,
+        "rating_sum": ratingSum,
+        **{
+            ratingColumnName(rating): count
+            for rating, count in zip(range(1, 6), ratingCounts)
+        },
+    }
+    statement = dialectInsertOf(asyncSession)(ReviewSummaryTable).values(
+        item_id=item_id, **values
+    )
+    await asyncSession.execute(
+        statement.on_conflict_do_update(
+            index_elements=[ReviewSummaryTable.item_id],
+            # set_ skips the onupdate of updated_at, set it here
+            set_={**values, "updated_at": func.now()},
+        )
+    )
+
+
+async def getReviewSummariesByItemIds(
+    asyncSession: AsyncSession,
+    item_ids: List[int],
+) -> List[ReviewSummaryTable]:
+    """Get the review summaries of the given items, items without reviews are skipped."""
+    result = await asyncSession.execute(
+        select(ReviewSummaryTable).where(ReviewSummaryTable.item_id.in_(item_ids))
+    )
+    return list(result.scalars().all())
+
+
+async def getReviewsPage(
+    asyncSession: AsyncSession,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    item_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> List[ReviewTable]:
+    """
+    Get up to limit reviews of an item or a user, newest first, starting after the
+    (created_at, id) keyset. The comments are not loaded, see loadCommentsPreview.
+    """
+    query = select(ReviewTable).options(noload(ReviewTable.comments))
+    if item_id is not None:
+        query = query.where(ReviewTable.item_id == item_id)
+    if user_id is not None:
+        query = query.join(OrderTable, OrderTable.id == ReviewTable.order_id).where(
+            OrderTable.user_id == user_id
+        )
+    if after is not None:
+        createdAt, reviewId = after
+        query = query.where(
+            or_(
+                ReviewTable.created_at < createdAt,
+                and_(ReviewTable.created_at == createdAt, ReviewTable.id < reviewId),
+            )
+        )
+    result = await asyncSession.execute(
+        query.order_by(ReviewTable.created_at.desc(), ReviewTable.id.desc()).limit(
+            limit
+        )
+    )
+    return list(result.scalars().all())
+
+
+async def loadCommentsPreview(
+    asyncSession: AsyncSession,
+    reviews: List[ReviewTable],
+    per_review: int,
+) -> Dict[int, int]:
+    """
+    Attach the first per_review comments to each review in one query and return
+    the total number of comments of each review.
+    """
+    if not reviews:
+        return {}
+    commentNumber = (
+        func.row_number()
+        .over(
+            partition_by=CommentTable.review_id,
+            order_by=(CommentTable.created_at, CommentTable.id),
+        )
+        .label("comment_number")
+    )
+    commentTotal = (
+        func.count().over(partition_by=CommentTable.review_id).label("comment_total")
+    )
+    numbered = (
+        select(CommentTable, commentNumber, commentTotal)
+        .where(CommentTable.review_id.in_([review.id for review in reviews]))
+        .subquery()
+    )
+    commentAlias = aliased(CommentTable, numbered)
+    result = await asyncSession.execute(
+        select(commentAlias, numbered.c.comment_total)
+        .where(numbered.c.comment_number <= per_review)
+        .order_by(numbered.c.review_id, numbered.c.comment_number)
+    )
+    commentsByReview: Dict[int, List[CommentTable]] = {}
+    totals: Dict[int, int] = {}
+    for comment, total in result.all():
+        commentsByReview.setdefault(comment.review_id, []).append(comment)
+        totals[comment.review_id] = total
+    for review in reviews:
+        # Fill the relationship without triggering a lazy load
+        set_committed_value(review, "comments", commentsByReview.get(review.id, []))
+    return {review.id: totals.get(review.id, 0) for review in reviews}
+
+
+async def getCommentsPage(
+    asyncSession: AsyncSession,
+    review_id: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+) -> List[CommentTable]:
+    """Get up to limit comments of a review, oldest first, starting after the keyset."""
+    query = select(CommentTable).where(CommentTable.review_id == review_id)
+    if after is not None:
+        createdAt, commentId = after
+        query = query.where(
+            or_(
+                CommentTable.created_at > createdAt,
+                and_(CommentTable.created_at == createdAt, CommentTable.id > commentId),
+            )
+        )
+    result = await asyncSession.execute(
+        query.order_by(CommentTable.created_at, CommentTable.id).limit(limit)
+    )
+    return list(result.scalars().all())
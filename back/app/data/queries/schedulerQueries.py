@@ -0,0 +1,125 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from app.data.models.SchedulerTable import SchedulerJobRunTable, SchedulerLeaderTable
+
+
+async def tryAdvisoryLock(connection: AsyncConnection, lockKey: int) -> bool:
+    """Postgres only. Session level lock, released when the connection ends."""
+    result = await connection.execute(
+        text("SELECT pg_try_advisory_lock(:key)"), {"key": lockKey}
+    )
+    return bool(result.scalar())
+
+
+async def releaseAdvisoryLock(connection: AsyncConnection, lockKey: int) -> None:
+    await connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lockKey})
+
+
+async def pingConnection(connection: AsyncConnection) -> None:
+    await connection.execute(text("SELECT 1"))
+
+
+async def getStaleLockHolderPid(
+    connection: AsyncConnection, lockName: str, lockKey: int, staleSeconds: float
+) -> Optional[int]:
+    """
+    Postgres only. Backend pid of the session holding the advisory lock when both
+    the heartbeat written for lockName and the last statement of that session are
+    older than staleSeconds, a hung leader. A leader that just took the lock ran a
+    statement moments ago, the old heartbeat row alone does not make it stale.
+    """
+    # pg_locks shows a bigint advisory key as two 32 bit halves
+    result = await connection.execute(
+        text(
+            "SELECT lock.pid FROM pg_locks AS lock "
+            "JOIN pg_stat_activity AS activity ON activity.pid = lock.pid "
+            "JOIN scheduler_leader_table AS leader ON leader.lock_name = :lockName "
+            "WHERE lock.locktype = 'advisory' AND lock.granted "
+            "AND lock.classid = :classId AND lock.objid = :objId "
+            "AND lock.objsubid = 1 "
+            "AND leader.heartbeat_at < now() - make_interval(secs => :staleSeconds) "
+            "AND activity.state_change < now() - make_interval(secs => :staleSeconds)"
+        ),
+        {
+            "lockName": lockName,
+            "classId": (lockKey >> 32) & 0xFFFFFFFF,
+            "objId": lockKey & 0xFFFFFFFF,
+            "staleSeconds": staleSeconds,
+        },
+    )
+    return result.scalar()
+
+
+async def terminateBackend(connection: AsyncConnection, pid: int) -> bool:
+    """Postgres only. Ends the session of pid, its session locks go with it."""
+    result = await connection.execute(
+        text("SELECT pg_terminate_backend(:pid)"), {"pid": pid}
+    )
+    return bool(result.scalar())
+
+
+async def upsertLeaderHeartbeat(
+    connection: AsyncConnection, lockName: str, nodeId: str, acquiredAt: datetime
+) -> None:
+    """Postgres only. Record the current leader and the time of its last heartbeat."""
+    now: datetime = datetime.now(timezone.utc)
+    statement = postgresql.insert(SchedulerLeaderTable).values(
+        lock_name=lockName, node_id=nodeId, acquired_at=acquiredAt, heartbeat_at=now
+    )
+    await connection.execute(
+        statement.on_conflict_do_update(
+            index_elements=[SchedulerLeaderTable.lock_name],
+            set_={
+                "node_id": statement.excluded.node_id,
+                "acquired_at": statement.excluded.acquired_at,
+                "heartbeat_at": statement.excluded.heartbeat_at,
+            },
+        )
+    )
+
+
+async def insertJobRun(asyncSession: AsyncSession, jobName: str, nodeId: str) -> int:
+    """Insert a running job run, returns its id."""
+    jobRun = SchedulerJobRunTable(
+        job_name=jobName,
+        node_id=nodeId,
+        status="running",
+        started_at=datetime.now(timezone.utc),
+    )
+    asyncSession.add(jobRun)
+    await asyncSession.flush()
+    return jobRun.id
+
+
+async def finishJobRun(
+    asyncSession: AsyncSession,
+    jobRunId: int,
+    status: str,
+    durationSeconds: float,
+    error: Optional[str] = None,
+) -> None:
+    await asyncSession.execute(
+        update(SchedulerJobRunTable)
+        .where(SchedulerJobRunTable.id == jobRunId)
+        .values(
+            status=status,
+            finished_at=datetime.now(timezone.utc),
+            duration_seconds=durationSeconds,
+            error=error,
+        )
+    )
+
+
+async def getLastJobRuns(
+    asyncSession: AsyncSession, jobName: str, limit: int = 10
+) -> List[SchedulerJobRunTable]:
+    result = await asyncSession.execute(
+        select(SchedulerJobRunTable)
+        .where(SchedulerJobRunTable.job_name == jobName)
+        .order_by(SchedulerJobRunTable.started_at.desc(), SchedulerJobRunTable.id.desc())
+        .limit(limit)
+    )
+    return list(result.scalars().all())
@@ -0,0 +1,158 @@
+import re
+import time
+from contextvars import ContextVar, Token
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.metrics import dbQuerySeconds
+from app.tracing import SPAN_KIND_CLIENT, currentSpan, tracer
+
+
+PLACEHOLDER_PATTERN = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+|\b\d+(?:\.\d+)?\b|'(?:[^']|'')*'")
+PLACEHOLDER_LIST_PATTERN = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+MAX_SPAN_STATEMENT_CHARS: int = 2000
+
+
+@lru_cache(maxsize=1024)
+def normalizeStatement(statement: str) -> str:
+    """
+    Reduce a statement to its shape: literals and bound parameters become ?,
+    expanded IN lists become (?) and whitespace is collapsed. Two statements
+    with the same shape only differ in their values, which is what an N+1 looks like.
+    """
+    shape: str = PLACEHOLDER_PATTERN.sub("?", statement)
+    shape = PLACEHOLDER_LIST_PATTERN.sub("(?)", shape)
+    return WHITESPACE_PATTERN.sub(" ", shape).strip()
+
+
+class RequestQueryStats:
+    """
+    Number of SQL statements and total time spent on them during one request.
+    The object is shared by reference through a contextvar, so statements executed
+    in child tasks or threads of the request are added to the same totals.
+    """
+
+    def __init__(self) -> None:
+        self.count: int = 0
+        self.totalSeconds: float = 0.0
+        self.statementCounts: Dict[str, int] = {}
+
+    def record(self, seconds: float, statement: str = "") -> None:
+        self.count += 1
+        self.totalSeconds += seconds
+        shape: str = normalizeStatement(statement)
+        self.statementCounts[shape] = self.statementCounts.get(shape, 0) + 1
+
+    def repeatedStatements(self, threshold: int) -> List[Tuple[str, int]]:
+        """
+        Statement shapes executed at least threshold times, most repeated first.
+        """
+        repeated: List[Tuple[str, int]] = [
+            (shape, count)
+            for shape, count in self.statementCounts.items()
+            if count >= threshold
+        ]
+        return sorted(repeated, key=lambda pair: pair[1], reverse=True)
+
+
+currentQueryStats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "currentQueryStats", default=None
+)
+
+
+def startQueryStats() -> Tuple[RequestQueryStats, Token]:
+    stats = RequestQueryStats()
+    token: Token = currentQueryStats.set(stats)
+    return stats, token
+
+
+def stopQueryStats(token: Token) -> None:
+    currentQueryStats.reset(token)
+
+
+def beforeCursorExecute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("queryStartTimes", []).append(time.perf_counter())
+
+
+def afterCursorExecute(conn, cursor, statement, parameters, context, executemany):
+    startTimes = conn.info.get("queryStartTimes")
+    if not startTimes:
+        return
+    elapsed: float = time.perf_counter() - startTimes.pop()
+    dbQuerySeconds.observe(elapsed)
+    stats: Optional[RequestQueryStats] = currentQueryStats.get()
+    if stats is not None:
+        stats.record(elapsed, statement)
+    recordQuerySpan(conn, statement, elapsed)
+
+
+def recordQuerySpan(conn, statement: str, elapsed: float) -> None:
+    """
+    Child span of the current request span. Only the normalized statement is kept,
+    the bound values could be personal data.
+    """
+    if currentSpan.get() is None:
+        return
+    endNs: int = time.time_ns()
+    operation: str = statement.split(None, 1)[0].upper() if statement.strip() else "SQL"
+    tracer.recordSpan(
+        operation,
+        endNs - int(elapsed * 1e9),
+        endNs,
+        SPAN_KIND_CLIENT,
+        {
+            "db.system": conn.dialect.name,
+            "db.statement": normalizeStatement(statement)[:MAX_SPAN_STATEMENT_CHARS],
+        },
+    )
+
+
+def instrumentEngine(engine: Engine) -> None:
+    """
+    Register the cursor execute events on a sync engine (AsyncEngine.sync_engine
+    for async engines). Calling it twice on the same engine is a no-op.
+    """
+    if event.contains(engine, "before_cursor_execute", beforeCursorExecute):
+        return
+    event.listen(engine, "before_cursor_execute", beforeCursorExecute)
+    event.listen(engine, "after_cursor_execute", afterCursorExecute)
+
+
+class QueryCounter:
+    """
+    Counts the statements executed on an engine while the context is open,
+    independently of any request. Meant for tests that assert how many queries
+    an endpoint issues:
+
+        with QueryCounter(engine.sync_engine) as counter:
+            client.get("/items/all")
+        assert counter.count <= 5
+    """
+
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.stats = RequestQueryStats()
+
+    @property
+    def count(self) -> int:
+        return self.stats.count
+
+    def repeatedStatements(self, threshold: int = 2) -> List[Tuple[str, int]]:
+        return self.stats.repeatedStatements(threshold)
+
+    def reset(self) -> None:
+        self.stats = RequestQueryStats()
+
+    def onCursorExecute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ) -> None:
+        self.stats.record(0.0, statement)
+
+    def __enter__(self) -> "QueryCounter":
+        event.listen(self.engine, "after_cursor_execute", self.onCursorExecute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        event.remove(self.engine, "after_cursor_execute", self.onCursorExecute)
@@ -1,16 +1,23 @@
-from typing import Dict, List, Set
+from typing import Any, Dict, FrozenSet, List, Optional, Sequence, Set
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.data.mappers import mapGoldTableToGold, mapItemTableToItem
 from app.data.models.GoldTable import GoldTable
 from app.data.models.ItemTable import ItemTable
 from app.data.queries.itemQueries import (
+    ITEM_FIELD_COLUMNS,
+    GOLD_FIELD_COLUMNS,
     getAllEffectNamesAndValueAssociatedByItemId,
     getAllTagNamesAssociatedByItemId,
+    getEffectsByItemIds,
     getGoldTableWithId,
+    getItemFieldRows,
     getItems,
+    getItemsWithGoldByIds,
     getSomeItems,
     getStatSetByItemId,
+    getStatsByItemIds,
+    getTagNamesByItemIds,
 )
 from app.schemas.Item import Effects, Gold, Item, Stat
 
@@ -57,3 +64,75 @@ async def convertItemTableIntoItem(
     )
     effects: Effects = Effects(root=effectsData)
     return mapItemTableToItem(itemTable, gold, tags, stats, effects)
+
+
+async def getItemsByIdsInBatch(
+    asyncSession: AsyncSession, itemIds: Optional[Sequence[int]] = None
+) -> List[Item]:
+    """
+    Same Item objects as convertItemTableIntoItem but with one query per relation
+    instead of several per item. Returns the items in the order of itemIds (missing
+    ids are skipped), or every item when itemIds is None.
+    """
+    itemsWithGold = await getItemsWithGoldByIds(asyncSession, itemIds)
+    tagsByItem: Dict[int, Set[str]] = await getTagNamesByItemIds(asyncSession, itemIds)
+    statsByItem: Dict[int, Set[Stat]] = await getStatsByItemIds(asyncSession, itemIds)
+    effectsByItem: Dict[int, Dict[str, int | float]] = await getEffectsByItemIds(
+        asyncSession, itemIds
+    )
+    itemsById: Dict[int, Item] = {}
+    for itemTable, goldTable in itemsWithGold:
+        itemsById[itemTable.id] = mapItemTableToItem(
+            itemTable,
+            mapGoldTableToGold(goldTable),
+            tagsByItem.get(itemTable.id, set()),
+            statsByItem.get(itemTable.id, set()),
+            Effects(root=effectsByItem.get(itemTable.id, {})),
+        )
+    if itemIds is None:
+        return list(itemsById.values())
+    return [itemsById[itemId] for itemId in itemIds if itemId in itemsById]
+
+
+async def getItemFieldsInBatch(
+    asyncSession: AsyncSession, fields: FrozenSet[str], someItems: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Items as plain dicts with only the given Item fields, serialized like Item would
+    be. Only the needed columns are selected and tags, stats and effects are only
+    queried when asked for, so a name and price list never reads the descriptions.
+    """
+    rows: List[Dict[str, Any]] = await getItemFieldRows(
+        asyncSession,
+        [field for field in ITEM_FIELD_COLUMNS if field in fields],
+        "gold" in fields,
+        someItems,
+    )
+    # The relation queries read everything when the item rows are not filtered
+    itemIds: Optional[List[int]] = [row["id"] for row in rows] if someItems else None
+    tagsByItem: Dict[int, Set[str]] = (
+        await getTagNamesByItemIds(asyncSession, itemIds) if "tags" in fields else {}
+    )
+    statsByItem: Dict[int, Set[Stat]] = (
+        await getStatsByItemIds(asyncSession, itemIds) if "stats" in fields else {}
+    )
+    effectsByItem: Dict[int, Dict[str, int | float]] = (
+        await getEffectsByItemIds(asyncSession, itemIds) if "effect" in fields else {}
+    )
+    items: List[Dict[str, Any]] = []
+    for row in rows:
+        item: Dict[str, Any] = {
+            field: row[field] for field in ITEM_FIELD_COLUMNS if field in fields
+        }
+        itemId: int = row["id"]
+        item["id"] = itemId
+        if "gold" in fields:
+            item["gold"] = {field: row[f"gold_{field}"] for field in GOLD_FIELD_COLUMNS}
+        if "tags" in fields:
+            item["tags"] = list(tagsByItem.get(itemId, set()))
+        if "stats" in fields:
+            item["stats"] = [stat.model_dump() for stat in statsByItem.get(itemId, set())]
+        if "effect" in fields:
+            item["effect"] = effectsByItem.get(itemId, {})
+        items.append(item)
+    return items
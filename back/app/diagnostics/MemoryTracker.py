@@ -0,0 +1,72 @@
+import tracemalloc
+from typing import List, Literal
+from app.customExceptions import NoMemoryBaselineException
+from app.schemas.Diagnostics import MemoryDiff, MemoryStat, MemoryStatus
+
+GroupBy = Literal["lineno", "filename", "traceback"]
+
+# Allocations of the tracing itself and of the import machinery are noise
+IGNORED_FILES: List[str] = [tracemalloc.__file__, "<frozen importlib._bootstrap>"]
+
+
+class MemoryTracker:
+    """
+    tracemalloc is off by default because it slows down every allocation. The
+    baseline call starts it and keeps a snapshot, a diff against that snapshot
+    shows which lines allocated the memory that is still alive since then.
+    """
+
+    def __init__(self, frames: int = 10) -> None:
+        self.frames = frames
+        self.baseline: tracemalloc.Snapshot | None = None
+
+    def takeSnapshot(self) -> tracemalloc.Snapshot:
+        snapshot: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        return snapshot.filter_traces(
+            [tracemalloc.Filter(False, fileName) for fileName in IGNORED_FILES]
+        )
+
+    def status(self) -> MemoryStatus:
+        tracing: bool = tracemalloc.is_tracing()
+        currentBytes, peakBytes = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return MemoryStatus(
+            tracing=tracing,
+            hasBaseline=self.baseline is not None,
+            currentBytes=currentBytes,
+            peakBytes=peakBytes,
+        )
+
+    def takeBaseline(self) -> MemoryStatus:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        self.baseline = self.takeSnapshot()
+        return self.status()
+
+    def diff(self, groupBy: GroupBy = "lineno", limit: int = 25) -> MemoryDiff:
+        if self.baseline is None or not tracemalloc.is_tracing():
+            raise NoMemoryBaselineException("Take a baseline snapshot first")
+        current: tracemalloc.Snapshot = self.takeSnapshot()
+        differences = current.compare_to(self.baseline, groupBy)
+        return MemoryDiff(
+            groupBy=groupBy,
+            totalSizeDiffBytes=sum(stat.size_diff for stat in differences),
+            stats=[
+                MemoryStat(
+                    location=[str(frame) for frame in stat.traceback.format()],
+                    sizeBytes=stat.size,
+                    sizeDiffBytes=stat.size_diff,
+                    count=stat.count,
+                    countDiff=stat.count_diff,
+                )
+                for stat in differences[:limit]
+            ],
+        )
+
+    def stop(self) -> MemoryStatus:
+        self.baseline = None
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        return self.status()
+
+
+memoryTracker = MemoryTracker()
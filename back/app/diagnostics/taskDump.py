@@ -0,0 +1,28 @@
+import asyncio
+from typing import List
+from app.schemas.Diagnostics import TaskInfo
+
+STACK_LIMIT: int = 30
+
+
+def describeTask(task: asyncio.Task) -> TaskInfo:
+    coroutine = task.get_coro()
+    stack: List[str] = [
+        f"{frame.f_code.co_filename}:{frame.f_lineno} in {frame.f_code.co_name}"
+        for frame in task.get_stack(limit=STACK_LIMIT)
+    ]
+    return TaskInfo(
+        name=task.get_name(),
+        coroutine=getattr(coroutine, "__qualname__", repr(coroutine)),
+        done=task.done(),
+        cancelled=task.cancelled(),
+        stack=stack,
+    )
+
+
+def dumpTasks() -> List[TaskInfo]:
+    """Every task of the running loop with the frame where it is suspended."""
+    return sorted(
+        (describeTask(task) for task in asyncio.all_tasks()),
+        key=lambda task: task.name,
+    )
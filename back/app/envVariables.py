@@ -1,3 +1,4 @@
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -28,3 +29,62 @@ LOKI_PORT: str = os.getenv("LOKI_PORT", "Empty")
 USE_LOKI: bool = os.getenv("USE_LOKI", "False").lower() == "true"
 USE_PROMETHEUS: bool = os.getenv("USE_PROMETHEUS", "False").lower() == "true"
 TESTING: bool = os.getenv("TESTING", "False").lower() == "true"
+LOG_QUEUE_MAX_SIZE: int = int(os.getenv("LOG_QUEUE_MAX_SIZE", 10000))
+LOG_BATCH_SIZE: int = int(os.getenv("LOG_BATCH_SIZE", 200))
+LOG_METHOD_ENABLED: bool = os.getenv("LOG_METHOD_ENABLED", "True").lower() == "true"
+LOG_METHOD_LEVEL_NAME: str = os.getenv("LOG_METHOD_LEVEL", "DEBUG").upper()
+# getLevelName answers "Level FOO" for an unknown name, fail at startup instead
+if not isinstance(logging.getLevelName(LOG_METHOD_LEVEL_NAME), int):
+    raise ValueError(f"LOG_METHOD_LEVEL={LOG_METHOD_LEVEL_NAME} is not a logging level")
+LOG_METHOD_LEVEL: int = logging.getLevelName(LOG_METHOD_LEVEL_NAME)
+LOG_METHOD_SAMPLE_RATE: float = float(os.getenv("LOG_METHOD_SAMPLE_RATE", 1.0))
+LOG_METHOD_SAMPLE_RATES: str = os.getenv("LOG_METHOD_SAMPLE_RATES", "")
+LOG_ARG_MAX_CHARS: int = int(os.getenv("LOG_ARG_MAX_CHARS", 500))
+SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "True").lower() == "true"
+QUERY_BUDGET_PER_REQUEST: int = int(os.getenv("QUERY_BUDGET_PER_REQUEST", 30))
+REPEATED_QUERY_THRESHOLD: int = int(os.getenv("REPEATED_QUERY_THRESHOLD", 10))
+DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+DB_STATEMENT_CACHE_SIZE: int = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))
+DATABASE_REPLICA_URL: str = os.getenv("DATABASE_REPLICA_URL", "")
+REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+REPLICA_LAG_CHECK_INTERVAL: float = float(os.getenv("REPLICA_LAG_CHECK_INTERVAL", 10))
+CATALOG_CHECK_INTERVAL: float = float(os.getenv("CATALOG_CHECK_INTERVAL", 30))
+PROFILE_CACHE_TTL_SECONDS: float = float(os.getenv("PROFILE_CACHE_TTL_SECONDS", 5))
+PROFILE_CACHE_MAX_USERS: int = int(os.getenv("PROFILE_CACHE_MAX_USERS", 10000))
+STARTUP_RETRY_SECONDS: float = float(os.getenv("STARTUP_RETRY_SECONDS", 30))
+STARTUP_RETRY_MAX_SECONDS: float = float(os.getenv("STARTUP_RETRY_MAX_SECONDS", 300))
+READINESS_CHECK_SECONDS: float = float(os.getenv("READINESS_CHECK_SECONDS", 5))
+READINESS_CHECK_TIMEOUT: float = float(os.getenv("READINESS_CHECK_TIMEOUT", 2))
+SCHEDULER_LOCK_KEY: int = int(os.getenv("SCHEDULER_LOCK_KEY", 724101))
+SCHEDULER_HEARTBEAT_SECONDS: float = float(os.getenv("SCHEDULER_HEARTBEAT_SECONDS", 10))
+SCHEDULER_TAKEOVER_SECONDS: float = float(os.getenv("SCHEDULER_TAKEOVER_SECONDS", 60))
+EVENT_LOOP_LAG_INTERVAL: float = float(os.getenv("EVENT_LOOP_LAG_INTERVAL", 0.5))
+SLOW_CALLBACK_SECONDS: float = float(os.getenv("SLOW_CALLBACK_SECONDS", 0.1))
+DIAGNOSTICS_ENABLED: bool = os.getenv("DIAGNOSTICS_ENABLED", "False").lower() == "true"
+DIAGNOSTICS_ADMINS: str = os.getenv("DIAGNOSTICS_ADMINS", "")
+DIAGNOSTICS_MAX_PROFILE_SECONDS: float = float(
+    os.getenv("DIAGNOSTICS_MAX_PROFILE_SECONDS", 120)
+)
+TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "False").lower() == "true"
+TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", 0.1))
+TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "otlp").lower()
+OTLP_TRACES_ENDPOINT: str = os.getenv(
+    "OTLP_TRACES_ENDPOINT", "http://localhost:4318/v1/traces"
+)
+TRACE_FILE_PATH: str = os.getenv("TRACE_FILE_PATH", "backend_logs/traces.jsonl")
+TRACE_SERVICE_NAME: str = os.getenv("TRACE_SERVICE_NAME", "legends-shop-backend")
+TRACE_MAX_SPANS: int = int(os.getenv("TRACE_MAX_SPANS", 500))
+TRACE_EXPORT_QUEUE_SIZE: int = int(os.getenv("TRACE_EXPORT_QUEUE_SIZE", 1000))
+COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "True").lower() == "true"
+COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL: int = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY: int = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+COMPRESSION_CACHE_ROUTES: str = os.getenv("COMPRESSION_CACHE_ROUTES", "/items/")
+COMPRESSION_CACHE_MAX_ENTRIES: int = int(os.getenv("COMPRESSION_CACHE_MAX_ENTRIES", 64))
+COMPRESSION_CACHE_TTL_SECONDS: float = float(
+    os.getenv("COMPRESSION_CACHE_TTL_SECONDS", 3600)
+)
@@ -0,0 +1,93 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.data.queries.itemQueries import getItemCatalogSignature, getVersion
+from app.data.utils import getItemsByIdsInBatch
+from app.envVariables import CATALOG_CHECK_INTERVAL
+from app.items.ItemFacetIndex import ItemFacetIndex
+from app.items.ItemProjection import serializeItemCards
+from app.logger import logger
+from app.metrics import recordCacheLookup
+from app.schemas.Item import Item
+
+
+class ItemCatalog:
+    """
+    Process wide copy of every item with the indexes built on top of it.
+
+    The items only change when ItemsLoader loads a new game version, so the catalog
+    is kept in memory and its signature (version, count, max id...) is checked at
+    most once per checkInterval seconds. invalidate() forces the check on the next use.
+    """
+
+    def __init__(self, checkInterval: float = CATALOG_CHECK_INTERVAL) -> None:
+        self.checkInterval = checkInterval
+        self.signature: Optional[Tuple] = None
+        self.items: List[Item] = []
+        self.itemsById: Dict[int, Item] = {}
+        self.facetIndex = ItemFacetIndex()
+        # Serialized once per load, the card list is the same for every request
+        self.cardsJson: bytes = b"[]"
+        self.lastCheck: float = float("-inf")
+        self.refreshLock: Optional[asyncio.Lock] = None
+
+    def invalidate(self) -> None:
+        self.lastCheck = float("-inf")
+
+    def isCheckDue(self) -> bool:
+        return time.monotonic() - self.lastCheck >= self.checkInterval
+
+    async def getSignature(self, dbSession: AsyncSession) -> Tuple:
+        version: str | None = await getVersion(dbSession)
+        return (version, *await getItemCatalogSignature(dbSession))
+
+    def load(self, items: List[Item], signature: Optional[Tuple] = None) -> None:
+        # Build everything first and swap at the end, readers never see a partial catalog
+        facetIndex = ItemFacetIndex()
+        facetIndex.build(items)
+        cardsJson: bytes = serializeItemCards(facetIndex.sortedItems("name"))
+        self.itemsById = {item.id: item for item in items}
+        self.items = items
+        self.facetIndex = facetIndex
+        self.cardsJson = cardsJson
+        self.signature = signature
+
+    async def refresh(self, dbSession: AsyncSession) -> "ItemCatalog":
+        """Reload the catalog if the items in the database changed since the last load."""
+        if not self.isCheckDue():
+            return self
+        if self.refreshLock is None:
+            self.refreshLock = asyncio.Lock()
+        async with self.refreshLock:
+            # Another request could have refreshed it while this one waited
+            if not self.isCheckDue():
+                return self
+            signature: Tuple = await self.getSignature(dbSession)
+            if signature != self.signature:
+                items: List[Item] = await getItemsByIdsInBatch(dbSession)
+                self.load(items, signature)
+                logger.info(f"Item catalog loaded with {len(items)} items")
+            self.lastCheck = time.monotonic()
+        return self
+
+    async def getItemsByIds(
+        self, dbSession: AsyncSession, itemIds: Sequence[int]
+    ) -> List[Item]:
+        """
+        Items in the order of itemIds, duplicated and unknown ids are skipped. Ids that
+        are not in the catalog yet (added since the last check) are read in batch.
+        """
+        await self.refresh(dbSession)
+        uniqueIds: List[int] = list(dict.fromkeys(itemIds))
+        missingIds: List[int] = [i for i in uniqueIds if i not in self.itemsById]
+        recordCacheLookup("item_catalog", not missingIds)
+        itemsById: Dict[int, Item] = self.itemsById
+        if missingIds:
+            itemsById = dict(itemsById)
+            for item in await getItemsByIdsInBatch(dbSession, missingIds):
+                itemsById[item.id] = item
+        return [itemsById[i] for i in uniqueIds if i in itemsById]
+
+
+itemCatalog = ItemCatalog()
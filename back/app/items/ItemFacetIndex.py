@@ -0,0 +1,130 @@
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Literal, Optional, Tuple
+from app.schemas.Item import Item
+
+SortOption = Literal["name", "price_asc", "price_desc"]
+
+
+class ItemFacetIndex:
+    """
+    Bitmap indexes to filter the catalog by tags, stats, effects and gold cost.
+
+    Each item gets a position and every facet value a python int used as a bitset
+    (bit i set = item at position i has it), so a conjunctive query is a few integer
+    ANDs and a facet count is a popcount. Gold costs are kept sorted with one prefix
+    bitmask per position, a price range is a XOR of two of them.
+    """
+
+    def __init__(self) -> None:
+        self.items: List[Item] = []
+        self.allMask: int = 0
+        self.tagMasks: Dict[str, int] = {}
+        self.statMasks: Dict[str, int] = {}
+        self.effectMasks: Dict[str, int] = {}
+        # Positions sorted by base cost, their costs and the prefix masks over that order
+        self.costOrder: List[int] = []
+        self.sortedCosts: List[int] = []
+        self.costPrefixMasks: List[int] = [0]
+        self.nameOrder: List[int] = []
+
+    def build(self, items: Iterable[Item]) -> None:
+        self.items = list(items)
+        self.allMask = (1 << len(self.items)) - 1
+        self.tagMasks, self.statMasks, self.effectMasks = {}, {}, {}
+        for position, item in enumerate(self.items):
+            bit: int = 1 << position
+            for tag in item.tags:
+                self.tagMasks[tag] = self.tagMasks.get(tag, 0) | bit
+            for stat in item.stats:
+                self.statMasks[stat.name] = self.statMasks.get(stat.name, 0) | bit
+            for effect in item.effect.root:
+                self.effectMasks[effect] = self.effectMasks.get(effect, 0) | bit
+        self.costOrder = sorted(
+            range(len(self.items)),
+            key=lambda position: (self.items[position].gold.base, self.items[position].name),
+        )
+        self.sortedCosts = [self.items[position].gold.base for position in self.costOrder]
+        self.costPrefixMasks = [0]
+        for position in self.costOrder:
+            self.costPrefixMasks.append(self.costPrefixMasks[-1] | (1 << position))
+        self.nameOrder = sorted(
+            range(len(self.items)), key=lambda position: self.items[position].name
+        )
+
+    def costRangeMask(self, minCost: Optional[int], maxCost: Optional[int]) -> int:
+        low: int = 0 if minCost is None else bisect_left(self.sortedCosts, minCost)
+        high: int = (
+            len(self.sortedCosts)
+            if maxCost is None
+            else bisect_right(self.sortedCosts, maxCost)
+        )
+        if high <= low:
+            return 0
+        return self.costPrefixMasks[high] ^ self.costPrefixMasks[low]
+
+    def filterMask(
+        self,
+        tags: Iterable[str] = (),
+        stats: Iterable[str] = (),
+        effects: Iterable[str] = (),
+        minCost: Optional[int] = None,
+        maxCost: Optional[int] = None,
+    ) -> int:
+        mask: int = self.allMask
+        for tag in tags:
+            mask &= self.tagMasks.get(tag, 0)
+        for stat in stats:
+            mask &= self.statMasks.get(stat, 0)
+        for effect in effects:
+            mask &= self.effectMasks.get(effect, 0)
+        if minCost is not None or maxCost is not None:
+            mask &= self.costRangeMask(minCost, maxCost)
+        return mask
+
+    def facetCounts(self, mask: int, masks: Dict[str, int]) -> Dict[str, int]:
+        """How many of the matching items have each facet value, zeros left out."""
+        counts: Dict[str, int] = {}
+        for name, facetMask in masks.items():
+            count: int = (facetMask & mask).bit_count()
+            if count:
+                counts[name] = count
+        return counts
+
+    def sortedPositions(self, mask: int, sort: SortOption) -> List[int]:
+        if sort == "name":
+            order: List[int] = self.nameOrder
+        elif sort == "price_asc":
+            order = self.costOrder
+        else:
+            order = self.costOrder[::-1]
+        return [position for position in order if mask >> position & 1]
+
+    def sortedItems(self, sort: SortOption) -> List[Item]:
+        return [self.items[position] for position in self.sortedPositions(self.allMask, sort)]
+
+    def query(
+        self,
+        tags: Iterable[str] = (),
+        stats: Iterable[str] = (),
+        effects: Iterable[str] = (),
+        minCost: Optional[int] = None,
+        maxCost: Optional[int] = None,
+        sort: SortOption = "name",
+        limit: int = 50,
+        offset: int = 0,
+    ) -> Tuple[int, List[Item], Dict[str, Dict[str, int]]]:
+        """
+        Returns the number of matching items, the requested page of them and the
+        facet counts of the whole match.
+        """
+        mask: int = self.filterMask(tags, stats, effects, minCost, maxCost)
+        positions: List[int] = self.sortedPositions(mask, sort)
+        facets: Dict[str, Dict[str, int]] = {
+            "tags": self.facetCounts(mask, self.tagMasks),
+            "stats": self.facetCounts(mask, self.statMasks),
+            "effects": self.facetCounts(mask, self.effectMasks),
+        }
+        page: List[Item] = [
+            self.items[position] for position in positions[offset : offset + limit]
+        ]
+        return len(positions), page, facets
@@ -0,0 +1,42 @@
+from typing import Any, Dict, FrozenSet, List, Optional
+from pydantic import TypeAdapter
+from app.customExceptions import InvalidItemFieldsException
+from app.schemas.Item import Item, ItemCard
+
+ITEM_FIELDS: FrozenSet[str] = frozenset(Item.model_fields)
+
+itemCardsAdapter = TypeAdapter(List[ItemCard])
+
+
+def parseFields(fields: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Parse a fields=name,imageUrl,gold query parameter. None means the whole item,
+    id is always part of the projection so clients can still key the results.
+
+    Raises:
+        InvalidItemFieldsException: If a field is not an Item field
+    """
+    if fields is None:
+        return None
+    requested = {field.strip() for field in fields.split(",") if field.strip()}
+    if not requested:
+        return None
+    unknown = requested - ITEM_FIELDS
+    if unknown:
+        raise InvalidItemFieldsException(
+            f"Unknown item fields: {', '.join(sorted(unknown))}"
+        )
+    return frozenset(requested | {"id"})
+
+
+def projectItems(items: List[Item], fields: FrozenSet[str]) -> List[Dict[str, Any]]:
+    """Projection at serialization level, for items that are already loaded."""
+    return [item.model_dump(mode="json", include=set(fields)) for item in items]
+
+
+def toItemCard(item: Item) -> ItemCard:
+    return ItemCard(id=item.id, name=item.name, imageUrl=item.imageUrl, cost=item.gold.base)
+
+
+def serializeItemCards(items: List[Item]) -> bytes:
+    return itemCardsAdapter.dump_json([toItemCard(item) for item in items])
@@ -0,0 +1,132 @@
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.schemas.Item import Item
+
+HTML_TAG_PATTERN = re.compile(r"<[^>]+>")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Same weights as the A/B/C weights of the Postgres search_vector column
+NAME_WEIGHT: float = 1.0
+PLAINTEXT_WEIGHT: float = 0.4
+DESCRIPTION_WEIGHT: float = 0.2
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words of a text, the html markup of the descriptions is dropped."""
+    return TOKEN_PATTERN.findall(HTML_TAG_PATTERN.sub(" ", text).lower())
+
+
+class ItemSearchIndex:
+    """
+    In-memory inverted index over the item name, plaintext and description.
+    Used when the database has no full-text search (sqlite in tests and local runs),
+    Postgres uses the search_vector GIN index instead.
+
+    Every query word matches as a prefix ("infin" finds "Infinity Edge") and all the
+    words have to match. Items are ranked by the weighted number of matches.
+    """
+
+    def __init__(self) -> None:
+        self.signature: Optional[Tuple] = None
+        # token -> item id -> weight
+        self.postings: Dict[str, Dict[int, float]] = {}
+        self.sortedTokens: List[str] = []
+        self.itemNames: Dict[int, str] = {}
+        self.itemsByTag: Dict[str, Set[int]] = {}
+        self.itemsByStat: Dict[str, Set[int]] = {}
+        self.itemsByEffect: Dict[str, Set[int]] = {}
+
+    def build(self, items: Iterable[Item], signature: Optional[Tuple] = None) -> None:
+        postings: Dict[str, Dict[int, float]] = {}
+        itemNames: Dict[int, str] = {}
+        itemsByTag: Dict[str, Set[int]] = {}
+        itemsByStat: Dict[str, Set[int]] = {}
+        itemsByEffect: Dict[str, Set[int]] = {}
+        for item in items:
+            itemNames[item.id] = item.name
+            for text, weight in (
+                (item.name, NAME_WEIGHT),
+                (item.plaintext, PLAINTEXT_WEIGHT),
+                (item.description, DESCRIPTION_WEIGHT),
+            ):
+                for token in tokenize(text):
+                    itemWeights: Dict[int, float] = postings.setdefault(token, {})
+                    itemWeights[item.id] = itemWeights.get(item.id, 0.0) + weight
+            for tag in item.tags:
+                itemsByTag.setdefault(tag, set()).add(item.id)
+            for stat in item.stats:
+                itemsByStat.setdefault(stat.name, set()).add(item.id)
+            for effect in item.effect.root:
+                itemsByEffect.setdefault(effect, set()).add(item.id)
+        # Swap everything at the end so a search never sees a half built index
+        self.postings = postings
+        self.sortedTokens = sorted(postings)
+        self.itemNames = itemNames
+        self.itemsByTag = itemsByTag
+        self.itemsByStat = itemsByStat
+        self.itemsByEffect = itemsByEffect
+        self.signature = signature
+
+    def matchPrefix(self, prefix: str) -> Dict[int, float]:
+        """Weights of the items containing a word that starts with prefix."""
+        weights: Dict[int, float] = {}
+        position: int = bisect_left(self.sortedTokens, prefix)
+        while position < len(self.sortedTokens) and self.sortedTokens[
+            position
+        ].startswith(prefix):
+            for itemId, weight in self.postings[self.sortedTokens[position]].items():
+                weights[itemId] = weights.get(itemId, 0.0) + weight
+            position += 1
+        return weights
+
+    def facetItemIds(
+        self, tags: Iterable[str], stats: Iterable[str], effects: Iterable[str]
+    ) -> Optional[Set[int]]:
+        """Items that have every requested tag, stat and effect, None when there are no facets."""
+        candidates: Optional[Set[int]] = None
+        for name, itemsByName in (
+            *((tag, self.itemsByTag) for tag in tags),
+            *((stat, self.itemsByStat) for stat in stats),
+            *((effect, self.itemsByEffect) for effect in effects),
+        ):
+            itemIds: Set[int] = itemsByName.get(name, set())
+            candidates = set(itemIds) if candidates is None else candidates & itemIds
+        return candidates
+
+    def search(
+        self,
+        query: str,
+        tags: Iterable[str] = (),
+        stats: Iterable[str] = (),
+        effects: Iterable[str] = (),
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[int]:
+        """
+        Ids of the matching items, best match first. Without query words the
+        facet matches are returned sorted by name.
+        """
+        scores: Optional[Dict[int, float]] = None
+        for word in tokenize(query):
+            wordScores: Dict[int, float] = self.matchPrefix(word)
+            if scores is None:
+                scores = wordScores
+            else:
+                scores = {
+                    itemId: score + wordScores[itemId]
+                    for itemId, score in scores.items()
+                    if itemId in wordScores
+                }
+        facetIds: Optional[Set[int]] = self.facetItemIds(tags, stats, effects)
+        if scores is None:
+            candidateIds = self.itemNames.keys() if facetIds is None else facetIds
+            scores = {itemId: 0.0 for itemId in candidateIds}
+        elif facetIds is not None:
+            scores = {
+                itemId: score for itemId, score in scores.items() if itemId in facetIds
+            }
+        ranked: List[int] = sorted(
+            scores, key=lambda itemId: (-scores[itemId], self.itemNames[itemId])
+        )
+        return ranked[offset : offset + limit]
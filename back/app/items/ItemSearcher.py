@@ -0,0 +1,77 @@
+from typing import List, Optional, Sequence
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.data.queries.itemQueries import searchItemIdsFullText
+from app.data.utils import getItemsByIdsInBatch
+from app.items.ItemCatalog import ItemCatalog, itemCatalog
+from app.items.ItemSearchIndex import ItemSearchIndex, tokenize
+from app.logger import logMethod
+from app.schemas.Item import Item
+
+# Shared by every request, rebuilt when the item catalog is reloaded
+memorySearchIndex = ItemSearchIndex()
+
+
+def makePrefixTsQuery(query: str) -> Optional[str]:
+    """
+    Turn user input into a safe tsquery where every word is a prefix and all must
+    match: "infinity ed" -> "infinity:* & ed:*". tokenize only keeps [a-z0-9] so
+    no tsquery operator from the input reaches the database.
+    """
+    words: List[str] = tokenize(query)
+    if not words:
+        return None
+    return " & ".join(f"{word}:*" for word in words)
+
+
+class ItemSearcher:
+    def __init__(self, dbSession: AsyncSession) -> None:
+        self.dbSession = dbSession
+
+    def usesFullTextSearch(self) -> bool:
+        return self.dbSession.bind.dialect.name == "postgresql"
+
+    async def refreshMemoryIndex(self) -> ItemSearchIndex:
+        catalog: ItemCatalog = await itemCatalog.refresh(self.dbSession)
+        if memorySearchIndex.signature != catalog.signature:
+            memorySearchIndex.build(catalog.items, catalog.signature)
+        return memorySearchIndex
+
+    @logMethod
+    async def search(
+        self,
+        query: str = "",
+        tags: Sequence[str] = (),
+        stats: Sequence[str] = (),
+        effects: Sequence[str] = (),
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Item]:
+        """
+        Search items by words of their name, plaintext and description, optionally
+        restricted to the items having every given tag, stat and effect.
+
+        Args:
+            query (str): Words to search, each one matches as a prefix
+            tags (Sequence[str]): Tags the items must have
+            stats (Sequence[str]): Stat names the items must have
+            effects (Sequence[str]): Effect names the items must have
+            limit (int): Maximum number of items
+            offset (int): Number of ranked items to skip
+
+        Returns:
+            List[Item]: The matching items, best match first
+        """
+        if self.usesFullTextSearch():
+            itemIds: List[int] = await searchItemIdsFullText(
+                self.dbSession,
+                makePrefixTsQuery(query),
+                tags,
+                stats,
+                effects,
+                limit,
+                offset,
+            )
+        else:
+            searchIndex: ItemSearchIndex = await self.refreshMemoryIndex()
+            itemIds = searchIndex.search(query, tags, stats, effects, limit, offset)
+        return await getItemsByIdsInBatch(self.dbSession, itemIds)
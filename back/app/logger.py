@@ -1,13 +1,30 @@
+import atexit
 import logging
 import os
+import queue
+import random
+import reprlib
 from datetime import datetime
 import functools
 import asyncio
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 import traceback
-from typing import Any, Optional, Callable
+from typing import Any, Dict, List, Optional, Callable, Tuple
 import logging_loki
-from app.envVariables import LOKI_HOST, LOKI_PORT, USE_LOKI
+from app.envVariables import (
+    LOG_ARG_MAX_CHARS,
+    LOG_BATCH_SIZE,
+    LOG_METHOD_ENABLED,
+    LOG_METHOD_LEVEL,
+    LOG_METHOD_SAMPLE_RATE,
+    LOG_METHOD_SAMPLE_RATES,
+    LOG_QUEUE_MAX_SIZE,
+    LOKI_HOST,
+    LOKI_PORT,
+    TRACING_ENABLED,
+    USE_LOKI,
+)
+from app.tracing import RequestContextFilter, tracer
 
 LOG_DIR_NAME = "backend_logs"
 # Maximum size of each log file before rotation (10MB)
@@ -61,6 +78,8 @@ class CustomFormatter(logging.Formatter):
         record.__dict__.setdefault("function", "")
         record.__dict__.setdefault("func_args", "")
         record.__dict__.setdefault("kwargs", "")
+        record.__dict__.setdefault("request_id", "-")
+        record.__dict__.setdefault("trace_id", "-")
 
         # Format exception info if present to include full traceback
         if record.exc_info:
@@ -69,6 +88,148 @@ class CustomFormatter(logging.Formatter):
         return super().format(record)
 
 
+class DropOldestQueue(queue.Queue):
+    """
+    Bounded queue used between the QueueHandler and the listener thread.
+
+    When the queue is full the oldest record is discarded instead of blocking the
+    caller, so a slow sink (disk, Loki) can never stall the event loop. Dropped and
+    enqueued records are counted to expose them as metrics.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        super().__init__(maxsize)
+        self.enqueued: int = 0
+        self.dropped: int = 0
+
+    def put(self, item, block: bool = True, timeout: Optional[float] = None) -> None:
+        with self.not_full:
+            if 0 < self.maxsize <= self._qsize():
+                self._get()
+                self.unfinished_tasks -= 1
+                self.dropped += 1
+            self._put(item)
+            # None is the listener stop sentinel, not a log record
+            if item is not None:
+                self.enqueued += 1
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+
+class BatchRotatingFileHandler(RotatingFileHandler):
+    """
+    Rotating file handler that writes a whole batch of records and flushes once.
+    """
+
+    def handleBatch(self, records: List[logging.LogRecord]) -> None:
+        self.acquire()
+        try:
+            for record in records:
+                if not self.filter(record):
+                    continue
+                try:
+                    if self.shouldRollover(record):
+                        self.doRollover()
+                    if self.stream is None:
+                        self.stream = self._open()
+                    self.stream.write(self.format(record) + self.terminator)
+                except Exception:
+                    self.handleError(record)
+            if self.stream is not None:
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BatchLokiHandler(logging_loki.LokiHandler):
+    """
+    Loki handler that pushes a whole batch of records in a single HTTP request.
+    """
+
+    def buildStream(self, record: logging.LogRecord) -> dict:
+        # build_payload stamps time.time(), the batch would carry the send time
+        timestamp: str = str(int(record.created * 1e9))
+        return {
+            "stream": self.emitter.build_tags(record),
+            "values": [[timestamp, self.format(record)]],
+        }
+
+    def handleBatch(self, records: List[logging.LogRecord]) -> None:
+        streams: List[dict] = []
+        for record in records:
+            if not self.filter(record):
+                continue
+            try:
+                streams.append(self.buildStream(record))
+            except Exception:
+                self.handleError(record)
+        if not streams:
+            return
+        try:
+            response = self.emitter.session.post(
+                self.emitter.url, json={"streams": streams}
+            )
+            if response.status_code != self.emitter.success_response_code:
+                raise ValueError(
+                    f"Unexpected Loki API response status code: {response.status_code}"
+                )
+        except Exception:
+            self.handleError(records[-1])
+
+
+class BatchQueueListener(QueueListener):
+    """
+    QueueListener that drains up to batchSize records per wake up and hands them
+    to the handlers in one call when they support it (handleBatch).
+    """
+
+    def __init__(self, logQueue: queue.Queue, *handlers, batchSize: int = 100):
+        super().__init__(logQueue, *handlers, respect_handler_level=True)
+        self.batchSize = batchSize
+
+    def drainBatch(self, first: logging.LogRecord) -> Tuple[List[logging.LogRecord], bool]:
+        """
+        Collect the first record plus whatever is already queued, up to batchSize.
+        Returns the batch and whether the stop sentinel was found.
+        """
+        batch: List[logging.LogRecord] = [first]
+        while len(batch) < self.batchSize:
+            try:
+                record = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if record is self._sentinel:
+                return batch, True
+            batch.append(record)
+        return batch, False
+
+    def handleBatch(self, batch: List[logging.LogRecord]) -> None:
+        for handler in self.handlers:
+            accepted: List[logging.LogRecord] = [
+                record for record in batch if record.levelno >= handler.level
+            ]
+            if not accepted:
+                continue
+            if hasattr(handler, "handleBatch"):
+                handler.handleBatch(accepted)
+            else:
+                for record in accepted:
+                    handler.handle(record)
+
+    def _monitor(self) -> None:
+        while True:
+            try:
+                record = self.dequeue(True)
+            except queue.Empty:
+                break
+            if record is self._sentinel:
+                break
+            batch, stop = self.drainBatch(record)
+            self.handleBatch(batch)
+            if stop:
+                break
+
+
 # Create log directory if it doesn't exist
 os.makedirs(LOG_DIR_NAME, exist_ok=True)
 logFile = os.path.join(LOG_DIR_NAME, f"logs-{datetime.now().strftime('%Y-%m-%d')}.txt")
@@ -82,125 +243,214 @@ streamHandler = logging.StreamHandler()
 streamHandler.setLevel(DEFAULT_LOG_LEVEL)
 
 # Rotating file handler for log files (automatically rotates when file gets too large)
-fileHandler = RotatingFileHandler(
+fileHandler = BatchRotatingFileHandler(
     logFile, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT
 )
 fileHandler.setLevel(DEFAULT_LOG_LEVEL)
 
 formatter = CustomFormatter(
-    "%(asctime)s - %(name)s - %(filename)s:%(lineno)d - %(class)s.%(function)s - %(levelname)s - %(message)s - args: %(func_args)s - kwargs: %(kwargs)s"
+    "%(asctime)s - %(name)s - %(filename)s:%(lineno)d - %(class)s.%(function)s - %(levelname)s - %(message)s - args: %(func_args)s - kwargs: %(kwargs)s - request: %(request_id)s - trace: %(trace_id)s"
 )
 streamHandler.setFormatter(formatter)
 fileHandler.setFormatter(formatter)
 
-# Add handlers to logger
-logger.addHandler(streamHandler)
-logger.addHandler(fileHandler)
+sinkHandlers: List[logging.Handler] = [streamHandler, fileHandler]
 
 if USE_LOKI:
-    lokiHandler = logging_loki.LokiHandler(
+    lokiHandler = BatchLokiHandler(
         url=f"http://{LOKI_HOST}:{LOKI_PORT}/loki/api/v1/push",
         tags={"application": "python-backend"},
         version="1",
     )
-    logger.addHandler(lokiHandler)
+    sinkHandlers.append(lokiHandler)
+
+# The logger only enqueues records, the sinks (console, file and Loki) run in the
+# listener thread so no disk or network I/O happens inside the event loop
+logQueue: DropOldestQueue = DropOldestQueue(LOG_QUEUE_MAX_SIZE)
+queueHandler = QueueHandler(logQueue)
+queueHandler.setLevel(DEFAULT_LOG_LEVEL)
+# Runs in the caller, the contextvars of the request are only visible there
+queueHandler.addFilter(RequestContextFilter())
+logger.addHandler(queueHandler)
+logListener = BatchQueueListener(logQueue, *sinkHandlers, batchSize=LOG_BATCH_SIZE)
+logListener.start()
+
+
+def stopLogPipeline() -> None:
+    """
+    Stop the listener thread, the records already in the queue are written first.
+    """
+    if logListener._thread is not None:
+        logListener.stop()
+
+
+atexit.register(stopLogPipeline)
+
+
+def getLogPipelineStats() -> Dict[str, int]:
+    """
+    Counters of the logging queue: records enqueued, dropped because the queue was
+    full and records waiting to be written.
+    """
+    return {
+        "enqueued": logQueue.enqueued,
+        "dropped": logQueue.dropped,
+        "queued": logQueue.qsize(),
+    }
+
+
+# Limits the size of the repr of large payloads like json nodes or List[Item]
+argRepr = reprlib.Repr()
+argRepr.maxlist = 5
+argRepr.maxtuple = 5
+argRepr.maxset = 5
+argRepr.maxdict = 5
+argRepr.maxstring = 80
+argRepr.maxother = 80
+
+
+def formatArgs(value: Any) -> str:
+    """Redacted repr of function arguments, capped to LOG_ARG_MAX_CHARS."""
+    text: str = argRepr.repr(redact(value))
+    if len(text) > LOG_ARG_MAX_CHARS:
+        return text[:LOG_ARG_MAX_CHARS] + "..."
+    return text
 
 
-def logMethod(func: Callable) -> Callable:
+def parseSampleRates(rawRates: str) -> Dict[str, float]:
+    """
+    Parse LOG_METHOD_SAMPLE_RATES, a comma separated list of
+    Class.function=rate pairs, into a dict keyed by qualified name.
+    """
+    rates: Dict[str, float] = {}
+    for pair in rawRates.split(","):
+        if "=" not in pair:
+            continue
+        name, rate = pair.split("=", 1)
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+SAMPLE_RATES_BY_FUNCTION: Dict[str, float] = parseSampleRates(LOG_METHOD_SAMPLE_RATES)
+
+
+def logMethod(
+    func: Optional[Callable] = None,
+    *,
+    level: Optional[int] = None,
+    sampleRate: Optional[float] = None,
+) -> Callable:
     """
     Decorator to automatically log function calls, successes, and errors.
+
+    Can be used as @logMethod or @logMethod(level=..., sampleRate=...).
+    - Call/exit records are emitted at `level` (LOG_METHOD_LEVEL by default) and
+      nothing is built when that level is disabled.
+    - Only a `sampleRate` fraction of the calls are logged, the rate can be
+      overridden per function with LOG_METHOD_SAMPLE_RATES. Errors are always logged.
+    - Arguments are redacted and turned into a capped repr (formatArgs) only for
+      the records that are emitted, the queue never holds the argument objects.
+    - Inside a sampled request trace every call is also a span named after the
+      function (see app.tracing), the span does not depend on the log sampling.
+    - With LOG_METHOD_ENABLED=false and TRACING_ENABLED=false the function is
+      returned undecorated at import time.
     Args:
         func: The function to decorate
+        level: Logging level of the call/exit records
+        sampleRate: Fraction of calls to log, between 0 and 1
 
     Returns:
         The decorated function
     """
+    if func is None:
+        return functools.partial(logMethod, level=level, sampleRate=sampleRate)
+    if not LOG_METHOD_ENABLED and not TRACING_ENABLED:
+        return func
+
+    callLevel: int = level if level is not None else LOG_METHOD_LEVEL
+    rate: float = SAMPLE_RATES_BY_FUNCTION.get(
+        func.__qualname__,
+        sampleRate if sampleRate is not None else LOG_METHOD_SAMPLE_RATE,
+    )
+    funcName = func.__name__
+    spanName: str = func.__qualname__
+    logEnabled: bool = LOG_METHOD_ENABLED
 
-    @functools.wraps(func)
-    async def asyncWrapper(*args, **kwargs):
+    def shouldLogCall() -> bool:
+        if not logEnabled or not logger.isEnabledFor(callLevel):
+            return False
+        return rate >= 1.0 or random.random() < rate
+
+    def buildExtra(args: tuple, kwargs: dict) -> dict:
         # Get class name if this is a method (first arg is self)
-        className = args[0].__class__.__name__ if args else ""
-        funcName = func.__name__
-
-        logger.info(
-            "Function called",
-            extra={
-                "class": className,
-                "function": funcName,
-                "func_args": redact(args[1:]),
-                "kwargs": redact(kwargs),
-            },
+        return {
+            "class": args[0].__class__.__name__ if args else "",
+            "function": funcName,
+            "func_args": formatArgs(args[1:]),
+            "kwargs": formatArgs(kwargs),
+        }
+
+    def logError(e: Exception, args: tuple, kwargs: dict) -> None:
+        if not logEnabled:
+            return
+        extra: dict = buildExtra(args, kwargs)
+        extra["error"] = str(e)
+        logger.error(
+            f"Error in function call: {str(e)}",
+            extra=extra,
+            exc_info=True,  # Include full traceback
         )
 
+    @functools.wraps(func)
+    async def asyncWrapper(*args, **kwargs):
+        sampled: bool = shouldLogCall()
+        span = tracer.startSpan(spanName)
+        if sampled:
+            logger.log(callLevel, "Function called", extra=buildExtra(args, kwargs))
         try:
             result = await func(*args, **kwargs)
-
-            logger.info(
-                "Function exited successfully",
-                extra={
-                    "class": className,
-                    "function": funcName,
-                    "func_args": redact(args[1:]),
-                    "kwargs": redact(kwargs),
-                },
-            )
-            return result
         except Exception as e:
-            logger.error(
-                f"Error in function call: {str(e)}",
-                extra={
-                    "class": className,
-                    "function": funcName,
-                    "func_args": redact(args[1:]),
-                    "kwargs": redact(kwargs),
-                    "error": str(e),
-                },
-                exc_info=True,  # Include full traceback
-            )
+            if span is not None:
+                span.recordError(e)
+            logError(e, args, kwargs)
             raise
+        finally:
+            if span is not None:
+                tracer.endSpan(span)
+        if sampled:
+            logger.log(
+                callLevel,
+                "Function exited successfully",
+                extra=buildExtra(args, kwargs),
+            )
+        return result
 
     @functools.wraps(func)
     def syncWrapper(*args, **kwargs):
-        # Get class name if this is a method (first arg is self)
-        className = args[0].__class__.__name__ if args else ""
-        funcName = func.__name__
-
-        logger.info(
-            "Function called",
-            extra={
-                "class": className,
-                "function": funcName,
-                "func_args": redact(args[1:]),
-                "kwargs": redact(kwargs),
-            },
-        )
-
+        sampled: bool = shouldLogCall()
+        span = tracer.startSpan(spanName)
+        if sampled:
+            logger.log(callLevel, "Function called", extra=buildExtra(args, kwargs))
         try:
             result = func(*args, **kwargs)
-
-            logger.info(
-                "Function exited successfully",
-                extra={
-                    "class": className,
-                    "function": funcName,
-                    "func_args": redact(args[1:]),
-                    "kwargs": redact(kwargs),
-                },
-            )
-            return result
         except Exception as e:
-            logger.error(
-                f"Error in function call: {str(e)}",
-                extra={
-                    "class": className,
-                    "function": funcName,
-                    "func_args": redact(args[1:]),
-                    "kwargs": redact(kwargs),
-                    "error": str(e),
-                },
-                exc_info=True,  # Include full traceback
-            )
+            if span is not None:
+                span.recordError(e)
+            logError(e, args, kwargs)
             raise
+        finally:
+            if span is not None:
+                tracer.endSpan(span)
+        if sampled:
+            logger.log(
+                callLevel,
+                "Function exited successfully",
+                extra=buildExtra(args, kwargs),
+            )
+        return result
 
     if asyncio.iscoroutinefunction(func):
         return asyncWrapper
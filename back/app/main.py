@@ -1,7 +1,7 @@
 from fastapi import Depends, FastAPI
 from sqlalchemy.ext.asyncio import AsyncSession
 from starlette.responses import JSONResponse
-from app.data.database import AsyncSessionLocal
+from app.data.database import AsyncSessionLocal, engine
 from app.data.ItemsLoader import ItemsLoader
 from app.data.SystemInitializer import SystemInitializer
 from app.services.SchedulerService import SchedulerService
@@ -9,37 +9,58 @@ from contextlib import asynccontextmanager
 from app.rateLimiter import limiter
 from app.routes import reviews, items, auth, orders, profile, cart, deliveryDates, locations
 from app.routes.RequestLoggingMiddleware import RequestLoggingMiddleware
+from app.routes.CompressionMiddleware import CompressionMiddleware
+from app.routes.FastJSONResponse import FastJSONResponse
 from app.routes.SecurityHeadersMiddleware import SecurityHeadersMiddleware
+from app.routes.QueryBudgetMiddleware import QueryBudgetMiddleware
 from app.routes import health
 from app.logger import logger
-from app.customExceptions import SystemInitializationError
 from fastapi.middleware.cors import CORSMiddleware
-from app.envVariables import FRONTEND_HOST, FRONTEND_PORT, USE_PROMETHEUS
+from app.envVariables import (
+    COMPRESSION_ENABLED,
+    DIAGNOSTICS_ENABLED,
+    EVENT_LOOP_LAG_INTERVAL,
+    FRONTEND_HOST,
+    FRONTEND_PORT,
+    SLOW_CALLBACK_SECONDS,
+    TESTING,
+    USE_PROMETHEUS,
+)
+from app.services.EventLoopLagMonitor import EventLoopLagMonitor
+from app.services.StartupManager import StartupManager
+from app.profile.ProfileCache import profileInvalidationChannel
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     scheduler = SchedulerService()
 
-    async with AsyncSessionLocal() as db:
-        try:
-            logger.info("Starting system initialization...")
-            systemInitializer = SystemInitializer(db)
-            await systemInitializer.initializeSystem()
-            logger.info("System initialization completed successfully")
-            scheduler.itemsLoader = systemInitializer.itemsLoader
-        except SystemInitializationError as e:
-            logger.error(f"System initialization failed: {str(e)}")
-            raise
-        except Exception as e:
-            logger.error(f"Unexpected error during startup: {str(e)}")
-            raise
+    # Only the database check and the catalog warm up run before serving, the
+    # system initialization continues in the background, see /health/health/readiness
+    startupManager = StartupManager(AsyncSessionLocal, SystemInitializer)
+
+    def useInitializerItemsLoader(systemInitializer: SystemInitializer) -> None:
+        scheduler.itemsLoader = systemInitializer.itemsLoader
+
+    startupManager.onSystemReady.append(useInitializerItemsLoader)
+    app.state.startupManager = startupManager
+    await startupManager.start()
 
     scheduler.start()
+    # The tests share one in memory database and worker, nothing to listen to
+    if not TESTING:
+        profileInvalidationChannel.start(engine)
+    # Always on, the stacks of the slow callbacks are logged even without prometheus
+    lagMonitor = EventLoopLagMonitor(EVENT_LOOP_LAG_INTERVAL, SLOW_CALLBACK_SECONDS)
+    app.state.lagMonitor = lagMonitor
+    lagMonitor.start()
     yield
-    scheduler.scheduler.shutdown()
+    await lagMonitor.stop()
+    await profileInvalidationChannel.stop()
+    await startupManager.stop()
+    await scheduler.stop()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 app.state.limiter = limiter
 
 
@@ -50,15 +71,9 @@ async def tooManyRequestHanlder(request, exc):
         content={"detail": "Too many requests"},
     )
 
-#This will mess with fastapi configs, find another way of using prometeus with python 
-# if USE_PROMETHEUS:
-#     from fastapi_prometheus_exporter import PrometheusExporterMiddleware
-#     PrometheusExporterMiddleware.setup(
-#         app=app,
-#         metrics_path="/metrics",
-#         ignore_paths=["/health", "/metrics"],
-#     )
-
+# Innermost, the other middlewares see the final (compressed) headers
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
 app.add_middleware(RequestLoggingMiddleware)
 app.add_middleware(SecurityHeadersMiddleware)
 
@@ -76,6 +91,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Added last so they are the outermost middlewares and time the whole stack
+if USE_PROMETHEUS:
+    from app.routes.MetricsMiddleware import MetricsMiddleware
+    from app.routes import metrics
+
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(metrics.router, prefix="/metrics")
+
+app.add_middleware(QueryBudgetMiddleware)
+
 app.include_router(items.router, prefix="/items")
 app.include_router(auth.router, prefix="/auth")
 app.include_router(orders.router, prefix="/orders")
@@ -86,6 +111,11 @@ app.include_router(locations.router, prefix="/locations")
 app.include_router(reviews.router, prefix="/review")
 app.include_router(health.router, prefix="/health")
 
+if DIAGNOSTICS_ENABLED:
+    from app.routes import diagnostics
+
+    app.include_router(diagnostics.router, prefix="/diagnostics")
+
 
 @app.get("/testGetVersion")
 async def testUpdateVersion(db: AsyncSession = Depends(AsyncSessionLocal)):
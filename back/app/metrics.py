@@ -0,0 +1,356 @@
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Sequence, Tuple
+from app.logger import getLogPipelineStats
+
+# Lightweight Prometheus registry, it only implements what the backend needs
+# (counters, gauges and histograms with labels) and renders the text exposition
+# format, so there is no need of an exporter that fights with the fastapi config.
+# Docs: https://prometheus.io/docs/instrumenting/exposition_formats/
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+COUNT_BUCKETS: Tuple[float, ...] = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+
+LabelValues = Tuple[str, ...]
+
+
+def formatValue(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def escapeLabelValue(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def formatLabels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs: str = ",".join(
+        f'{name}="{escapeLabelValue(str(value))}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Metric:
+    kind: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelNames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelNames: Tuple[str, ...] = tuple(labelNames)
+        self.lock = threading.Lock()
+
+    def labelValues(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelNames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelNames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelNames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines: List[str] = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelNames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelNames)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key: LabelValues = self.labelValues(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def get(self, **labels: str) -> float:
+        return self.values.get(self.labelValues(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            items = list(self.values.items())
+        return [
+            f"{self.name}{formatLabels(self.labelNames, key)} {formatValue(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        key: LabelValues = self.labelValues(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelNames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelNames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(buckets)) + (math.inf,)
+        # Per label values: [bucket counts..., sum, count]
+        self.values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key: LabelValues = self.labelValues(labels)
+        with self.lock:
+            data: List[float] | None = self.values.get(key)
+            if data is None:
+                data = [0.0] * (len(self.buckets) + 2)
+                self.values[key] = data
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            data[-2] += value
+            data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def getCount(self, **labels: str) -> float:
+        data: List[float] | None = self.values.get(self.labelValues(labels))
+        return data[-1] if data else 0.0
+
+    def getSum(self, **labels: str) -> float:
+        data: List[float] | None = self.values.get(self.labelValues(labels))
+        return data[-2] if data else 0.0
+
+    def samples(self) -> List[str]:
+        with self.lock:
+            items = [(key, list(data)) for key, data in self.values.items()]
+        lines: List[str] = []
+        bucketLabelNames: Tuple[str, ...] = self.labelNames + ("le",)
+        for key, data in items:
+            cumulative: float = 0.0
+            for i, bound in enumerate(self.buckets):
+                cumulative += data[i]
+                labels: str = formatLabels(bucketLabelNames, key + (formatValue(bound),))
+                lines.append(f"{self.name}_bucket{labels} {formatValue(cumulative)}")
+            labels = formatLabels(self.labelNames, key)
+            lines.append(f"{self.name}_sum{labels} {formatValue(data[-2])}")
+            lines.append(f"{self.name}_count{labels} {formatValue(data[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self.metrics: Dict[str, Metric] = {}
+        # Callbacks run before rendering, used to refresh gauges that are read
+        # from somewhere else (log queue, pool status...)
+        self.collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def addCollector(self, collector: Callable[[], None]) -> None:
+        self.collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self.collectors:
+            try:
+                collector()
+            except Exception:
+                # A broken collector should never break the scrape
+                continue
+        return "\n".join(metric.render() for metric in self.metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def counter(name: str, documentation: str, labelNames: Sequence[str] = ()) -> Counter:
+    metric = Counter(name, documentation, labelNames)
+    registry.register(metric)
+    return metric
+
+
+def gauge(name: str, documentation: str, labelNames: Sequence[str] = ()) -> Gauge:
+    metric = Gauge(name, documentation, labelNames)
+    registry.register(metric)
+    return metric
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelNames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    metric = Histogram(name, documentation, labelNames, buckets)
+    registry.register(metric)
+    return metric
+
+
+httpRequestSeconds = histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ("method", "route", "status"),
+)
+dbQueriesPerRequest = histogram(
+    "db_queries_per_request",
+    "Number of SQL statements executed per HTTP request",
+    ("route",),
+    COUNT_BUCKETS,
+)
+dbTimePerRequestSeconds = histogram(
+    "db_time_per_request_seconds",
+    "Total time spent executing SQL statements per HTTP request",
+    ("route",),
+)
+dbQuerySeconds = histogram(
+    "db_query_duration_seconds",
+    "Latency of a single SQL statement",
+)
+dbPoolCheckoutWaitSeconds = histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time waited to check out a connection from the SQLAlchemy pool",
+)
+itemsLoaderPhaseSeconds = histogram(
+    "items_loader_phase_duration_seconds",
+    "Duration of each ItemsLoader refresh phase",
+    ("phase",),
+    DEFAULT_BUCKETS + (30.0, 60.0, 120.0),
+)
+schedulerJobSeconds = histogram(
+    "scheduler_job_duration_seconds",
+    "Duration of the scheduled background jobs",
+    ("job", "status"),
+    DEFAULT_BUCKETS + (30.0, 60.0, 120.0, 300.0),
+)
+schedulerJobSkippedTotal = counter(
+    "scheduler_job_skipped_total",
+    "Scheduled job firings skipped because this process is not the leader",
+    ("job",),
+)
+schedulerIsLeader = gauge(
+    "scheduler_is_leader",
+    "1 when this process holds the scheduler lock and runs the background jobs",
+)
+dbPoolConnections = gauge(
+    "db_pool_connections",
+    "SQLAlchemy pool connections by state (size, checked_in, checked_out, overflow, waiting)",
+    ("state",),
+)
+dbReplicaLagSeconds = gauge(
+    "db_replica_lag_seconds",
+    "Last measured replication lag of the read replica",
+)
+dbReadSessionsTotal = counter(
+    "db_read_sessions_total",
+    "Read-only sessions opened by target database (replica or primary)",
+    ("target",),
+)
+queryBudgetWarningsTotal = counter(
+    "query_budget_warnings_total",
+    "Requests that exceeded the query budget or repeated a statement shape",
+    ("route", "reason"),
+)
+cacheRequestsTotal = counter(
+    "cache_requests_total",
+    "Cache lookups by cache name and result (hit or miss)",
+    ("cache", "result"),
+)
+cacheHitRatio = gauge(
+    "cache_hit_ratio",
+    "Hits over total lookups since the process started",
+    ("cache",),
+)
+httpResponseBytesTotal = counter(
+    "http_response_bytes_total",
+    "Response body bytes by encoding, original or sent after compression",
+    ("encoding", "stage"),
+)
+eventLoopLagSeconds = histogram(
+    "event_loop_lag_seconds",
+    "Delay between the scheduled and the real wake up of the lag sampler",
+)
+eventLoopSlowCallbacksTotal = counter(
+    "event_loop_slow_callbacks_total",
+    "Times the event loop was blocked longer than SLOW_CALLBACK_SECONDS",
+)
+logRecords = gauge(
+    "log_pipeline_records",
+    "Records enqueued, dropped and waiting in the logging queue",
+    ("state",),
+)
+
+
+def recordCacheLookup(cache: str, hit: bool) -> None:
+    """
+    Count a cache lookup, the hit ratio gauge is derived from these counters.
+    """
+    cacheRequestsTotal.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def collectCacheHitRatio() -> None:
+    totals: Dict[str, List[float]] = {}
+    with cacheRequestsTotal.lock:
+        items = list(cacheRequestsTotal.values.items())
+    for (cache, result), value in items:
+        hitsAndTotal: List[float] = totals.setdefault(cache, [0.0, 0.0])
+        if result == "hit":
+            hitsAndTotal[0] += value
+        hitsAndTotal[1] += value
+    for cache, (hits, total) in totals.items():
+        cacheHitRatio.set(hits / total if total else 0.0, cache=cache)
+
+
+def collectLogPipeline() -> None:
+    for state, value in getLogPipelineStats().items():
+        logRecords.set(value, state=state)
+
+
+registry.addCollector(collectCacheHitRatio)
+registry.addCollector(collectLogPipeline)
+
+
+def renderMetrics() -> str:
+    return registry.render()
@@ -5,7 +5,11 @@ from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.data.mappers import mapOrderToOrderTable
 from app.data.models.OrderTable import OrderItemAssociation, OrderTable
-from app.data.queries.orderQueries import getOrderHistoryByUserId, getOrderWithId
+from app.data.queries.orderQueries import (
+    addOrderToPurchaseSummary,
+    getOrderHistoryByUserId,
+    getOrderWithId,
+)
 from app.customExceptions import (
     DifferentTotal,
     InvalidItemException,
@@ -24,6 +28,8 @@ from app.data.queries.profileQueries import (
     updateUserSpendGoldWithUserId,
 )
 from app.logger import logMethod
+from app.data.queries.authQueries import getUserNameWithUserId
+from app.profile.ProfileCache import invalidateProfile
 from app.data.queries.deliveryDatesQueries import getDeliveryDateForItemAndLocation
 
 
@@ -63,9 +69,11 @@ class OrderProcessor:
             self.comparePrices(orderDataPerItem, order.total)
             leftGold: int = await self.computeUserChange(userId, order.total)
             await self.insertItemOrderData(orderId, orderDataPerItem)
+            await self.updatePurchaseSummary(userId, order, orderDataPerItem)
             # If an user send a lot of orders does this async job run and make the gold negative?
             await self.updateUserGold(userId, leftGold)
             await self.updateTotalUserSpendGold(userId, order.total)
+            await self.invalidateUserProfile(userId)
             await self.dbSession.commit()
             return orderId
         except ProcessOrderException as e:
@@ -147,6 +155,24 @@ class OrderProcessor:
             except SQLAlchemyError as e:
                 raise ProcessOrderException("Internal server error")
 
+    @logMethod
+    async def updatePurchaseSummary(
+        self, userId: int, order: Order, orderDataPerItem: List[OrderDataPerItem]
+    ) -> None:
+        """
+        Adds the order items to the user purchase summary read by the profile page,
+        it runs inside the order transaction so both always agree.
+        """
+        try:
+            await addOrderToPurchaseSummary(
+                self.dbSession,
+                userId,
+                order.orderDate.date(),
+                [(data.itemId, data.quantity, data.total) for data in orderDataPerItem],
+            )
+        except SQLAlchemyError as e:
+            raise ProcessOrderException("Internal server error") from e
+
     @logMethod
     async def getOrderDataPerItem(
         self, order: Order, orderTableId: int
@@ -236,6 +262,7 @@ class OrderProcessor:
             )
         orderTable.status = OrderStatus.CANCELED
         try:
+            await self.invalidateUserProfile(userId)
             await self.dbSession.commit()
         except SQLAlchemyError as e:
             raise ProcessOrderException("Internal server error") from e
@@ -256,6 +283,16 @@ class OrderProcessor:
             raise NotEnoughGoldException("Not enough gold")
         return leftGold
 
+    @logMethod
+    async def invalidateUserProfile(self, userId: int) -> None:
+        """Drops the cached gold and profile info of the user, inside the transaction."""
+        try:
+            userName: Optional[str] = await getUserNameWithUserId(self.dbSession, userId)
+        except SQLAlchemyError as e:
+            raise ProcessOrderException("Internal server error") from e
+        if userName is not None:
+            await invalidateProfile(self.dbSession, userName)
+
     @logMethod
     async def updateUserGold(self, userId: int, newGold: int) -> None:
         try:
@@ -0,0 +1,41 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.data.CacheInvalidationChannel import CacheInvalidationChannel
+from app.data.LRUTTLCache import LRUTTLCache
+from app.envVariables import PROFILE_CACHE_MAX_USERS, PROFILE_CACHE_TTL_SECONDS
+from app.schemas.profileSchemas import ProfileInfo
+
+
+class ProfileCache:
+    """
+    Gold balance and profile info per user name. The frontend polls the gold, with
+    this cache the polling only reaches the database once per TTL, and every write
+    that changes a profile invalidates it explicitly.
+    """
+
+    def __init__(self, maxUsers: int, ttlSeconds: float) -> None:
+        self.gold: LRUTTLCache[int] = LRUTTLCache(maxUsers, ttlSeconds)
+        self.info: LRUTTLCache[ProfileInfo] = LRUTTLCache(maxUsers, ttlSeconds)
+
+    def invalidate(self, userName: str) -> None:
+        self.gold.pop(userName)
+        self.info.pop(userName)
+
+    def clear(self) -> None:
+        self.gold.clear()
+        self.info.clear()
+
+
+profileCache = ProfileCache(PROFILE_CACHE_MAX_USERS, PROFILE_CACHE_TTL_SECONDS)
+profileInvalidationChannel = CacheInvalidationChannel("profile_cache")
+profileInvalidationChannel.subscribe(profileCache.invalidate, profileCache.clear)
+
+
+async def invalidateProfile(dbSession: AsyncSession, userName: str) -> None:
+    """
+    Call before committing a change to the user profile. This worker drops its
+    entries right away and every worker, this one included, drops them again when
+    the notification arrives after the commit, so a read that slipped in before the
+    commit can not keep the old values for a whole TTL.
+    """
+    await profileInvalidationChannel.notify(dbSession, userName)
+    profileCache.invalidate(userName)
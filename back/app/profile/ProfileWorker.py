@@ -4,13 +4,13 @@ from app.data.queries.profileQueries import getCurrentUserGoldWithUserName
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.data.queries.authQueries import getUserInDB
-from app.data.queries.orderQueries import (
-    getUniqueItemNamesQuantityAndBasePriceByUserName,
-)
+from app.data.queries.orderQueries import getPurchaseSummaryByUserName
 from app.schemas.AuthSchemas import UserInDB
 from app.schemas.Order import OrderSummary
 from app.schemas.profileSchemas import ProfileInfo
 from app.logger import logMethod
+from app.metrics import recordCacheLookup
+from app.profile.ProfileCache import profileCache
 
 
 class ProfileWorker:
@@ -21,6 +21,10 @@ class ProfileWorker:
 
     @logMethod
     async def getUserGoldWithUserName(self, userName: str) -> int:
+        cachedGold: int | None = profileCache.gold.get(userName)
+        recordCacheLookup("profile_gold", cachedGold is not None)
+        if cachedGold is not None:
+            return cachedGold
         try:
             gold: int | None = await getCurrentUserGoldWithUserName(
                 self.dbSession, userName
@@ -33,10 +37,15 @@ class ProfileWorker:
             ) from e
         if gold is None:
             raise UserNoGoldRow()
+        profileCache.gold.set(userName, gold)
         return gold
 
     @logMethod
     async def getProfileInfo(self, userName: str) -> ProfileInfo:
+        cachedInfo: ProfileInfo | None = profileCache.info.get(userName)
+        recordCacheLookup("profile_info", cachedInfo is not None)
+        if cachedInfo is not None:
+            return cachedInfo
         try:
             user: UserInDB | None = await getUserInDB(self.dbSession, userName)
             if user is None:
@@ -45,7 +54,9 @@ class ProfileWorker:
             orderSummaryList: List[OrderSummary] = await self.buildOrderSummaryForUser(
                 userName
             )
-            return ProfileInfo(user=user, ordersInfo=orderSummaryList)
+            profileInfo = ProfileInfo(user=user, ordersInfo=orderSummaryList)
+            profileCache.info.set(userName, profileInfo)
+            return profileInfo
         except SQLAlchemyError as e:
             raise ProfileWorkerException("SQLAlchemyError") from e
 
@@ -53,9 +64,7 @@ class ProfileWorker:
     async def buildOrderSummaryForUser(self, userName: str) -> List[OrderSummary]:
         try:
             itemNameAndCostOrderedByUser: List[OrderSummary] = (
-                await getUniqueItemNamesQuantityAndBasePriceByUserName(
-                    self.dbSession, userName
-                )
+                await getPurchaseSummaryByUserName(self.dbSession, userName)
             )
             return itemNameAndCostOrderedByUser
         except SQLAlchemyError as e:
@@ -1,14 +1,23 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.schemas.Review import Review
+from app.schemas.Review import (
+    CommentPage,
+    OrderReviews,
+    Review,
+    ReviewPage,
+    ReviewSummary,
+)
 from sqlalchemy.exc import SQLAlchemyError
-from app.logger import logMethod
+from app.logger import logger, logMethod
 from app.customExceptions import (
     InvalidRatingException,
+    InvalidReviewBatchException,
     InvalidUserReview,
     ReviewProcessorException,
 )
 from app.data.queries.reviewQueries import (
+    addComments,
     addReview,
+    addReviews,
     getReviewsByUserId,
     getCommentsByUserId,
 )
@@ -19,9 +28,29 @@ from app.data.queries.reviewQueries import (
     getCommentsByReviewId,
 )
 from app.data.queries.reviewQueries import getReviewsWithCommentsByItemId
+from app.data.queries.reviewQueries import (
+    applyRatingToReviewSummary,
+    ensureReviewSummaries,
+    getReviewById,
+    getReviewSummariesByItemIds,
+)
+from app.data.queries.reviewQueries import (
+    getCommentsPage,
+    getReviewsPage,
+    loadCommentsPreview,
+)
+from app.data.pagination import decodeCursor, encodeCursor
 from app.data.queries.orderQueries import getUserIdByOrderId, markOrderAsReviewed
-from app.data.mappers import mapReviewTableToReview, mapCommentTableToComment
-from typing import List
+from app.data.mappers import (
+    mapReviewTableToReview,
+    mapCommentTableToComment,
+    mapReviewSummaryTableToReviewSummary,
+)
+from typing import Dict, List, Optional, Tuple
+
+# Comments returned inline with each review of a page, the rest are read
+# through the paginated comments endpoint
+INLINE_COMMENTS_PER_REVIEW: int = 3
 
 
 class ReviewProcessor:
@@ -43,6 +72,10 @@ class ReviewProcessor:
             )
             for comment in review.comments:
                 await addComment(self.dbSession, reviewId, userId, comment.content)
+            await ensureReviewSummaries(self.dbSession, [review.itemId])
+            await applyRatingToReviewSummary(
+                self.dbSession, review.itemId, review.rating
+            )
 
             await markOrderAsReviewed(self.dbSession, review.orderId)
         except InvalidRatingException as e:
@@ -52,6 +85,52 @@ class ReviewProcessor:
             await self.dbSession.rollback()
             raise ReviewProcessorException("Internal server error") from e
 
+    @logMethod
+    async def addOrderReviews(self, orderReviews: OrderReviews, userId: int) -> None:
+        """
+        Add the reviews of several items of one order in a single transaction.
+
+        The ownership is checked once, reviews and comments are created with one
+        multi-row insert each and the order is marked as reviewed in the same commit.
+
+        Args:
+            orderReviews (OrderReviews): The order id and one review per item
+            userId (int): The ID of the user making the reviews
+
+        Raises:
+            InvalidReviewBatchException: If a review is for another order or an item is repeated
+            InvalidUserReview: If the user is not the owner of the order
+            ReviewProcessorException: If there's an error adding the reviews
+        """
+        reviews: List[Review] = orderReviews.reviews
+        if any(review.orderId != orderReviews.orderId for review in reviews):
+            raise InvalidReviewBatchException("All the reviews must be for the same order")
+        ratingsByItem: Dict[int, int] = {review.itemId: review.rating for review in reviews}
+        if len(ratingsByItem) != len(reviews):
+            raise InvalidReviewBatchException("Only one review per item is allowed")
+        try:
+            await self.checkSameUser(orderReviews.orderId, userId)
+            reviewIdsByItem: Dict[int, int] = await addReviews(
+                self.dbSession, orderReviews.orderId, ratingsByItem
+            )
+            comments: List[Tuple[int, int, str]] = [
+                (reviewIdsByItem[review.itemId], userId, comment.content)
+                for review in reviews
+                for comment in review.comments
+            ]
+            await addComments(self.dbSession, comments)
+            await ensureReviewSummaries(self.dbSession, ratingsByItem)
+            for itemId, rating in ratingsByItem.items():
+                await applyRatingToReviewSummary(self.dbSession, itemId, rating)
+            # Commits everything above
+            await markOrderAsReviewed(self.dbSession, orderReviews.orderId)
+        except InvalidUserReview as e:
+            await self.dbSession.rollback()
+            raise e
+        except (Exception, SQLAlchemyError) as e:
+            await self.dbSession.rollback()
+            raise ReviewProcessorException("Internal server error") from e
+
     @logMethod
     async def updateReviewAndComments(self, review: Review, userId: int) -> None:
         """
@@ -69,6 +148,13 @@ class ReviewProcessor:
             # Verify the user owns the order associated with this review
             await self.checkSameUser(review.orderId, userId)
 
+            # Move the rating in the item summary, committed together with the review
+            existingReview = await getReviewById(self.dbSession, review.id)
+            if existingReview and existingReview.rating != review.rating:
+                await self.moveRatingInSummary(
+                    existingReview.item_id, existingReview.rating, review.rating
+                )
+
             # Update the review rating
             await updateReview(self.dbSession, review.id, review.rating)
 
@@ -95,6 +181,19 @@ class ReviewProcessor:
             await self.dbSession.rollback()
             raise ReviewProcessorException("Error updating review") from e
 
+    async def moveRatingInSummary(
+        self, itemId: int, previousRating: int, newRating: int
+    ) -> None:
+        if not await applyRatingToReviewSummary(
+            self.dbSession, itemId, newRating, previousRating
+        ):
+            # A reviewed item always has a summary since the backfill migration,
+            # rebuilding it here would race with the concurrent reviews
+            logger.warning(
+                f"Item {itemId} has no review summary, rebuild it offline with "
+                "rebuildReviewSummary"
+            )
+
     @logMethod
     async def getReviewsByUserId(self, userId: int) -> List[Review]:
         """
@@ -132,3 +231,113 @@ class ReviewProcessor:
             return mapped_reviews
         except SQLAlchemyError as e:
             raise ReviewProcessorException("Error retrieving item reviews") from e
+
+    @logMethod
+    async def getReviewSummaries(self, itemIds: List[int]) -> List[ReviewSummary]:
+        """
+        Get the rating summaries for many items in one query.
+
+        Args:
+            itemIds (List[int]): The IDs of the items, duplicates are ignored
+
+        Returns:
+            List[ReviewSummary]: One summary per item in the order requested,
+            items without reviews get an empty summary
+        """
+        try:
+            uniqueItemIds: List[int] = list(dict.fromkeys(itemIds))
+            summaryTables = await getReviewSummariesByItemIds(
+                self.dbSession, uniqueItemIds
+            )
+            summariesById: Dict[int, ReviewSummary] = {
+                summaryTable.item_id: mapReviewSummaryTableToReviewSummary(summaryTable)
+                for summaryTable in summaryTables
+            }
+            return [
+                summariesById.get(itemId, ReviewSummary(itemId=itemId))
+                for itemId in uniqueItemIds
+            ]
+        except SQLAlchemyError as e:
+            raise ReviewProcessorException("Error retrieving review summaries") from e
+
+    @logMethod
+    async def getReviewsPage(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        itemId: Optional[int] = None,
+        userId: Optional[int] = None,
+    ) -> ReviewPage:
+        """
+        Get a page of reviews of an item or a user, newest first.
+
+        Args:
+            limit (int): Maximum number of reviews in the page
+            cursor (Optional[str]): nextCursor of the previous page, None for the first one
+            itemId (Optional[int]): Only the reviews of this item
+            userId (Optional[int]): Only the reviews of this user
+
+        Returns:
+            ReviewPage: The reviews, each one with its first comments, and the cursor
+            of the next page (None on the last page)
+
+        Raises:
+            InvalidCursorException: If the cursor can not be decoded
+        """
+        after = decodeCursor(cursor) if cursor else None
+        try:
+            # One extra row tells if there is a next page without a count query
+            reviewTables = await getReviewsPage(
+                self.dbSession, limit + 1, after, item_id=itemId, user_id=userId
+            )
+            hasNext: bool = len(reviewTables) > limit
+            reviewTables = reviewTables[:limit]
+            commentCounts: Dict[int, int] = await loadCommentsPreview(
+                self.dbSession, reviewTables, INLINE_COMMENTS_PER_REVIEW
+            )
+            reviews: List[Review] = []
+            for reviewTable in reviewTables:
+                review: Review = mapReviewTableToReview(reviewTable)
+                review.commentCount = commentCounts[reviewTable.id]
+                reviews.append(review)
+            nextCursor: Optional[str] = None
+            if hasNext:
+                lastReview: Review = reviews[-1]
+                nextCursor = encodeCursor(lastReview.createdAt, lastReview.id)
+            return ReviewPage(reviews=reviews, nextCursor=nextCursor)
+        except SQLAlchemyError as e:
+            raise ReviewProcessorException("Error retrieving reviews") from e
+
+    @logMethod
+    async def getCommentsPage(
+        self, reviewId: int, limit: int, cursor: Optional[str] = None
+    ) -> CommentPage:
+        """
+        Get a page of comments of a review, oldest first.
+
+        Args:
+            reviewId (int): The ID of the review
+            limit (int): Maximum number of comments in the page
+            cursor (Optional[str]): nextCursor of the previous page, None for the first one
+
+        Returns:
+            CommentPage: The comments and the cursor of the next page
+
+        Raises:
+            InvalidCursorException: If the cursor can not be decoded
+        """
+        after = decodeCursor(cursor) if cursor else None
+        try:
+            commentTables = await getCommentsPage(
+                self.dbSession, reviewId, limit + 1, after
+            )
+            hasNext: bool = len(commentTables) > limit
+            comments = [
+                mapCommentTableToComment(comment) for comment in commentTables[:limit]
+            ]
+            nextCursor: Optional[str] = None
+            if hasNext:
+                nextCursor = encodeCursor(comments[-1].createdAt, comments[-1].id)
+            return CommentPage(comments=comments, nextCursor=nextCursor)
+        except SQLAlchemyError as e:
+            raise ReviewProcessorException("Error retrieving comments") from e
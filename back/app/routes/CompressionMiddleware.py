@@ -0,0 +1,294 @@
+import asyncio
+import gzip
+import hashlib
+import zlib
+from typing import Dict, List, Optional, Tuple
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.data.LRUTTLCache import LRUTTLCache
+from app.envVariables import (
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_CACHE_MAX_ENTRIES,
+    COMPRESSION_CACHE_ROUTES,
+    COMPRESSION_CACHE_TTL_SECONDS,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MIN_SIZE,
+)
+from app.metrics import httpResponseBytesTotal, recordCacheLookup
+from app.routes.MetricsMiddleware import getRouteTemplate
+
+# brotli is optional, without it only gzip is offered
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES: Tuple[str, ...] = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# zlib and brotli release the GIL, bodies this big are compressed in a thread
+THREAD_MIN_BYTES: int = 256 * 1024
+
+
+def parseAcceptEncoding(header: str) -> Dict[str, float]:
+    """Encoding -> q value of an Accept-Encoding header."""
+    weights: Dict[str, float] = {}
+    for part in header.split(","):
+        name, _, parameters = part.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight: float = 1.0
+        parameters = parameters.strip().lower()
+        if parameters.startswith("q="):
+            try:
+                weight = float(parameters[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name] = weight
+    return weights
+
+
+def chooseEncoding(
+    acceptEncoding: str, brotliAvailable: bool = brotli is not None
+) -> Optional[str]:
+    """
+    Encoding with the highest q value the client accepts, brotli wins the ties.
+    None means the body is sent as is.
+    """
+    weights: Dict[str, float] = parseAcceptEncoding(acceptEncoding)
+    candidates: List[str] = (["br"] if brotliAvailable else []) + ["gzip"]
+    chosen: Optional[str] = None
+    chosenWeight: float = 0.0
+    for encoding in candidates:
+        weight: float = weights.get(encoding, weights.get("*", 0.0))
+        if weight > chosenWeight:
+            chosen, chosenWeight = encoding, weight
+    return chosen
+
+
+def isCompressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    if "no-transform" in headers.get("cache-control", ""):
+        return False
+    contentType: str = headers.get("content-type", "")
+    return contentType.startswith(COMPRESSIBLE_TYPES)
+
+
+def compressBody(
+    body: bytes,
+    encoding: str,
+    gzipLevel: int = COMPRESSION_GZIP_LEVEL,
+    brotliQuality: int = COMPRESSION_BROTLI_QUALITY,
+) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=brotliQuality)
+    # mtime=0, the same body always gives the same bytes
+    return gzip.compress(body, compresslevel=gzipLevel, mtime=0)
+
+
+class StreamCompressor:
+    def __init__(self, encoding: str, gzipLevel: int, brotliQuality: int) -> None:
+        if encoding == "br":
+            self.compressor = brotli.Compressor(quality=brotliQuality)
+            self.compressChunk = self.compressor.process
+            self.finish = self.compressor.finish
+        else:
+            # wbits 31 writes the gzip header and trailer
+            self.compressor = zlib.compressobj(gzipLevel, zlib.DEFLATED, 31)
+            self.compressChunk = self.compressor.compress
+            self.finish = self.compressor.flush
+
+
+def tagEtag(etag: str, encoding: str) -> str:
+    """A compressed variant is a different representation, its ETag must differ."""
+    if etag.endswith('"'):
+        return f'{etag[:-1]}-{encoding}"'
+    return etag
+
+
+class CompressionMiddleware:
+    """
+    Compresses the response bodies with the best encoding the client accepts.
+
+    - Bodies under minSize are sent as is, the gain does not pay for the CPU.
+    - A body sent in one message is compressed at once, streamed bodies are
+      compressed chunk by chunk once minSize bytes have been buffered.
+    - GET 200 responses of the routes starting with one of cacheRoutes are
+      deterministic (the catalog), the compressed bytes are cached keyed by route
+      template, encoding and a digest of the body. A new catalog version changes
+      the body and so the key, the old entries just age out.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minSize: int = COMPRESSION_MIN_SIZE,
+        gzipLevel: int = COMPRESSION_GZIP_LEVEL,
+        brotliQuality: int = COMPRESSION_BROTLI_QUALITY,
+        cacheRoutes: str = COMPRESSION_CACHE_ROUTES,
+        cacheMaxEntries: int = COMPRESSION_CACHE_MAX_ENTRIES,
+        cacheTtlSeconds: float = COMPRESSION_CACHE_TTL_SECONDS,
+    ) -> None:
+        self.app = app
+        self.minSize = minSize
+        self.gzipLevel = gzipLevel
+        self.brotliQuality = brotliQuality
+        self.cacheRoutes: Tuple[str, ...] = tuple(
+            route.strip() for route in cacheRoutes.split(",") if route.strip()
+        )
+        self.cache: LRUTTLCache[bytes] = LRUTTLCache(cacheMaxEntries, cacheTtlSeconds)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding: Optional[str] = chooseEncoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(self, scope, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+    def isCacheable(self, scope: Scope, status: int) -> bool:
+        if not self.cacheRoutes or scope["method"] != "GET" or status != 200:
+            return False
+        return getRouteTemplate(scope).startswith(self.cacheRoutes)
+
+    async def compressWhole(
+        self, body: bytes, encoding: str, cacheKey: Optional[Tuple] = None
+    ) -> bytes:
+        if cacheKey is not None:
+            cached: Optional[bytes] = self.cache.get(cacheKey)
+            recordCacheLookup("compressed_responses", cached is not None)
+            if cached is not None:
+                return cached
+        if len(body) >= THREAD_MIN_BYTES:
+            compressed: bytes = await asyncio.to_thread(
+                compressBody, body, encoding, self.gzipLevel, self.brotliQuality
+            )
+        else:
+            compressed = compressBody(
+                body, encoding, self.gzipLevel, self.brotliQuality
+            )
+        if cacheKey is not None:
+            self.cache.set(cacheKey, compressed)
+        return compressed
+
+
+class CompressionResponder:
+    """Send wrapper of one response, holds the start message until the size is known."""
+
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        scope: Scope,
+        encoding: str,
+        send: Send,
+    ) -> None:
+        self.middleware = middleware
+        self.scope = scope
+        self.encoding = encoding
+        self.realSend = send
+        self.startMessage: Optional[Message] = None
+        self.passthrough: bool = False
+        self.buffered: List[bytes] = []
+        self.bufferedSize: int = 0
+        self.stream: Optional[StreamCompressor] = None
+
+    def setEncodingHeaders(self, headers: MutableHeaders) -> None:
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "etag" in headers:
+            headers["ETag"] = tagEtag(headers["etag"], self.encoding)
+
+    def recordBytes(self, original: int, sent: int) -> None:
+        httpResponseBytesTotal.inc(original, encoding=self.encoding, stage="original")
+        httpResponseBytesTotal.inc(sent, encoding=self.encoding, stage="sent")
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.startMessage = message
+            headers = Headers(raw=message["headers"])
+            status: int = message["status"]
+            if status < 200 or status in (204, 304) or not isCompressible(headers):
+                self.passthrough = True
+                await self.realSend(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.realSend(message)
+            return
+        if self.stream is not None:
+            await self.sendStreamed(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        moreBody: bool = message.get("more_body", False)
+        self.buffered.append(body)
+        self.bufferedSize += len(body)
+        if moreBody and self.bufferedSize < self.middleware.minSize:
+            return
+        if not moreBody:
+            await self.sendWhole(b"".join(self.buffered))
+        else:
+            await self.startStream()
+        self.buffered = []
+
+    async def sendWhole(self, body: bytes) -> None:
+        headers = MutableHeaders(scope=self.startMessage)
+        if len(body) < self.middleware.minSize:
+            await self.realSend(self.startMessage)
+            await self.realSend({"type": "http.response.body", "body": body})
+            return
+        cacheKey: Optional[Tuple] = None
+        if self.middleware.isCacheable(self.scope, self.startMessage["status"]):
+            digest: bytes = hashlib.blake2b(body, digest_size=16).digest()
+            cacheKey = (getRouteTemplate(self.scope), self.encoding, digest)
+        compressed: bytes = await self.middleware.compressWhole(
+            body, self.encoding, cacheKey
+        )
+        self.setEncodingHeaders(headers)
+        headers["Content-Length"] = str(len(compressed))
+        self.recordBytes(len(body), len(compressed))
+        await self.realSend(self.startMessage)
+        await self.realSend({"type": "http.response.body", "body": compressed})
+
+    async def startStream(self) -> None:
+        headers = MutableHeaders(scope=self.startMessage)
+        self.setEncodingHeaders(headers)
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self.stream = StreamCompressor(
+            self.encoding, self.middleware.gzipLevel, self.middleware.brotliQuality
+        )
+        await self.realSend(self.startMessage)
+        await self.sendStreamed(
+            {
+                "type": "http.response.body",
+                "body": b"".join(self.buffered),
+                "more_body": True,
+            }
+        )
+
+    async def sendStreamed(self, message: Message) -> None:
+        body: bytes = message.get("body", b"")
+        moreBody: bool = message.get("more_body", False)
+        compressed: bytes = self.stream.compressChunk(body)
+        if not moreBody:
+            compressed += self.stream.finish()
+        self.recordBytes(len(body), len(compressed))
+        if compressed or not moreBody:
+            await self.realSend(
+                {
+                    "type": "http.response.body",
+                    "body": compressed,
+                    "more_body": moreBody,
+                }
+            )
@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+import pydantic_core
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse, Response
+
+# FastAPI serializes a response_model in three passes: it validates the returned
+# objects again, dumps them to python dicts and json.dumps the dicts. The models
+# the processors return are already valid, so the list endpoints skip the first
+# two passes with ModelResponse and everything else renders in Rust.
+# Docs: https://docs.pydantic.dev/latest/concepts/json/#json-serialization
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class of the app, same output as JSONResponse but rendered
+    with pydantic_core.to_json instead of json.dumps.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return pydantic_core.to_json(content)
+
+
+@lru_cache(maxsize=None)
+def getTypeAdapter(annotation: Any) -> TypeAdapter:
+    """Building an adapter compiles its serializer, one per annotation is enough."""
+    return TypeAdapter(annotation)
+
+
+class ModelResponse(Response):
+    """
+    JSON body written by the serializer of annotation straight from the models,
+    without validating them again. Keep response_model on the route, FastAPI
+    still uses it for the OpenAPI schema:
+
+        @router.get("/order_history", response_model=List[Order])
+        async def getOrderHistory(...):
+            return ModelResponse(orders, List[Order])
+    """
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        annotation: Any,
+        status_code: int = 200,
+        headers: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        self.annotation = annotation
+        super().__init__(content, status_code, headers)
+
+    def render(self, content: Any) -> bytes:
+        return getTypeAdapter(self.annotation).dump_json(content)
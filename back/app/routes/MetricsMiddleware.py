@@ -0,0 +1,51 @@
+import time
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Optional
+from app.data.queryInstrumentation import RequestQueryStats, currentQueryStats
+from app.metrics import dbQueriesPerRequest, dbTimePerRequestSeconds, httpRequestSeconds
+
+UNMATCHED_ROUTE: str = "unmatched"
+
+
+def getRouteTemplate(scope: Scope) -> str:
+    """
+    Route path with the parameters as placeholders (/review/item/{item_id}),
+    using the raw path would create a time series per item id.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+
+# Pure ASGI middleware instead of BaseHTTPMiddleware, it does not wrap the response
+# in another task and streams the body untouched.
+# The query totals are collected by QueryBudgetMiddleware, which has to wrap this one
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        startTime: float = time.perf_counter()
+        statusCode: int = 500
+
+        async def sendWithStatus(message: Message) -> None:
+            nonlocal statusCode
+            if message["type"] == "http.response.start":
+                statusCode = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, sendWithStatus)
+        finally:
+            duration: float = time.perf_counter() - startTime
+            route: str = getRouteTemplate(scope)
+            httpRequestSeconds.observe(
+                duration, method=scope["method"], route=route, status=str(statusCode)
+            )
+            queryStats: Optional[RequestQueryStats] = currentQueryStats.get()
+            if queryStats is not None:
+                dbQueriesPerRequest.observe(queryStats.count, route=route)
+                dbTimePerRequestSeconds.observe(queryStats.totalSeconds, route=route)
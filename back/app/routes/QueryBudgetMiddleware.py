@@ -0,0 +1,91 @@
+import time
+from typing import List, Tuple
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.data.queryInstrumentation import (
+    RequestQueryStats,
+    startQueryStats,
+    stopQueryStats,
+)
+from app.envVariables import (
+    QUERY_BUDGET_PER_REQUEST,
+    REPEATED_QUERY_THRESHOLD,
+    SERVER_TIMING_ENABLED,
+)
+from app.logger import logger
+from app.metrics import queryBudgetWarningsTotal
+from app.routes.MetricsMiddleware import getRouteTemplate
+
+MAX_LOGGED_STATEMENT_CHARS: int = 300
+
+
+def makeServerTimingHeader(stats: RequestQueryStats, appSeconds: float) -> str:
+    """
+    Server-Timing value read by the browser devtools, durations are in milliseconds.
+    Docs: https://developer.mozilla.org/en-US/docs/Web/HTTP/Headers/Server-Timing
+    """
+    return (
+        f'db;dur={stats.totalSeconds * 1000:.2f};desc="{stats.count} queries", '
+        f"app;dur={appSeconds * 1000:.2f}"
+    )
+
+
+def checkQueryBudget(
+    stats: RequestQueryStats,
+    method: str,
+    route: str,
+    budget: int = QUERY_BUDGET_PER_REQUEST,
+    repeatedThreshold: int = REPEATED_QUERY_THRESHOLD,
+) -> None:
+    if stats.count > budget:
+        queryBudgetWarningsTotal.inc(route=route, reason="budget")
+        logger.warning(
+            f"Query budget exceeded on {method} {route}: {stats.count} statements "
+            f"(budget {budget}), {stats.totalSeconds * 1000:.2f} ms in the database"
+        )
+    repeated: List[Tuple[str, int]] = stats.repeatedStatements(repeatedThreshold)
+    if repeated:
+        queryBudgetWarningsTotal.inc(route=route, reason="repeated")
+        shape, times = repeated[0]
+        logger.warning(
+            f"Possible N+1 on {method} {route}: same statement executed {times} times: "
+            f"{shape[:MAX_LOGGED_STATEMENT_CHARS]}"
+        )
+
+
+class QueryBudgetMiddleware:
+    """
+    Tracks the SQL statements of each request. The totals are available to the
+    handlers as request.state.queryStats, sent back in the Server-Timing header
+    and checked against the query budget once the response is done.
+    """
+
+    def __init__(self, app: ASGIApp, serverTiming: bool = SERVER_TIMING_ENABLED):
+        self.app = app
+        self.serverTiming = serverTiming
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        startTime: float = time.perf_counter()
+        queryStats, token = startQueryStats()
+        scope.setdefault("state", {})["queryStats"] = queryStats
+
+        async def sendWithServerTiming(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.serverTiming:
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    makeServerTimingHeader(
+                        queryStats, time.perf_counter() - startTime
+                    ),
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, sendWithServerTiming)
+        finally:
+            stopQueryStats(token)
+            checkQueryBudget(queryStats, scope["method"], getRouteTemplate(scope))
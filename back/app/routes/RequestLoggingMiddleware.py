@@ -1,17 +1,47 @@
+import re
 import time
 import uuid
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.types import ASGIApp
 from starlette.requests import Request
 from app.logger import logger
+from app.routes.MetricsMiddleware import getRouteTemplate
+from app.tracing import currentRequestId, formatTraceparent, tracer
+
+# Ids sent by a proxy or another service are kept, anything else is replaced so
+# a client can not inject text in the logs
+REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._:-]{1,128}$")
+
+
+def getRequestId(request: Request) -> str:
+    incoming = request.headers.get("X-Request-ID")
+    if incoming and REQUEST_ID_PATTERN.match(incoming):
+        return incoming
+    return str(uuid.uuid4())
 
 
 class RequestLoggingMiddleware(BaseHTTPMiddleware):
+    """
+    Logs every request and response with a request id. The id is stored in a
+    contextvar so every record logged while serving the request carries it, and
+    the root span of the request trace starts here when the request is sampled.
+    """
+
     def __init__(self, app: ASGIApp):
         super().__init__(app)
 
     async def dispatch(self, request: Request, call_next):
-        request_id = str(uuid.uuid4())
+        request_id = getRequestId(request)
+        requestIdToken = currentRequestId.set(request_id)
+        rootSpan = tracer.startRootSpan(
+            request.method,
+            request.headers.get("traceparent"),
+            {
+                "http.request.method": request.method,
+                "url.path": request.url.path,
+                "http.request_id": request_id,
+            },
+        )
 
         start_time = time.time()
 
@@ -34,8 +64,19 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             )
 
             response.headers["X-Request-ID"] = request_id
+            if rootSpan is not None:
+                route: str = getRouteTemplate(request.scope)
+                rootSpan.name = f"{request.method} {route}"
+                rootSpan.setAttribute("http.route", route)
+                rootSpan.setAttribute("http.response.status_code", response.status_code)
+                response.headers["traceparent"] = formatTraceparent(rootSpan)
 
             return response
         except Exception as e:
             logger.error(f"Error processing request {request_id}: {str(e)}")
+            if rootSpan is not None:
+                rootSpan.recordError(e)
             raise
+        finally:
+            tracer.finishTrace(rootSpan)
+            currentRequestId.reset(requestIdToken)
@@ -30,6 +30,7 @@ from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from app.rateLimiter import authRateLimiter, sensitiveRateLimit
 
 from app.data.queries.profileQueries import updateLastSingInWithUserName
+from app.profile.ProfileCache import invalidateProfile
 
 # Source:https://fastapi.tiangolo.com/tutorial/security/first-steps/#create-mainpy
 router = APIRouter()
@@ -276,6 +277,8 @@ async def singUp(
             },
         )
     try:
+        # A user name can be taken again after a delete, never serve the old profile
+        await invalidateProfile(db, username)
         await insertUser(db, userInDB)
         return {"message": "nice"}
     except Exception as e:
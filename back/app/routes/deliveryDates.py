@@ -11,7 +11,7 @@ router = APIRouter()
 
 
 def getDeliveryDateAssigner(
-    db: AsyncSession = Depends(database.getDbSession),
+    db: AsyncSession = Depends(database.getReadDbSession),
 ) -> DeliveryDateAssigner:
     return DeliveryDateAssigner(db)
 
@@ -0,0 +1,133 @@
+import asyncio
+from datetime import datetime, timezone
+from typing import Annotated, List, Set
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from starlette.responses import PlainTextResponse
+from app.customExceptions import (
+    NoMemoryBaselineException,
+    NoProfileException,
+    ProfilerAlreadyRunningException,
+)
+from app.diagnostics.MemoryTracker import GroupBy, memoryTracker
+from app.diagnostics.SamplingProfiler import samplingProfiler
+from app.diagnostics.taskDump import dumpTasks
+from app.envVariables import DIAGNOSTICS_ADMINS, DIAGNOSTICS_MAX_PROFILE_SECONDS
+from app.logger import logger
+from app.routes.auth import getCurrentUserTokenFlow
+from app.schemas.Diagnostics import (
+    MemoryDiff,
+    MemoryStatus,
+    ProfileStatus,
+    SlowCallback,
+    TaskInfo,
+)
+
+# Only mounted with DIAGNOSTICS_ENABLED=true, and only for the user names listed
+# in DIAGNOSTICS_ADMINS. Everything here inspects the worker that serves the
+# request, with several workers call it until the right one answers.
+ADMIN_USER_NAMES: Set[str] = {
+    name.strip() for name in DIAGNOSTICS_ADMINS.split(",") if name.strip()
+}
+
+
+def getAdminUserName(
+    request: Request,
+    userName: Annotated[str, Depends(getCurrentUserTokenFlow)],
+) -> str:
+    if userName not in ADMIN_USER_NAMES:
+        logger.error(f"Error in {request.url.path}, {userName} is not an admin")
+        raise HTTPException(status_code=403, detail="Admin only")
+    return userName
+
+
+router = APIRouter(dependencies=[Depends(getAdminUserName)])
+
+
+def collapsedStacksResponse() -> PlainTextResponse:
+    try:
+        content: str = samplingProfiler.collapsedStacks()
+    except NoProfileException as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    timestamp: str = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    fileName: str = f"profile-{timestamp}.collapsed"
+    return PlainTextResponse(
+        content, headers={"Content-Disposition": f'attachment; filename="{fileName}"'}
+    )
+
+
+@router.post("/profile/start", response_model=ProfileStatus)
+async def startProfile(
+    seconds: Annotated[float, Query(gt=0, le=DIAGNOSTICS_MAX_PROFILE_SECONDS)] = 10,
+    interval_ms: Annotated[float, Query(ge=1, le=1000)] = 10,
+):
+    """
+    Start sampling the stacks of this worker for `seconds`, get the result with
+    /profile/stop (stops early) or /profile once it finished.
+    """
+    try:
+        samplingProfiler.start(seconds, interval_ms / 1000)
+    except ProfilerAlreadyRunningException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return samplingProfiler.status()
+
+
+@router.post("/profile/stop", response_class=PlainTextResponse)
+async def stopProfile():
+    """Stop the running profile and download the collapsed stacks."""
+    # Joining the sampler thread waits for its last sample, off the event loop
+    await asyncio.to_thread(samplingProfiler.stop)
+    return collapsedStacksResponse()
+
+
+@router.get("/profile", response_class=PlainTextResponse)
+async def getProfile():
+    """
+    Collapsed stacks of the last profile, one "frame;frame;frame count" line per
+    distinct stack, ready for flamegraph.pl or speedscope.
+    """
+    return collapsedStacksResponse()
+
+
+@router.get("/profile/status", response_model=ProfileStatus)
+async def getProfileStatus():
+    return samplingProfiler.status()
+
+
+@router.post("/memory/baseline", response_model=MemoryStatus)
+async def takeMemoryBaseline():
+    """Start tracemalloc if needed and keep a snapshot to diff against."""
+    # Snapshots walk every traced allocation, off the event loop
+    return await asyncio.to_thread(memoryTracker.takeBaseline)
+
+
+@router.get("/memory/diff", response_model=MemoryDiff)
+async def getMemoryDiff(
+    group_by: GroupBy = "lineno",
+    limit: Annotated[int, Query(ge=1, le=500)] = 25,
+):
+    """Allocation sites that grew the most since the baseline."""
+    try:
+        return await asyncio.to_thread(memoryTracker.diff, group_by, limit)
+    except NoMemoryBaselineException as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/memory/stop", response_model=MemoryStatus)
+async def stopMemoryTracing():
+    """Stop tracemalloc, tracing slows down every allocation."""
+    return await asyncio.to_thread(memoryTracker.stop)
+
+
+@router.get("/tasks", response_model=List[TaskInfo])
+async def getTasks():
+    """Every asyncio task of this worker with the frame where it is suspended."""
+    return dumpTasks()
+
+
+@router.get("/slow_callbacks", response_model=List[SlowCallback])
+async def getSlowCallbacks(request: Request):
+    """The last callbacks that blocked the event loop, with their stacks."""
+    lagMonitor = getattr(request.app.state, "lagMonitor", None)
+    if lagMonitor is None:
+        return []
+    return list(lagMonitor.recentSlowCallbacks)
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.data import database
@@ -6,6 +7,7 @@ from app.logger import logger
 from app.data.ItemsLoader import ItemsLoader
 from typing import Dict, Any
 from app.rateLimiter import apiRateLimit
+from app.services.StartupManager import StartupManager
 
 router = APIRouter()
 
@@ -42,6 +44,9 @@ async def detailed_health_check(
         health_status["status"] = "degraded"
         health_status["services"]["database"] = "unhealthy"
 
+    # Pool snapshot, a growing waiting count means the pool is too small for the load
+    health_status["database_pool"] = database.getPoolStatus(database.engine)
+
     # Check items loader service
     try:
         items_loader = ItemsLoader(db)
@@ -57,11 +62,22 @@ async def detailed_health_check(
 @router.get("/health/readiness", summary="Readiness probe")
 async def readiness_probe(
     request:Request,
-) -> Dict[str, str]:
+) -> JSONResponse:
     """
-    This endpoint indicates whether the application is ready to receive traffic.
+    This endpoint indicates whether the application is ready to receive traffic:
+    the database answers (a rate limited SELECT 1) and there are items to serve.
+    Returns 503 with the startup phases while the instance is still starting or
+    when it lost the database.
     """
-    return {"status": "ready"}
+    startupManager: StartupManager | None = getattr(
+        request.app.state, "startupManager", None
+    )
+    if startupManager is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    ready: bool = await startupManager.checkReady()
+    return JSONResponse(
+        status_code=200 if ready else 503, content=startupManager.status()
+    )
 
 
 @router.get("/health/liveness", summary="Liveness probe")
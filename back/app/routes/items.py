@@ -1,5 +1,6 @@
-from typing import Annotated, List, Set
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Annotated, Any, Dict, FrozenSet, List, Literal, Optional, Set
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from app.routes.FastJSONResponse import FastJSONResponse, ModelResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.data.queries.itemQueries import (
@@ -8,18 +9,26 @@ from app.data.queries.itemQueries import (
     getAllTagsTableNames,
     itemTableHasRows,
 )
+from app.customExceptions import InvalidItemFieldsException
 from app.data.utils import (
     getAllItemTableRowsAnMapToItems,
+    getItemFieldsInBatch,
     getSomeItemTableRowsAnMapToItems,
 )
 from app.logger import logMethod
 from app.data import database
-from app.schemas.Item import Item
+from app.schemas.Item import FacetCounts, Item, ItemCard, ItemFilterResult
 from app.data.ItemsLoader import ItemsLoader
+from app.items.ItemCatalog import ItemCatalog, itemCatalog
+from app.items.ItemProjection import parseFields, projectItems
+from app.items.ItemSearcher import ItemSearcher
 from app.rateLimiter import apiRateLimit
 
 router = APIRouter()
 
+MAX_SEARCH_RESULTS: int = 100
+MAX_ITEMS_BY_IDS: int = 100
+
 
 def getItemsLoader(
     db: AsyncSession = Depends(database.getDbSession),
@@ -27,13 +36,38 @@ def getItemsLoader(
     return ItemsLoader(db)
 
 
+def getItemSearcher(
+    db: AsyncSession = Depends(database.getReadDbSession),
+) -> ItemSearcher:
+    return ItemSearcher(db)
+
+
+async def getItemCatalog(
+    db: AsyncSession = Depends(database.getReadDbSession),
+) -> ItemCatalog:
+    return await itemCatalog.refresh(db)
+
+
+def getItemFields(
+    fields: Annotated[
+        Optional[str],
+        Query(description="Comma separated Item fields to return, e.g. name,imageUrl,gold"),
+    ] = None,
+) -> Optional[FrozenSet[str]]:
+    try:
+        return parseFields(fields)
+    except InvalidItemFieldsException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @logMethod
 async def staticDataValidation(
     request: Request,
     itemsLoader: Annotated[ItemsLoader, Depends(getItemsLoader)],
-    db: Annotated[AsyncSession, Depends(database.getDbSession)],
 ) -> None:
-    itemsExist: bool = await itemTableHasRows(db)
+    # Checked on the primary session of the loader, an empty or lagging replica
+    # would start a full item load on every request
+    itemsExist: bool = await itemTableHasRows(itemsLoader.dbSession)
     if itemsExist:
         return
     else:
@@ -47,13 +81,17 @@ async def staticDataValidation(
 async def getAllItems(
     request: Request,
     itemsLoader: Annotated[ItemsLoader, Depends(getItemsLoader)],
-    db: Annotated[AsyncSession, Depends(database.getDbSession)],
+    db: Annotated[AsyncSession, Depends(database.getReadDbSession)],
+    fields: Annotated[Optional[FrozenSet[str]], Depends(getItemFields)],
 ):
     items: List[Item] = []
     try:
-        await staticDataValidation(request, itemsLoader, db)
+        await staticDataValidation(request, itemsLoader)
+        if fields is not None:
+            projected: List[Dict[str, Any]] = await getItemFieldsInBatch(db, fields)
+            return FastJSONResponse(projected)
         items = await getAllItemTableRowsAnMapToItems(db)
-        return items
+        return ModelResponse(items, List[Item])
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error fetching {request.url.path} the database"
@@ -65,13 +103,19 @@ async def getAllItems(
 async def getSomeItems(
     request: Request,
     itemsLoader: Annotated[ItemsLoader, Depends(getItemsLoader)],
-    db: Annotated[AsyncSession, Depends(database.getDbSession)],
+    db: Annotated[AsyncSession, Depends(database.getReadDbSession)],
+    fields: Annotated[Optional[FrozenSet[str]], Depends(getItemFields)],
 ):
     items: List[Item] = []
     try:
-        await staticDataValidation(request, itemsLoader, db)
+        await staticDataValidation(request, itemsLoader)
+        if fields is not None:
+            projected: List[Dict[str, Any]] = await getItemFieldsInBatch(
+                db, fields, someItems=True
+            )
+            return FastJSONResponse(projected)
         items = await getSomeItemTableRowsAnMapToItems(db)
-        return items
+        return ModelResponse(items, List[Item])
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -81,7 +125,7 @@ async def getSomeItems(
 
 @router.get("/uniqueTags", response_model=List[str])
 async def getUniqueTags(
-    request: Request, db: AsyncSession = Depends(database.getDbSession)
+    request: Request, db: AsyncSession = Depends(database.getReadDbSession)
 ):
     tagNames: Set[str] = set()
     try:
@@ -96,7 +140,7 @@ async def getUniqueTags(
 
 @router.get("/item_names", response_model=Set[str])
 async def getItemNames(
-    request: Request, db: AsyncSession = Depends(database.getDbSession)
+    request: Request, db: AsyncSession = Depends(database.getReadDbSession)
 ):
     itemNames: Set[str] = set()
     try:
@@ -111,7 +155,7 @@ async def getItemNames(
 
 @router.get("/unique_effects", response_model=Set[str])
 async def getUniqueEffects(
-    request: Request, db: AsyncSession = Depends(database.getDbSession)
+    request: Request, db: AsyncSession = Depends(database.getReadDbSession)
 ):
     effectNames: Set[str] = set()
     try:
@@ -122,3 +166,107 @@ async def getUniqueEffects(
             status_code=500,
             detail=f"Error fetching {request.url.path} from the database",
         )
+
+
+@router.get("/search", response_model=List[Item])
+@apiRateLimit()
+async def searchItems(
+    request: Request,
+    itemSearcher: Annotated[ItemSearcher, Depends(getItemSearcher)],
+    q: str = "",
+    tags: Annotated[List[str], Query()] = [],
+    stats: Annotated[List[str], Query()] = [],
+    effects: Annotated[List[str], Query()] = [],
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_RESULTS)] = 20,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    fields: Annotated[Optional[FrozenSet[str]], Depends(getItemFields)] = None,
+):
+    """
+    Full-text search over the item name, plaintext and description, every word
+    matches as a prefix. tags, stats and effects can be repeated and the items must
+    have all of them. Results are ranked, name matches first.
+    """
+    try:
+        items: List[Item] = await itemSearcher.search(
+            q, tags, stats, effects, limit, offset
+        )
+        if fields is not None:
+            return FastJSONResponse(projectItems(items, fields))
+        return ModelResponse(items, List[Item])
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching {request.url.path} from the database",
+        )
+
+
+@router.get("/filter", response_model=ItemFilterResult)
+@apiRateLimit()
+async def filterItems(
+    request: Request,
+    catalog: Annotated[ItemCatalog, Depends(getItemCatalog)],
+    tags: Annotated[List[str], Query()] = [],
+    stats: Annotated[List[str], Query()] = [],
+    effects: Annotated[List[str], Query()] = [],
+    min_cost: Annotated[Optional[int], Query(ge=0)] = None,
+    max_cost: Annotated[Optional[int], Query(ge=0)] = None,
+    sort: Literal["name", "price_asc", "price_desc"] = "name",
+    limit: Annotated[int, Query(ge=1, le=MAX_SEARCH_RESULTS)] = 50,
+    offset: Annotated[int, Query(ge=0)] = 0,
+    fields: Annotated[Optional[FrozenSet[str]], Depends(getItemFields)] = None,
+):
+    """
+    Items having every given tag, stat and effect with a base cost between
+    min_cost and max_cost (both included). Facet counts are computed over all the
+    matching items, not only the returned page, so the UI can show how many items
+    each extra filter would leave.
+    """
+    total, items, facets = catalog.facetIndex.query(
+        tags, stats, effects, min_cost, max_cost, sort, limit, offset
+    )
+    if fields is not None:
+        return FastJSONResponse(
+            {"total": total, "items": projectItems(items, fields), "facets": facets}
+        )
+    return ModelResponse(
+        ItemFilterResult(total=total, items=items, facets=FacetCounts(**facets)),
+        ItemFilterResult,
+    )
+
+
+@router.get("/cards", response_model=List[ItemCard])
+@apiRateLimit()
+async def getItemCards(
+    request: Request,
+    catalog: Annotated[ItemCatalog, Depends(getItemCatalog)],
+):
+    """
+    Every item as a compact card (id, name, imageUrl, cost) sorted by name. The body
+    is serialized once per catalog load and sent as is.
+    """
+    return Response(content=catalog.cardsJson, media_type="application/json")
+
+
+@router.get("/by_ids", response_model=List[Item])
+@apiRateLimit()
+async def getItemsByIds(
+    request: Request,
+    ids: Annotated[List[int], Query(min_length=1, max_length=MAX_ITEMS_BY_IDS)],
+    db: Annotated[AsyncSession, Depends(database.getReadDbSession)],
+    fields: Annotated[Optional[FrozenSet[str]], Depends(getItemFields)] = None,
+):
+    """
+    Items of the given ids (repeat ids, up to MAX_ITEMS_BY_IDS) in the same order,
+    unknown ids are left out. Lets cart, order and review pages resolve their items
+    without downloading the whole catalog.
+    """
+    try:
+        items: List[Item] = await itemCatalog.getItemsByIds(db, ids)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching {request.url.path} from the database",
+        )
+    if fields is not None:
+        return FastJSONResponse(projectItems(items, fields))
+    return ModelResponse(items, List[Item])
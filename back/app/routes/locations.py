@@ -25,11 +25,17 @@ async def getLocationManager(
     return LocationManager(dbSession)
 
 
+async def getReadLocationManager(
+    dbSession: Annotated[AsyncSession, Depends(database.getReadDbSession)],
+) -> LocationManager:
+    return LocationManager(dbSession)
+
+
 @router.get("/all")
 @apiRateLimit()
 async def getAllLocations(
     request:Request,
-    locationManager: Annotated[LocationManager, Depends(getLocationManager)],
+    locationManager: Annotated[LocationManager, Depends(getReadLocationManager)],
 ):
     """
     Get all locations.
@@ -125,7 +131,7 @@ async def deleteLocation(
 async def getLocation(
     request:Request,
     locationId: int,
-    locationManager: Annotated[LocationManager, Depends(getLocationManager)],
+    locationManager: Annotated[LocationManager, Depends(getReadLocationManager)],
 ):
     """
     Get a location by ID.
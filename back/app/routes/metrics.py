@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+from app.metrics import CONTENT_TYPE, renderMetrics
+
+router = APIRouter()
+
+
+@router.get("", include_in_schema=False)
+async def getMetrics() -> Response:
+    """
+    Prometheus scrape endpoint.
+    """
+    return Response(content=renderMetrics(), media_type=CONTENT_TYPE)
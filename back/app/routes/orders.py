@@ -12,6 +12,7 @@ from app.logger import logger
 from app.data import database
 from app.orders.OrderProcessor import OrderProcessor
 from app.routes.auth import getUserIdFromName
+from app.routes.FastJSONResponse import ModelResponse
 from app.schemas.Order import Order
 from app.rateLimiter import sensitiveRateLimit, apiRateLimit
 
@@ -51,7 +52,7 @@ async def getOrderHistory(
 ):
     try:
         orders: List[Order] = await orderProcessor.getOrderHistory(userId)
-        return orders
+        return ModelResponse(orders, List[Order])
     except ProcessOrderException as e:
         raise HTTPException(status_code=500, detail="Internal server error")
 
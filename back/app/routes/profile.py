@@ -4,6 +4,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.logger import logger
 
 from app.routes.auth import getCurrentUserTokenFlow
+from app.routes.FastJSONResponse import ModelResponse
 
 from app.data import database
 from app.customExceptions import ProfileWorkerException
@@ -42,11 +43,13 @@ async def getUserGold(
 async def getProfileInfo(
     request: Request,
     userName: Annotated[str, Depends(getCurrentUserTokenFlow)],
+    # Primary, not the replica: the result is cached and a lagging replica would
+    # keep a stale profile in the cache after the invalidation of a new order
     profileWorker: Annotated[ProfileWorker, Depends(getProfileWorker)],
 ):
     try:
         profileInfo: ProfileInfo = await profileWorker.getProfileInfo(userName)
-        return profileInfo
+        return ModelResponse(profileInfo, ProfileInfo)
     except ProfileWorkerException:
         raise HTTPException(status_code=500, detail="Internal server error")
     except Exception as e:
@@ -1,15 +1,24 @@
-from typing import Annotated, List
-from fastapi import APIRouter, Depends, HTTPException, Request
+from typing import Annotated, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from app.data.database import getDbSession
-from app.schemas.Review import Review
+from app.data.database import getDbSession, getReadDbSession
+from app.schemas.Review import (
+    CommentPage,
+    OrderReviews,
+    Review,
+    ReviewPage,
+    ReviewSummary,
+)
 from app.reviews.ReviewProcessor import ReviewProcessor
 from app.customExceptions import (
+    InvalidCursorException,
+    InvalidReviewBatchException,
     InvalidUserReview,
     ReviewProcessorException,
     InvalidRatingException,
 )
 from app.routes.auth import getUserIdFromName
+from app.routes.FastJSONResponse import ModelResponse
 from app.rateLimiter import sensitiveRateLimit, apiRateLimit
 
 
@@ -19,8 +28,18 @@ def getReviewProcessor(
     return ReviewProcessor(db)
 
 
+def getReadReviewProcessor(
+    db: AsyncSession = Depends(getReadDbSession),
+) -> ReviewProcessor:
+    return ReviewProcessor(db)
+
+
 router = APIRouter()
 
+MAX_SUMMARY_ITEM_IDS: int = 500
+DEFAULT_PAGE_SIZE: int = 20
+MAX_PAGE_SIZE: int = 100
+
 
 @router.post("/add", status_code=200)
 @sensitiveRateLimit()
@@ -41,6 +60,28 @@ async def addReview(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/add_bulk", status_code=200)
+@sensitiveRateLimit()
+async def addOrderReviews(
+    request: Request,
+    orderReviews: OrderReviews,
+    userId: Annotated[int, Depends(getUserIdFromName)],
+    reviewProcessor: ReviewProcessor = Depends(getReviewProcessor),
+):
+    """
+    Add the reviews of all the items of an order in one request and one transaction.
+    """
+    try:
+        await reviewProcessor.addOrderReviews(orderReviews, userId)
+        return {"message": "Reviews added successfully"}
+    except (InvalidRatingException, InvalidReviewBatchException) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except InvalidUserReview as e:
+        raise HTTPException(status_code=401, detail=str(e))
+    except ReviewProcessorException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.put("/update", status_code=200)
 async def updateReview(
     request:Request,
@@ -79,7 +120,7 @@ async def getReviewsByUserId(
     """
     try:
         reviews = await reviewProcessor.getReviewsByUserId(userId)
-        return reviews
+        return ModelResponse(reviews, List[Review])
     except ReviewProcessorException as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -88,7 +129,7 @@ async def getReviewsByUserId(
 async def getReviewsByItemId(
     request:Request,
     item_id: int,
-    reviewProcessor: ReviewProcessor = Depends(getReviewProcessor),
+    reviewProcessor: ReviewProcessor = Depends(getReadReviewProcessor),
 ):
     """
     Get all reviews for a specific item.
@@ -104,6 +145,101 @@ async def getReviewsByItemId(
     """
     try:
         reviews = await reviewProcessor.getReviewsAndCommentsByItemId(item_id)
-        return reviews
+        return ModelResponse(reviews, List[Review])
+    except ReviewProcessorException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/summaries", status_code=200, response_model=List[ReviewSummary])
+@apiRateLimit()
+async def getReviewSummaries(
+    request: Request,
+    item_ids: Annotated[List[int], Query()],
+    reviewProcessor: ReviewProcessor = Depends(getReadReviewProcessor),
+):
+    """
+    Get the rating summary (count, average and 1-5 histogram) of many items at once.
+
+    Args:
+        item_ids (List[int]): The item IDs, repeated query parameter (?item_ids=1&item_ids=2)
+
+    Returns:
+        List[ReviewSummary]: One summary per requested item, empty for items without reviews
+    """
+    if len(item_ids) > MAX_SUMMARY_ITEM_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_SUMMARY_ITEM_IDS} item ids per request",
+        )
+    try:
+        summaries = await reviewProcessor.getReviewSummaries(item_ids)
+        return ModelResponse(summaries, List[ReviewSummary])
+    except ReviewProcessorException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/item/{item_id}/page", status_code=200, response_model=ReviewPage)
+@apiRateLimit()
+async def getReviewsPageByItemId(
+    request: Request,
+    item_id: int,
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    reviewProcessor: ReviewProcessor = Depends(getReadReviewProcessor),
+):
+    """
+    Get a page of reviews for a specific item, newest first.
+
+    Each review includes only its first comments and the total in commentCount,
+    the rest can be read from /review/comments/{review_id}. Send the returned
+    nextCursor to get the next page, it is null on the last one.
+    """
+    try:
+        page = await reviewProcessor.getReviewsPage(limit, cursor, itemId=item_id)
+        return ModelResponse(page, ReviewPage)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReviewProcessorException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/user/page", status_code=200, response_model=ReviewPage)
+@apiRateLimit()
+async def getReviewsPageByUserId(
+    request: Request,
+    userId: Annotated[int, Depends(getUserIdFromName)],
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    reviewProcessor: ReviewProcessor = Depends(getReviewProcessor),
+):
+    """
+    Get a page of reviews of the authenticated user, newest first.
+    """
+    try:
+        page = await reviewProcessor.getReviewsPage(limit, cursor, userId=userId)
+        return ModelResponse(page, ReviewPage)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ReviewProcessorException as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/comments/{review_id}", status_code=200, response_model=CommentPage)
+@apiRateLimit()
+async def getCommentsPageByReviewId(
+    request: Request,
+    review_id: int,
+    cursor: Optional[str] = None,
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = DEFAULT_PAGE_SIZE,
+    reviewProcessor: ReviewProcessor = Depends(getReadReviewProcessor),
+):
+    """
+    Get a page of comments of a review, oldest first.
+    """
+    try:
+        page = await reviewProcessor.getCommentsPage(review_id, limit, cursor)
+        return ModelResponse(page, CommentPage)
+    except InvalidCursorException as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ReviewProcessorException as e:
         raise HTTPException(status_code=500, detail=str(e))
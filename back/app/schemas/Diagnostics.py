@@ -0,0 +1,50 @@
+from datetime import datetime
+from typing import List, Optional
+from pydantic import BaseModel
+
+
+class SlowCallback(BaseModel):
+    detectedAt: datetime
+    blockedSeconds: float
+    # Stack of the event loop thread while it was blocked, innermost frame last.
+    # Empty when the callback finished before the watchdog looked at it
+    stack: List[str]
+
+
+class ProfileStatus(BaseModel):
+    running: bool
+    samples: int
+    intervalSeconds: float
+    durationSeconds: float
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+
+
+class MemoryStatus(BaseModel):
+    tracing: bool
+    hasBaseline: bool
+    currentBytes: int
+    peakBytes: int
+
+
+class MemoryStat(BaseModel):
+    # Formatted traceback lines of the allocation site
+    location: List[str]
+    sizeBytes: int
+    sizeDiffBytes: int
+    count: int
+    countDiff: int
+
+
+class MemoryDiff(BaseModel):
+    groupBy: str
+    totalSizeDiffBytes: int
+    stats: List[MemoryStat]
+
+
+class TaskInfo(BaseModel):
+    name: str
+    coroutine: str
+    done: bool
+    cancelled: bool
+    stack: List[str]
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, RootModel
-from typing import Dict, Literal, Set, Union
+from typing import Dict, List, Literal, Set, Union
 
 
 class Gold(BaseModel):
@@ -34,3 +34,24 @@ class Item(BaseModel):
     effect: Effects
     id: int
     description: str
+
+
+class FacetCounts(BaseModel):
+    tags: Dict[str, int]
+    stats: Dict[str, int]
+    effects: Dict[str, int]
+
+
+class ItemFilterResult(BaseModel):
+    total: int
+    items: List[Item]
+    facets: FacetCounts
+
+
+class ItemCard(BaseModel):
+    """Compact view of an item for list pages, cost is the base gold cost."""
+
+    id: int
+    name: str
+    imageUrl: str
+    cost: int
@@ -1,6 +1,6 @@
-from datetime import datetime
+from datetime import date, datetime
 from enum import Enum
-from typing import List
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -49,3 +49,4 @@ class OrderSummary(BaseModel):
     timesOrdered: int
     totalSpend: int
     orderDates: List[datetime]
+    lastOrderDate: Optional[date] = None
@@ -1,6 +1,6 @@
 from datetime import datetime
-from typing import Annotated, List
-from pydantic import AfterValidator, BaseModel
+from typing import Annotated, List, Optional
+from pydantic import AfterValidator, BaseModel, Field
 from app.customExceptions import InvalidRatingException
 
 
@@ -27,3 +27,30 @@ class Review(BaseModel):
     createdAt: datetime
     updatedAt: datetime
     comments: List[Comment] = []
+    # Total comments of the review, only set by the paginated listings where
+    # comments holds just the first ones
+    commentCount: Optional[int] = None
+
+
+class OrderReviews(BaseModel):
+    orderId: int
+    reviews: Annotated[List[Review], Field(min_length=1)]
+
+
+class ReviewSummary(BaseModel):
+    itemId: int
+    count: int = 0
+    averageRating: Optional[float] = None
+    # Number of reviews per rating, index 0 is 1 star and index 4 is 5 stars
+    ratingCounts: List[int] = [0, 0, 0, 0, 0]
+    updatedAt: Optional[datetime] = None
+
+
+class ReviewPage(BaseModel):
+    reviews: List[Review]
+    nextCursor: Optional[str] = None
+
+
+class CommentPage(BaseModel):
+    comments: List[Comment]
+    nextCursor: Optional[str] = None
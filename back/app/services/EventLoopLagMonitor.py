@@ -0,0 +1,142 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime, timezone
+from typing import Deque, List
+from app.metrics import eventLoopLagSeconds, eventLoopSlowCallbacksTotal
+from app.logger import logger
+from app.schemas.Diagnostics import SlowCallback
+
+STACK_LIMIT: int = 30
+RECENT_SLOW_CALLBACKS: int = 20
+# Heartbeats per slowCallbackSeconds, a block longer than 1.25x the threshold is
+# always caught
+BEATS_PER_THRESHOLD: int = 4
+
+
+class EventLoopLagMonitor:
+    """
+    Two probes on the loop:
+
+    - Lag: sleeps for interval and records how late the loop woke it up, any
+      delay is time the loop spent running other (blocking) callbacks.
+    - Slow callbacks: a callback rescheduling itself every slowCallbackSeconds / 4
+      stamps a heartbeat. A watchdog thread compares the clock with the last
+      stamp, when it is late by more than slowCallbackSeconds it takes the stack
+      of the loop thread, that is the code blocking it. The late heartbeat then
+      records the stall. Stalls shorter than interval are caught too, the
+      heartbeat does not wait for the lag sleep.
+
+    Only one stack is taken per stall and the thread does nothing else, so it is
+    cheap enough to leave on.
+    """
+
+    def __init__(
+        self, interval: float = 0.5, slowCallbackSeconds: float = 0.1
+    ) -> None:
+        self.interval = interval
+        self.slowCallbackSeconds = slowCallbackSeconds
+        self.beatSeconds: float = slowCallbackSeconds / BEATS_PER_THRESHOLD
+        self.task: asyncio.Task | None = None
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self.beatHandle: asyncio.TimerHandle | None = None
+        self.lastBeat: float | None = None
+        self.loopThreadId: int | None = None
+        self.watchdog: threading.Thread | None = None
+        self.stopWatchdog = threading.Event()
+        self.capturedBeat: float | None = None
+        self.capturedStack: List[str] = []
+        self.recentSlowCallbacks: Deque[SlowCallback] = deque(
+            maxlen=RECENT_SLOW_CALLBACKS
+        )
+
+    def captureLoopStack(self) -> List[str]:
+        frame = sys._current_frames().get(self.loopThreadId)
+        if frame is None:
+            return []
+        return traceback.format_stack(frame, limit=STACK_LIMIT)
+
+    def checkLoop(self) -> None:
+        """Run by the watchdog thread, takes the stack once per stall."""
+        lastBeat: float | None = self.lastBeat
+        if lastBeat is None or self.capturedBeat == lastBeat:
+            return
+        late: float = time.perf_counter() - lastBeat - self.beatSeconds
+        if late >= self.slowCallbackSeconds:
+            self.capturedStack = self.captureLoopStack()
+            self.capturedBeat = lastBeat
+
+    def watch(self) -> None:
+        pollSeconds: float = max(self.beatSeconds, 0.005)
+        while not self.stopWatchdog.wait(pollSeconds):
+            self.checkLoop()
+
+    def beat(self) -> None:
+        """Runs on the loop every beatSeconds, a late beat is a blocked loop."""
+        now: float = time.perf_counter()
+        previous: float | None = self.lastBeat
+        self.lastBeat = now
+        if previous is not None:
+            blocked: float = now - previous - self.beatSeconds
+            if blocked >= self.slowCallbackSeconds:
+                self.recordSlowCallback(blocked, previous)
+        self.beatHandle = self.loop.call_later(self.beatSeconds, self.beat)
+
+    def recordSlowCallback(self, blocked: float, beat: float) -> None:
+        stack: List[str] = self.capturedStack if self.capturedBeat == beat else []
+        slowCallback = SlowCallback(
+            detectedAt=datetime.now(timezone.utc),
+            blockedSeconds=blocked,
+            stack=stack,
+        )
+        self.recentSlowCallbacks.append(slowCallback)
+        eventLoopSlowCallbacksTotal.inc()
+        logger.warning(
+            f"Event loop blocked for {blocked:.3f}s"
+            + (":\n" + "".join(stack) if stack else "")
+        )
+
+    async def sample(self) -> float:
+        expected: float = time.perf_counter() + self.interval
+        await asyncio.sleep(self.interval)
+        lag: float = max(0.0, time.perf_counter() - expected)
+        eventLoopLagSeconds.observe(lag)
+        return lag
+
+    async def run(self) -> None:
+        while True:
+            await self.sample()
+
+    def start(self) -> None:
+        if self.task is None:
+            self.loopThreadId = threading.get_ident()
+            self.loop = asyncio.get_running_loop()
+            self.lastBeat = None
+            self.beat()
+            self.stopWatchdog.clear()
+            self.watchdog = threading.Thread(
+                target=self.watch, name="event-loop-watchdog", daemon=True
+            )
+            self.watchdog.start()
+            self.task = asyncio.create_task(self.run())
+            logger.info("Event loop lag monitor started")
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+        if self.beatHandle is not None:
+            self.beatHandle.cancel()
+            self.beatHandle = None
+        self.stopWatchdog.set()
+        if self.watchdog is not None:
+            self.watchdog.join()
+            self.watchdog = None
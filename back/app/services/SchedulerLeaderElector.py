@@ -0,0 +1,183 @@
+import asyncio
+import os
+import socket
+import time
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from app.data.queries.schedulerQueries import (
+    getStaleLockHolderPid,
+    pingConnection,
+    releaseAdvisoryLock,
+    terminateBackend,
+    tryAdvisoryLock,
+    upsertLeaderHeartbeat,
+)
+from app.envVariables import (
+    SCHEDULER_HEARTBEAT_SECONDS,
+    SCHEDULER_LOCK_KEY,
+    SCHEDULER_TAKEOVER_SECONDS,
+)
+from app.logger import logger
+from app.metrics import schedulerIsLeader
+
+LOCK_NAME: str = "scheduler"
+
+
+def getNodeId() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class SchedulerLeaderElector:
+    """
+    Elects one scheduler per cluster with a Postgres session advisory lock.
+
+    Every worker keeps a dedicated connection and tries the lock every heartbeat,
+    the one that gets it is the leader. The lock lives as long as the session, so
+    the leader heartbeats with a round trip on its connection and then writes the
+    heartbeat to scheduler_leader_table; that write is bookkeeping, failing it
+    does not cost the leadership. If the leader dies its connection closes,
+    Postgres releases the lock and a standby takes it on its next try. A leader
+    that can not heartbeat steps down by itself, isLeader() is only true while the
+    last heartbeat is recent.
+
+    A hung leader keeps its session and so the lock. A standby that sees both the
+    heartbeat row and the holder session idle for takeoverSeconds terminates that
+    session and takes the lock on its next try.
+
+    The connection never goes back to the pool: it may still hold the lock, so it
+    is invalidated (closed for real) instead.
+
+    Other databases have no advisory locks and a single process, always leader.
+    """
+
+    def __init__(
+        self,
+        asyncEngine: AsyncEngine,
+        lockKey: int = SCHEDULER_LOCK_KEY,
+        heartbeatSeconds: float = SCHEDULER_HEARTBEAT_SECONDS,
+        nodeId: Optional[str] = None,
+        takeoverSeconds: float = SCHEDULER_TAKEOVER_SECONDS,
+    ) -> None:
+        self.asyncEngine = asyncEngine
+        self.lockKey = lockKey
+        self.heartbeatSeconds = heartbeatSeconds
+        self.takeoverSeconds = takeoverSeconds
+        self.nodeId: str = nodeId or getNodeId()
+        self.usesLock: bool = asyncEngine.dialect.name == "postgresql"
+        self.connection: Optional[AsyncConnection] = None
+        self.leader: bool = False
+        self.acquiredAt: Optional[datetime] = None
+        self.lastHeartbeat: float = float("-inf")
+        self.task: Optional[asyncio.Task] = None
+
+    def isLeader(self) -> bool:
+        if not self.usesLock:
+            return True
+        # Two missed heartbeats and this node does not trust its lock anymore
+        return (
+            self.leader
+            and time.monotonic() - self.lastHeartbeat < 2 * self.heartbeatSeconds
+        )
+
+    def setLeader(self, leader: bool) -> None:
+        if leader != self.leader:
+            logger.info(
+                f"Scheduler node {self.nodeId} "
+                f"{'became the leader' if leader else 'is not the leader anymore'}"
+            )
+        self.leader = leader
+        schedulerIsLeader.set(1 if leader else 0)
+
+    async def step(self) -> None:
+        """One election round: try the lock as standby, heartbeat as leader."""
+        if self.connection is None:
+            self.connection = await self.asyncEngine.connect()
+        if not self.leader:
+            if not await tryAdvisoryLock(self.connection, self.lockKey):
+                await self.takeOverIfStale()
+                # Close the implicit transaction, nothing to keep open as standby
+                await self.connection.commit()
+                return
+            self.acquiredAt = datetime.now(timezone.utc)
+        else:
+            await pingConnection(self.connection)
+        await self.connection.commit()
+        self.lastHeartbeat = time.monotonic()
+        self.setLeader(True)
+        await self.recordHeartbeat()
+
+    async def recordHeartbeat(self) -> None:
+        try:
+            await upsertLeaderHeartbeat(
+                self.connection, LOCK_NAME, self.nodeId, self.acquiredAt
+            )
+            await self.connection.commit()
+        except Exception as e:
+            logger.warning(f"Could not record the scheduler heartbeat: {e}")
+            # A dead connection raises here and run() drops the leadership
+            await self.connection.rollback()
+
+    async def takeOverIfStale(self) -> None:
+        pid: Optional[int] = await getStaleLockHolderPid(
+            self.connection, LOCK_NAME, self.lockKey, self.takeoverSeconds
+        )
+        if pid is None:
+            return
+        logger.warning(
+            f"Scheduler leader backend {pid} missed its heartbeats for "
+            f"{self.takeoverSeconds}s, node {self.nodeId} terminates it"
+        )
+        await terminateBackend(self.connection, pid)
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.step()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Scheduler election on {self.nodeId} failed: {e}")
+                # The lock belonged to the lost connection, start again as standby
+                self.setLeader(False)
+                await self.closeConnection()
+            await asyncio.sleep(self.heartbeatSeconds)
+
+    async def closeConnection(self) -> None:
+        """Invalidate instead of close, a pooled session would keep the lock."""
+        if self.connection is None:
+            return
+        try:
+            await self.connection.invalidate()
+        except Exception:
+            pass
+        try:
+            await self.connection.close()
+        except Exception:
+            pass
+        self.connection = None
+
+    def start(self) -> None:
+        if not self.usesLock:
+            schedulerIsLeader.set(1)
+            return
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        if self.leader and self.connection is not None:
+            # Hand over now instead of waiting for the connection to close
+            try:
+                await releaseAdvisoryLock(self.connection, self.lockKey)
+                await self.connection.commit()
+            except Exception as e:
+                logger.warning(f"Could not release the scheduler lock: {e}")
+        self.setLeader(False)
+        await self.closeConnection()
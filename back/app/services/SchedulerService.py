@@ -1,16 +1,29 @@
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from app.data.database import AsyncSessionLocal
+import time
+from typing import Awaitable, Callable, Optional
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from app.data.database import AsyncSessionLocal, engine
+from app.data.queries.schedulerQueries import finishJobRun, insertJobRun
 from app.services.OrderStatusProcessor import OrderStatusProcessor
 from app.data.ItemsLoader import ItemsLoader
 from app.delivery.DeliveryDateAssigner import DeliveryDateAssigner
 from app.logger import logger
+from app.metrics import schedulerJobSeconds, schedulerJobSkippedTotal
+from app.services.SchedulerLeaderElector import SchedulerLeaderElector
 
 
 class SchedulerService:
-    def __init__(self):
+    def __init__(
+        self,
+        leaderElector: Optional[SchedulerLeaderElector] = None,
+        sessionMaker: async_sessionmaker = AsyncSessionLocal,
+    ):
         self.scheduler = AsyncIOScheduler()
         self.itemsLoader = None
+        # Every worker schedules the jobs but only the leader runs them
+        self.leaderElector = leaderElector or SchedulerLeaderElector(engine)
+        self.sessionMaker = sessionMaker
 
         """Initialize the ItemsLoader with a database session"""
 
@@ -22,33 +35,79 @@ class SchedulerService:
             processor = OrderStatusProcessor(db)
             await processor.updateOrderStatuses()
 
+    # The jobs let their errors through, runTimedJob logs and records them
     async def updateItemsJob(self):
         async with AsyncSessionLocal() as db:
-            try:
-                if not self.itemsLoader:
-                    await self.initializeItemsLoader(db)
-                if self.itemsLoader:
-                    await self.itemsLoader.updateItems()
-                    assigner = DeliveryDateAssigner(db)
-                    await assigner.checkAndUpdateDeliveryDates()
-                else:
-                    logger.error("ItemsLoader not initialized")
-            except Exception as e:
-                logger.error(f"Error updating items: {str(e)}")
+            if not self.itemsLoader:
+                await self.initializeItemsLoader(db)
+            if not self.itemsLoader:
+                raise RuntimeError("ItemsLoader not initialized")
+            await self.itemsLoader.updateItems()
+            assigner = DeliveryDateAssigner(db)
+            await assigner.checkAndUpdateDeliveryDates()
 
     async def assignDeliveryDatesJob(self):
         async with AsyncSessionLocal() as db:
-            try:
-                assigner = DeliveryDateAssigner(db)
-                await assigner.checkAndUpdateDeliveryDates()
-                logger.info("Delivery dates assigned successfully")
-            except Exception as e:
-                logger.error(f"Error assigning delivery dates: {str(e)}")
+            assigner = DeliveryDateAssigner(db)
+            await assigner.checkAndUpdateDeliveryDates()
+            logger.info("Delivery dates assigned successfully")
+
+    async def runTimedJob(
+        self, jobName: str, job: Callable[[], Awaitable[None]]
+    ) -> None:
+        """
+        Run a job if this node is the scheduler leader. The run is recorded in
+        scheduler_job_run_table and its duration labeled by job name and outcome.
+        """
+        if not self.leaderElector.isLeader():
+            schedulerJobSkippedTotal.inc(job=jobName)
+            logger.info(f"Skipping job {jobName}, this node is not the scheduler leader")
+            return
+        jobRunId: Optional[int] = await self.recordJobStart(jobName)
+        start: float = time.perf_counter()
+        status: str = "error"
+        error: Optional[str] = None
+        try:
+            await job()
+            status = "success"
+        except Exception as e:
+            error = str(e)
+            logger.error(f"Job {jobName} failed: {error}")
+            raise
+        finally:
+            duration: float = time.perf_counter() - start
+            schedulerJobSeconds.observe(duration, job=jobName, status=status)
+            if jobRunId is not None:
+                await self.recordJobEnd(jobRunId, status, duration, error)
+
+    async def recordJobStart(self, jobName: str) -> Optional[int]:
+        # A failing bookkeeping write should never stop the job itself
+        try:
+            async with self.sessionMaker() as db:
+                jobRunId: int = await insertJobRun(
+                    db, jobName, self.leaderElector.nodeId
+                )
+                await db.commit()
+                return jobRunId
+        except Exception as e:
+            logger.error(f"Could not record the start of job {jobName}: {e}")
+            return None
+
+    async def recordJobEnd(
+        self, jobRunId: int, status: str, duration: float, error: Optional[str]
+    ) -> None:
+        try:
+            async with self.sessionMaker() as db:
+                await finishJobRun(db, jobRunId, status, duration, error)
+                await db.commit()
+        except Exception as e:
+            logger.error(f"Could not record the end of job run {jobRunId}: {e}")
 
     def start(self):
         # Schedule jobs to run every day at slightly different times
         self.scheduler.add_job(
-            self.updateOrderStatusJob,
+            self.runTimedJob,
+            args=["update_order_statuses", self.updateOrderStatusJob],
             trigger=CronTrigger(hour=0, minute=0),  # 00:00
             id="update_order_statuses",
             name="Update order statuses",
@@ -56,7 +115,8 @@ class SchedulerService:
         )
 
         self.scheduler.add_job(
-            self.updateItemsJob,
+            self.runTimedJob,
+            args=["update_items", self.updateItemsJob],
             trigger=CronTrigger(hour=0, minute=5),  # 00:05
             id="update_items",
             name="Update items from API",
@@ -64,11 +124,17 @@ class SchedulerService:
         )
 
         self.scheduler.add_job(
-            self.assignDeliveryDatesJob,
+            self.runTimedJob,
+            args=["assign_delivery_dates", self.assignDeliveryDatesJob],
             trigger=CronTrigger(hour=0, minute=15),  # 00:15
             id="assign_delivery_dates",
             name="Assign delivery dates",
             replace_existing=True,
         )
 
+        self.leaderElector.start()
         self.scheduler.start()
+
+    async def stop(self):
+        self.scheduler.shutdown()
+        await self.leaderElector.stop()
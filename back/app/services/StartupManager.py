@@ -0,0 +1,174 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from app.envVariables import (
+    READINESS_CHECK_SECONDS,
+    READINESS_CHECK_TIMEOUT,
+    STARTUP_RETRY_MAX_SECONDS,
+    STARTUP_RETRY_SECONDS,
+)
+from app.items.ItemCatalog import itemCatalog
+from app.logger import logger
+
+PENDING: str = "pending"
+RUNNING: str = "running"
+DONE: str = "done"
+FAILED: str = "failed"
+
+
+class StartupManager:
+    """
+    Splits the startup in a fast mandatory phase and slow background phases.
+
+    The mandatory phase only checks the database and warms the item catalog from it,
+    so the server accepts connections in a moment. The system initialization (Data
+    Dragon download, fake data, delivery dates) runs afterwards in a task and is
+    retried with backoff if it fails, a CDN outage does not stop the server anymore.
+
+    The instance is ready once the database answers and there are items to serve,
+    either already in the database or loaded by the system initialization. After
+    the startup, checkReady() keeps asking the database with a SELECT 1 at most
+    every checkSeconds, an instance that lost its database stops getting traffic.
+    """
+
+    def __init__(
+        self,
+        sessionMaker: async_sessionmaker,
+        initializerFactory: Callable[[AsyncSession], Any],
+        retrySeconds: float = STARTUP_RETRY_SECONDS,
+        maxRetrySeconds: float = STARTUP_RETRY_MAX_SECONDS,
+        checkSeconds: float = READINESS_CHECK_SECONDS,
+        checkTimeout: float = READINESS_CHECK_TIMEOUT,
+    ) -> None:
+        self.sessionMaker = sessionMaker
+        self.initializerFactory = initializerFactory
+        self.retrySeconds = retrySeconds
+        self.maxRetrySeconds = maxRetrySeconds
+        self.checkSeconds = checkSeconds
+        self.checkTimeout = checkTimeout
+        self.databaseReachable: bool = True
+        self.lastDatabaseCheck: float = float("-inf")
+        self.phases: Dict[str, str] = {
+            "database": PENDING,
+            "catalog": PENDING,
+            "system": PENDING,
+        }
+        self.errors: Dict[str, str] = {}
+        self.phaseSeconds: Dict[str, float] = {}
+        self.attempts: int = 0
+        self.task: Optional[asyncio.Task] = None
+        # Called with the initializer once the system initialization succeeded
+        self.onSystemReady: List[Callable[[Any], None]] = []
+
+    async def runPhase(self, phase: str, step: Callable[[], Any]) -> bool:
+        self.phases[phase] = RUNNING
+        start: float = time.perf_counter()
+        try:
+            await step()
+        except Exception as e:
+            self.phases[phase] = FAILED
+            self.errors[phase] = str(e)
+            logger.error(f"Startup phase {phase} failed: {e}")
+            return False
+        finally:
+            self.phaseSeconds[phase] = time.perf_counter() - start
+        self.phases[phase] = DONE
+        self.errors.pop(phase, None)
+        return True
+
+    async def checkDatabase(self) -> None:
+        async with self.sessionMaker() as db:
+            await db.execute(text("SELECT 1"))
+
+    async def warmCatalog(self) -> None:
+        itemCatalog.invalidate()
+        async with self.sessionMaker() as db:
+            catalog = await itemCatalog.refresh(db)
+        logger.info(f"Item catalog warmed with {len(catalog.items)} items")
+
+    async def initializeSystem(self) -> None:
+        async with self.sessionMaker() as db:
+            initializer = self.initializerFactory(db)
+            await initializer.initializeSystem()
+        for callback in self.onSystemReady:
+            callback(initializer)
+
+    async def runMandatoryPhase(self) -> None:
+        """Never raises, a failed phase only keeps the instance not ready."""
+        if await self.runPhase("database", self.checkDatabase):
+            await self.runPhase("catalog", self.warmCatalog)
+
+    async def runBackgroundPhases(self) -> None:
+        delay: float = self.retrySeconds
+        while True:
+            self.attempts += 1
+            if self.phases["database"] != DONE:
+                await self.runPhase("database", self.checkDatabase)
+            if self.phases["database"] == DONE and await self.runPhase(
+                "system", self.initializeSystem
+            ):
+                # The initialization can have loaded the first items
+                await self.runPhase("catalog", self.warmCatalog)
+                return
+            logger.warning(f"Startup will be retried in {delay} seconds")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.maxRetrySeconds)
+
+    async def start(self) -> None:
+        await self.runMandatoryPhase()
+        self.task = asyncio.create_task(self.runBackgroundPhases())
+
+    async def stop(self) -> None:
+        if self.task is None:
+            return
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+
+    def isReady(self) -> bool:
+        if self.phases["database"] != DONE:
+            return False
+        hasItems: bool = self.phases["catalog"] == DONE and len(itemCatalog.items) > 0
+        return hasItems or self.phases["system"] == DONE
+
+    async def checkDatabaseReachable(self) -> bool:
+        """SELECT 1 at most every checkSeconds, the probes in between reuse it."""
+        now: float = time.monotonic()
+        if now - self.lastDatabaseCheck < self.checkSeconds:
+            return self.databaseReachable
+        self.lastDatabaseCheck = now
+        try:
+            await asyncio.wait_for(self.checkDatabase(), self.checkTimeout)
+        except Exception as e:
+            if self.databaseReachable:
+                logger.error(f"Readiness database check failed: {e!r}")
+            self.databaseReachable = False
+            self.errors["readiness"] = repr(e)
+            return False
+        self.databaseReachable = True
+        self.errors.pop("readiness", None)
+        return True
+
+    async def checkReady(self) -> bool:
+        """isReady() plus a live database check, used by the readiness probe."""
+        if not self.isReady():
+            return False
+        return await self.checkDatabaseReachable()
+
+    def status(self) -> Dict[str, Any]:
+        ready: bool = self.isReady() and self.databaseReachable
+        return {
+            "status": "ready" if ready else "starting",
+            "database_reachable": self.databaseReachable,
+            "phases": dict(self.phases),
+            "errors": dict(self.errors),
+            "phase_seconds": {
+                phase: round(seconds, 3) for phase, seconds in self.phaseSeconds.items()
+            },
+            "attempts": self.attempts,
+        }
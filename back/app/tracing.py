@@ -0,0 +1,470 @@
+import abc
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import httpx
+from app.envVariables import (
+    OTLP_TRACES_ENDPOINT,
+    TRACE_EXPORT_QUEUE_SIZE,
+    TRACE_EXPORTER,
+    TRACE_FILE_PATH,
+    TRACE_MAX_SPANS,
+    TRACE_SAMPLE_RATE,
+    TRACE_SERVICE_NAME,
+    TRACING_ENABLED,
+)
+
+# In-process request tracing. The middleware opens the root span of the request,
+# logMethod and the SQLAlchemy cursor events add child spans, the parent is the
+# span stored in a contextvar so every await, child task and greenlet of the
+# request nests under it. Finished traces are exported in the OTLP/JSON format,
+# to a collector or to a local file.
+# Docs: https://opentelemetry.io/docs/specs/otlp/#json-protobuf-encoding
+
+# The name of the logger in app.logger, that module imports this one
+tracingLogger = logging.getLogger("app.logger")
+
+SPAN_KIND_INTERNAL: int = 1
+SPAN_KIND_SERVER: int = 2
+SPAN_KIND_CLIENT: int = 3
+STATUS_UNSET: int = 0
+STATUS_ERROR: int = 2
+TRACEPARENT_PATTERN = re.compile(
+    r"^[0-9a-f]{2}-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$"
+)
+INVALID_TRACE_ID: str = "0" * 32
+INVALID_SPAN_ID: str = "0" * 16
+
+
+class Trace:
+    """
+    Spans of one request. Span objects are appended when they start, so a trace
+    can be exported as soon as its root span ends. At most maxSpans are kept, a
+    request running thousands of queries would otherwise grow without bound.
+    """
+
+    def __init__(self, traceId: str, maxSpans: int = TRACE_MAX_SPANS) -> None:
+        self.traceId = traceId
+        self.maxSpans = maxSpans
+        self.spans: List["Span"] = []
+        self.droppedSpans: int = 0
+
+    def addSpan(self, span: "Span") -> bool:
+        if len(self.spans) >= self.maxSpans:
+            self.droppedSpans += 1
+            return False
+        self.spans.append(span)
+        return True
+
+
+class Span:
+    __slots__ = (
+        "trace",
+        "spanId",
+        "parentSpanId",
+        "name",
+        "kind",
+        "startNs",
+        "endNs",
+        "attributes",
+        "statusCode",
+        "statusMessage",
+        "token",
+    )
+
+    def __init__(
+        self,
+        trace: Trace,
+        name: str,
+        parentSpanId: str = "",
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+        startNs: Optional[int] = None,
+    ) -> None:
+        self.trace = trace
+        self.spanId: str = secrets.token_hex(8)
+        self.parentSpanId = parentSpanId
+        self.name = name
+        self.kind = kind
+        self.startNs: int = startNs if startNs is not None else time.time_ns()
+        self.endNs: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.statusCode: int = STATUS_UNSET
+        self.statusMessage: str = ""
+        self.token: Optional[Token] = None
+
+    def setAttribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def recordError(self, error: BaseException) -> None:
+        self.statusCode = STATUS_ERROR
+        self.statusMessage = str(error)
+        self.attributes["exception.type"] = type(error).__name__
+
+    def end(self, endNs: Optional[int] = None) -> None:
+        if self.endNs is None:
+            self.endNs = endNs if endNs is not None else time.time_ns()
+
+
+currentSpan: ContextVar[Optional[Span]] = ContextVar("currentSpan", default=None)
+currentRequestId: ContextVar[str] = ContextVar("currentRequestId", default="-")
+
+
+def parseTraceparent(header: Optional[str]) -> Optional[Tuple[str, str, bool]]:
+    """
+    Trace id, parent span id and sampled flag of a W3C traceparent header, None
+    when it is missing or malformed.
+    Docs: https://www.w3.org/TR/trace-context/#traceparent-header
+    """
+    if not header:
+        return None
+    match = TRACEPARENT_PATTERN.match(header.strip().lower())
+    if match is None:
+        return None
+    traceId, parentSpanId, flags = match.groups()
+    if traceId == INVALID_TRACE_ID or parentSpanId == INVALID_SPAN_ID:
+        return None
+    return traceId, parentSpanId, bool(int(flags, 16) & 1)
+
+
+def formatTraceparent(span: Span) -> str:
+    return f"00-{span.trace.traceId}-{span.spanId}-01"
+
+
+def attributeValue(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def encodeAttributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [
+        {"key": key, "value": attributeValue(value)}
+        for key, value in attributes.items()
+    ]
+
+
+def encodeSpan(span: Span) -> Dict[str, Any]:
+    encoded: Dict[str, Any] = {
+        "traceId": span.trace.traceId,
+        "spanId": span.spanId,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.startNs),
+        # A span still open when the trace is exported (a task that outlived the
+        # request) is closed at export time
+        "endTimeUnixNano": str(span.endNs or time.time_ns()),
+        "attributes": encodeAttributes(span.attributes),
+        "status": {"code": span.statusCode},
+    }
+    if span.parentSpanId:
+        encoded["parentSpanId"] = span.parentSpanId
+    if span.statusMessage:
+        encoded["status"]["message"] = span.statusMessage
+    return encoded
+
+
+def encodeTraces(traces: List[Trace], serviceName: str) -> Dict[str, Any]:
+    """ExportTraceServiceRequest body in the OTLP/JSON encoding."""
+    return {
+        "resourceSpans": [
+            {
+                "resource": {
+                    "attributes": encodeAttributes({"service.name": serviceName})
+                },
+                "scopeSpans": [
+                    {
+                        "scope": {"name": __name__},
+                        "spans": [
+                            encodeSpan(span) for trace in traces for span in trace.spans
+                        ],
+                    }
+                ],
+            }
+        ]
+    }
+
+
+class SpanExporter(abc.ABC):
+    def __init__(self, serviceName: str = TRACE_SERVICE_NAME) -> None:
+        self.serviceName = serviceName
+
+    @abc.abstractmethod
+    def export(self, traces: List[Trace]) -> None:
+        """Send a batch of finished traces, called from the processor thread."""
+
+    def shutdown(self) -> None:
+        pass
+
+
+class JsonFileSpanExporter(SpanExporter):
+    """Appends one OTLP/JSON document per batch, one per line. Used by the tests."""
+
+    def __init__(self, path: str, serviceName: str = TRACE_SERVICE_NAME) -> None:
+        super().__init__(serviceName)
+        self.path = path
+
+    def export(self, traces: List[Trace]) -> None:
+        directory: str = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(encodeTraces(traces, self.serviceName)) + "\n")
+
+
+class OtlpHttpSpanExporter(SpanExporter):
+    """Posts the batches to an OTLP/HTTP collector (jaeger, tempo, otel-collector)."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        serviceName: str = TRACE_SERVICE_NAME,
+        timeout: float = 5.0,
+    ) -> None:
+        super().__init__(serviceName)
+        self.endpoint = endpoint
+        self.timeout = timeout
+        self.client: Optional[httpx.Client] = None
+
+    def export(self, traces: List[Trace]) -> None:
+        if self.client is None:
+            self.client = httpx.Client(timeout=self.timeout)
+        response = self.client.post(
+            self.endpoint, json=encodeTraces(traces, self.serviceName)
+        )
+        response.raise_for_status()
+
+    def shutdown(self) -> None:
+        if self.client is not None:
+            self.client.close()
+            self.client = None
+
+
+class BatchSpanProcessor:
+    """
+    Finished traces wait in a bounded queue and a background thread exports
+    whatever is queued in one call, the request never waits for the collector.
+    When the queue is full the trace is dropped and counted.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        maxQueueSize: int = TRACE_EXPORT_QUEUE_SIZE,
+        batchSize: int = 64,
+    ) -> None:
+        self.exporter = exporter
+        self.batchSize = batchSize
+        self.queue: queue.Queue = queue.Queue(maxQueueSize)
+        self.thread: Optional[threading.Thread] = None
+        self.threadLock = threading.Lock()
+        self.dropped: int = 0
+
+    def ensureThread(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            return
+        with self.threadLock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(
+                    target=self.run, name="trace-exporter", daemon=True
+                )
+                self.thread.start()
+
+    def submit(self, trace: Trace) -> None:
+        self.ensureThread()
+        try:
+            self.queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def drainBatch(self, first: Trace) -> Tuple[List[Trace], bool]:
+        batch: List[Trace] = [first]
+        while len(batch) < self.batchSize:
+            try:
+                trace: Optional[Trace] = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if trace is None:
+                return batch, True
+            batch.append(trace)
+        return batch, False
+
+    def run(self) -> None:
+        while True:
+            first: Optional[Trace] = self.queue.get()
+            if first is None:
+                self.queue.task_done()
+                return
+            batch, stop = self.drainBatch(first)
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                tracingLogger.warning(f"Could not export {len(batch)} traces: {e}")
+            for _ in range(len(batch) + (1 if stop else 0)):
+                self.queue.task_done()
+            if stop:
+                return
+
+    def flush(self) -> None:
+        """Block until every submitted trace has been exported."""
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.join()
+
+    def shutdown(self) -> None:
+        if self.thread is not None and self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        self.exporter.shutdown()
+
+
+def makeExporter(kind: str = TRACE_EXPORTER) -> SpanExporter:
+    if kind == "file":
+        return JsonFileSpanExporter(TRACE_FILE_PATH)
+    return OtlpHttpSpanExporter(OTLP_TRACES_ENDPOINT)
+
+
+class Tracer:
+    """
+    Head based sampling: the decision is taken once, when the request starts, and
+    every span of an unsampled request is skipped. A traceparent header from an
+    upstream service overrides the sample rate so its traces stay complete.
+    Outside a sampled request startSpan is a contextvar lookup.
+    """
+
+    def __init__(
+        self,
+        processor: BatchSpanProcessor,
+        enabled: bool = TRACING_ENABLED,
+        sampleRate: float = TRACE_SAMPLE_RATE,
+        maxSpans: int = TRACE_MAX_SPANS,
+    ) -> None:
+        self.processor = processor
+        self.enabled = enabled
+        self.sampleRate = sampleRate
+        self.maxSpans = maxSpans
+
+    def startRootSpan(
+        self,
+        name: str,
+        traceparent: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Span]:
+        """
+        Root span of a request, or None when the request is not sampled. It is
+        also made the current span, close it with finishTrace.
+        """
+        if not self.enabled:
+            return None
+        parent: Optional[Tuple[str, str, bool]] = parseTraceparent(traceparent)
+        if parent is not None:
+            traceId, parentSpanId, sampled = parent
+        else:
+            traceId, parentSpanId = secrets.token_hex(16), ""
+            sampled = self.sampleRate >= 1.0 or random.random() < self.sampleRate
+        if not sampled:
+            return None
+        trace = Trace(traceId, self.maxSpans)
+        span = Span(trace, name, parentSpanId, SPAN_KIND_SERVER, attributes)
+        trace.addSpan(span)
+        span.token = currentSpan.set(span)
+        return span
+
+    def finishTrace(self, rootSpan: Optional[Span]) -> None:
+        if rootSpan is None:
+            return
+        self.endSpan(rootSpan)
+        if rootSpan.trace.droppedSpans:
+            rootSpan.setAttribute("trace.dropped_spans", rootSpan.trace.droppedSpans)
+        self.processor.submit(rootSpan.trace)
+
+    def startSpan(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Span]:
+        """Child of the current span made current, None outside a sampled trace."""
+        parent: Optional[Span] = currentSpan.get()
+        if parent is None:
+            return None
+        span = Span(parent.trace, name, parent.spanId, kind, attributes)
+        if not parent.trace.addSpan(span):
+            return None
+        span.token = currentSpan.set(span)
+        return span
+
+    def endSpan(self, span: Span) -> None:
+        span.end()
+        if span.token is not None:
+            try:
+                currentSpan.reset(span.token)
+            except ValueError:
+                # Ended from another context, the span stays current there
+                pass
+            span.token = None
+
+    def recordSpan(
+        self,
+        name: str,
+        startNs: int,
+        endNs: int,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Add an already finished child span, used where start and end are events."""
+        parent: Optional[Span] = currentSpan.get()
+        if parent is None:
+            return
+        span = Span(parent.trace, name, parent.spanId, kind, attributes, startNs)
+        span.end(endNs)
+        parent.trace.addSpan(span)
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: int = SPAN_KIND_INTERNAL,
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> Iterator[Optional[Span]]:
+        span: Optional[Span] = self.startSpan(name, kind, attributes)
+        if span is None:
+            yield None
+            return
+        try:
+            yield span
+        except BaseException as e:
+            span.recordError(e)
+            raise
+        finally:
+            self.endSpan(span)
+
+    def shutdown(self) -> None:
+        self.processor.shutdown()
+
+
+class RequestContextFilter(logging.Filter):
+    """Adds the request id and trace id of the current request to every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span: Optional[Span] = currentSpan.get()
+        record.request_id = currentRequestId.get()
+        record.trace_id = span.trace.traceId if span is not None else "-"
+        return True
+
+
+tracer = Tracer(BatchSpanProcessor(makeExporter()))
+atexit.register(tracer.shutdown)
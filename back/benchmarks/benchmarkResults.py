@@ -0,0 +1,132 @@
+import json
+import math
+import os
+import platform
+import subprocess
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Sequence
+
+# Shared helpers of the benchmarks: latency summaries, the JSON result files and
+# the comparison of two runs, so the results of two commits can be diffed.
+
+RESULTS_DIR: str = os.path.join(os.path.dirname(__file__), "results")
+
+
+@contextmanager
+def appLogLevel(level: str) -> Iterator[None]:
+    """
+    Level of the app logger and of its handlers while the benchmark runs, the
+    records of logMethod would otherwise be part of the measured time. app.logger
+    is imported first, its import sets the level to DEBUG and would undo it.
+    """
+    from app.logger import logListener, logger
+
+    targets = [logger, *logger.handlers, *logListener.handlers]
+    previous = [target.level for target in targets]
+    for target in targets:
+        target.setLevel(level)
+    try:
+        yield
+    finally:
+        for target, previousLevel in zip(targets, previous):
+            target.setLevel(previousLevel)
+
+
+def percentile(sortedValues: Sequence[float], fraction: float) -> float:
+    """Nearest rank percentile of already sorted values, 0 when there are none."""
+    if not sortedValues:
+        return 0.0
+    rank: int = max(math.ceil(fraction * len(sortedValues)), 1)
+    return sortedValues[min(rank, len(sortedValues)) - 1]
+
+
+def summarizeLatencies(latencies: List[float]) -> Dict[str, float]:
+    """Count, mean, p50, p95, p99 and max of the latencies, in milliseconds."""
+    values: List[float] = sorted(latencies)
+    count: int = len(values)
+    return {
+        "count": count,
+        "meanMs": round(sum(values) / count * 1000, 3) if count else 0.0,
+        "p50Ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95Ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99Ms": round(percentile(values, 0.99) * 1000, 3),
+        "maxMs": round(values[-1] * 1000, 3) if count else 0.0,
+    }
+
+
+def gitCommit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(__file__),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def environmentInfo() -> Dict[str, str]:
+    return {
+        "commit": gitCommit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "createdAt": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def defaultResultsPath(benchmarkName: str) -> str:
+    timestamp: str = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    return os.path.join(RESULTS_DIR, f"{benchmarkName}-{gitCommit()}-{timestamp}.json")
+
+
+def writeResults(path: str, results: Dict) -> None:
+    directory: str = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def readResults(path: str) -> Dict:
+    with open(path) as file:
+        return json.load(file)
+
+
+def compareResults(
+    baseline: Dict[str, Dict[str, float]],
+    current: Dict[str, Dict[str, float]],
+    metric: str = "p95Ms",
+    tolerance: float = 0.10,
+) -> List[Dict]:
+    """
+    Compare the same metric of the entries present in both runs. An entry is a
+    regression when the current value is more than tolerance above the baseline.
+    """
+    comparison: List[Dict] = []
+    for name in sorted(set(baseline) & set(current)):
+        before: float = baseline[name].get(metric, 0.0)
+        after: float = current[name].get(metric, 0.0)
+        change: float = (after - before) / before if before else 0.0
+        comparison.append(
+            {
+                "name": name,
+                "baseline": before,
+                "current": after,
+                "change": round(change, 4),
+                "regression": change > tolerance,
+            }
+        )
+    return comparison
+
+
+def printComparison(comparison: List[Dict], metric: str) -> None:
+    print(f"{'entry':<45} {'baseline':>10} {'current':>10} {'change':>8}  ({metric})")
+    for entry in comparison:
+        flag: str = "  REGRESSION" if entry["regression"] else ""
+        print(
+            f"{entry['name']:<45} {entry['baseline']:>10.3f} {entry['current']:>10.3f} "
+            f"{entry['change'] * 100:>7.1f}%{flag}"
+        )
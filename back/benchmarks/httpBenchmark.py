@@ -0,0 +1,405 @@
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Sequence
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import select
+
+from benchmarks.benchmarkResults import (
+    compareResults,
+    defaultResultsPath,
+    environmentInfo,
+    printComparison,
+    readResults,
+    summarizeLatencies,
+    writeResults,
+)
+
+# Load benchmark of the HTTP routes. The app runs in process (ASGI transport, no
+# sockets), with its lifespan, against the database of DATABASE_URL, seed it first
+# with app.data.BulkDataGenerator. Each virtual user logs in and runs weighted
+# scenarios until the duration ends, latencies are reported per route template.
+# Run from back/:
+#   python -m benchmarks.httpBenchmark --concurrency 20 --duration 60
+#   python -m benchmarks.httpBenchmark --compare benchmarks/results/http-<old>.json
+
+DEFAULT_MIX: Dict[str, int] = {
+    "browse": 45,
+    "profile": 15,
+    "cart": 15,
+    "checkout": 10,
+    "review": 5,
+    "login": 10,
+}
+BASE_URL: str = "https://benchmark"
+
+
+class RouteRecorder:
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = {}
+        self.statuses: Dict[str, Counter] = {}
+        self.enabled: bool = True
+
+    def record(self, route: str, seconds: float, status: int) -> None:
+        if not self.enabled:
+            return
+        self.latencies.setdefault(route, []).append(seconds)
+        self.statuses.setdefault(route, Counter())[str(status)] += 1
+
+    def reset(self) -> None:
+        self.latencies.clear()
+        self.statuses.clear()
+
+    def summary(self, elapsed: float) -> Dict[str, Dict]:
+        routes: Dict[str, Dict] = {}
+        for route, latencies in sorted(self.latencies.items()):
+            statuses: Counter = self.statuses[route]
+            routes[route] = {
+                **summarizeLatencies(latencies),
+                "throughput": round(len(latencies) / elapsed, 3),
+                "errors": sum(
+                    count for status, count in statuses.items() if int(status) >= 400
+                ),
+                "statuses": dict(statuses),
+            }
+        return routes
+
+
+class CatalogSnapshot:
+    """Items and tags read once before the run, the scenarios pick from them."""
+
+    def __init__(self, cards: List[Dict], tags: List[str]):
+        self.cards = cards
+        self.tags = tags
+        self.cardsByName: Dict[str, Dict] = {card["name"]: card for card in cards}
+
+
+class VirtualUser:
+    def __init__(
+        self,
+        app: FastAPI,
+        userName: str,
+        password: str,
+        catalog: CatalogSnapshot,
+        recorder: RouteRecorder,
+        rng: random.Random,
+    ):
+        self.userName = userName
+        self.password = password
+        self.catalog = catalog
+        self.recorder = recorder
+        self.rng = rng
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url=BASE_URL
+        )
+        self.locationId: int | None = None
+
+    async def request(
+        self, method: str, route: str, url: str, **kwargs
+    ) -> httpx.Response:
+        start: float = time.perf_counter()
+        response: httpx.Response = await self.client.request(method, url, **kwargs)
+        self.recorder.record(
+            f"{method} {route}", time.perf_counter() - start, response.status_code
+        )
+        return response
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    def randomItems(self, count: int) -> List[Dict]:
+        return self.rng.sample(self.catalog.cards, min(count, len(self.catalog.cards)))
+
+    async def login(self) -> None:
+        await self.request(
+            "POST",
+            "/auth/token",
+            "/auth/token",
+            data={"username": self.userName, "password": self.password},
+        )
+
+    async def browse(self) -> None:
+        await self.request("GET", "/items/cards", "/items/cards")
+        params: Dict = {"sort": self.rng.choice(["name", "price_asc", "price_desc"])}
+        if self.catalog.tags:
+            params["tags"] = [self.rng.choice(self.catalog.tags)]
+        await self.request("GET", "/items/filter", "/items/filter", params=params)
+        itemIds: List[int] = [item["id"] for item in self.randomItems(5)]
+        await self.request(
+            "GET", "/items/by_ids", "/items/by_ids", params={"ids": itemIds}
+        )
+        await self.request(
+            "GET",
+            "/review/summaries",
+            "/review/summaries",
+            params={"item_ids": itemIds},
+        )
+        await self.request(
+            "GET",
+            "/review/item/{item_id}/page",
+            f"/review/item/{itemIds[0]}/page",
+        )
+
+    async def profile(self) -> None:
+        await self.request("GET", "/profile/current_gold", "/profile/current_gold")
+        await self.request("GET", "/profile/info", "/profile/info")
+        await self.request("GET", "/orders/order_history", "/orders/order_history")
+
+    async def cart(self) -> None:
+        item: Dict = self.randomItems(1)[0]
+        await self.request(
+            "POST",
+            "/cart/add_item",
+            "/cart/add_item",
+            json={"id": None, "itemId": item["id"], "status": "ADDED"},
+        )
+        await self.request(
+            "GET", "/cart/added_cart_items", "/cart/added_cart_items"
+        )
+
+    async def checkout(self) -> None:
+        if self.locationId is None:
+            response = await self.request("GET", "/locations/user", "/locations/user")
+            if response.status_code != 200:
+                return
+            self.locationId = response.json()["id"]
+        items: List[Dict] = self.randomItems(self.rng.randint(1, 3))
+        now: datetime = datetime.now()
+        await self.request(
+            "POST",
+            "/orders/order",
+            "/orders/order",
+            json={
+                "id": 0,
+                "itemNames": [item["name"] for item in items],
+                "userName": self.userName,
+                "total": sum(item["cost"] for item in items),
+                "orderDate": now.isoformat(),
+                "deliveryDate": now.isoformat(),
+                "status": "PENDING",
+                "location_id": self.locationId,
+                "reviewed": False,
+            },
+        )
+
+    async def review(self) -> None:
+        response = await self.request(
+            "GET", "/orders/order_history", "/orders/order_history"
+        )
+        if response.status_code != 200:
+            return
+        candidates: List[Dict] = [
+            order
+            for order in response.json()
+            if order["status"] == "DELIVERED" and not order["reviewed"]
+        ]
+        if not candidates:
+            return
+        order: Dict = self.rng.choice(candidates)
+        item: Dict | None = self.catalog.cardsByName.get(order["itemNames"][0])
+        if item is None:
+            return
+        now: str = datetime.now().isoformat()
+        await self.request(
+            "POST",
+            "/review/add",
+            "/review/add",
+            json={
+                "id": 0,
+                "orderId": order["id"],
+                "itemId": item["id"],
+                "rating": self.rng.randint(1, 5),
+                "createdAt": now,
+                "updatedAt": now,
+                "comments": [],
+            },
+        )
+
+    async def run(self, mix: Dict[str, int], deadline: float) -> None:
+        scenarios: Dict[str, Callable[[], Awaitable[None]]] = {
+            "browse": self.browse,
+            "profile": self.profile,
+            "cart": self.cart,
+            "checkout": self.checkout,
+            "review": self.review,
+            "login": self.login,
+        }
+        names: List[str] = list(mix)
+        weights: List[int] = [mix[name] for name in names]
+        await self.login()
+        while time.perf_counter() < deadline:
+            scenario: str = self.rng.choices(names, weights=weights)[0]
+            await scenarios[scenario]()
+
+
+def parseMix(value: str) -> Dict[str, int]:
+    mix: Dict[str, int] = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}")
+        mix[name.strip()] = int(weight)
+    return mix
+
+
+@asynccontextmanager
+async def runningApp(keepRateLimits: bool) -> AsyncIterator[FastAPI]:
+    from app.main import app
+
+    # The limits are per client ip and every virtual user shares one
+    app.state.limiter.enabled = keepRateLimits
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+async def loadUserNames(prefix: str, count: int) -> List[str]:
+    from app.data.database import AsyncSessionLocal
+    from app.data.models.UserTable import UserTable
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(UserTable.userName)
+            .where(UserTable.userName.startswith(prefix))
+            .order_by(UserTable.id)
+            .limit(count)
+        )
+        return list(result.scalars())
+
+
+async def loadCatalog(app: FastAPI) -> CatalogSnapshot:
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url=BASE_URL
+    ) as client:
+        cards = (await client.get("/items/cards")).json()
+        tags = (await client.get("/items/uniqueTags")).json()
+    return CatalogSnapshot(cards, tags)
+
+
+async def runBenchmark(arguments: argparse.Namespace) -> Dict:
+    async with runningApp(arguments.keep_rate_limits) as app:
+        userNames: List[str] = await loadUserNames(
+            arguments.user_prefix, arguments.concurrency
+        )
+        if not userNames:
+            raise SystemExit(
+                f"No users named {arguments.user_prefix}*, seed them with "
+                "app.data.BulkDataGenerator"
+            )
+        catalog: CatalogSnapshot = await loadCatalog(app)
+        if not catalog.cards:
+            raise SystemExit("The item catalog is empty")
+        recorder = RouteRecorder()
+        rng = random.Random(arguments.seed)
+        users: List[VirtualUser] = [
+            VirtualUser(
+                app,
+                userNames[i % len(userNames)],
+                arguments.password,
+                catalog,
+                recorder,
+                random.Random(rng.random()),
+            )
+            for i in range(arguments.concurrency)
+        ]
+        try:
+            if arguments.warmup > 0:
+                recorder.enabled = False
+                deadline: float = time.perf_counter() + arguments.warmup
+                await asyncio.gather(
+                    *(user.run(arguments.mix, deadline) for user in users)
+                )
+                recorder.reset()
+                recorder.enabled = True
+            start: float = time.perf_counter()
+            await asyncio.gather(
+                *(user.run(arguments.mix, start + arguments.duration) for user in users)
+            )
+            elapsed: float = time.perf_counter() - start
+        finally:
+            for user in users:
+                await user.close()
+    routes: Dict[str, Dict] = recorder.summary(elapsed)
+    totalRequests: int = sum(route["count"] for route in routes.values())
+    return {
+        "benchmark": "http",
+        "environment": environmentInfo(),
+        "config": {
+            "concurrency": arguments.concurrency,
+            "duration": arguments.duration,
+            "warmup": arguments.warmup,
+            "seed": arguments.seed,
+            "mix": arguments.mix,
+            "users": len(userNames),
+            "items": len(catalog.cards),
+        },
+        "elapsedSeconds": round(elapsed, 3),
+        "totalRequests": totalRequests,
+        "throughput": round(totalRequests / elapsed, 3),
+        "routes": routes,
+    }
+
+
+def printRoutes(results: Dict) -> None:
+    print(
+        f"{'route':<40} {'count':>7} {'req/s':>8} {'p50':>8} {'p95':>8} "
+        f"{'p99':>8} {'errors':>7}"
+    )
+    for route, stats in results["routes"].items():
+        print(
+            f"{route:<40} {stats['count']:>7} {stats['throughput']:>8.1f} "
+            f"{stats['p50Ms']:>8.2f} {stats['p95Ms']:>8.2f} {stats['p99Ms']:>8.2f} "
+            f"{stats['errors']:>7}"
+        )
+    print(f"{results['totalRequests']} requests, {results['throughput']:.1f} req/s")
+
+
+def parseArguments(arguments: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="In process HTTP load benchmark")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--mix",
+        type=parseMix,
+        default=DEFAULT_MIX,
+        help="Scenario weights, e.g. browse=60,profile=20,checkout=20",
+    )
+    parser.add_argument("--user-prefix", default="load_user_")
+    parser.add_argument("--password", default="LoadTest123!")
+    parser.add_argument("--keep-rate-limits", action="store_true")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="Baseline result file")
+    parser.add_argument("--metric", default="p95Ms")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args(arguments)
+
+
+def main(arguments: Sequence[str] | None = None) -> int:
+    parsed = parseArguments(arguments)
+    results: Dict = asyncio.run(runBenchmark(parsed))
+    printRoutes(results)
+    outputPath: str = parsed.output or defaultResultsPath("http")
+    writeResults(outputPath, results)
+    print(f"Results written to {outputPath}")
+    if parsed.compare:
+        comparison = compareResults(
+            readResults(parsed.compare)["routes"],
+            results["routes"],
+            parsed.metric,
+            parsed.tolerance,
+        )
+        printComparison(comparison, parsed.metric)
+        if any(entry["regression"] for entry in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
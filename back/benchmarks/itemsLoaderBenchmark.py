@@ -0,0 +1,307 @@
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Iterator, List, Sequence
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from benchmarks.benchmarkResults import (
+    appLogLevel,
+    compareResults,
+    defaultResultsPath,
+    environmentInfo,
+    printComparison,
+    readResults,
+    summarizeLatencies,
+    writeResults,
+)
+
+# Microbenchmarks of the ItemsLoader refresh phases over a recorded item.json,
+# cloned `scale` times so the scaling of each phase shows up. Every run starts
+# from empty item tables: a new in-memory sqlite database (--target memory) or a
+# transaction rolled back at the end (--target postgres, nothing is kept). The
+# allocations are measured with tracemalloc in a separate run, tracing slows
+# everything down and would distort the timings. Run from back/:
+#   python -m benchmarks.itemsLoaderBenchmark --scales 1,10,25 --repeat 3
+#   python -m benchmarks.itemsLoaderBenchmark --target postgres --database-url ...
+
+DEFAULT_FIXTURE: str = os.path.join(os.path.dirname(__file__), "fixtures", "item.json")
+# Clones get ids far away from the real ones, they are parsed as int by Item
+CLONE_ID_STEP: int = 100000
+
+
+def scaleItemsJson(itemsJson: Dict, scale: int) -> Dict:
+    """
+    Repeat every item of the data node `scale` times with a new id and a unique
+    name, the tags, stats and effects are kept so only the item count grows.
+    """
+    data: Dict[str, Dict] = {}
+    for copy in range(scale):
+        for itemId, node in itemsJson["data"].items():
+            clone: Dict = dict(node)
+            clone["name"] = f"{node['name']} #{copy}"
+            data[str(int(itemId) + copy * CLONE_ID_STEP)] = clone
+    return {**itemsJson, "data": data}
+
+
+class PhaseRecorder:
+    def __init__(self, traceAllocations: bool):
+        self.traceAllocations = traceAllocations
+        self.seconds: Dict[str, float] = {}
+        self.allocations: Dict[str, Dict[str, int]] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        if self.traceAllocations:
+            tracemalloc.reset_peak()
+            before: int = tracemalloc.get_traced_memory()[0]
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+            if self.traceAllocations:
+                current, peak = tracemalloc.get_traced_memory()
+                self.allocations[name] = {
+                    "allocatedBytes": current - before,
+                    "peakBytes": peak - before,
+                }
+
+    def add(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+
+
+@asynccontextmanager
+async def targetSession(
+    target: str, engine: AsyncEngine | None
+) -> AsyncIterator[AsyncSession]:
+    if target == "memory":
+        from app.data.database import base
+        from app.data.models import (
+            EffectsTable,
+            GoldTable,
+            ItemTable,
+            MetaDataTable,
+            StatsMappingTable,
+            StatsTable,
+            TagsTable,
+        )
+
+        memoryEngine = create_async_engine(
+            "sqlite+aiosqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        async with memoryEngine.begin() as connection:
+            await connection.run_sync(base.metadata.create_all)
+        try:
+            async with AsyncSession(memoryEngine, expire_on_commit=False) as session:
+                yield session
+        finally:
+            await memoryEngine.dispose()
+        return
+    # The loader commits after each step, with create_savepoint those commits only
+    # release savepoints and the outer transaction undoes everything
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+        session = AsyncSession(
+            bind=connection,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+        try:
+            yield session
+        finally:
+            await session.close()
+            await transaction.rollback()
+
+
+async def runPipeline(
+    itemsText: str,
+    target: str,
+    engine: AsyncEngine | None,
+    recorder: PhaseRecorder,
+) -> int:
+    from app.data.ItemsLoader import ItemsLoader
+
+    async with targetSession(target, engine) as session:
+        with recorder.phase("json_load"):
+            itemsJson: Dict = json.loads(itemsText)
+        itemNames: List[str] = [node["name"] for node in itemsJson["data"].values()]
+        loader = ItemsLoader(session, itemNames)
+        loader.version = itemsJson.get("version", "")
+
+        originalInsertOrUpdate = loader.insertOrUpdateItemTable
+
+        async def timedInsertOrUpdate(item, existingItem) -> None:
+            start: float = time.perf_counter()
+            try:
+                await originalInsertOrUpdate(item, existingItem)
+            finally:
+                recorder.add(
+                    f"{currentItemsPhase}.insertOrUpdateItemTable",
+                    time.perf_counter() - start,
+                )
+
+        loader.insertOrUpdateItemTable = timedInsertOrUpdate
+
+        with recorder.phase("format_tags"):
+            for node in itemsJson["data"].values():
+                for tag in node.get("tags", []):
+                    loader._format_tag(tag)
+        with recorder.phase("parse_effects"):
+            for node in itemsJson["data"].values():
+                loader._parse_effects(node.get("effect"))
+        with recorder.phase("parse"):
+            items = await loader.parseItemsJsonIntoItemList(itemsJson)
+        with recorder.phase("unique_stats"):
+            uniqueStats = loader.getUniqueStats(items)
+        with recorder.phase("db_tags"):
+            await loader.updateTagsInDataBase(
+                set(tag for item in items for tag in item.tags)
+            )
+        with recorder.phase("db_stats"):
+            await loader.updateStatsInDataBase(uniqueStats)
+        with recorder.phase("db_effects"):
+            await loader.updateEffectsInDataBase(
+                set(effect for item in items for effect in item.effect.root)
+            )
+        # First a fresh install, then a patch day where every item already exists
+        currentItemsPhase: str = "db_items_insert"
+        with recorder.phase(currentItemsPhase):
+            await loader.updateItemsInDataBase(items)
+        currentItemsPhase = "db_items_update"
+        with recorder.phase(currentItemsPhase):
+            await loader.updateItemsInDataBase(items)
+        return len(items)
+
+
+async def benchmarkScale(
+    fixture: Dict,
+    scale: int,
+    arguments: argparse.Namespace,
+    engine: AsyncEngine | None,
+) -> Dict[str, Dict]:
+    itemsText: str = json.dumps(scaleItemsJson(fixture, scale))
+    runs: List[PhaseRecorder] = []
+    for _ in range(arguments.warmup + arguments.repeat):
+        recorder = PhaseRecorder(traceAllocations=False)
+        itemCount: int = await runPipeline(
+            itemsText, arguments.target, engine, recorder
+        )
+        runs.append(recorder)
+    runs = runs[arguments.warmup :]
+
+    traced = PhaseRecorder(traceAllocations=True)
+    tracemalloc.start()
+    try:
+        await runPipeline(itemsText, arguments.target, engine, traced)
+    finally:
+        tracemalloc.stop()
+
+    phases: Dict[str, Dict] = {}
+    for name in runs[0].seconds:
+        samples: List[float] = [run.seconds.get(name, 0.0) for run in runs]
+        phases[f"{name}@x{scale}"] = {
+            **summarizeLatencies(samples),
+            "minMs": round(min(samples) * 1000, 3),
+            "stdevMs": round(statistics.pstdev(samples) * 1000, 3),
+            "items": itemCount,
+            **traced.allocations.get(name, {}),
+        }
+    return phases
+
+
+async def runBenchmark(arguments: argparse.Namespace) -> Dict:
+    with open(arguments.fixture) as file:
+        fixture: Dict = json.load(file)
+    engine: AsyncEngine | None = None
+    if arguments.target == "postgres":
+        engine = create_async_engine(arguments.database_url)
+    phases: Dict[str, Dict] = {}
+    try:
+        for scale in arguments.scales:
+            phases.update(await benchmarkScale(fixture, scale, arguments, engine))
+    finally:
+        if engine is not None:
+            await engine.dispose()
+    return {
+        "benchmark": "itemsLoader",
+        "environment": environmentInfo(),
+        "config": {
+            "target": arguments.target,
+            "scales": arguments.scales,
+            "repeat": arguments.repeat,
+            "warmup": arguments.warmup,
+            "fixture": os.path.basename(arguments.fixture),
+            "fixtureItems": len(fixture["data"]),
+        },
+        "phases": phases,
+    }
+
+
+def printPhases(results: Dict) -> None:
+    print(
+        f"{'phase':<45} {'items':>6} {'p50 ms':>10} {'min ms':>10} "
+        f"{'alloc KiB':>10} {'peak KiB':>10}"
+    )
+    for name, stats in results["phases"].items():
+        print(
+            f"{name:<45} {stats['items']:>6} {stats['p50Ms']:>10.3f} "
+            f"{stats['minMs']:>10.3f} {stats.get('allocatedBytes', 0) / 1024:>10.1f} "
+            f"{stats.get('peakBytes', 0) / 1024:>10.1f}"
+        )
+
+
+def parseScales(value: str) -> List[int]:
+    return [int(scale) for scale in value.split(",")]
+
+
+def parseArguments(arguments: Sequence[str] | None = None) -> argparse.Namespace:
+    from app.envVariables import DATABASE_URL
+
+    parser = argparse.ArgumentParser(description="ItemsLoader phase microbenchmarks")
+    parser.add_argument("--target", choices=["memory", "postgres"], default="memory")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--fixture", default=DEFAULT_FIXTURE)
+    parser.add_argument("--scales", type=parseScales, default=[1, 10, 25])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="Baseline result file")
+    parser.add_argument("--metric", default="p50Ms")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args(arguments)
+
+
+def main(arguments: Sequence[str] | None = None) -> int:
+    parsed = parseArguments(arguments)
+    # The per call debug records of the loader would be most of the measured time
+    with appLogLevel(parsed.log_level):
+        results: Dict = asyncio.run(runBenchmark(parsed))
+    printPhases(results)
+    outputPath: str = parsed.output or defaultResultsPath("itemsLoader")
+    writeResults(outputPath, results)
+    print(f"Results written to {outputPath}")
+    if parsed.compare:
+        comparison = compareResults(
+            readResults(parsed.compare)["phases"],
+            results["phases"],
+            parsed.metric,
+            parsed.tolerance,
+        )
+        printComparison(comparison, parsed.metric)
+        if any(entry["regression"] for entry in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+
+from benchmarks.benchmarkResults import (
+    appLogLevel,
+    compareResults,
+    defaultResultsPath,
+    environmentInfo,
+    printComparison,
+    readResults,
+    summarizeLatencies,
+    writeResults,
+)
+
+# Serialization cost of the JSON endpoints with synthetic payloads, per endpoint
+# and per path:
+#   default        FastAPI response_model (validate, dump to dicts) + json.dumps
+#   fastRender     the same response_model passes + FastJSONResponse rendering
+#   modelResponse  ModelResponse, dump_json straight from the models
+# All three bodies are checked to decode to the same JSON before timing. Run
+# from back/:
+#   python -m benchmarks.serializationBenchmark --items 300 --rows 100
+
+DESCRIPTION: str = (
+    "<mainText><stats><attention>40</attention> Attack Damage<br>"
+    "<attention>25%</attention> Critical Strike Chance</stats><br><br>"
+    "<passive>Bloodthirst</passive><br>Gain <healing>15% Life Steal</healing> "
+    "and excess healing becomes a <shield>shield</shield>.</mainText><br>"
+)
+BASE_DATE = datetime(2025, 3, 1, 12, 0, 0)
+
+
+def makeItems(count: int) -> List[Any]:
+    from app.schemas.Item import Effects, Gold, Item, Stat
+
+    return [
+        Item(
+            id=1000 + i,
+            name=f"Item {i}",
+            plaintext="Grants attack damage and life steal",
+            image=f"{1000 + i}.png",
+            imageUrl=f"https://ddragon.leagueoflegends.com/cdn/15.5.1/img/item/{i}.png",
+            gold=Gold(base=300 + i, purchasable=True, total=1300 + i, sell=900),
+            tags={"Damage", "LifeSteal", "CriticalStrike"},
+            stats={
+                Stat(name="FlatPhysicalDamageMod", kind="flat", value=40),
+                Stat(name="FlatCritChanceMod", kind="percentage", value=0.25),
+            },
+            effect=Effects({"Effect1Amount": 15, "Effect2Amount": 0.5}),
+            description=DESCRIPTION,
+        )
+        for i in range(count)
+    ]
+
+
+def makeOrders(count: int) -> List[Any]:
+    from app.schemas.Order import Order, OrderStatus
+
+    return [
+        Order(
+            id=i,
+            itemNames=[f"Item {i}", f"Item {i + 1}", f"Item {i + 2}"],
+            userName="load_user_1",
+            total=3900 + i,
+            orderDate=BASE_DATE + timedelta(hours=i),
+            deliveryDate=BASE_DATE + timedelta(days=3, hours=i),
+            status=OrderStatus.DELIVERED,
+            location_id=1,
+            reviewed=i % 2 == 0,
+        )
+        for i in range(count)
+    ]
+
+
+def makeReviews(count: int, commentsPerReview: int = 3) -> List[Any]:
+    from app.schemas.Review import Comment, Review
+
+    return [
+        Review(
+            id=i,
+            orderId=i,
+            itemId=1000 + i % 50,
+            rating=1 + i % 5,
+            createdAt=BASE_DATE + timedelta(hours=i),
+            updatedAt=BASE_DATE + timedelta(hours=i),
+            comments=[
+                Comment(
+                    id=i * commentsPerReview + j,
+                    reviewId=i,
+                    userId=j,
+                    content="Great item, bought it twice for my bruiser builds.",
+                    createdAt=BASE_DATE + timedelta(hours=i, minutes=j),
+                    updatedAt=BASE_DATE + timedelta(hours=i, minutes=j),
+                )
+                for j in range(commentsPerReview)
+            ],
+            commentCount=commentsPerReview,
+        )
+        for i in range(count)
+    ]
+
+
+def makeSummaries(count: int) -> List[Any]:
+    from app.schemas.Review import ReviewSummary
+
+    return [
+        ReviewSummary(
+            itemId=1000 + i,
+            count=40 + i,
+            averageRating=3.75,
+            ratingCounts=[2, 4, 8, 10, 16 + i],
+            updatedAt=BASE_DATE,
+        )
+        for i in range(count)
+    ]
+
+
+def makeProfileInfo(count: int) -> Any:
+    from app.schemas.AuthSchemas import UserInDB
+    from app.schemas.Order import OrderSummary
+    from app.schemas.profileSchemas import ProfileInfo
+
+    user = UserInDB(
+        userName="load_user_1",
+        email="load_user_1@example.com",
+        created=date(2025, 1, 1),
+        lastSingIn=date(2025, 3, 1),
+        goldSpend=50000,
+        currentGold=6000,
+        birthDate=date(2000, 1, 1),
+        hashedPassword="$2b$12$" + "x" * 53,
+    )
+    ordersInfo = [
+        OrderSummary(
+            itemName=f"Item {i}",
+            basePrice=1300 + i,
+            timesOrdered=5,
+            totalSpend=5 * (1300 + i),
+            orderDates=[BASE_DATE + timedelta(days=day) for day in range(5)],
+            lastOrderDate=date(2025, 3, 5),
+        )
+        for i in range(count)
+    ]
+    return ProfileInfo(user=user, ordersInfo=ordersInfo)
+
+
+def makeFilterResult(count: int) -> Any:
+    from app.schemas.Item import FacetCounts, ItemFilterResult
+
+    return ItemFilterResult(
+        total=count,
+        items=makeItems(count),
+        facets=FacetCounts(
+            tags={"Damage": count, "LifeSteal": count},
+            stats={"FlatPhysicalDamageMod": count},
+            effects={"Effect1Amount": count},
+        ),
+    )
+
+
+def makeEndpoints(items: int, rows: int) -> List[Tuple[str, Any, Any]]:
+    """(route path, annotation, payload) of every benchmarked endpoint."""
+    from app.schemas.Item import Item, ItemFilterResult
+    from app.schemas.Order import Order
+    from app.schemas.profileSchemas import ProfileInfo
+    from app.schemas.Review import Review, ReviewPage, ReviewSummary
+
+    reviews: List[Any] = makeReviews(rows)
+    return [
+        ("/items/all", List[Item], makeItems(items)),
+        ("/items/filter", ItemFilterResult, makeFilterResult(rows)),
+        ("/orders/order_history", List[Order], makeOrders(rows)),
+        ("/review/item/{item_id}", List[Review], reviews),
+        ("/review/item/{item_id}/page", ReviewPage, ReviewPage(reviews=reviews)),
+        ("/review/summaries", List[ReviewSummary], makeSummaries(rows)),
+        ("/profile/info", ProfileInfo, makeProfileInfo(rows)),
+    ]
+
+
+def findRoute(routes: Sequence[Any], path: str) -> APIRoute:
+    for route in routes:
+        if not isinstance(route, APIRoute) or route.path != path:
+            continue
+        if "GET" in route.methods:
+            return route
+    raise ValueError(f"No GET route {path}")
+
+
+def makeSerializers(route: APIRoute, annotation: Any) -> Dict[str, Callable]:
+    from app.routes.FastJSONResponse import FastJSONResponse, ModelResponse
+
+    async def default(content: Any) -> bytes:
+        jsonable = await serialize_response(
+            field=route.response_field, response_content=content
+        )
+        return JSONResponse(jsonable).body
+
+    async def fastRender(content: Any) -> bytes:
+        jsonable = await serialize_response(
+            field=route.response_field, response_content=content
+        )
+        return FastJSONResponse(jsonable).body
+
+    async def modelResponse(content: Any) -> bytes:
+        return ModelResponse(content, annotation).body
+
+    return {
+        "default": default,
+        "fastRender": fastRender,
+        "modelResponse": modelResponse,
+    }
+
+
+async def timeSerializer(
+    serializer: Callable, content: Any, warmup: int, repeat: int
+) -> List[float]:
+    for _ in range(warmup):
+        await serializer(content)
+    samples: List[float] = []
+    for _ in range(repeat):
+        start: float = time.perf_counter()
+        await serializer(content)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+async def runBenchmark(arguments: argparse.Namespace) -> Dict:
+    from app.main import app
+
+    endpoints: Dict[str, Dict] = {}
+    for path, annotation, content in makeEndpoints(arguments.items, arguments.rows):
+        serializers = makeSerializers(findRoute(app.routes, path), annotation)
+        bodies: Dict[str, bytes] = {
+            name: await serializer(content) for name, serializer in serializers.items()
+        }
+        expected = json.loads(bodies["default"])
+        for name, body in bodies.items():
+            if json.loads(body) != expected:
+                raise AssertionError(f"{name} output differs from default on {path}")
+        for name, serializer in serializers.items():
+            samples: List[float] = await timeSerializer(
+                serializer, content, arguments.warmup, arguments.repeat
+            )
+            endpoints[f"{path}:{name}"] = {
+                **summarizeLatencies(samples),
+                "minMs": round(min(samples) * 1000, 3),
+                "stdevMs": round(statistics.pstdev(samples) * 1000, 3),
+                "bodyBytes": len(bodies[name]),
+            }
+    return {
+        "benchmark": "serialization",
+        "environment": environmentInfo(),
+        "config": {
+            "items": arguments.items,
+            "rows": arguments.rows,
+            "repeat": arguments.repeat,
+            "warmup": arguments.warmup,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def printEndpoints(results: Dict) -> None:
+    print(
+        f"{'endpoint:path':<50} {'p50 ms':>10} {'min ms':>10} {'KiB':>8} "
+        f"{'speedup':>8}"
+    )
+    for name, stats in results["endpoints"].items():
+        default: Dict = results["endpoints"][name.rsplit(":", 1)[0] + ":default"]
+        speedup: float = default["p50Ms"] / stats["p50Ms"] if stats["p50Ms"] else 0.0
+        print(
+            f"{name:<50} {stats['p50Ms']:>10.3f} {stats['minMs']:>10.3f} "
+            f"{stats['bodyBytes'] / 1024:>8.1f} {speedup:>7.2f}x"
+        )
+
+
+def parseArguments(arguments: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="JSON serialization per endpoint")
+    parser.add_argument("--items", type=int, default=300, help="Items in /items/all")
+    parser.add_argument("--rows", type=int, default=100, help="Rows of the others")
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="Baseline result file")
+    parser.add_argument("--metric", default="p50Ms")
+    parser.add_argument("--tolerance", type=float, default=0.10)
+    return parser.parse_args(arguments)
+
+
+def main(arguments: Sequence[str] | None = None) -> int:
+    parsed = parseArguments(arguments)
+    with appLogLevel("WARNING"):
+        results: Dict = asyncio.run(runBenchmark(parsed))
+    printEndpoints(results)
+    outputPath: str = parsed.output or defaultResultsPath("serialization")
+    writeResults(outputPath, results)
+    print(f"Results written to {outputPath}")
+    if parsed.compare:
+        comparison = compareResults(
+            readResults(parsed.compare)["endpoints"],
+            results["endpoints"],
+            parsed.metric,
+            parsed.tolerance,
+        )
+        printComparison(comparison, parsed.metric)
+        if any(entry["regression"] for entry in comparison):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -146,3 +146,34 @@ async def test_signup_login_flow(client, dbSession):
     login_response = client.post("/auth/token", data=test_login_data)
     assert login_response.status_code == 200
     assert "access_token" in login_response.cookies
+
+
+@pytest.mark.asyncio
+async def test_readiness(client, dbSession):
+    """The readiness probe runs the real startup manager against the database."""
+    from app.services.StartupManager import StartupManager
+
+    manager = StartupManager(TestingSessionLocal, MockSystemInitializer, checkSeconds=0)
+    client.app.state.startupManager = manager
+
+    # The database answers but there are no items to serve yet
+    await manager.runMandatoryPhase()
+    response = client.get("/health/health/readiness")
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    assert response.json()["phases"]["database"] == "done"
+
+    await manager.runPhase("system", manager.initializeSystem)
+    response = client.get("/health/health/readiness")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+    def brokenSessionMaker():
+        raise ConnectionRefusedError("database down")
+
+    # Lost the database after the startup
+    manager.sessionMaker = brokenSessionMaker
+    response = client.get("/health/health/readiness")
+    assert response.status_code == 503
+    assert response.json()["database_reachable"] is False
+    assert "database down" in response.json()["errors"]["readiness"]
@@ -4,14 +4,18 @@ from fastapi.testclient import TestClient
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.data.models.LocationTable import LocationTable
+from app.data.queryInstrumentation import QueryCounter, instrumentEngine
 
 from app.main import app
-from app.data.database import getDbSession
+from app.data.database import getDbSession, getReadDbSession
+from app.items.ItemCatalog import itemCatalog
+from app.profile.ProfileCache import profileCache
 
 # Mock ItemsLoader for testing
 class MockItemsLoader:
     def __init__(self, db: AsyncSession):
         self.db = db
+        self.dbSession = db
         self.version = "test-version"
 
     async def updateItems(self) -> None:
@@ -34,12 +38,34 @@ class MockSystemInitializer:
     async def initializeSystem(self) -> None:
         return
 
+# Mock StartupManager for testing, the tables are created by the dbSession fixture
+class MockStartupManager:
+    def __init__(self, sessionMaker, initializerFactory):
+        self.onSystemReady = []
+
+    async def start(self) -> None:
+        return
+
+    async def stop(self) -> None:
+        return
+
+    def isReady(self) -> bool:
+        return True
+
+    async def checkReady(self) -> bool:
+        return True
+
+    def status(self) -> dict:
+        return {"status": "ready"}
+
 # Use an in-memory SQLite database for testing
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 engine = create_async_engine(
     TEST_DATABASE_URL, connect_args={"check_same_thread": False}, poolclass=StaticPool
 )
 
+instrumentEngine(engine.sync_engine)
+
 # Create an async session factory
 TestingSessionLocal = async_sessionmaker(
     engine,
@@ -68,6 +94,7 @@ async def dbSession():
         DeliveryDatesTable,
         LocationTable,
         ReviewTable,
+        SchedulerTable,
     )
 
     async with engine.begin() as conn:
@@ -84,6 +111,7 @@ async def dbSession():
 def client(dbSession):
     # Patch both SystemInitializer and ItemsLoader with our mock versions
     with patch('app.main.SystemInitializer', MockSystemInitializer), \
+         patch('app.main.StartupManager', MockStartupManager), \
          patch('app.data.ItemsLoader.ItemsLoader', MockItemsLoader), \
          patch('app.routes.items.ItemsLoader', MockItemsLoader):
         
@@ -91,14 +119,25 @@ def client(dbSession):
             return dbSession
 
         app.dependency_overrides[getDbSession] = fakeAsyncDb
+        app.dependency_overrides[getReadDbSession] = fakeAsyncDb
 
         # Create test client with base_url to handle secure cookies
         with TestClient(app, base_url="https://testserver") as test_client:
+            # Every test builds its own items, never reuse the catalog of the previous one
+            itemCatalog.invalidate()
+            profileCache.clear()
             yield test_client
 
         app.dependency_overrides.clear()
 
 
+@pytest_asyncio.fixture
+def queryCounter(dbSession):
+    """Counts the statements issued on the test engine, call reset() before the request under test."""
+    with QueryCounter(engine.sync_engine) as counter:
+        yield counter
+
+
 async def addLocation(dbSession)->int:
     testLocation = LocationTable(country_name="Test Country")
     dbSession.add(testLocation)
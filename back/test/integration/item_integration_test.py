@@ -391,3 +391,170 @@ async def test_get_all_items(client, dbSession):
     assert stat2_response["kind"] == "percentage"
     assert stat2_response["value"] == 15.0
     assert len(item2_response["stats"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_unique_tags_query_budget(client, dbSession, queryCounter):
+    """The tags endpoint reads the catalog with a bounded number of statements."""
+    dbSession.add(TagsTable(name="Tag1"))
+    dbSession.add(TagsTable(name="Tag2"))
+    await dbSession.commit()
+
+    queryCounter.reset()
+    response = client.get("/items/uniqueTags")
+
+    assert response.status_code == 200
+    assert queryCounter.count == 1
+    assert queryCounter.repeatedStatements() == []
+    assert "db;dur=" in response.headers["server-timing"]
+
+
+async def addSearchItems(dbSession):
+    gold = GoldTable(base_cost=100, total=100, sell=70, purchaseable=True)
+    dbSession.add(gold)
+    await dbSession.commit()
+    swordItem = ItemTable(
+        name="Long Sword",
+        plain_text="Slightly increases Attack Damage",
+        description="<stats>10 Attack Damage</stats>",
+        image="sword.jpg",
+        imageUrl="http://example.com/sword.jpg",
+        updated=False,
+        gold_id=gold.id
+    )
+    edgeItem = ItemTable(
+        name="Infinity Edge",
+        plain_text="Massively enhances critical strikes",
+        description="<stats>70 Attack Damage</stats>",
+        image="edge.jpg",
+        imageUrl="http://example.com/edge.jpg",
+        updated=False,
+        gold_id=gold.id
+    )
+    dbSession.add_all([swordItem, edgeItem])
+    await dbSession.commit()
+    tag = TagsTable(name="CriticalStrike")
+    dbSession.add(tag)
+    await dbSession.commit()
+    await dbSession.execute(
+        insert(ItemTagsAssociation).values(item_id=edgeItem.id, tags_id=tag.id)
+    )
+    await dbSession.commit()
+    return swordItem, edgeItem
+
+
+@pytest.mark.asyncio
+async def test_search_items(client, dbSession):
+    """Test the search endpoint with the in-memory index used on sqlite."""
+    swordItem, edgeItem = await addSearchItems(dbSession)
+
+    response = client.get("/items/search", params={"q": "infin"})
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [edgeItem.id]
+    assert response.json()[0]["tags"] == ["CriticalStrike"]
+
+    response = client.get("/items/search", params={"q": "attack damage"})
+    assert [item["name"] for item in response.json()] == ["Long Sword", "Infinity Edge"]
+
+    response = client.get(
+        "/items/search", params={"q": "attack", "tags": ["CriticalStrike"]}
+    )
+    assert [item["id"] for item in response.json()] == [edgeItem.id]
+
+
+@pytest.mark.asyncio
+async def test_items_in_batch_match_per_item_mapping(client, dbSession, queryCounter):
+    """The batched item assembly returns the same items as the per item one."""
+    from app.data.utils import getAllItemTableRowsAnMapToItems, getItemsByIdsInBatch
+
+    swordItem, edgeItem = await addSearchItems(dbSession)
+    perItem = await getAllItemTableRowsAnMapToItems(dbSession)
+
+    queryCounter.reset()
+    batched = await getItemsByIdsInBatch(dbSession, [edgeItem.id, swordItem.id])
+    assert queryCounter.count == 4
+    assert batched == sorted(perItem, key=lambda item: item.id != edgeItem.id)
+
+
+@pytest.mark.asyncio
+async def test_filter_items(client, dbSession, queryCounter):
+    """Test the filter endpoint, the catalog is loaded once and then served from memory."""
+    swordItem, edgeItem = await addSearchItems(dbSession)
+
+    response = client.get("/items/filter", params={"tags": "CriticalStrike"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total"] == 1
+    assert [item["id"] for item in body["items"]] == [edgeItem.id]
+    assert body["facets"]["tags"] == {"CriticalStrike": 1}
+
+    queryCounter.reset()
+    response = client.get(
+        "/items/filter", params={"min_cost": 100, "max_cost": 100, "sort": "name"}
+    )
+    assert [item["name"] for item in response.json()["items"]] == [
+        "Infinity Edge",
+        "Long Sword",
+    ]
+    assert response.json()["facets"]["tags"] == {"CriticalStrike": 1}
+    assert queryCounter.count == 0
+
+
+@pytest.mark.asyncio
+async def test_get_all_items_with_fields(client, dbSession, queryCounter):
+    """Projected items match the full items and only query what was asked for."""
+    await addSearchItems(dbSession)
+
+    fullItems = client.get("/items/all").json()
+    queryCounter.reset()
+    response = client.get("/items/all", params={"fields": "name,gold"})
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": item["id"], "name": item["name"], "gold": item["gold"]}
+        for item in fullItems
+    ]
+    # Table check of staticDataValidation plus the projected item query
+    assert queryCounter.count == 2
+
+    allFields = "name,plaintext,description,image,imageUrl,gold,tags,stats,effect"
+    response = client.get("/items/all", params={"fields": allFields})
+    assert response.json() == fullItems
+
+    response = client.get("/items/some", params={"fields": "name,tags"})
+    assert sorted(item["name"] for item in response.json()) == [
+        "Infinity Edge",
+        "Long Sword",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_item_cards(client, dbSession):
+    """Test the cards endpoint built from the item catalog."""
+    swordItem, edgeItem = await addSearchItems(dbSession)
+
+    response = client.get("/items/cards")
+    assert response.status_code == 200
+    assert response.json() == [
+        {"id": edgeItem.id, "name": "Infinity Edge", "imageUrl": edgeItem.imageUrl, "cost": 100},
+        {"id": swordItem.id, "name": "Long Sword", "imageUrl": swordItem.imageUrl, "cost": 100},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_get_items_by_ids(client, dbSession, queryCounter):
+    """Test items by ids keep the order, skip unknown ids and reuse the catalog."""
+    swordItem, edgeItem = await addSearchItems(dbSession)
+
+    response = client.get(
+        "/items/by_ids", params={"ids": [edgeItem.id, 999, swordItem.id, edgeItem.id]}
+    )
+    assert response.status_code == 200
+    assert [item["id"] for item in response.json()] == [edgeItem.id, swordItem.id]
+    assert response.json()[0]["tags"] == ["CriticalStrike"]
+
+    queryCounter.reset()
+    response = client.get(
+        "/items/by_ids", params={"ids": [swordItem.id], "fields": "name"}
+    )
+    assert response.json() == [{"id": swordItem.id, "name": "Long Sword"}]
+    assert queryCounter.count == 0
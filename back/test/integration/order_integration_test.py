@@ -3,7 +3,12 @@ from app.data.models.UserTable import UserTable
 from app.data.models.ItemTable import ItemTable
 from app.data.models.GoldTable import GoldTable
 from app.data.models.DeliveryDatesTable import ItemLocationDeliveryAssociation
-from app.data.models.OrderTable import OrderTable, OrderItemAssociation
+from app.data.models.OrderTable import (
+    OrderTable,
+    OrderItemAssociation,
+    ProfilePurchaseSummaryTable,
+)
+from app.data.queries.orderQueries import rebuildPurchaseSummaries
 from app.schemas.Order import OrderStatus
 import pytest
 from sqlalchemy import  select
@@ -145,6 +150,33 @@ async def test_create_order_success(client, dbSession):
     assert user is not None
     assert user.current_gold == 700  # 1000 - 300
 
+    # The profile summary was updated in the same transaction, a second order adds up
+    order_data["itemNames"] = ["Test Item 1", "Test Item 1"]
+    order_data["total"] = 200
+    response = client.post("/orders/order", json=order_data)
+    assert response.status_code == 200
+    response = client.get("/profile/info")
+    assert response.status_code == 200
+    ordersInfo = {info["itemName"]: info for info in response.json()["ordersInfo"]}
+    assert ordersInfo["Test Item 1"]["timesOrdered"] == 3
+    assert ordersInfo["Test Item 1"]["totalSpend"] == 300
+    assert ordersInfo["Test Item 1"]["basePrice"] == 100
+    assert ordersInfo["Test Item 1"]["lastOrderDate"] == today.isoformat()
+    assert ordersInfo["Test Item 2"]["timesOrdered"] == 1
+    assert ordersInfo["Test Item 2"]["totalSpend"] == 200
+
+    # Rebuilding from the order history gives the same summary
+    summaryQuery = select(
+        ProfilePurchaseSummaryTable.item_id,
+        ProfilePurchaseSummaryTable.times_ordered,
+        ProfilePurchaseSummaryTable.total_spend,
+        ProfilePurchaseSummaryTable.last_order_date,
+    ).order_by(ProfilePurchaseSummaryTable.item_id)
+    incremental = (await dbSession.execute(summaryQuery)).all()
+    await rebuildPurchaseSummaries(dbSession)
+    await dbSession.commit()
+    assert (await dbSession.execute(summaryQuery)).all() == incremental
+
 
 @pytest.mark.asyncio
 async def test_get_order_history(client, dbSession):
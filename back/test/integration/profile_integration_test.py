@@ -4,6 +4,7 @@ import pytest
 from sqlalchemy import select
 from datetime import date
 from app.auth.functions import hashPassword
+from app.profile.ProfileCache import invalidateProfile
 
 
 @pytest.mark.asyncio
@@ -105,4 +106,38 @@ async def testGetCurrentGoldUnauthorized(client):
     
     # Check response
     assert response.status_code == 401
-    assert "detail" in response.json() 
\ No newline at end of file
+    assert "detail" in response.json() 
+
+@pytest.mark.asyncio
+async def testGetCurrentGoldCached(client, dbSession, queryCounter):
+    """Polling the gold is served from the cache until the profile changes."""
+    locationId: int = await addLocation(dbSession)
+    testUser = UserTable(
+        userName="testuser",
+        password=hashPassword("TestPassword123!"),
+        gold_spend=0,
+        created=date.today(),
+        last_singn=date.today(),
+        current_gold=1000,
+        email="test@example.com",
+        birthdate=date(2000, 1, 1),
+        location_id=locationId,
+    )
+    dbSession.add(testUser)
+    await dbSession.commit()
+    loginResponse = client.post(
+        "/auth/token", data={"username": "testuser", "password": "TestPassword123!"}
+    )
+    assert loginResponse.status_code == 200
+
+    assert client.get("/profile/current_gold").json() == 1000
+    queryCounter.reset()
+    assert client.get("/profile/current_gold").json() == 1000
+    assert queryCounter.count == 0
+
+    testUser.current_gold = 500
+    await dbSession.commit()
+    # Still cached, nothing told the cache about this write
+    assert client.get("/profile/current_gold").json() == 1000
+    await invalidateProfile(dbSession, "testuser")
+    assert client.get("/profile/current_gold").json() == 500
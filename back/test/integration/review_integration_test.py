@@ -3,7 +3,7 @@ from app.data.models.UserTable import UserTable
 from app.data.models.ItemTable import ItemTable
 from app.data.models.GoldTable import GoldTable
 from app.data.models.OrderTable import OrderTable
-from app.data.models.ReviewTable import ReviewTable
+from app.data.models.ReviewTable import ReviewTable, CommentTable, ReviewSummaryTable
 from app.schemas.Review import Review, Comment
 import pytest
 from sqlalchemy import select
@@ -112,6 +112,14 @@ async def testAddReviewSuccess(client, dbSession):
     assert review.rating == 5
     assert review.item_id == item.id
 
+    # The item summary was updated with the review
+    summaryResponse = client.get(f"/review/summaries?item_ids={item.id}")
+    assert summaryResponse.status_code == 200
+    summary = summaryResponse.json()[0]
+    assert summary["count"] == 1
+    assert summary["averageRating"] == 5.0
+    assert summary["ratingCounts"] == [0, 0, 0, 0, 1]
+
 
 @pytest.mark.asyncio
 async def testUpdateReviewSuccess(client, dbSession):
@@ -176,6 +184,10 @@ async def testUpdateReviewSuccess(client, dbSession):
         rating=3
     )
     dbSession.add(review)
+    # The summary the migration backfilled for reviews older than the table
+    dbSession.add(
+        ReviewSummaryTable(item_id=item.id, review_count=1, rating_sum=3, rating_3=1)
+    )
     await dbSession.commit()
     
     # Login to get authentication token
@@ -222,6 +234,13 @@ async def testUpdateReviewSuccess(client, dbSession):
     assert updatedReview is not None
     assert updatedReview.rating == 5
 
+    # The rating moved from 3 to 5 in the summary
+    summaryResponse = client.get(f"/review/summaries?item_ids={item.id}")
+    assert summaryResponse.status_code == 200
+    summary = summaryResponse.json()[0]
+    assert summary["count"] == 1
+    assert summary["ratingCounts"] == [0, 0, 0, 0, 1]
+
 
 @pytest.mark.asyncio
 async def testGetUserReviewsSuccess(client, dbSession):
@@ -409,4 +428,336 @@ async def testGetItemReviewsSuccess(client, dbSession):
     reviews = response.json()
     assert len(reviews) == 2
     assert any(r["rating"] == 5 for r in reviews)
-    assert any(r["rating"] == 4 for r in reviews) 
\ No newline at end of file
+    assert any(r["rating"] == 4 for r in reviews) 
+
+@pytest.mark.asyncio
+async def testGetItemReviewsPageWithCursor(client, dbSession):
+    """Test keyset pagination of item reviews and of review comments."""
+    locationId:int = await addLocation(dbSession)
+    testUser = UserTable(
+        userName="testuser",
+        password=hashPassword("TestPassword123!"),
+        gold_spend=0,
+        created=date.today(),
+        last_singn=date.today(),
+        current_gold=1000,
+        email="test@example.com",
+        birthdate=date(2000, 1, 1),
+        location_id=locationId
+    )
+    gold = GoldTable(base_cost=100, total=100, sell=70, purchaseable=True)
+    dbSession.add(testUser)
+    dbSession.add(gold)
+    await dbSession.commit()
+    item = ItemTable(
+        name="Test Item",
+        plain_text="Plain text for test item",
+        description="Description for test item",
+        image="item.jpg",
+        imageUrl="http://example.com/item.jpg",
+        updated=False,
+        gold_id=gold.id
+    )
+    dbSession.add(item)
+    await dbSession.commit()
+
+    # Five reviews, the two last ones share created_at so the id breaks the tie
+    createdDates = [datetime(2025, 1, day) for day in (1, 2, 3, 4, 4)]
+    reviewIds = []
+    for createdAt in createdDates:
+        order = OrderTable(
+            user_id=testUser.id,
+            total=100,
+            order_date=date.today(),
+            delivery_date=date.today(),
+            status="COMPLETED",
+            location_id=locationId,
+            reviewed=True
+        )
+        dbSession.add(order)
+        await dbSession.commit()
+        review = ReviewTable(
+            order_id=order.id,
+            item_id=item.id,
+            rating=4,
+            created_at=createdAt,
+            updated_at=createdAt,
+        )
+        dbSession.add(review)
+        await dbSession.commit()
+        reviewIds.append(review.id)
+    newestReviewId = reviewIds[-1]
+    for commentNumber in range(5):
+        dbSession.add(
+            CommentTable(
+                review_id=newestReviewId,
+                user_id=testUser.id,
+                content=f"Comment {commentNumber}",
+                created_at=datetime(2025, 1, 5, commentNumber),
+                updated_at=datetime(2025, 1, 5, commentNumber),
+            )
+        )
+    await dbSession.commit()
+
+    seenIds = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(f"/review/item/{item.id}/page", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seenIds.extend(review["id"] for review in page["reviews"])
+        pages += 1
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seenIds == list(reversed(reviewIds))
+
+    firstPage = client.get(f"/review/item/{item.id}/page", params={"limit": 1}).json()
+    newestReview = firstPage["reviews"][0]
+    assert newestReview["commentCount"] == 5
+    assert [comment["content"] for comment in newestReview["comments"]] == [
+        "Comment 0", "Comment 1", "Comment 2"
+    ]
+
+    commentsPage = client.get(
+        f"/review/comments/{newestReviewId}", params={"limit": 3}
+    ).json()
+    assert len(commentsPage["comments"]) == 3
+    nextComments = client.get(
+        f"/review/comments/{newestReviewId}",
+        params={"limit": 3, "cursor": commentsPage["nextCursor"]},
+    ).json()
+    assert [comment["content"] for comment in nextComments["comments"]] == [
+        "Comment 3", "Comment 4"
+    ]
+    assert nextComments["nextCursor"] is None
+
+    invalidCursor = client.get(f"/review/item/{item.id}/page", params={"cursor": "nope"})
+    assert invalidCursor.status_code == 400
+
+
+@pytest.mark.asyncio
+async def testAddBulkReviewsSuccess(client, dbSession, queryCounter):
+    """Test adding the reviews of every item of an order in one request."""
+    locationId:int = await addLocation(dbSession)
+    testUser = UserTable(
+        userName="testuser",
+        password=hashPassword("TestPassword123!"),
+        gold_spend=0,
+        created=date.today(),
+        last_singn=date.today(),
+        current_gold=1000,
+        email="test@example.com",
+        birthdate=date(2000, 1, 1),
+        location_id=locationId
+    )
+    gold = GoldTable(base_cost=100, total=100, sell=70, purchaseable=True)
+    dbSession.add(testUser)
+    dbSession.add(gold)
+    await dbSession.commit()
+    items = [
+        ItemTable(
+            name=f"Test Item {number}",
+            plain_text="Plain text",
+            description="Description",
+            image="item.jpg",
+            imageUrl="http://example.com/item.jpg",
+            updated=False,
+            gold_id=gold.id
+        )
+        for number in range(3)
+    ]
+    dbSession.add_all(items)
+    await dbSession.commit()
+    order = OrderTable(
+        user_id=testUser.id,
+        total=300,
+        order_date=date.today(),
+        delivery_date=date.today(),
+        status="COMPLETED",
+        location_id=locationId,
+        reviewed=False
+    )
+    dbSession.add(order)
+    await dbSession.commit()
+
+    loginResponse = client.post(
+        "/auth/token", data={"username": "testuser", "password": "TestPassword123!"}
+    )
+    assert loginResponse.status_code == 200
+
+    now = datetime.now().isoformat()
+    reviewsData = [
+        {
+            "id": 0,
+            "orderId": order.id,
+            "itemId": item.id,
+            "rating": rating,
+            "createdAt": now,
+            "updatedAt": now,
+            "comments": [
+                {
+                    "id": 0,
+                    "reviewId": 0,
+                    "userId": testUser.id,
+                    "content": f"Comment for {item.name}",
+                    "createdAt": now,
+                    "updatedAt": now
+                }
+            ]
+        }
+        for item, rating in zip(items, (5, 4, 3))
+    ]
+
+    queryCounter.reset()
+    response = client.post(
+        "/review/add_bulk", json={"orderId": order.id, "reviews": reviewsData}
+    )
+    assert response.status_code == 200
+    assert response.json()["message"] == "Reviews added successfully"
+    # Reviews and comments are created with one multi-row insert each
+    insertCounts = {
+        table: sum(
+            count
+            for shape, count in queryCounter.stats.statementCounts.items()
+            if shape.startswith(f"INSERT INTO {table} ")
+        )
+        for table in ("review_table", "comment_table")
+    }
+    assert insertCounts == {"review_table": 1, "comment_table": 1}
+
+    result = await dbSession.execute(
+        select(ReviewTable).where(ReviewTable.order_id == order.id)
+    )
+    reviews = list(result.scalars().all())
+    assert sorted(review.rating for review in reviews) == [3, 4, 5]
+    result = await dbSession.execute(
+        select(CommentTable).where(
+            CommentTable.review_id.in_([review.id for review in reviews])
+        )
+    )
+    assert len(result.scalars().all()) == 3
+    await dbSession.refresh(order)
+    assert order.reviewed is True
+
+    summaries = client.get(
+        "/review/summaries", params={"item_ids": [item.id for item in items]}
+    ).json()
+    assert [summary["averageRating"] for summary in summaries] == [5.0, 4.0, 3.0]
+
+
+@pytest.mark.asyncio
+async def test_rebuildReviewSummary_overwritesExistingSummary(dbSession):
+    from app.data.queries.reviewQueries import rebuildReviewSummary
+
+    locationId: int = await addLocation(dbSession)
+    testUser = UserTable(
+        userName="testuser",
+        password=hashPassword("TestPassword123!"),
+        gold_spend=0,
+        created=date.today(),
+        last_singn=date.today(),
+        current_gold=1000,
+        email="test@example.com",
+        birthdate=date(2000, 1, 1),
+        location_id=locationId
+    )
+    gold = GoldTable(base_cost=100, total=100, sell=70, purchaseable=True)
+    dbSession.add_all([testUser, gold])
+    await dbSession.commit()
+    item = ItemTable(
+        name="Test Item",
+        plain_text="Plain text for test item",
+        description="Description for test item",
+        image="item.jpg",
+        imageUrl="http://example.com/item.jpg",
+        updated=False,
+        gold_id=gold.id
+    )
+    dbSession.add(item)
+    await dbSession.commit()
+    # One review per order and item, two orders
+    orders = [
+        OrderTable(
+            user_id=testUser.id,
+            total=100,
+            order_date=date.today(),
+            delivery_date=date.today(),
+            status="COMPLETED",
+            location_id=locationId,
+            reviewed=True
+        )
+        for _ in range(2)
+    ]
+    dbSession.add_all(orders)
+    await dbSession.commit()
+    dbSession.add_all(
+        [
+            ReviewTable(order_id=order.id, item_id=item.id, rating=rating)
+            for order, rating in zip(orders, (2, 4))
+        ]
+    )
+    # A stale summary, the rebuild has to overwrite it in place
+    dbSession.add(
+        ReviewSummaryTable(item_id=item.id, review_count=9, rating_sum=45, rating_5=9)
+    )
+    await dbSession.commit()
+
+    await rebuildReviewSummary(dbSession, item.id)
+    await rebuildReviewSummary(dbSession, item.id)
+    await dbSession.commit()
+
+    summary = await dbSession.get(
+        ReviewSummaryTable, item.id, populate_existing=True
+    )
+    assert summary.review_count == 2
+    assert summary.rating_sum == 6
+    assert [getattr(summary, f"rating_{rating}") for rating in range(1, 6)] == [
+        0, 1, 0, 1, 0
+    ]
+
+
+@pytest.mark.asyncio
+async def test_concurrentFirstReviews_bothCountInSummary(dbSession):
+    from app.data.queries.reviewQueries import (
+        applyRatingToReviewSummary,
+        ensureReviewSummaries,
+    )
+
+    gold = GoldTable(base_cost=100, total=100, sell=70, purchaseable=True)
+    dbSession.add(gold)
+    await dbSession.commit()
+    item = ItemTable(
+        name="Test Item",
+        plain_text="Plain text for test item",
+        description="Description for test item",
+        image="item.jpg",
+        imageUrl="http://example.com/item.jpg",
+        updated=False,
+        gold_id=gold.id
+    )
+    dbSession.add(item)
+    await dbSession.commit()
+
+    # Two first reviews interleaved: both seed before either increments
+    async with TestingSessionLocal() as first, TestingSessionLocal() as second:
+        await ensureReviewSummaries(first, [item.id])
+        await ensureReviewSummaries(second, [item.id])
+        assert await applyRatingToReviewSummary(first, item.id, 2)
+        assert await applyRatingToReviewSummary(second, item.id, 4)
+        await first.commit()
+        await second.commit()
+
+    summary = await dbSession.get(
+        ReviewSummaryTable, item.id, populate_existing=True
+    )
+    assert summary.review_count == 2
+    assert summary.rating_sum == 6
+    assert [getattr(summary, f"rating_{rating}") for rating in range(1, 6)] == [
+        0, 1, 0, 1, 0
+    ]
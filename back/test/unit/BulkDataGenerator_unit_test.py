@@ -0,0 +1,192 @@
+import random
+from collections import Counter
+import pytest
+import pytest_asyncio
+from unittest.mock import patch
+from sqlalchemy import func, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.customExceptions import BulkDataGenerationError
+from app.data.database import base
+from app.data.BulkDataGenerator import (
+    BulkDataConfig,
+    BulkDataGenerator,
+    ZipfSampler,
+    powerUserOrderCount,
+)
+from app.data.models.GoldTable import GoldTable
+from app.data.models.ItemTable import ItemTable
+from app.data.models.OrderTable import (
+    OrderItemAssociation,
+    OrderTable,
+    ProfilePurchaseSummaryTable,
+)
+from app.data.models.ReviewTable import ReviewSummaryTable, ReviewTable
+from app.data.models.UserTable import UserTable
+
+ITEM_COUNT = 20
+
+
+@pytest_asyncio.fixture
+async def engine():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(base.metadata.create_all)
+        for itemId in range(1, ITEM_COUNT + 1):
+            await conn.execute(
+                insert(GoldTable).values(
+                    id=itemId,
+                    base_cost=itemId * 100,
+                    total=itemId * 100,
+                    sell=itemId * 70,
+                    purchaseable=True,
+                )
+            )
+            await conn.execute(
+                insert(ItemTable).values(
+                    id=itemId,
+                    name=f"Sword {itemId}",
+                    plain_text="",
+                    description="",
+                    image="",
+                    imageUrl="",
+                    updated=False,
+                    gold_id=itemId,
+                )
+            )
+    yield engine
+    await engine.dispose()
+
+
+def smallConfig(**overrides) -> BulkDataConfig:
+    values = dict(users=60, userChunkSize=25, batchSize=7, seed=3)
+    values.update(overrides)
+    return BulkDataConfig(**values)
+
+
+def test_zipf_sampler_prefers_the_top_ranked_items():
+    sampler = ZipfSampler(list(range(100)), 1.2, random.Random(1))
+    counts = Counter(sampler.sample() for _ in range(20000))
+    top = sampler.values[0]
+    tail = sampler.values[-1]
+    assert counts[top] > 20 * max(counts[tail], 1)
+    assert len(set(sampler.sampleDistinct(10))) == 10
+
+
+def test_powerUserOrderCount_is_heavy_tailed_around_the_mean():
+    rng = random.Random(5)
+    counts = [powerUserOrderCount(rng, 4.0, 1.6, 1000) for _ in range(20000)]
+    mean = sum(counts) / len(counts)
+    assert 2.5 < mean < 5.5
+    assert sorted(counts)[len(counts) // 2] < mean
+    assert max(counts) > 50
+
+
+@pytest.mark.asyncio
+@patch("app.data.BulkDataGenerator.hashPassword", return_value="hashed")
+async def test_run_writes_consistent_rows(_, engine):
+    counts = await BulkDataGenerator(engine, smallConfig()).run()
+
+    assert counts["users"] == 60
+    async with engine.connect() as conn:
+        assert await conn.scalar(select(func.count(UserTable.id))) == 60
+        assert await conn.scalar(select(func.count(OrderTable.id))) == counts["orders"]
+        assert (
+            await conn.scalar(select(func.count()).select_from(OrderItemAssociation))
+            == counts["order_items"]
+        )
+        totals = await conn.execute(
+            select(
+                OrderTable.total,
+                func.sum(OrderItemAssociation.c.quantity * GoldTable.base_cost),
+            )
+            .join(
+                OrderItemAssociation, OrderItemAssociation.c.order_id == OrderTable.id
+            )
+            .join(ItemTable, ItemTable.id == OrderItemAssociation.c.item_id)
+            .join(GoldTable, GoldTable.id == ItemTable.gold_id)
+            .group_by(OrderTable.id)
+        )
+        assert all(total == expected for total, expected in totals.all())
+        reviews = await conn.scalar(select(func.count(ReviewTable.id)))
+        assert reviews == counts["reviews"]
+        summaryReviews = await conn.scalar(
+            select(func.coalesce(func.sum(ReviewSummaryTable.review_count), 0))
+        )
+        assert summaryReviews == counts["reviews"]
+        if counts["orders"]:
+            assert await conn.scalar(
+                select(func.count()).select_from(ProfilePurchaseSummaryTable)
+            )
+
+
+@pytest.mark.asyncio
+@patch("app.data.BulkDataGenerator.hashPassword", return_value="hashed")
+async def test_run_is_seeded_and_appends_after_existing_ids(_, engine):
+    first = await BulkDataGenerator(engine, smallConfig(userNamePrefix="a_")).run()
+    async with engine.connect() as conn:
+        firstOrders = (
+            await conn.execute(select(OrderTable.total).order_by(OrderTable.id))
+        ).scalars().all()
+
+    second = await BulkDataGenerator(engine, smallConfig(userNamePrefix="b_")).run()
+
+    assert first == second
+    async with engine.connect() as conn:
+        assert await conn.scalar(select(func.count(UserTable.id))) == 120
+        orders = (
+            await conn.execute(select(OrderTable.total).order_by(OrderTable.id))
+        ).scalars().all()
+    assert orders == firstOrders * 2
+
+
+@pytest.mark.asyncio
+async def test_run_needs_the_item_catalog():
+    emptyEngine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with emptyEngine.begin() as conn:
+        await conn.run_sync(base.metadata.create_all)
+
+    with pytest.raises(BulkDataGenerationError):
+        await BulkDataGenerator(emptyEngine, smallConfig()).run()
+    await emptyEngine.dispose()
+
+
+def test_config_rejects_a_prefix_overflowing_the_email():
+    # 50 characters: prefix + 5 digits + "@loadtest.example"
+    smallConfig(users=10000, userNamePrefix="u" * 28)
+    with pytest.raises(ValueError):
+        smallConfig(users=10000, userNamePrefix="u" * 29)
+
+
+@pytest.mark.asyncio
+@patch("app.data.BulkDataGenerator.hashPassword", return_value="hashed")
+async def test_run_checks_the_email_length_after_existing_ids(_, engine):
+    # 99 users fit in 2 digits, appended after user 1 the last id needs 3
+    config = smallConfig(users=99, userNamePrefix="u" * 31)
+    async with engine.begin() as conn:
+        await conn.execute(
+            insert(UserTable).values(
+                id=1,
+                userName="existing",
+                password="hashed",
+                gold_spend=0,
+                created=func.current_date(),
+                last_singn=func.current_date(),
+                current_gold=0,
+                email="existing@example.com",
+                birthdate=func.current_date(),
+            )
+        )
+
+    with pytest.raises(BulkDataGenerationError):
+        await BulkDataGenerator(engine, config).run()
+    async with engine.connect() as conn:
+        assert await conn.scalar(select(func.count(UserTable.id))) == 1
@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.data import CacheInvalidationChannel as channelModule
+from app.data.CacheInvalidationChannel import CacheInvalidationChannel
+
+
+@pytest.mark.asyncio
+async def test_listen_clearsCachesAndCleansUpTheConnection(monkeypatch):
+    channel = CacheInvalidationChannel("profile_cache")
+    invalidated, cleared = [], []
+    channel.subscribe(invalidated.append, lambda: cleared.append(True))
+
+    driverConnection = MagicMock()
+    driverConnection.add_listener = AsyncMock()
+    driverConnection.remove_listener = AsyncMock()
+
+    def isClosed() -> bool:
+        # One listening round, then the app shuts down
+        channel.stopping = True
+        return False
+
+    driverConnection.is_closed.side_effect = isClosed
+    connection = AsyncMock()
+    connection.get_raw_connection.return_value = MagicMock(
+        driver_connection=driverConnection
+    )
+    listenEngine = MagicMock()
+    listenEngine.connect = AsyncMock(return_value=connection)
+    listenEngine.dispose = AsyncMock()
+    createEngine = MagicMock(return_value=listenEngine)
+    monkeypatch.setattr(channelModule, "create_async_engine", createEngine)
+
+    appEngine = MagicMock()
+    await channel.listen(appEngine)
+
+    # A dedicated engine outside the pool of the app
+    assert createEngine.call_args.args == (appEngine.url,)
+    assert createEngine.call_args.kwargs["poolclass"] is channelModule.NullPool
+    assert cleared == [True]
+    driverConnection.remove_listener.assert_awaited_once_with(
+        "profile_cache", channel.onNotification
+    )
+    connection.invalidate.assert_awaited_once()
+    listenEngine.dispose.assert_awaited_once()
+    assert channel.connection is None
+
+    channel.onNotification(None, 1, "profile_cache", "testUser")
+    assert invalidated == ["testUser"]
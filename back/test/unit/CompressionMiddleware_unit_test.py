@@ -0,0 +1,116 @@
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.routes.CompressionMiddleware import (
+    CompressionMiddleware,
+    chooseEncoding,
+    parseAcceptEncoding,
+)
+
+LARGE_BODY = "legends shop item description " * 200
+
+
+def makeApp(**options) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minSize=500, **options)
+
+    @app.get("/items/all")
+    async def getAllItems():
+        return PlainTextResponse(LARGE_BODY, headers={"ETag": '"v1"'})
+
+    @app.get("/orders/order_history")
+    async def getOrderHistory():
+        return PlainTextResponse(LARGE_BODY)
+
+    @app.get("/small")
+    async def getSmall():
+        return PlainTextResponse("short")
+
+    @app.get("/image")
+    async def getImage():
+        return PlainTextResponse(LARGE_BODY, media_type="image/png")
+
+    @app.get("/stream")
+    async def getStream():
+        async def chunks():
+            for _ in range(20):
+                yield "chunk of a streamed body " * 10
+
+        return StreamingResponse(chunks(), media_type="application/json")
+
+    return app
+
+
+@pytest.fixture
+def client() -> TestClient:
+    return TestClient(makeApp())
+
+
+def getRaw(client: TestClient, path: str, acceptEncoding: str = "gzip"):
+    # httpx decodes gzip on its own, read the raw bytes to check what was sent
+    with client.stream("GET", path, headers={"Accept-Encoding": acceptEncoding}) as r:
+        return r, b"".join(r.iter_raw())
+
+
+def test_parseAcceptEncoding():
+    assert parseAcceptEncoding("gzip, br;q=0.5, *;q=0") == {
+        "gzip": 1.0,
+        "br": 0.5,
+        "*": 0.0,
+    }
+
+
+def test_chooseEncoding():
+    assert chooseEncoding("gzip, deflate, br", brotliAvailable=True) == "br"
+    assert chooseEncoding("gzip, deflate, br", brotliAvailable=False) == "gzip"
+    assert chooseEncoding("br;q=0.5, gzip", brotliAvailable=True) == "gzip"
+    assert chooseEncoding("*", brotliAvailable=False) == "gzip"
+    assert chooseEncoding("gzip;q=0, identity") is None
+    assert chooseEncoding("") is None
+
+
+def test_largeBodyIsCompressed(client):
+    response, raw = getRaw(client, "/items/all")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert response.headers["ETag"] == '"v1-gzip"'
+    assert int(response.headers["Content-Length"]) == len(raw)
+    assert len(raw) < len(LARGE_BODY) / 10
+    assert gzip.decompress(raw).decode() == LARGE_BODY
+
+
+def test_smallAndBinaryBodiesAreNotCompressed(client):
+    response, raw = getRaw(client, "/small")
+    assert "Content-Encoding" not in response.headers
+    assert raw == b"short"
+    response, _ = getRaw(client, "/image")
+    assert "Content-Encoding" not in response.headers
+
+
+def test_identityClientGetsPlainBody(client):
+    response, raw = getRaw(client, "/items/all", acceptEncoding="identity")
+    assert "Content-Encoding" not in response.headers
+    assert raw.decode() == LARGE_BODY
+
+
+def test_streamedBodyIsCompressedByChunks(client):
+    response, raw = getRaw(client, "/stream")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(raw).decode() == "chunk of a streamed body " * 200
+
+
+def test_cacheOnlyKeepsConfiguredRoutes():
+    app = makeApp()
+    client = TestClient(app)
+    getRaw(client, "/items/all")
+    _, cachedRaw = getRaw(client, "/items/all")
+    getRaw(client, "/orders/order_history")
+
+    middleware = app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+    assert len(middleware.cache) == 1
+    assert list(middleware.cache.entries.values())[0][1] == cachedRaw
@@ -0,0 +1,71 @@
+import asyncio
+import time
+import pytest
+from app.metrics import eventLoopSlowCallbacksTotal
+from app.services.EventLoopLagMonitor import EventLoopLagMonitor
+
+
+def blockTheLoop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_slow_callback_is_recorded_with_its_stack():
+    monitor = EventLoopLagMonitor(interval=0.02, slowCallbackSeconds=0.05)
+    before = eventLoopSlowCallbacksTotal.get()
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blockTheLoop(0.3)
+        await asyncio.sleep(0.1)
+    finally:
+        await monitor.stop()
+
+    assert len(monitor.recentSlowCallbacks) == 1
+    slowCallback = monitor.recentSlowCallbacks[0]
+    assert slowCallback.blockedSeconds >= 0.2
+    assert any("blockTheLoop" in line for line in slowCallback.stack)
+    assert eventLoopSlowCallbacksTotal.get() == before + 1
+    assert monitor.watchdog is None
+
+
+@pytest.mark.asyncio
+async def test_stall_shorter_than_the_interval_is_recorded():
+    # The lag sleep alone would miss it, the loop is blocked well before the
+    # sleep is due
+    monitor = EventLoopLagMonitor(interval=5, slowCallbackSeconds=0.05)
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        blockTheLoop(0.2)
+        await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    assert len(monitor.recentSlowCallbacks) == 1
+    slowCallback = monitor.recentSlowCallbacks[0]
+    assert slowCallback.blockedSeconds >= 0.15
+    assert any("blockTheLoop" in line for line in slowCallback.stack)
+    assert monitor.beatHandle is None
+
+
+@pytest.mark.asyncio
+async def test_short_pauses_are_not_slow_callbacks():
+    monitor = EventLoopLagMonitor(interval=0.02, slowCallbackSeconds=0.2)
+    monitor.start()
+    try:
+        for _ in range(5):
+            blockTheLoop(0.01)
+            await asyncio.sleep(0.02)
+    finally:
+        await monitor.stop()
+
+    assert len(monitor.recentSlowCallbacks) == 0
+
+
+@pytest.mark.asyncio
+async def test_sample_reports_the_lag():
+    monitor = EventLoopLagMonitor(interval=0.01, slowCallbackSeconds=10)
+    lag = await monitor.sample()
+    assert lag >= 0
+    assert len(monitor.recentSlowCallbacks) == 0
@@ -0,0 +1,46 @@
+import json
+from typing import List
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.routes.FastJSONResponse import FastJSONResponse, ModelResponse, getTypeAdapter
+from app.schemas.Order import Order
+from app.schemas.profileSchemas import ProfileInfo
+from app.schemas.Review import Review
+from app.schemas.Item import Item
+from staticData import (
+    STATIC_DATA_ITEM1,
+    STATIC_DATA_ITEM2,
+    STATIC_PROFILE_INFO1,
+    STATIC_REVIEW1,
+    STATIC_REVIEW2,
+)
+
+
+def test_fastJSONResponse_rendersLikeJSONResponse():
+    content = {"name": "Doran's Blade", "tags": ["Damage"], "gold": 450.5, "id": None}
+    assert json.loads(FastJSONResponse(content).body) == json.loads(
+        JSONResponse(content).body
+    )
+
+
+def test_modelResponse_matchesDefaultSerialization():
+    for content, annotation in [
+        ([STATIC_DATA_ITEM1, STATIC_DATA_ITEM2], List[Item]),
+        ([STATIC_REVIEW1, STATIC_REVIEW2], List[Review]),
+        (STATIC_PROFILE_INFO1, ProfileInfo),
+    ]:
+        response = ModelResponse(content, annotation)
+        assert response.media_type == "application/json"
+        assert json.loads(response.body) == jsonable_encoder(content)
+
+
+def test_modelResponse_statusAndHeaders():
+    response = ModelResponse([], List[Order], status_code=201, headers={"X-A": "1"})
+    assert response.status_code == 201
+    assert response.body == b"[]"
+    assert response.headers["X-A"] == "1"
+    assert response.headers["content-type"] == "application/json"
+
+
+def test_getTypeAdapter_isBuiltOncePerAnnotation():
+    assert getTypeAdapter(List[Review]) is getTypeAdapter(List[Review])
@@ -0,0 +1,105 @@
+from typing import Dict, List, Set
+from app.items.ItemFacetIndex import ItemFacetIndex
+from app.schemas.Item import Effects, Gold, Item, Stat
+
+
+def makeItem(
+    itemId: int,
+    name: str,
+    cost: int,
+    tags: Set[str] = set(),
+    stats: Set[str] = set(),
+    effects: Dict[str, float] = {},
+) -> Item:
+    return Item(
+        id=itemId,
+        name=name,
+        plaintext="",
+        description="",
+        image="image.png",
+        imageUrl="http://example.com/image.png",
+        gold=Gold(base=cost, purchasable=True, total=cost, sell=cost // 2),
+        tags=tags,
+        stats={Stat(name=stat, kind="flat", value=10) for stat in stats},
+        effect=Effects(root=effects),
+    )
+
+
+def makeIndex() -> ItemFacetIndex:
+    items: List[Item] = [
+        makeItem(1, "Long Sword", 350, {"Damage", "Lane"}, {"AttackDamage"}),
+        makeItem(
+            2,
+            "Infinity Edge",
+            3400,
+            {"Damage", "CriticalStrike"},
+            {"AttackDamage", "CritChance"},
+            {"Effect1Amount": 0.4},
+        ),
+        makeItem(3, "Amplifying Tome", 400, {"SpellDamage"}, {"AbilityPower"}),
+        makeItem(4, "Cloth Armor", 300, {"Armor"}, {"Armor"}),
+        makeItem(5, "B. F. Sword", 1300, {"Damage"}, {"AttackDamage"}),
+    ]
+    index = ItemFacetIndex()
+    index.build(items)
+    return index
+
+
+def test_query_without_filters_returns_every_item_by_name():
+    total, items, facets = makeIndex().query()
+    assert total == 5
+    assert [item.id for item in items] == [3, 5, 4, 2, 1]
+    assert facets["tags"]["Damage"] == 3
+    assert facets["stats"]["AttackDamage"] == 3
+    assert facets["effects"] == {"Effect1Amount": 1}
+
+
+def test_query_is_conjunctive():
+    index = makeIndex()
+    total, items, _ = index.query(tags=["Damage"], stats=["CritChance"])
+    assert total == 1 and items[0].id == 2
+    total, items, _ = index.query(tags=["Damage", "Armor"])
+    assert total == 0 and items == []
+
+
+def test_query_unknown_facet_value_matches_nothing():
+    total, _, facets = makeIndex().query(effects=["Unknown"])
+    assert total == 0
+    assert facets == {"tags": {}, "stats": {}, "effects": {}}
+
+
+def test_query_facet_counts_follow_the_filters():
+    _, _, facets = makeIndex().query(tags=["Damage"])
+    assert facets["tags"] == {"Damage": 3, "Lane": 1, "CriticalStrike": 1}
+    assert "SpellDamage" not in facets["tags"]
+    assert facets["stats"] == {"AttackDamage": 3, "CritChance": 1}
+
+
+def test_query_cost_range_includes_both_ends():
+    index = makeIndex()
+    total, items, _ = index.query(minCost=350, maxCost=1300, sort="price_asc")
+    assert total == 3
+    assert [item.gold.base for item in items] == [350, 400, 1300]
+    total, _, _ = index.query(minCost=5000)
+    assert total == 0
+    total, _, _ = index.query(maxCost=299)
+    assert total == 0
+    total, _, _ = index.query(minCost=1000, maxCost=500)
+    assert total == 0
+
+
+def test_query_sorting_and_paging():
+    index = makeIndex()
+    total, items, _ = index.query(tags=["Damage"], sort="price_desc")
+    assert [item.id for item in items] == [2, 5, 1]
+    total, items, _ = index.query(sort="price_asc", limit=2, offset=1)
+    assert total == 5
+    assert [item.id for item in items] == [1, 3]
+
+
+def test_build_replaces_previous_items():
+    index = makeIndex()
+    index.build([makeItem(9, "Dagger", 250, {"AttackSpeed"})])
+    total, items, facets = index.query()
+    assert total == 1 and items[0].id == 9
+    assert facets["tags"] == {"AttackSpeed": 1}
@@ -0,0 +1,92 @@
+from typing import Dict, List, Set
+from app.items.ItemSearchIndex import ItemSearchIndex, tokenize
+from app.items.ItemSearcher import makePrefixTsQuery
+from app.schemas.Item import Effects, Gold, Item, Stat
+
+
+def makeItem(
+    itemId: int,
+    name: str,
+    plaintext: str = "",
+    description: str = "",
+    tags: Set[str] = set(),
+    stats: Set[Stat] = set(),
+    effects: Dict[str, float] = {},
+) -> Item:
+    return Item(
+        id=itemId,
+        name=name,
+        plaintext=plaintext,
+        description=description,
+        image="image.png",
+        imageUrl="http://example.com/image.png",
+        gold=Gold(base=100, purchasable=True, total=100, sell=70),
+        tags=tags,
+        stats=stats,
+        effect=Effects(root=effects),
+    )
+
+
+def makeIndex() -> ItemSearchIndex:
+    items: List[Item] = [
+        makeItem(
+            1,
+            "Infinity Edge",
+            "Massively enhances critical strikes",
+            "<mainText><stats>Attack Damage</stats></mainText>",
+            tags={"Damage", "CriticalStrike"},
+            stats={Stat(name="FlatPhysicalDamageMod", kind="flat", value=70)},
+        ),
+        makeItem(
+            2,
+            "Rabadon's Deathcap",
+            "Massively increases Ability Power",
+            "Magical opus, edge of power",
+            tags={"SpellDamage"},
+            effects={"Effect1Amount": 0.35},
+        ),
+        makeItem(3, "Long Sword", "Slightly increases Attack Damage", tags={"Damage"}),
+    ]
+    index = ItemSearchIndex()
+    index.build(items, ("15.5.1", 3, 3))
+    return index
+
+
+def test_tokenize_dropsMarkup():
+    assert tokenize("<stats>Attack Damage</stats> 10%") == ["attack", "damage", "10"]
+
+
+def test_search_prefixMatch():
+    assert makeIndex().search("infin") == [1]
+
+
+def test_search_allWordsMustMatch():
+    assert makeIndex().search("attack damage slight") == [3]
+
+
+def test_search_nameMatchesRankFirst():
+    # "edge" is in the name of 1 and in the description of 2
+    assert makeIndex().search("edge") == [1, 2]
+
+
+def test_search_facets():
+    index = makeIndex()
+    # Plaintext match (3) weights more than a description match (1)
+    assert index.search("damage", tags=["Damage"]) == [3, 1]
+    assert index.search("", tags=["Damage"], stats=["FlatPhysicalDamageMod"]) == [1]
+    assert index.search("", effects=["Effect1Amount"]) == [2]
+    assert index.search("", tags=["Unknown"]) == []
+
+
+def test_search_withoutWordsSortsByName():
+    assert makeIndex().search("") == [1, 3, 2]
+
+
+def test_search_limitAndOffset():
+    assert makeIndex().search("", limit=1, offset=1) == [3]
+
+
+def test_makePrefixTsQuery_onlyKeepsWords():
+    assert makePrefixTsQuery("Infinity ed") == "infinity:* & ed:*"
+    assert makePrefixTsQuery("a' | !b:* & (c") == "a:* & b:* & c:*"
+    assert makePrefixTsQuery("  !!  ") is None
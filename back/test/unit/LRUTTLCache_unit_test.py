@@ -0,0 +1,59 @@
+from app.data.LRUTTLCache import LRUTTLCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_get_returns_value_until_ttl():
+    clock = FakeClock()
+    cache: LRUTTLCache[int] = LRUTTLCache(10, 5, clock)
+    cache.set("a", 1)
+    clock.now = 4.9
+    assert cache.get("a") == 1
+    clock.now = 5
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_set_evicts_least_recently_used():
+    cache: LRUTTLCache[int] = LRUTTLCache(2, 60, FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    # Reading "a" makes "b" the least recently used
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+def test_set_again_refreshes_ttl_and_value():
+    clock = FakeClock()
+    cache: LRUTTLCache[int] = LRUTTLCache(10, 5, clock)
+    cache.set("a", 1)
+    clock.now = 4
+    cache.set("a", 2)
+    clock.now = 8
+    assert cache.get("a") == 2
+
+
+def test_pop_and_clear():
+    cache: LRUTTLCache[int] = LRUTTLCache(10, 5, FakeClock())
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.pop("a")
+    cache.pop("missing")
+    assert cache.get("a") is None
+    cache.clear()
+    assert cache.get("b") is None
+
+
+def test_zero_size_never_stores():
+    cache: LRUTTLCache[int] = LRUTTLCache(0, 5, FakeClock())
+    cache.set("a", 1)
+    assert cache.get("a") is None
@@ -453,3 +453,32 @@ async def test_determineDeliveryDate_no_items(processor):
     with pytest.raises(ProcessOrderException) as exc_info:
         await processor.determineDeliveryDate(dummyOrder)
     assert "Could not determine delivery date" in str(exc_info.value)
+
+
+@pytest.mark.asyncio
+async def test_updatePurchaseSummary_success(processor):
+    orderData = [
+        OrderDataPerItem(itemId=1, orderId=1, quantity=2, total=200),
+        OrderDataPerItem(itemId=2, orderId=1, quantity=1, total=300),
+    ]
+    with patch(
+        "app.orders.OrderProcessor.addOrderToPurchaseSummary",
+        new=AsyncMock(return_value=None),
+    ) as addToSummary:
+        await processor.updatePurchaseSummary(7, STATIC_DATA_ORDER1, orderData)
+        addToSummary.assert_awaited_once_with(
+            processor.dbSession,
+            7,
+            STATIC_DATA_ORDER1.orderDate.date(),
+            [(1, 2, 200), (2, 1, 300)],
+        )
+
+
+@pytest.mark.asyncio
+async def test_updatePurchaseSummary_sqlalchemy_error(processor):
+    with patch(
+        "app.orders.OrderProcessor.addOrderToPurchaseSummary",
+        new=AsyncMock(side_effect=SQLAlchemyError("DB error")),
+    ):
+        with pytest.raises(ProcessOrderException):
+            await processor.updatePurchaseSummary(7, STATIC_DATA_ORDER1, [])
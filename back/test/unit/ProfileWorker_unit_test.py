@@ -4,6 +4,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.profile.ProfileWorker import ProfileWorker
+from app.profile.ProfileCache import profileCache
 from app.customExceptions import ProfileWorkerException, UserNoGoldRow
 from staticData import (
     STATIC_ORDER_SUMMARY1,
@@ -17,6 +18,7 @@ from staticData import (
 def worker() -> ProfileWorker:
     mockSession = MagicMock(spec=AsyncSession)
     worker = ProfileWorker(mockSession)
+    profileCache.clear()
     return worker
 
 
@@ -108,7 +110,7 @@ async def test_buildOrderSummaryForUser_success(worker: ProfileWorker):
     ]
 
     with patch(
-        "app.profile.ProfileWorker.getUniqueItemNamesQuantityAndBasePriceByUserName",
+        "app.profile.ProfileWorker.getPurchaseSummaryByUserName",
         new=AsyncMock(return_value=fakeOrderSummaryList),
     ):
         result = await worker.buildOrderSummaryForUser(userName)
@@ -120,9 +122,45 @@ async def test_buildOrderSummaryForUser_sqlalchemy_error(worker: ProfileWorker):
     userName = "testuser"
 
     with patch(
-        "app.profile.ProfileWorker.getUniqueItemNamesQuantityAndBasePriceByUserName",
+        "app.profile.ProfileWorker.getPurchaseSummaryByUserName",
         new=AsyncMock(side_effect=SQLAlchemyError("DB error")),
     ):
         with pytest.raises(ProfileWorkerException) as excinfo:
             await worker.buildOrderSummaryForUser(userName)
         assert "SQLAlchemyError" in str(excinfo.value)
+
+
+@pytest.mark.asyncio
+async def test_getUserGoldWithUserName_cached(worker: ProfileWorker):
+    userName = "testuser"
+
+    with patch(
+        "app.profile.ProfileWorker.getCurrentUserGoldWithUserName",
+        new=AsyncMock(return_value=1000),
+    ) as getGold:
+        assert await worker.getUserGoldWithUserName(userName) == 1000
+        assert await worker.getUserGoldWithUserName(userName) == 1000
+        assert getGold.await_count == 1
+
+        profileCache.invalidate(userName)
+        getGold.return_value = 700
+        assert await worker.getUserGoldWithUserName(userName) == 700
+        assert getGold.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_getProfileInfo_cached(worker: ProfileWorker):
+    userName = "testuser"
+
+    with patch(
+        "app.profile.ProfileWorker.getUserInDB",
+        new=AsyncMock(return_value=STATIC_DATA_USER_IN_DB1.model_copy()),
+    ) as getUser, patch.object(
+        worker,
+        "buildOrderSummaryForUser",
+        new=AsyncMock(return_value=[STATIC_ORDER_SUMMARY1]),
+    ):
+        first = await worker.getProfileInfo(userName)
+        second = await worker.getProfileInfo(userName)
+        assert first == second
+        assert getUser.await_count == 1
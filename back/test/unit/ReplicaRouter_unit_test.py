@@ -0,0 +1,92 @@
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, patch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from app.data.ReplicaRouter import ReplicaRouter
+
+
+async def makeSqliteDatabase(path, value: str):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE origin (name TEXT)"))
+        await conn.execute(text("INSERT INTO origin VALUES (:name)"), {"name": value})
+    return engine
+
+
+async def readOrigin(router: ReplicaRouter) -> str:
+    sessionMaker = await router.getReadSessionMaker()
+    async with sessionMaker() as session:
+        result = await session.execute(text("SELECT name FROM origin"))
+        return result.scalar_one()
+
+
+@pytest_asyncio.fixture
+async def databases(tmp_path):
+    primaryEngine = await makeSqliteDatabase(tmp_path / "primary.db", "primary")
+    replicaEngine = await makeSqliteDatabase(tmp_path / "replica.db", "replica")
+    yield primaryEngine, replicaEngine
+    await primaryEngine.dispose()
+    await replicaEngine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_readsGoToReplica(databases):
+    primaryEngine, replicaEngine = databases
+    router = ReplicaRouter(
+        async_sessionmaker(primaryEngine),
+        replicaEngine,
+        async_sessionmaker(replicaEngine),
+    )
+    assert await readOrigin(router) == "replica"
+    assert router.lastLag == 0.0
+
+
+@pytest.mark.asyncio
+async def test_withoutReplicaReadsGoToPrimary(databases):
+    primaryEngine, _ = databases
+    router = ReplicaRouter(async_sessionmaker(primaryEngine))
+    assert await readOrigin(router) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_fallsBackToPrimaryWhenLagging(databases):
+    primaryEngine, replicaEngine = databases
+    router = ReplicaRouter(
+        async_sessionmaker(primaryEngine),
+        replicaEngine,
+        async_sessionmaker(replicaEngine),
+        maxLagSeconds=5,
+    )
+    with patch.object(router, "measureLag", new=AsyncMock(return_value=30.0)):
+        assert await readOrigin(router) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_fallsBackToPrimaryWhenReplicaFails(databases):
+    primaryEngine, replicaEngine = databases
+    router = ReplicaRouter(
+        async_sessionmaker(primaryEngine),
+        replicaEngine,
+        async_sessionmaker(replicaEngine),
+    )
+    with patch.object(
+        router, "measureLag", new=AsyncMock(side_effect=ConnectionError("down"))
+    ):
+        assert await readOrigin(router) == "primary"
+
+
+@pytest.mark.asyncio
+async def test_lagIsCheckedOncePerInterval(databases):
+    primaryEngine, replicaEngine = databases
+    router = ReplicaRouter(
+        async_sessionmaker(primaryEngine),
+        replicaEngine,
+        async_sessionmaker(replicaEngine),
+        checkInterval=60,
+    )
+    measureLag = AsyncMock(return_value=0.0)
+    with patch.object(router, "measureLag", new=measureLag):
+        for _ in range(3):
+            assert await readOrigin(router) == "replica"
+    measureLag.assert_awaited_once()
@@ -3,13 +3,16 @@ from unittest.mock import AsyncMock, MagicMock, patch
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.reviews.ReviewProcessor import ReviewProcessor
-from app.schemas.Review import Review, Comment
+from app.schemas.Review import OrderReviews, Review, Comment
 from app.customExceptions import (
+    InvalidCursorException,
     InvalidRatingException,
+    InvalidReviewBatchException,
     InvalidUserReview,
     ReviewProcessorException,
 )
 from datetime import datetime
+from app.data.pagination import decodeCursor, encodeCursor
 
 
 @pytest.fixture
@@ -82,6 +85,12 @@ async def test_addReviewAndComments_success(processor, mockReview):
     ), patch(
         "app.reviews.ReviewProcessor.addComment",
         new=AsyncMock(return_value=None),
+    ), patch(
+        "app.reviews.ReviewProcessor.ensureReviewSummaries",
+        new=AsyncMock(return_value=None),
+    ), patch(
+        "app.reviews.ReviewProcessor.applyRatingToReviewSummary",
+        new=AsyncMock(return_value=True),
     ), patch(
         "app.reviews.ReviewProcessor.markOrderAsReviewed",
         new=AsyncMock(return_value=None),
@@ -143,6 +152,9 @@ async def test_updateReviewAndComments_success(processor, mockReview):
     with patch(
         "app.reviews.ReviewProcessor.getUserIdByOrderId",
         new=AsyncMock(return_value=userOrderId),
+    ), patch(
+        "app.reviews.ReviewProcessor.getReviewById",
+        new=AsyncMock(return_value=MagicMock(rating=5, item_id=201)),
     ), patch(
         "app.reviews.ReviewProcessor.updateReview",
         new=AsyncMock(return_value=None),
@@ -165,6 +177,9 @@ async def test_updateReviewAndComments_noExistingComments(processor, mockReview)
     with patch(
         "app.reviews.ReviewProcessor.getUserIdByOrderId",
         new=AsyncMock(return_value=userOrderId),
+    ), patch(
+        "app.reviews.ReviewProcessor.getReviewById",
+        new=AsyncMock(return_value=MagicMock(rating=5, item_id=201)),
     ), patch(
         "app.reviews.ReviewProcessor.updateReview",
         new=AsyncMock(return_value=None),
@@ -199,6 +214,9 @@ async def test_updateReviewAndComments_dbError(processor, mockReview):
     with patch(
         "app.reviews.ReviewProcessor.getUserIdByOrderId",
         new=AsyncMock(return_value=userOrderId),
+    ), patch(
+        "app.reviews.ReviewProcessor.getReviewById",
+        new=AsyncMock(return_value=MagicMock(rating=5, item_id=201)),
     ), patch(
         "app.reviews.ReviewProcessor.updateReview",
         new=AsyncMock(side_effect=SQLAlchemyError("DB error")),
@@ -263,3 +281,208 @@ async def test_getReviewsAndCommentsByItemId_dbError(processor):
     ):
         with pytest.raises(ReviewProcessorException):
             await processor.getReviewsAndCommentsByItemId(itemId)
+
+
+@pytest.mark.asyncio
+async def test_addReviewAndComments_seedsThenIncrementsSummary(processor, mockReview):
+    calls = MagicMock()
+    calls.ensureReviewSummaries = AsyncMock(return_value=None)
+    calls.applyRatingToReviewSummary = AsyncMock(return_value=True)
+    with patch(
+        "app.reviews.ReviewProcessor.getUserIdByOrderId",
+        new=AsyncMock(return_value=123),
+    ), patch(
+        "app.reviews.ReviewProcessor.addReview",
+        new=AsyncMock(return_value=301),
+    ), patch(
+        "app.reviews.ReviewProcessor.addComment",
+        new=AsyncMock(return_value=None),
+    ), patch(
+        "app.reviews.ReviewProcessor.ensureReviewSummaries",
+        new=calls.ensureReviewSummaries,
+    ), patch(
+        "app.reviews.ReviewProcessor.applyRatingToReviewSummary",
+        new=calls.applyRatingToReviewSummary,
+    ), patch(
+        "app.reviews.ReviewProcessor.markOrderAsReviewed",
+        new=AsyncMock(return_value=None),
+    ):
+        await processor.addReviewAndComments(mockReview, 123)
+    assert [name for name, _, _ in calls.mock_calls] == [
+        "ensureReviewSummaries",
+        "applyRatingToReviewSummary",
+    ]
+    calls.ensureReviewSummaries.assert_awaited_once_with(
+        processor.dbSession, [mockReview.itemId]
+    )
+
+
+@pytest.mark.asyncio
+async def test_updateReviewAndComments_movesRatingInSummary(processor, mockReview):
+    applyRating = AsyncMock(return_value=True)
+    with patch(
+        "app.reviews.ReviewProcessor.getUserIdByOrderId",
+        new=AsyncMock(return_value=123),
+    ), patch(
+        "app.reviews.ReviewProcessor.getReviewById",
+        new=AsyncMock(return_value=MagicMock(rating=2, item_id=201)),
+    ), patch(
+        "app.reviews.ReviewProcessor.applyRatingToReviewSummary",
+        new=applyRating,
+    ), patch(
+        "app.reviews.ReviewProcessor.updateReview",
+        new=AsyncMock(return_value=None),
+    ), patch(
+        "app.reviews.ReviewProcessor.getCommentsByReviewId",
+        new=AsyncMock(return_value=[]),
+    ), patch(
+        "app.reviews.ReviewProcessor.addComment",
+        new=AsyncMock(return_value=None),
+    ):
+        await processor.updateReviewAndComments(mockReview, 123)
+    applyRating.assert_awaited_once_with(processor.dbSession, 201, 5, 2)
+
+
+@pytest.mark.asyncio
+async def test_getReviewSummaries_keepsOrderAndFillsMissing(processor):
+    summaryTable = MagicMock(
+        item_id=2,
+        review_count=2,
+        rating_sum=9,
+        rating_1=0,
+        rating_2=0,
+        rating_3=0,
+        rating_4=1,
+        rating_5=1,
+        updated_at=datetime.now(),
+    )
+    with patch(
+        "app.reviews.ReviewProcessor.getReviewSummariesByItemIds",
+        new=AsyncMock(return_value=[summaryTable]),
+    ):
+        summaries = await processor.getReviewSummaries([3, 2, 3])
+    assert [summary.itemId for summary in summaries] == [3, 2]
+    assert summaries[0].count == 0
+    assert summaries[0].averageRating is None
+    assert summaries[1].averageRating == 4.5
+    assert summaries[1].ratingCounts == [0, 0, 0, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_getReviewSummaries_dbError(processor):
+    with patch(
+        "app.reviews.ReviewProcessor.getReviewSummariesByItemIds",
+        new=AsyncMock(side_effect=SQLAlchemyError("DB error")),
+    ):
+        with pytest.raises(ReviewProcessorException):
+            await processor.getReviewSummaries([1])
+
+
+def makeReviewTable(reviewId: int, createdAt: datetime) -> MagicMock:
+    return MagicMock(
+        id=reviewId,
+        order_id=100 + reviewId,
+        item_id=201,
+        rating=4,
+        created_at=createdAt,
+        updated_at=createdAt,
+        comments=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_getReviewsPage_returnsNextCursor(processor):
+    reviewTables = [makeReviewTable(reviewId, datetime(2025, 1, reviewId)) for reviewId in (3, 2, 1)]
+    getReviewsPage = AsyncMock(return_value=reviewTables)
+    with patch(
+        "app.reviews.ReviewProcessor.getReviewsPage", new=getReviewsPage
+    ), patch(
+        "app.reviews.ReviewProcessor.loadCommentsPreview",
+        new=AsyncMock(return_value={3: 4, 2: 0}),
+    ):
+        page = await processor.getReviewsPage(2, itemId=201)
+    assert [review.id for review in page.reviews] == [3, 2]
+    assert page.reviews[0].commentCount == 4
+    assert decodeCursor(page.nextCursor) == (datetime(2025, 1, 2), 2)
+    # One extra row is requested to know if there is a next page
+    assert getReviewsPage.await_args.args[1] == 3
+
+
+@pytest.mark.asyncio
+async def test_getReviewsPage_lastPageHasNoCursor(processor):
+    with patch(
+        "app.reviews.ReviewProcessor.getReviewsPage",
+        new=AsyncMock(return_value=[makeReviewTable(1, datetime(2025, 1, 1))]),
+    ), patch(
+        "app.reviews.ReviewProcessor.loadCommentsPreview",
+        new=AsyncMock(return_value={1: 0}),
+    ):
+        page = await processor.getReviewsPage(2, cursor=encodeCursor(datetime(2025, 1, 2), 2))
+    assert page.nextCursor is None
+
+
+@pytest.mark.asyncio
+async def test_getReviewsPage_invalidCursor(processor):
+    with pytest.raises(InvalidCursorException):
+        await processor.getReviewsPage(2, cursor="not a cursor")
+
+
+@pytest.mark.asyncio
+async def test_addOrderReviews_success(processor, mockReview):
+    secondReview = mockReview.model_copy(update={"itemId": 202, "rating": 3, "comments": []})
+    addReviews = AsyncMock(return_value={201: 1, 202: 2})
+    addComments = AsyncMock(return_value=None)
+    markOrderAsReviewed = AsyncMock(return_value=None)
+    with patch(
+        "app.reviews.ReviewProcessor.getUserIdByOrderId",
+        new=AsyncMock(return_value=123),
+    ), patch(
+        "app.reviews.ReviewProcessor.addReviews", new=addReviews
+    ), patch(
+        "app.reviews.ReviewProcessor.addComments", new=addComments
+    ), patch(
+        "app.reviews.ReviewProcessor.ensureReviewSummaries",
+        new=AsyncMock(return_value=None),
+    ), patch(
+        "app.reviews.ReviewProcessor.applyRatingToReviewSummary",
+        new=AsyncMock(return_value=True),
+    ), patch(
+        "app.reviews.ReviewProcessor.markOrderAsReviewed", new=markOrderAsReviewed
+    ):
+        await processor.addOrderReviews(
+            OrderReviews(orderId=101, reviews=[mockReview, secondReview]), 123
+        )
+    addReviews.assert_awaited_once_with(processor.dbSession, 101, {201: 5, 202: 3})
+    addComments.assert_awaited_once_with(
+        processor.dbSession, [(1, 123, "Great product!")]
+    )
+    markOrderAsReviewed.assert_awaited_once_with(processor.dbSession, 101)
+
+
+@pytest.mark.asyncio
+async def test_addOrderReviews_differentOrder(processor, mockReview):
+    otherOrderReview = mockReview.model_copy(update={"orderId": 999, "itemId": 202})
+    with pytest.raises(InvalidReviewBatchException):
+        await processor.addOrderReviews(
+            OrderReviews(orderId=101, reviews=[mockReview, otherOrderReview]), 123
+        )
+
+
+@pytest.mark.asyncio
+async def test_addOrderReviews_repeatedItem(processor, mockReview):
+    with pytest.raises(InvalidReviewBatchException):
+        await processor.addOrderReviews(
+            OrderReviews(orderId=101, reviews=[mockReview, mockReview]), 123
+        )
+
+
+@pytest.mark.asyncio
+async def test_addOrderReviews_invalidUser(processor, mockReview):
+    with patch(
+        "app.reviews.ReviewProcessor.getUserIdByOrderId",
+        new=AsyncMock(return_value=456),
+    ):
+        with pytest.raises(InvalidUserReview):
+            await processor.addOrderReviews(
+                OrderReviews(orderId=101, reviews=[mockReview]), 123
+            )
@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from app.services import SchedulerLeaderElector as electorModule
+from app.services.SchedulerLeaderElector import SchedulerLeaderElector
+
+
+def makeElector(monkeypatch, lockResult: bool = True, stalePid=None):
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    connection = AsyncMock()
+    engine.connect = AsyncMock(return_value=connection)
+    queries = {
+        "tryAdvisoryLock": AsyncMock(return_value=lockResult),
+        "pingConnection": AsyncMock(),
+        "upsertLeaderHeartbeat": AsyncMock(),
+        "getStaleLockHolderPid": AsyncMock(return_value=stalePid),
+        "terminateBackend": AsyncMock(return_value=True),
+    }
+    for name, mock in queries.items():
+        monkeypatch.setattr(electorModule, name, mock)
+    elector = SchedulerLeaderElector(engine, heartbeatSeconds=10, nodeId="node-1")
+    return elector, connection, queries
+
+
+@pytest.mark.asyncio
+async def test_step_keeps_leadership_when_heartbeat_write_fails(monkeypatch):
+    elector, connection, queries = makeElector(monkeypatch)
+    queries["upsertLeaderHeartbeat"].side_effect = RuntimeError("table missing")
+
+    await elector.step()
+    await elector.step()
+
+    assert elector.isLeader()
+    assert queries["tryAdvisoryLock"].await_count == 1
+    queries["pingConnection"].assert_awaited_once()
+    assert connection.rollback.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_closeConnection_invalidates_the_lock_session(monkeypatch):
+    elector, connection, _ = makeElector(monkeypatch)
+    await elector.step()
+
+    await elector.closeConnection()
+
+    connection.invalidate.assert_awaited_once()
+    assert elector.connection is None
+
+
+@pytest.mark.asyncio
+async def test_standby_terminates_stale_leader(monkeypatch):
+    elector, _, queries = makeElector(monkeypatch, lockResult=False, stalePid=4242)
+
+    await elector.step()
+
+    assert not elector.isLeader()
+    queries["terminateBackend"].assert_awaited_once()
+    assert queries["terminateBackend"].await_args.args[1] == 4242
+
+
+@pytest.mark.asyncio
+async def test_standby_leaves_live_leader_alone(monkeypatch):
+    elector, _, queries = makeElector(monkeypatch, lockResult=False)
+
+    await elector.step()
+
+    queries["terminateBackend"].assert_not_awaited()
@@ -0,0 +1,118 @@
+import time
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.data.database import base
+from app.data.queries.schedulerQueries import getLastJobRuns
+from app.services.SchedulerLeaderElector import SchedulerLeaderElector
+from app.services.SchedulerService import SchedulerService
+
+
+@pytest_asyncio.fixture
+async def sessionMaker():
+    from app.data.models import SchedulerTable
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(base.metadata.create_all)
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    await engine.dispose()
+
+
+def makeElector(leader: bool) -> SchedulerLeaderElector:
+    elector = MagicMock(spec=SchedulerLeaderElector)
+    elector.isLeader.return_value = leader
+    elector.nodeId = "node-1"
+    return elector
+
+
+@pytest.mark.asyncio
+async def test_runTimedJob_records_the_run(sessionMaker):
+    service = SchedulerService(makeElector(True), sessionMaker)
+    job = AsyncMock(return_value=None)
+
+    await service.runTimedJob("update_items", job)
+
+    job.assert_awaited_once()
+    async with sessionMaker() as db:
+        runs = await getLastJobRuns(db, "update_items")
+    assert len(runs) == 1
+    assert runs[0].status == "success"
+    assert runs[0].node_id == "node-1"
+    assert runs[0].finished_at is not None
+    assert runs[0].duration_seconds >= 0
+
+
+@pytest.mark.asyncio
+async def test_runTimedJob_records_the_error(sessionMaker):
+    service = SchedulerService(makeElector(True), sessionMaker)
+    job = AsyncMock(side_effect=RuntimeError("CDN down"))
+
+    with pytest.raises(RuntimeError):
+        await service.runTimedJob("update_items", job)
+
+    async with sessionMaker() as db:
+        runs = await getLastJobRuns(db, "update_items")
+    assert runs[0].status == "error"
+    assert runs[0].error == "CDN down"
+
+
+@pytest.mark.asyncio
+async def test_failing_items_update_is_recorded_as_error(sessionMaker):
+    service = SchedulerService(makeElector(True), sessionMaker)
+    service.itemsLoader = MagicMock()
+    service.itemsLoader.updateItems = AsyncMock(side_effect=RuntimeError("CDN down"))
+
+    with pytest.raises(RuntimeError):
+        await service.runTimedJob("update_items", service.updateItemsJob)
+
+    async with sessionMaker() as db:
+        runs = await getLastJobRuns(db, "update_items")
+    assert runs[0].status == "error"
+    assert runs[0].error == "CDN down"
+
+
+@pytest.mark.asyncio
+async def test_runTimedJob_skipped_when_not_leader(sessionMaker):
+    service = SchedulerService(makeElector(False), sessionMaker)
+    job = AsyncMock(return_value=None)
+
+    await service.runTimedJob("update_items", job)
+
+    job.assert_not_awaited()
+    async with sessionMaker() as db:
+        assert await getLastJobRuns(db, "update_items") == []
+
+
+@pytest.mark.asyncio
+async def test_runTimedJob_runs_when_recording_fails():
+    brokenSessionMaker = MagicMock(side_effect=ConnectionRefusedError("database down"))
+    service = SchedulerService(makeElector(True), brokenSessionMaker)
+    job = AsyncMock(return_value=None)
+
+    await service.runTimedJob("update_items", job)
+
+    job.assert_awaited_once()
+
+
+def test_elector_without_advisory_locks_is_always_leader():
+    engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+    elector = SchedulerLeaderElector(engine, heartbeatSeconds=1)
+    assert elector.isLeader()
+
+
+def test_elector_leadership_expires_without_heartbeat():
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    elector = SchedulerLeaderElector(engine, heartbeatSeconds=1)
+    assert not elector.isLeader()
+    elector.setLeader(True)
+    assert not elector.isLeader()
+    elector.lastHeartbeat = time.monotonic()
+    assert elector.isLeader()
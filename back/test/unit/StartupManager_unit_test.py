@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.data.database import base
+from app.items.ItemCatalog import itemCatalog
+from app.services.StartupManager import DONE, FAILED, PENDING, StartupManager
+
+
+class FakeInitializer:
+    calls: int = 0
+    failures: int = 0
+
+    def __init__(self, db: AsyncSession) -> None:
+        self.db = db
+        self.itemsLoader = "loader"
+
+    async def initializeSystem(self) -> None:
+        FakeInitializer.calls += 1
+        if FakeInitializer.calls <= FakeInitializer.failures:
+            raise RuntimeError("Data Dragon unreachable")
+
+
+@pytest_asyncio.fixture
+async def sessionMaker():
+    from app.data.models import GoldTable, ItemTable, TagsTable, StatsTable, EffectsTable
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(base.metadata.create_all)
+    FakeInitializer.calls = 0
+    FakeInitializer.failures = 0
+    yield async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    itemCatalog.invalidate()
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_start_serves_before_the_system_initialization(sessionMaker):
+    manager = StartupManager(sessionMaker, FakeInitializer, retrySeconds=0.01)
+    readyWith = []
+    manager.onSystemReady.append(lambda initializer: readyWith.append(initializer))
+
+    await manager.start()
+    # Empty database: nothing to serve until the background initialization ends
+    assert manager.phases["database"] == DONE
+    assert manager.phases["catalog"] == DONE
+    assert manager.phases["system"] == PENDING
+    assert not manager.isReady()
+
+    await asyncio.wait_for(manager.task, 1)
+    assert manager.isReady()
+    assert manager.status()["status"] == "ready"
+    assert readyWith[0].itemsLoader == "loader"
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_initialization_is_retried(sessionMaker):
+    FakeInitializer.failures = 2
+    manager = StartupManager(sessionMaker, FakeInitializer, retrySeconds=0.01)
+
+    await manager.start()
+    await asyncio.wait_for(manager.task, 1)
+    assert FakeInitializer.calls == 3
+    assert manager.attempts == 3
+    assert manager.phases["system"] == DONE
+    assert manager.status()["errors"] == {}
+    await manager.stop()
+
+
+@pytest.mark.asyncio
+async def test_database_down_is_not_ready():
+    FakeInitializer.calls = 0
+    def brokenSessionMaker():
+        raise ConnectionRefusedError("database down")
+
+    manager = StartupManager(brokenSessionMaker, FakeInitializer, retrySeconds=10)
+    await manager.start()
+    assert manager.phases["database"] == FAILED
+    assert not manager.isReady()
+    assert "database down" in manager.status()["errors"]["database"]
+    await manager.stop()
+    assert FakeInitializer.calls == 0
+
+
+@pytest.mark.asyncio
+async def test_checkReady_rate_limits_the_database_check(sessionMaker):
+    manager = StartupManager(sessionMaker, FakeInitializer, checkSeconds=60)
+    await manager.start()
+    await asyncio.wait_for(manager.task, 1)
+    checks = []
+
+    async def countingCheck():
+        checks.append(True)
+        raise ConnectionRefusedError("database down")
+
+    manager.checkDatabase = countingCheck
+    assert not await manager.checkReady()
+    assert not await manager.checkReady()
+    assert len(checks) == 1
+    assert manager.status()["status"] == "starting"
+    await manager.stop()
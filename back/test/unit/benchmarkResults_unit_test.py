@@ -0,0 +1,64 @@
+import argparse
+import pytest
+from benchmarks.benchmarkResults import (
+    compareResults,
+    percentile,
+    readResults,
+    summarizeLatencies,
+    writeResults,
+)
+from benchmarks.httpBenchmark import RouteRecorder, parseMix
+
+
+def test_percentile_uses_the_nearest_rank():
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.95) == 95.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([7.0], 0.99) == 7.0
+    assert percentile([], 0.5) == 0.0
+
+
+def test_summarizeLatencies_reports_milliseconds():
+    summary = summarizeLatencies([0.003, 0.001, 0.002])
+    assert summary["count"] == 3
+    assert summary["p50Ms"] == 2.0
+    assert summary["maxMs"] == 3.0
+    assert summary["meanMs"] == 2.0
+
+
+def test_compareResults_flags_only_regressions_over_the_tolerance():
+    baseline = {"GET /a": {"p95Ms": 10.0}, "GET /b": {"p95Ms": 10.0}, "GET /old": {}}
+    current = {"GET /a": {"p95Ms": 10.5}, "GET /b": {"p95Ms": 13.0}, "GET /new": {}}
+
+    comparison = compareResults(baseline, current, "p95Ms", 0.10)
+
+    assert [entry["name"] for entry in comparison] == ["GET /a", "GET /b"]
+    assert [entry["regression"] for entry in comparison] == [False, True]
+
+
+def test_results_round_trip(tmp_path):
+    path = tmp_path / "results" / "http.json"
+    writeResults(str(path), {"routes": {"GET /a": {"p95Ms": 1.5}}})
+    assert readResults(str(path)) == {"routes": {"GET /a": {"p95Ms": 1.5}}}
+
+
+def test_routeRecorder_counts_errors_per_route():
+    recorder = RouteRecorder()
+    recorder.record("GET /a", 0.01, 200)
+    recorder.record("GET /a", 0.02, 500)
+    recorder.enabled = False
+    recorder.record("GET /a", 0.03, 200)
+
+    summary = recorder.summary(elapsed=2.0)
+
+    assert summary["GET /a"]["count"] == 2
+    assert summary["GET /a"]["errors"] == 1
+    assert summary["GET /a"]["throughput"] == 1.0
+    assert summary["GET /a"]["statuses"] == {"200": 1, "500": 1}
+
+
+def test_parseMix():
+    assert parseMix("browse=3,checkout=1") == {"browse": 3, "checkout": 1}
+    with pytest.raises(argparse.ArgumentTypeError):
+        parseMix("dance=1")
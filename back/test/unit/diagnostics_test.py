@@ -0,0 +1,130 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.diagnostics.MemoryTracker import memoryTracker
+from app.diagnostics.SamplingProfiler import SamplingProfiler
+from app.routes import diagnostics
+from app.routes.auth import getCurrentUserTokenFlow
+
+app = FastAPI()
+app.include_router(diagnostics.router, prefix="/diagnostics")
+client = TestClient(app)
+
+
+def fake_getCurrentUserTokenFlow() -> str:
+    return "adminUser"
+
+
+app.dependency_overrides[getCurrentUserTokenFlow] = fake_getCurrentUserTokenFlow
+
+
+@pytest.fixture(autouse=True)
+def admins():
+    with patch("app.routes.diagnostics.ADMIN_USER_NAMES", {"adminUser"}):
+        yield
+    memoryTracker.stop()
+
+
+def busyWork(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+def test_non_admin_is_rejected():
+    with patch("app.routes.diagnostics.ADMIN_USER_NAMES", {"someoneElse"}):
+        response = client.get("/diagnostics/tasks")
+    assert response.status_code == 403
+
+
+def test_profile_returns_collapsed_stacks():
+    profiler = SamplingProfiler()
+    with patch("app.routes.diagnostics.samplingProfiler", profiler):
+        assert client.get("/diagnostics/profile").status_code == 404
+
+        response = client.post(
+            "/diagnostics/profile/start", params={"seconds": 5, "interval_ms": 1}
+        )
+        assert response.status_code == 200
+        assert response.json()["running"] is True
+        assert client.post("/diagnostics/profile/start").status_code == 409
+        busyWork(0.2)
+        response = client.post("/diagnostics/profile/stop")
+
+    assert response.status_code == 200
+    assert "attachment" in response.headers["content-disposition"]
+    lines = response.text.splitlines()
+    assert lines
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+    assert any("busyWork" in line for line in lines)
+    assert profiler.status().running is False
+
+
+def test_profile_duration_is_capped():
+    response = client.post("/diagnostics/profile/start", params={"seconds": 100000})
+    assert response.status_code == 422
+
+
+def test_memory_diff_needs_a_baseline():
+    assert client.get("/diagnostics/memory/diff").status_code == 409
+
+    response = client.post("/diagnostics/memory/baseline")
+    assert response.json()["tracing"] is True
+    leak = [bytearray(1024) for _ in range(200)]
+    response = client.get("/diagnostics/memory/diff", params={"limit": 5})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["stats"]) <= 5
+    assert any(
+        "diagnostics_test.py" in "".join(stat["location"]) for stat in body["stats"]
+    )
+    assert client.post("/diagnostics/memory/stop").json()["tracing"] is False
+    del leak
+
+
+def test_blocking_calls_run_off_the_event_loop():
+    calledOnLoop = []
+
+    def recordLoop(function):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                calledOnLoop.append(True)
+            except RuntimeError:
+                calledOnLoop.append(False)
+            return function(*args)
+
+        return wrapper
+
+    profiler = SamplingProfiler()
+    with patch("app.routes.diagnostics.samplingProfiler", profiler), patch.object(
+        profiler, "stop", recordLoop(profiler.stop)
+    ), patch.object(
+        memoryTracker, "takeBaseline", recordLoop(memoryTracker.takeBaseline)
+    ), patch.object(
+        memoryTracker, "diff", recordLoop(memoryTracker.diff)
+    ), patch.object(
+        memoryTracker, "stop", recordLoop(memoryTracker.stop)
+    ):
+        assert client.post("/diagnostics/profile/stop").status_code == 404
+        assert client.post("/diagnostics/memory/baseline").status_code == 200
+        assert client.get("/diagnostics/memory/diff").status_code == 200
+        assert client.post("/diagnostics/memory/stop").status_code == 200
+
+    assert calledOnLoop == [False] * 4
+
+
+def test_tasks_are_listed():
+    response = client.get("/diagnostics/tasks")
+    assert response.status_code == 200
+    assert all("stack" in task for task in response.json())
+
+
+def test_slow_callbacks_without_monitor():
+    response = client.get("/diagnostics/slow_callbacks")
+    assert response.status_code == 200
+    assert response.json() == []
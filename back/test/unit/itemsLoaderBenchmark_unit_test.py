@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+import pytest
+from benchmarks.itemsLoaderBenchmark import (
+    DEFAULT_FIXTURE,
+    PhaseRecorder,
+    runPipeline,
+    scaleItemsJson,
+)
+
+
+@pytest.fixture
+def fixture() -> dict:
+    with open(DEFAULT_FIXTURE) as file:
+        return json.load(file)
+
+
+def test_scaleItemsJson_clones_items_with_unique_ids_and_names(fixture):
+    scaled = scaleItemsJson(fixture, 3)
+
+    names = [node["name"] for node in scaled["data"].values()]
+    assert len(scaled["data"]) == 3 * len(fixture["data"])
+    assert len(set(names)) == len(names)
+    assert all(itemId.isdigit() for itemId in scaled["data"])
+    assert scaled["version"] == fixture["version"]
+
+
+@pytest.mark.asyncio
+async def test_runPipeline_times_every_phase_in_memory(fixture):
+    recorder = PhaseRecorder(traceAllocations=False)
+
+    itemCount = await runPipeline(json.dumps(fixture), "memory", None, recorder)
+
+    assert itemCount == len(fixture["data"])
+    assert {
+        "json_load",
+        "parse",
+        "unique_stats",
+        "db_tags",
+        "db_items_insert",
+        "db_items_insert.insertOrUpdateItemTable",
+        "db_items_update",
+    } <= set(recorder.seconds)
+
+
+def test_main_keeps_the_log_level_after_importing_the_loader(tmp_path):
+    # A fresh process, app.logger is first imported by the pipeline as in a real run
+    script = (
+        "from benchmarks.benchmarkResults import appLogLevel\n"
+        "with appLogLevel('WARNING'):\n"
+        "    import app.data.ItemsLoader\n"
+        "    from app.logger import logger, queueHandler\n"
+        "    print(logger.level, queueHandler.level)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True
+    )
+    assert result.stdout.split() == ["30", "30"]
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.itemsLoaderBenchmark",
+            "--scales",
+            "1",
+            "--repeat",
+            "1",
+            "--warmup",
+            "0",
+            "--output",
+            str(tmp_path / "itemsLoader.json"),
+        ],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert "Function called" not in result.stderr
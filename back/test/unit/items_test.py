@@ -1,7 +1,16 @@
 import pytest
 from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
 from app.main import app
+from app.items.ItemCatalog import ItemCatalog
+from app.data import database
+from app.data.database import base
+from app.data.models.GoldTable import GoldTable
+from app.data.models.ItemTable import ItemTable
+from app.routes.items import getItemCatalog
 from staticData import (
     STATIC_DATA_ITEM1,
     STATIC_DATA_ITEM2,
@@ -164,3 +173,196 @@ async def test_get_unique_effects_error():
         response = client.get("/items/unique_effects")
 
         assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_search_items_success():
+    """Test the search endpoint forwards the query and facets."""
+    with patch(
+        "app.items.ItemSearcher.ItemSearcher.search",
+        new=AsyncMock(return_value=[STATIC_DATA_ITEM1]),
+    ) as search:
+        response = client.get("/items/search?q=sword&tags=Damage&tags=Lane&limit=5")
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == STATIC_DATA_ITEM1.name
+        search.assert_awaited_once_with("sword", ["Damage", "Lane"], [], [], 5, 0)
+
+
+@pytest.mark.asyncio
+async def test_search_items_error():
+    """Test error handling when the search fails."""
+    with patch(
+        "app.items.ItemSearcher.ItemSearcher.search",
+        new=AsyncMock(side_effect=Exception("Database error")),
+    ):
+        response = client.get("/items/search?q=sword")
+        assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_filter_items_success():
+    """Test the filter endpoint answers from the catalog facet index."""
+    catalog = ItemCatalog()
+    catalog.load([STATIC_DATA_ITEM1, STATIC_DATA_ITEM2])
+    app.dependency_overrides[getItemCatalog] = lambda: catalog
+    try:
+        cost = STATIC_DATA_ITEM1.gold.base
+        response = client.get(
+            "/items/filter", params={"min_cost": cost, "max_cost": cost}
+        )
+        assert response.status_code == 200
+        body = response.json()
+        assert body["total"] == len(
+            [
+                item
+                for item in (STATIC_DATA_ITEM1, STATIC_DATA_ITEM2)
+                if item.gold.base == cost
+            ]
+        )
+        assert STATIC_DATA_ITEM1.id in [item["id"] for item in body["items"]]
+        assert set(body["facets"]) == {"tags", "stats", "effects"}
+        response = client.get("/items/filter", params={"sort": "cheapest"})
+        assert response.status_code == 422
+    finally:
+        app.dependency_overrides.pop(getItemCatalog)
+
+
+@pytest.mark.asyncio
+async def test_get_all_items_with_fields():
+    """Test the fields parameter goes to the projected query."""
+    projected = [{"id": STATIC_DATA_ITEM1.id, "name": STATIC_DATA_ITEM1.name}]
+    with patch(
+        "app.routes.items.getItemFieldsInBatch",
+        new=AsyncMock(return_value=projected),
+    ) as getItemFields, patch(
+        "app.routes.items.staticDataValidation",
+        new=AsyncMock(return_value=True),
+    ):
+        response = client.get("/items/all?fields=name")
+        assert response.status_code == 200
+        assert response.json() == projected
+        assert getItemFields.await_args.args[1] == frozenset({"id", "name"})
+
+
+@pytest.mark.asyncio
+async def test_get_items_with_unknown_fields():
+    """Test unknown fields are rejected before touching the database."""
+    with patch(
+        "app.routes.items.getItemFieldsInBatch", new=AsyncMock()
+    ) as getItemFields:
+        response = client.get("/items/some?fields=name,price")
+        assert response.status_code == 400
+        assert "price" in response.json()["detail"]
+        getItemFields.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_get_item_cards():
+    """Test the cards endpoint sends the serialized cards of the catalog."""
+    catalog = ItemCatalog()
+    catalog.load([STATIC_DATA_ITEM1])
+    app.dependency_overrides[getItemCatalog] = lambda: catalog
+    try:
+        response = client.get("/items/cards")
+        assert response.status_code == 200
+        assert response.json() == [
+            {
+                "id": STATIC_DATA_ITEM1.id,
+                "name": STATIC_DATA_ITEM1.name,
+                "imageUrl": STATIC_DATA_ITEM1.imageUrl,
+                "cost": STATIC_DATA_ITEM1.gold.base,
+            }
+        ]
+    finally:
+        app.dependency_overrides.pop(getItemCatalog)
+
+
+@pytest.mark.asyncio
+async def test_get_items_by_ids():
+    """Test the ids are forwarded to the catalog and capped."""
+    with patch(
+        "app.items.ItemCatalog.ItemCatalog.getItemsByIds",
+        new=AsyncMock(return_value=[STATIC_DATA_ITEM2, STATIC_DATA_ITEM1]),
+    ) as getItemsByIds:
+        response = client.get(
+            f"/items/by_ids?ids={STATIC_DATA_ITEM2.id}&ids={STATIC_DATA_ITEM1.id}"
+        )
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == [
+            STATIC_DATA_ITEM2.id,
+            STATIC_DATA_ITEM1.id,
+        ]
+        assert getItemsByIds.await_args.args[1] == [
+            STATIC_DATA_ITEM2.id,
+            STATIC_DATA_ITEM1.id,
+        ]
+
+        response = client.get("/items/by_ids?" + "&".join(f"ids={i}" for i in range(101)))
+        assert response.status_code == 422
+        response = client.get("/items/by_ids")
+        assert response.status_code == 422
+
+
+async def makeSession(withItems: bool) -> AsyncSession:
+    from app.data.models import EffectsTable, StatsTable, TagsTable
+
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(base.metadata.create_all)
+        if withItems:
+            await conn.execute(
+                insert(GoldTable).values(
+                    id=1, base_cost=100, total=100, sell=70, purchaseable=True
+                )
+            )
+            await conn.execute(
+                insert(ItemTable).values(
+                    id=1,
+                    name="Sword",
+                    plain_text="",
+                    description="",
+                    image="",
+                    imageUrl="",
+                    updated=False,
+                    gold_id=1,
+                )
+            )
+    return AsyncSession(engine, expire_on_commit=False)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/items/all", "/items/some"])
+@pytest.mark.parametrize("primaryHasItems", [True, False])
+async def test_staticDataValidation_checks_the_primary(path, primaryHasItems):
+    """
+    The replica is empty (or lagging), only an empty primary, the database the
+    loader writes to, starts a full item load.
+    """
+    primary = await makeSession(withItems=primaryHasItems)
+    replica = await makeSession(withItems=False)
+    updateItems = AsyncMock(return_value=None)
+    app.dependency_overrides[database.getDbSession] = lambda: primary
+    app.dependency_overrides[database.getReadDbSession] = lambda: replica
+    try:
+        with patch(
+            "app.data.ItemsLoader.ItemsLoader.updateItems", new=updateItems
+        ), patch(
+            "app.routes.items.getAllItemTableRowsAnMapToItems",
+            new=AsyncMock(return_value=[]),
+        ), patch(
+            "app.routes.items.getSomeItemTableRowsAnMapToItems",
+            new=AsyncMock(return_value=[]),
+        ):
+            response = client.get(path)
+    finally:
+        del app.dependency_overrides[database.getDbSession]
+        del app.dependency_overrides[database.getReadDbSession]
+        for session in (primary, replica):
+            await session.close()
+            await session.bind.dispose()
+    assert response.status_code == 200
+    assert updateItems.await_count == (0 if primaryHasItems else 1)
@@ -0,0 +1,188 @@
+import logging
+import os
+import subprocess
+import sys
+import pytest
+from typing import List
+from unittest.mock import MagicMock, patch
+from app.logger import (
+    BatchLokiHandler,
+    BatchQueueListener,
+    DropOldestQueue,
+    formatArgs,
+    logger,
+    logMethod,
+    parseSampleRates,
+)
+
+
+def makeRecord(message: str, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord("test", level, __file__, 1, message, None, None)
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.batches: List[List[str]] = []
+
+    def handleBatch(self, records: List[logging.LogRecord]) -> None:
+        self.batches.append([record.getMessage() for record in records])
+
+
+def test_dropOldestQueue_dropsOldestWhenFull():
+    logQueue = DropOldestQueue(2)
+    logQueue.put_nowait("first")
+    logQueue.put_nowait("second")
+    logQueue.put_nowait("third")
+    assert logQueue.qsize() == 2
+    assert logQueue.dropped == 1
+    assert logQueue.enqueued == 3
+    assert logQueue.get_nowait() == "second"
+    assert logQueue.get_nowait() == "third"
+
+
+def test_batchQueueListener_drainsQueuedRecordsInOneBatch():
+    logQueue = DropOldestQueue(100)
+    handler = CollectingHandler()
+    listener = BatchQueueListener(logQueue, handler, batchSize=10)
+    for i in range(5):
+        logQueue.put_nowait(makeRecord(f"message {i}"))
+    listener.start()
+    listener.stop()
+    assert sum(len(batch) for batch in handler.batches) == 5
+    assert handler.batches[0][0] == "message 0"
+
+
+def test_batchQueueListener_respectsHandlerLevel():
+    logQueue = DropOldestQueue(100)
+    handler = CollectingHandler()
+    handler.setLevel(logging.ERROR)
+    listener = BatchQueueListener(logQueue, handler, batchSize=10)
+    logQueue.put_nowait(makeRecord("info"))
+    logQueue.put_nowait(makeRecord("error", logging.ERROR))
+    listener.start()
+    listener.stop()
+    assert handler.batches == [["error"]]
+
+
+def test_batchLokiHandler_sendsOneRequestPerBatch():
+    handler = BatchLokiHandler(url="http://loki/api/v1/push", version="1")
+    session = MagicMock()
+    session.post.return_value.status_code = handler.emitter.success_response_code
+    handler.emitter._session = session
+    handler.handleBatch([makeRecord("a"), makeRecord("b"), makeRecord("c")])
+    assert session.post.call_count == 1
+    payload = session.post.call_args.kwargs["json"]
+    assert len(payload["streams"]) == 3
+
+
+def test_batchLokiHandler_stampsTheRecordTime():
+    handler = BatchLokiHandler(url="http://loki/api/v1/push", version="1")
+    session = MagicMock()
+    session.post.return_value.status_code = handler.emitter.success_response_code
+    handler.emitter._session = session
+    record = makeRecord("late")
+    record.created = 1700000000.5
+    handler.handleBatch([record])
+    (stream,) = session.post.call_args.kwargs["json"]["streams"]
+    assert stream["values"][0][0] == "1700000000500000000"
+    assert stream["stream"]["severity"] == "info"
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__(logging.DEBUG)
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.records.append(record)
+
+
+@pytest.fixture
+def recordingHandler():
+    handler = RecordingHandler()
+    logger.addHandler(handler)
+    yield handler
+    logger.removeHandler(handler)
+
+
+def test_logMethod_logsCallAndExit(recordingHandler):
+    @logMethod(level=logging.INFO)
+    def add(a, b):
+        return a + b
+
+    assert add(1, 2) == 3
+    messages = [record.getMessage() for record in recordingHandler.records]
+    assert messages == ["Function called", "Function exited successfully"]
+    assert str(recordingHandler.records[0].func_args) == "(2,)"
+
+
+def test_logMethod_skipsArgsWhenLevelDisabled(recordingHandler):
+    @logMethod(level=logging.DEBUG)
+    def add(a, b):
+        return a + b
+
+    with patch("app.logger.formatArgs") as formatArgsMock:
+        logger.setLevel(logging.INFO)
+        try:
+            assert add(1, 2) == 3
+        finally:
+            logger.setLevel(logging.DEBUG)
+    formatArgsMock.assert_not_called()
+    assert recordingHandler.records == []
+
+
+def test_logMethod_sampleRateZeroStillLogsErrors(recordingHandler):
+    @logMethod(sampleRate=0.0)
+    def fail():
+        raise ValueError("boom")
+
+    @logMethod(sampleRate=0.0)
+    def ok():
+        return 1
+
+    ok()
+    with pytest.raises(ValueError):
+        fail()
+    assert len(recordingHandler.records) == 1
+    assert recordingHandler.records[0].levelno == logging.ERROR
+
+
+@pytest.mark.asyncio
+async def test_logMethod_asyncFunction(recordingHandler):
+    @logMethod(level=logging.INFO)
+    async def double(x):
+        return x * 2
+
+    assert await double(2) == 4
+    assert len(recordingHandler.records) == 2
+
+
+def test_logMethod_disabledReturnsSameFunction():
+    def add(a, b):
+        return a + b
+
+    with patch("app.logger.LOG_METHOD_ENABLED", False):
+        assert logMethod(add) is add
+
+
+def test_formatArgs_redactsAndCapsSize():
+    assert formatArgs({"password": "1234"}) == "{'password': '***'}"
+    text = formatArgs(list(range(1000)))
+    assert len(text) < 100
+
+
+def test_parseSampleRates():
+    rates = parseSampleRates("ItemsLoader.buildImageUrl=0.1, Foo.bar=2,bad")
+    assert rates == {"ItemsLoader.buildImageUrl": 0.1, "Foo.bar": 1.0}
+
+
+def test_invalidLogMethodLevelFailsAtStartup():
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.envVariables"],
+        env={**os.environ, "LOG_METHOD_LEVEL": "VERBOSE"},
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode != 0
+    assert "LOG_METHOD_LEVEL=VERBOSE is not a logging level" in result.stderr
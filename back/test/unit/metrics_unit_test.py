@@ -0,0 +1,180 @@
+import pytest
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.data.queryInstrumentation import (
+    RequestQueryStats,
+    currentQueryStats,
+    instrumentEngine,
+    normalizeStatement,
+    startQueryStats,
+    stopQueryStats,
+)
+from app.metrics import (
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    cacheHitRatio,
+    dbQueriesPerRequest,
+    httpRequestSeconds,
+    queryBudgetWarningsTotal,
+    recordCacheLookup,
+    renderMetrics,
+)
+from app.routes import metrics
+from app.routes.MetricsMiddleware import MetricsMiddleware
+from app.routes.QueryBudgetMiddleware import QueryBudgetMiddleware, checkQueryBudget
+
+
+def test_counter_rendersLabels():
+    registry = MetricsRegistry()
+    requests = Counter("test_requests_total", "Test counter", ("route",))
+    registry.register(requests)
+    requests.inc(route="/items")
+    requests.inc(2, route="/items")
+    output: str = registry.render()
+    assert "# TYPE test_requests_total counter" in output
+    assert 'test_requests_total{route="/items"} 3' in output
+
+
+def test_counter_wrongLabelsRaise():
+    requests = Counter("test_wrong_labels", "Test counter", ("route",))
+    with pytest.raises(ValueError):
+        requests.inc(path="/items")
+
+
+def test_histogram_bucketsAreCumulative():
+    latency = Histogram("test_latency_seconds", "Test histogram", buckets=(0.1, 1.0))
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+    lines = latency.samples()
+    assert 'test_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 'test_latency_seconds_bucket{le="1"} 2' in lines
+    assert 'test_latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "test_latency_seconds_count 3" in lines
+    assert latency.getSum() == pytest.approx(5.55)
+
+
+def test_registry_duplicateNameRaises():
+    registry = MetricsRegistry()
+    registry.register(Counter("test_duplicate", "Test"))
+    with pytest.raises(ValueError):
+        registry.register(Counter("test_duplicate", "Test"))
+
+
+def test_recordCacheLookup_updatesHitRatio():
+    recordCacheLookup("testCache", hit=True)
+    recordCacheLookup("testCache", hit=True)
+    recordCacheLookup("testCache", hit=False)
+    renderMetrics()
+    assert cacheHitRatio.get(cache="testCache") == pytest.approx(2 / 3)
+
+
+def makeApp() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/things/{thing_id}")
+    async def getThing(thing_id: int):
+        return {"id": thing_id}
+
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(QueryBudgetMiddleware)
+    app.include_router(metrics.router, prefix="/metrics")
+    return app
+
+
+def test_metricsMiddleware_labelsByRouteTemplate():
+    client = TestClient(makeApp())
+    before: float = httpRequestSeconds.getCount(
+        method="GET", route="/things/{thing_id}", status="200"
+    )
+    assert client.get("/things/1").status_code == 200
+    assert client.get("/things/2").status_code == 200
+    assert (
+        httpRequestSeconds.getCount(method="GET", route="/things/{thing_id}", status="200")
+        == before + 2
+    )
+    assert dbQueriesPerRequest.getCount(route="/things/{thing_id}") >= 2
+
+
+def test_metricsMiddleware_unmatchedRoute():
+    client = TestClient(makeApp())
+    before: float = httpRequestSeconds.getCount(
+        method="GET", route="unmatched", status="404"
+    )
+    assert client.get("/missing").status_code == 404
+    assert (
+        httpRequestSeconds.getCount(method="GET", route="unmatched", status="404")
+        == before + 1
+    )
+
+
+def test_metricsEndpoint_exposesTextFormat():
+    client = TestClient(makeApp())
+    client.get("/things/1")
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+
+
+@pytest.mark.asyncio
+async def test_queryStats_countsStatements():
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    instrumentEngine(engine.sync_engine)
+    instrumentEngine(engine.sync_engine)
+    stats, token = startQueryStats()
+    try:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+    finally:
+        stopQueryStats(token)
+        await engine.dispose()
+    assert stats.count == 2
+    assert stats.totalSeconds > 0
+    assert currentQueryStats.get() is None
+
+
+def test_normalizeStatement_collapsesValues():
+    first: str = normalizeStatement("SELECT * FROM items WHERE id = $1 AND name = 'a'")
+    second: str = normalizeStatement("SELECT *  FROM items\nWHERE id = 7 AND name = 'b'")
+    assert first == second == "SELECT * FROM items WHERE id = ? AND name = ?"
+    assert normalizeStatement("SELECT 1 FROM t WHERE id IN (?, ?, ?)") == (
+        "SELECT ? FROM t WHERE id IN (?)"
+    )
+
+
+def test_queryBudgetMiddleware_addsServerTiming():
+    client = TestClient(makeApp())
+    response = client.get("/things/1")
+    assert response.headers["server-timing"].startswith('db;dur=')
+    assert "app;dur=" in response.headers["server-timing"]
+
+
+def test_checkQueryBudget_warnsOnBudgetAndRepeats():
+    stats = RequestQueryStats()
+    for itemId in range(4):
+        stats.record(0.001, f"SELECT * FROM gold WHERE id = {itemId}")
+    with patch("app.routes.QueryBudgetMiddleware.logger") as mockLogger:
+        checkQueryBudget(stats, "GET", "/items/all", budget=3, repeatedThreshold=3)
+    assert mockLogger.warning.call_count == 2
+    assert "budget 3" in mockLogger.warning.call_args_list[0].args[0]
+    assert "N+1" in mockLogger.warning.call_args_list[1].args[0]
+    assert queryBudgetWarningsTotal.get(route="/items/all", reason="repeated") >= 1
+
+
+def test_checkQueryBudget_quietUnderBudget():
+    stats = RequestQueryStats()
+    stats.record(0.001, "SELECT 1")
+    with patch("app.routes.QueryBudgetMiddleware.logger") as mockLogger:
+        checkQueryBudget(stats, "GET", "/items/all", budget=3, repeatedThreshold=3)
+    mockLogger.warning.assert_not_called()
@@ -96,3 +96,29 @@ async def test_get_profile_info_none_user():
         response = client.get("/profile/info")
         assert response.status_code == 500
         assert "Internal server error" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_get_profile_info_reads_the_primary():
+    """The profile info is cached, it must not be read from a lagging replica."""
+    from app.data.database import getDbSession, getReadDbSession
+
+    sessions = []
+
+    async def fakeGetProfileInfo(self, userName):
+        sessions.append(self.dbSession)
+        return STATIC_PROFILE_INFO1
+
+    app.dependency_overrides[getDbSession] = lambda: "primary"
+    app.dependency_overrides[getReadDbSession] = lambda: "replica"
+    try:
+        with patch(
+            "app.profile.ProfileWorker.ProfileWorker.getProfileInfo",
+            new=fakeGetProfileInfo,
+        ):
+            response = client.get("/profile/info")
+    finally:
+        del app.dependency_overrides[getDbSession]
+        del app.dependency_overrides[getReadDbSession]
+    assert response.status_code == 200
+    assert sessions == ["primary"]
@@ -3,11 +3,14 @@ from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from app.main import app
 from app.customExceptions import (
+    InvalidCursorException,
+    InvalidReviewBatchException,
     InvalidRatingException,
     InvalidUserReview,
     ReviewProcessorException,
 )
 from app.routes.auth import getUserIdFromName
+from app.schemas.Review import ReviewSummary
 from staticData import STATIC_REVIEW1, STATIC_REVIEW2
 
 STATIC_REVIEWS = [STATIC_REVIEW1, STATIC_REVIEW2]
@@ -180,3 +183,84 @@ async def test_get_reviews_by_item_error():
     ):
         response = client.get(f"/review/item/{itemId}")
         assert response.status_code == 500
+
+
+@pytest.mark.asyncio
+async def test_get_review_summaries_success():
+    """Test bulk retrieval of item review summaries."""
+    summaries = [
+        ReviewSummary(itemId=1, count=2, averageRating=4.5, ratingCounts=[0, 0, 0, 1, 1]),
+        ReviewSummary(itemId=2),
+    ]
+    with patch(
+        "app.reviews.ReviewProcessor.ReviewProcessor.getReviewSummaries",
+        new=AsyncMock(return_value=summaries),
+    ) as getReviewSummaries:
+        response = client.get("/review/summaries?item_ids=1&item_ids=2")
+        assert response.status_code == 200
+        assert response.json()[0]["averageRating"] == 4.5
+        assert response.json()[1]["count"] == 0
+        getReviewSummaries.assert_awaited_once_with([1, 2])
+
+
+@pytest.mark.asyncio
+async def test_get_review_summaries_too_many_ids():
+    """Test the item ids limit of the summaries endpoint."""
+    query = "&".join(f"item_ids={itemId}" for itemId in range(501))
+    response = client.get(f"/review/summaries?{query}")
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_reviews_page_by_item_invalid_cursor():
+    """Test that an invalid cursor is a client error."""
+    with patch(
+        "app.reviews.ReviewProcessor.ReviewProcessor.getReviewsPage",
+        new=AsyncMock(side_effect=InvalidCursorException("Invalid pagination cursor")),
+    ):
+        response = client.get("/review/item/1/page?cursor=abc")
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_reviews_page_by_item_limit_bounds():
+    """Test that the page size is capped."""
+    response = client.get("/review/item/1/page?limit=1000")
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_add_bulk_reviews_success():
+    """Test successful addition of the reviews of an order."""
+    with patch(
+        "app.reviews.ReviewProcessor.ReviewProcessor.addOrderReviews",
+        new=AsyncMock(return_value=None),
+    ):
+        response = client.post(
+            "/review/add_bulk",
+            json={"orderId": STATIC_REVIEW1.orderId, "reviews": [reviewToDict(STATIC_REVIEW1)]},
+        )
+        assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_add_bulk_reviews_invalid_batch():
+    """Test that an invalid batch is a client error."""
+    with patch(
+        "app.reviews.ReviewProcessor.ReviewProcessor.addOrderReviews",
+        new=AsyncMock(
+            side_effect=InvalidReviewBatchException("Only one review per item is allowed")
+        ),
+    ):
+        response = client.post(
+            "/review/add_bulk",
+            json={"orderId": STATIC_REVIEW1.orderId, "reviews": [reviewToDict(STATIC_REVIEW1)]},
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_add_bulk_reviews_empty():
+    """Test that a batch needs at least one review."""
+    response = client.post("/review/add_bulk", json={"orderId": 1, "reviews": []})
+    assert response.status_code == 422
@@ -0,0 +1,24 @@
+from benchmarks.serializationBenchmark import main
+from benchmarks.benchmarkResults import readResults
+
+
+def test_main_times_every_path_of_every_endpoint(tmp_path):
+    output = tmp_path / "serialization.json"
+
+    exitCode = main(
+        ["--items", "3", "--rows", "2", "--repeat", "2", "--warmup", "0"]
+        + ["--output", str(output)]
+    )
+
+    results = readResults(str(output))
+    assert exitCode == 0
+    assert "/items/all:default" in results["endpoints"]
+    assert "/profile/info:modelResponse" in results["endpoints"]
+    sizes = {
+        name.rsplit(":", 1)[0]: stats["bodyBytes"]
+        for name, stats in results["endpoints"].items()
+        if name.endswith(":default")
+    }
+    for name, stats in results["endpoints"].items():
+        assert stats["count"] == 2
+        assert stats["bodyBytes"] == sizes[name.rsplit(":", 1)[0]]
@@ -0,0 +1,190 @@
+import json
+import pytest
+from typing import Dict, List
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import StaticPool
+from app.data.queryInstrumentation import instrumentEngine
+from app.logger import logMethod
+from app.routes.RequestLoggingMiddleware import RequestLoggingMiddleware
+from app.tracing import (
+    STATUS_ERROR,
+    BatchSpanProcessor,
+    JsonFileSpanExporter,
+    SpanExporter,
+    Trace,
+    Tracer,
+    currentSpan,
+    parseTraceparent,
+    tracer,
+)
+
+UPSTREAM_TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+UPSTREAM_SPAN_ID = "00f067aa0ba902b7"
+
+
+class CollectingExporter(SpanExporter):
+    def __init__(self) -> None:
+        super().__init__()
+        self.traces: List[Trace] = []
+
+    def export(self, traces: List[Trace]) -> None:
+        self.traces.extend(traces)
+
+
+def makeTracer(sampleRate: float = 1.0) -> Tracer:
+    return Tracer(
+        BatchSpanProcessor(CollectingExporter()), enabled=True, sampleRate=sampleRate
+    )
+
+
+def readSpans(path) -> List[Dict]:
+    spans: List[Dict] = []
+    with open(path) as file:
+        for line in file:
+            for resourceSpans in json.loads(line)["resourceSpans"]:
+                for scopeSpans in resourceSpans["scopeSpans"]:
+                    spans.extend(scopeSpans["spans"])
+    return spans
+
+
+def test_parseTraceparent():
+    header = f"00-{UPSTREAM_TRACE_ID}-{UPSTREAM_SPAN_ID}-01"
+    assert parseTraceparent(header) == (UPSTREAM_TRACE_ID, UPSTREAM_SPAN_ID, True)
+    assert parseTraceparent(header[:-1] + "0")[2] is False
+    assert parseTraceparent(None) is None
+    assert parseTraceparent("00-abc-def-01") is None
+    assert parseTraceparent(f"00-{'0' * 32}-{UPSTREAM_SPAN_ID}-01") is None
+
+
+def test_spanExporter_requires_export():
+    class IncompleteExporter(SpanExporter):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteExporter()
+
+
+def test_startRootSpan_headSampling():
+    assert makeTracer(sampleRate=0.0).startRootSpan("GET") is None
+    disabled = makeTracer()
+    disabled.enabled = False
+    assert disabled.startRootSpan("GET") is None
+
+
+def test_startRootSpan_followsUpstreamDecision():
+    sampledTracer = makeTracer(sampleRate=0.0)
+    root = sampledTracer.startRootSpan(
+        "GET", f"00-{UPSTREAM_TRACE_ID}-{UPSTREAM_SPAN_ID}-01"
+    )
+    assert root.trace.traceId == UPSTREAM_TRACE_ID
+    assert root.parentSpanId == UPSTREAM_SPAN_ID
+    sampledTracer.finishTrace(root)
+
+    unsampledTracer = makeTracer(sampleRate=1.0)
+    header = f"00-{UPSTREAM_TRACE_ID}-{UPSTREAM_SPAN_ID}-00"
+    assert unsampledTracer.startRootSpan("GET", header) is None
+
+
+def test_spans_nestUnderCurrentSpan():
+    testTracer = makeTracer()
+    root = testTracer.startRootSpan("GET /items")
+    with testTracer.span("ItemCatalog.get") as child:
+        testTracer.recordSpan("SELECT", 1, 2)
+        with pytest.raises(ValueError):
+            with testTracer.span("ItemCatalog.parse"):
+                raise ValueError("bad item")
+        assert currentSpan.get() is child
+    testTracer.finishTrace(root)
+    testTracer.processor.flush()
+
+    assert currentSpan.get() is None
+    (trace,) = testTracer.processor.exporter.traces
+    spans = {span.name: span for span in trace.spans}
+    assert spans["ItemCatalog.get"].parentSpanId == root.spanId
+    assert spans["SELECT"].parentSpanId == child.spanId
+    assert spans["ItemCatalog.parse"].parentSpanId == child.spanId
+    assert spans["ItemCatalog.parse"].statusCode == STATUS_ERROR
+    assert all(span.endNs is not None for span in trace.spans)
+
+
+def test_spans_areSkippedOutsideATrace():
+    testTracer = makeTracer()
+    with testTracer.span("ItemCatalog.get") as span:
+        assert span is None
+    testTracer.recordSpan("SELECT", 1, 2)
+    assert testTracer.processor.thread is None
+
+
+def test_trace_capsNumberOfSpans():
+    testTracer = makeTracer()
+    testTracer.maxSpans = 3
+    root = testTracer.startRootSpan("GET")
+    for _ in range(5):
+        testTracer.recordSpan("SELECT", 1, 2)
+    testTracer.finishTrace(root)
+    assert len(root.trace.spans) == 3
+    assert root.attributes["trace.dropped_spans"] == 3
+
+
+@pytest.fixture
+def tracedApp(tmp_path, monkeypatch):
+    engine = create_async_engine(
+        "sqlite+aiosqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    instrumentEngine(engine.sync_engine)
+    tracePath = tmp_path / "traces.jsonl"
+    processor = BatchSpanProcessor(JsonFileSpanExporter(str(tracePath)))
+    monkeypatch.setattr(tracer, "processor", processor)
+    monkeypatch.setattr(tracer, "enabled", True)
+    monkeypatch.setattr(tracer, "sampleRate", 1.0)
+
+    class Processor:
+        @logMethod
+        async def countItems(self) -> int:
+            async with engine.connect() as connection:
+                result = await connection.execute(
+                    text("SELECT 1 WHERE 1 = :one"), {"one": 1}
+                )
+                return result.scalar()
+
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+
+    @app.get("/items/{item_id}")
+    async def getItem(item_id: int):
+        return {"count": await Processor().countItems()}
+
+    yield TestClient(app), processor, tracePath
+    processor.shutdown()
+
+
+def test_middleware_exportsRequestWaterfall(tracedApp):
+    client, processor, tracePath = tracedApp
+    response = client.get("/items/3", headers={"X-Request-ID": "req-123"})
+    processor.flush()
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-123"
+    spans = {span["name"]: span for span in readSpans(tracePath)}
+    root = spans["GET /items/{item_id}"]
+    method = spans["tracedApp.<locals>.Processor.countItems"]
+    query = spans["SELECT"]
+    assert response.headers["traceparent"].split("-")[1] == root["traceId"]
+    assert "parentSpanId" not in root
+    assert method["parentSpanId"] == root["spanId"]
+    assert query["parentSpanId"] == method["spanId"]
+    attributes = {item["key"]: item["value"] for item in query["attributes"]}
+    assert attributes["db.statement"]["stringValue"] == "SELECT ? WHERE ? = ?"
+    assert int(query["endTimeUnixNano"]) >= int(query["startTimeUnixNano"])
+
+
+def test_middleware_replacesInvalidRequestId(tracedApp):
+    client, _, _ = tracedApp
+    response = client.get("/items/3", headers={"X-Request-ID": "bad id\nforged"})
+    assert response.headers["X-Request-ID"] != "bad id\nforged"
+    assert len(response.headers["X-Request-ID"]) == 36